@@ -13,6 +13,8 @@ from taskbrew.intelligence.clarification import ClarificationDetector
 from taskbrew.intelligence.execution import CommitPlanner, DebuggingHelper
 from taskbrew.orchestrator.event_bus import EventBus
 from taskbrew.orchestrator.task_board import TaskBoard
+from taskbrew.orchestrator.tracing import get_tracer
+from taskbrew.tools.git_service import get_git_service
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,12 @@ DEFAULT_TASK_TIMEOUT = 1800  # 30 minutes
 MAX_RETRIES = 3
 RETRY_BASE_DELAY = 5
 
+# The most recent usage row of a task, for cost attribution.
+_LATEST_USAGE_SQL = (
+    "SELECT input_tokens, output_tokens, cost_usd FROM task_usage "
+    "WHERE task_id = ? ORDER BY recorded_at DESC LIMIT 1"
+)
+
 
 # Retry classification
 # docs/superpowers/specs/2026-04-24-retry-classification-design.md
@@ -82,6 +90,7 @@ def _is_retryable(exc: BaseException) -> bool:
     return any(token in msg for token in _RETRYABLE_MESSAGE_SUBSTRINGS)
 
 if TYPE_CHECKING:
+    from taskbrew.agents.supervisor import AgentSupervisor
     from taskbrew.tools.worktree_manager import WorktreeManager
 
 
@@ -113,6 +122,10 @@ class AgentLoop:
         Optional WorktreeManager for git worktree isolation.  When provided
         the agent runs each task in its own worktree so it never touches the
         main checkout.
+    supervisor:
+        Optional shared AgentSupervisor. When provided it owns this
+        agent's heartbeat and idle watchdog; otherwise the loop runs its
+        own per-agent heartbeat and watchdog tasks.
     """
 
     def __init__(
@@ -137,6 +150,8 @@ class AgentLoop:
         cli_provider: str = "claude",
         mcp_servers: dict | None = None,
         preflight_checker=None,
+        supervisor: AgentSupervisor | None = None,
+        cost_manager=None,
     ) -> None:
         self.instance_id = instance_id
         self.role_config = role_config
@@ -163,6 +178,10 @@ class AgentLoop:
         self._observability_manager = observability_manager
         self.cli_provider = cli_provider
         self.mcp_servers = mcp_servers
+        self.supervisor = supervisor
+        # Spend is charged to the CostManager ledger that budget checks
+        # are answered from; record_task_usage alone never reaches it.
+        self.cost_manager = cost_manager
         self._running = False
 
     async def poll_for_task(self) -> dict | None:
@@ -491,7 +510,10 @@ class AgentLoop:
             cli_path=self.cli_path,
             event_bus=self.event_bus,
         )
-        context = await self.build_context(task)
+        tracer = get_tracer()
+        role = self.role_config.role
+        with tracer.span("agent.build_context", role=role, task_id=task["id"]):
+            context = await self.build_context(task)
 
         if worktree_path:
             context += (
@@ -504,27 +526,32 @@ class AgentLoop:
         # Activity callback for the idle watchdog. Each SDK message
         # (tool use / text block / result) bumps the timestamp so an
         # actively-working agent never trips the timeout.
-        import time as _time
-
-        def _on_activity():
-            self._last_activity_ts = _time.monotonic()
-
-        output = await runner.run(
-            prompt=context, cwd=cwd, on_activity=_on_activity,
-        )
+        with tracer.span(
+            "agent.sdk_run", role=role, task_id=task["id"],
+            model=self.role_config.model,
+        ):
+            output = await runner.run(
+                prompt=context, cwd=cwd, on_activity=self._note_activity,
+            )
 
         # Record usage from SDK
         if runner.last_usage:
             u = runner.last_usage.get("usage") or {}
+            cost_usd = runner.last_usage.get("cost_usd") or 0
             await self.board.record_task_usage(
                 task_id=task["id"],
                 agent_id=self.instance_id,
+                role=self.role_config.role,
                 input_tokens=u.get("input_tokens", 0),
                 output_tokens=u.get("output_tokens", 0),
-                cost_usd=runner.last_usage.get("cost_usd") or 0,
+                cost_usd=cost_usd,
                 duration_api_ms=runner.last_usage.get("duration_api_ms", 0),
                 num_turns=runner.last_usage.get("num_turns", 0),
             )
+            if self.cost_manager is not None and cost_usd:
+                await self.cost_manager.record_spend(
+                    cost_usd, role=role, group_id=task.get("group_id"),
+                )
 
         return output
 
@@ -760,8 +787,7 @@ class AgentLoop:
             try:
                 # Get usage data if available
                 usage_row = await self.board._db.execute_fetchone(
-                    "SELECT input_tokens, output_tokens, cost_usd FROM task_usage WHERE task_id = ? ORDER BY created_at DESC LIMIT 1",
-                    (task["id"],),
+                    _LATEST_USAGE_SQL, (task["id"],),
                 )
                 if usage_row:
                     await self._observability_manager.attribute_cost(
@@ -993,22 +1019,13 @@ class AgentLoop:
         if not cwd:
             return []
         parent_branch = task.get("parent_branch") or "main"
+        git = self.worktree_manager.git
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "git", "diff", "--name-only", f"{parent_branch}...HEAD",
-                cwd=cwd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
-            if proc.returncode != 0:
-                return []
-        except (asyncio.TimeoutError, FileNotFoundError, OSError):
+            branch = await git.worktree_branch(cwd)
+            numstat = await git.diff_numstat(parent_branch, branch, cwd=cwd)
+        except (RuntimeError, asyncio.TimeoutError, OSError):
             return []
-        return [
-            line for line in stdout.decode(errors="replace").splitlines()
-            if line.strip()
-        ]
+        return [path for _added, _removed, path in numstat]
 
     async def _count_changed_loc(
         self, worktree_path: str | None, branch_name: str | None,
@@ -1017,36 +1034,29 @@ class AgentLoop:
 
         Returns None when the call fails (dirty worktree, detached head,
         no git, etc.) so the caller can decide the conservative default.
+        Goes through the shared GitService, so a branch whose commits
+        have not moved since the last check costs no git process.
         """
         cwd = worktree_path or self.project_dir
         if not cwd:
             return None
+        if self.worktree_manager is not None:
+            git = self.worktree_manager.git
+        else:
+            git = get_git_service(self.project_dir or cwd)
+        # Without a worktree the diff is of the project checkout's HEAD.
+        branch = branch_name if worktree_path else "HEAD"
         try:
-            proc = await asyncio.create_subprocess_exec(
-                "git", "diff", "--numstat", "main...HEAD",
-                cwd=cwd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
-            if proc.returncode != 0:
-                return None
-        except (asyncio.TimeoutError, FileNotFoundError, OSError):
+            numstat = await git.diff_numstat("main", branch, cwd=cwd)
+        except (RuntimeError, asyncio.TimeoutError, OSError):
             return None
 
         total = 0
-        for line in stdout.decode(errors="replace").splitlines():
-            parts = line.split("\t")
-            if len(parts) < 2:
-                continue
-            added, removed = parts[0], parts[1]
-            # Binary files report "-" for both counts — skip them.
-            if added == "-" or removed == "-":
-                continue
-            try:
-                total += int(added) + int(removed)
-            except ValueError:
+        for added, removed, _path in numstat:
+            # Binary files report no counts — skip them.
+            if added is None or removed is None:
                 continue
+            total += added + removed
         return total
 
     async def _has_verification_child(self, task_id: str) -> bool:
@@ -1063,6 +1073,12 @@ class AgentLoop:
         )
         return row is not None
 
+    def _note_activity(self) -> None:
+        """SDK activity callback: feeds the idle watchdog."""
+        self._last_activity_ts = time.monotonic()
+        if self.supervisor is not None:
+            self.supervisor.touch(self.instance_id)
+
     async def _heartbeat_loop(self):
         """Background heartbeat that runs during task execution."""
         while True:
@@ -1084,6 +1100,9 @@ class AgentLoop:
         """Activity-based watchdog: kill ``target`` if the agent goes
         ``idle_timeout`` seconds without any SDK activity.
 
+        Only used without a supervisor; :class:`AgentSupervisor` does the
+        same check in memory for the whole fleet.
+
         Pauses while ``tasks.awaiting_input_since`` is non-NULL so an
         agent legitimately waiting on a manual ask_question response
         doesn't get killed during overnight runs.
@@ -1144,7 +1163,9 @@ class AgentLoop:
                 "model": self.role_config.model,
             })
 
-        task = await self.poll_for_task()
+        tracer = get_tracer()
+        with tracer.span("agent.claim", role=self.role_config.role):
+            task = await self.poll_for_task()
         if task is None:
             return False
 
@@ -1215,11 +1236,14 @@ class AgentLoop:
         )
         parent_branch: str | None = task.get("parent_branch") or "main"
         if self.worktree_manager:
-            worktree_path = await self.worktree_manager.create_worktree(
-                agent_name=self.instance_id,
-                branch_name=branch_name,
-                base_branch=parent_branch,
-            )
+            with tracer.span(
+                "agent.worktree", role=self.role_config.role, task_id=task["id"],
+            ):
+                worktree_path = await self.worktree_manager.create_worktree(
+                    agent_name=self.instance_id,
+                    branch_name=branch_name,
+                    base_branch=parent_branch,
+                )
             logger.info(
                 "Agent %s using worktree %s (branch %s)",
                 self.instance_id, worktree_path, branch_name,
@@ -1239,7 +1263,10 @@ class AgentLoop:
                 or DEFAULT_TASK_TIMEOUT
             )
             self._last_activity_ts = _time.monotonic()
-            hb_task = asyncio.create_task(self._heartbeat_loop())
+            hb_task = (
+                asyncio.create_task(self._heartbeat_loop())
+                if self.supervisor is None else None
+            )
             try:
                 for attempt in range(MAX_RETRIES + 1):
                     try:
@@ -1251,21 +1278,33 @@ class AgentLoop:
                             worktree_path=worktree_path,
                             branch_name=branch_name,
                         ))
-                        watchdog_task = asyncio.create_task(
-                            self._idle_watchdog(
+                        watchdog_task = None
+                        if self.supervisor is not None:
+                            self.supervisor.watch(
+                                self.instance_id,
                                 task_id=task["id"],
-                                idle_timeout=idle_timeout,
                                 target=exec_task,
+                                idle_timeout=idle_timeout,
+                            )
+                        else:
+                            watchdog_task = asyncio.create_task(
+                                self._idle_watchdog(
+                                    task_id=task["id"],
+                                    idle_timeout=idle_timeout,
+                                    target=exec_task,
+                                )
                             )
-                        )
                         try:
                             output = await exec_task
                         finally:
-                            watchdog_task.cancel()
-                            try:
-                                await watchdog_task
-                            except (asyncio.CancelledError, Exception):
-                                pass
+                            if watchdog_task is None:
+                                self.supervisor.unwatch(self.instance_id)
+                            else:
+                                watchdog_task.cancel()
+                                try:
+                                    await watchdog_task
+                                except (asyncio.CancelledError, Exception):
+                                    pass
                         break  # success
                     except asyncio.CancelledError:
                         # Watchdog killed us. Treat exactly like a timeout.
@@ -1355,18 +1394,22 @@ class AgentLoop:
                                 )
                             raise  # let outer handler fail the task
             finally:
-                hb_task.cancel()
-                try:
-                    await hb_task
-                except (asyncio.CancelledError, Exception):
-                    pass
+                if hb_task is not None:
+                    hb_task.cancel()
+                    try:
+                        await hb_task
+                    except (asyncio.CancelledError, Exception):
+                        pass
 
             task_logger.info("Agent %s completed task %s", self.instance_id, task["id"])
-            await self.complete_and_handoff(
-                task, output,
-                worktree_path=worktree_path,
-                branch_name=branch_name,
-            )
+            with tracer.span(
+                "agent.complete", role=self.role_config.role, task_id=task["id"],
+            ):
+                await self.complete_and_handoff(
+                    task, output,
+                    worktree_path=worktree_path,
+                    branch_name=branch_name,
+                )
         except Exception as e:
             task_logger.error("Agent %s failed task %s: %s", self.instance_id, task["id"], e, exc_info=True)
             await self.board.fail_task(task["id"])
@@ -1449,6 +1492,8 @@ class AgentLoop:
             await self.instance_manager.register_instance(
                 self.instance_id, self.role_config
             )
+            if self.supervisor is not None:
+                self.supervisor.register(self.instance_id, asyncio.current_task())
             await self.event_bus.emit(
                 "agent.status_changed",
                 {"instance_id": self.instance_id, "status": "idle",
@@ -1486,7 +1531,8 @@ class AgentLoop:
                         self.instance_id, "idle", current_task=None,
                     )
                     await asyncio.sleep(self.poll_interval)
-                await self.instance_manager.heartbeat(self.instance_id)
+                if self.supervisor is None:
+                    await self.instance_manager.heartbeat(self.instance_id)
 
             # Cleanup after loop exits
             await self.instance_manager.update_status(
@@ -1501,6 +1547,8 @@ class AgentLoop:
             # Always unsubscribe so a stopped agent doesn't leave
             # a dangling callback in the event bus.
             self.event_bus.unsubscribe("task.available", self._wake_handler)
+            if self.supervisor is not None:
+                self.supervisor.unregister(self.instance_id)
             # Destroy the agent's worktree at stop time, not per-task.
             # Per-task cleanup was removed so untracked-ignored state
             # (node_modules, .venv) survives across tasks on the same
@@ -1,10 +1,23 @@
-"""Dynamic agent instance scaling based on queue depth."""
+"""Dynamic agent instance scaling based on queue depth and forecast demand.
+
+Each tick reads queue depth with one grouped ``COUNT`` and the arrivals
+and completions since the previous tick, feeding per-role EWMA
+estimates of arrival rate and service time. A role with
+``auto_scale.target_latency`` set is sized from those estimates (offered
+load plus enough capacity to drain the backlog within the target), so
+scale-up starts as demand builds instead of after the queue crosses
+``scale_up_threshold``. :func:`replay_history` runs the same policy over
+the recorded task history to tune thresholds offline.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import bisect
 import logging
+import math
 import time
+from collections import deque
 from collections.abc import Awaitable, Callable
 from datetime import datetime, timezone
 
@@ -20,6 +33,83 @@ DEFAULT_COOLDOWN_SECONDS = 60
 # Minimum seconds an agent must be idle before it becomes eligible for
 # scale-down (5 minutes).
 DEFAULT_IDLE_THRESHOLD_SECONDS = 300
+# Weight of the newest sample in the arrival-rate / service-time EWMAs.
+DEFAULT_EWMA_ALPHA = 0.3
+# Scaling decisions kept for get_scaling_status().
+_DECISION_HISTORY = 50
+
+
+class DemandEstimate:
+    """EWMA arrival rate (tasks/s) and service time (s/task) for one role."""
+
+    __slots__ = ("alpha", "arrival_rate", "service_time")
+
+    def __init__(self, alpha: float = DEFAULT_EWMA_ALPHA) -> None:
+        self.alpha = alpha
+        self.arrival_rate: float | None = None
+        self.service_time: float | None = None
+
+    def _blend(self, old: float | None, sample: float) -> float:
+        return sample if old is None else self.alpha * sample + (1 - self.alpha) * old
+
+    def observe(
+        self, elapsed: float, arrivals: int, completions: int, service_seconds: float,
+    ) -> None:
+        """Fold one window of *elapsed* seconds into the estimates."""
+        if elapsed <= 0:
+            return
+        self.arrival_rate = self._blend(self.arrival_rate, arrivals / elapsed)
+        if completions > 0:
+            self.service_time = self._blend(self.service_time, service_seconds / completions)
+
+    def desired_instances(self, pending: int, target_latency: float) -> int | None:
+        """Instances needed to absorb arrivals and drain *pending* within
+        *target_latency* seconds, or ``None`` before any task has been
+        observed completing."""
+        if self.service_time is None or target_latency <= 0:
+            return None
+        load = (self.arrival_rate or 0.0) * self.service_time
+        drain = pending * self.service_time / target_latency
+        # Round first so float noise (2.0000000001) doesn't add an instance.
+        return math.ceil(round(load + drain, 6))
+
+
+def _target_latency_seconds(role_cfg: RoleConfig) -> float | None:
+    """Per-role ``auto_scale.target_latency`` (MINUTES) in seconds."""
+    asc = role_cfg.auto_scale
+    if asc is None or not asc.target_latency:
+        return None
+    return float(asc.target_latency) * 60.0
+
+
+def _scale_up_count(
+    pending: int, active: int, max_instances: int, threshold: int, target: int | None,
+) -> int:
+    """Instances to add: the larger of the reactive rule (queue above
+    *threshold*) and the forecast *target*, capped at *max_instances*."""
+    want = pending - threshold if pending > threshold else 0
+    if target is not None:
+        want = max(want, target - active)
+    return max(min(want, max_instances - active), 0)
+
+
+def _scale_down_count(
+    pending: int, active: int, extra: int, max_instances: int, target: int | None,
+) -> int:
+    """Instances to remove before idle checks.
+
+    Over the ceiling always shrinks; otherwise auto-spawned extras go
+    once the queue is empty, minus whatever the forecast still needs.
+    """
+    over_max = max(active - max_instances, 0)
+    if over_max:
+        return max(extra, over_max)
+    if pending > 0:
+        return 0
+    want = extra
+    if target is not None:
+        want = min(want, max(active - target, 0))
+    return want
 
 
 class AutoScaler:
@@ -28,7 +118,7 @@ class AutoScaler:
     Parameters
     ----------
     task_board:
-        The :class:`TaskBoard` used to query pending task counts.
+        The :class:`TaskBoard` used to query queue depths and task flow.
     instance_manager:
         The :class:`InstanceManager` used to inspect running instances.
     roles:
@@ -45,6 +135,11 @@ class AutoScaler:
     idle_threshold_seconds:
         Minimum seconds an agent must be idle before it is eligible for
         scale-down.
+    ewma_alpha:
+        Weight of the newest window in the demand estimates.
+    dry_run:
+        Decide and record scaling actions without spawning or stopping
+        anything.
     """
 
     def __init__(
@@ -57,6 +152,8 @@ class AutoScaler:
         cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
         idle_threshold_seconds: float = DEFAULT_IDLE_THRESHOLD_SECONDS,
         event_bus: EventBus | None = None,
+        ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+        dry_run: bool = False,
     ) -> None:
         self._board = task_board
         self._instances = instance_manager
@@ -68,8 +165,15 @@ class AutoScaler:
         self._cooldown_seconds = cooldown_seconds
         self._idle_threshold_seconds = idle_threshold_seconds
         self._event_bus = event_bus
+        self._dry_run = dry_run
         # Timestamps of last scaling action per role, keyed by (role, direction).
         self._last_scale_at: dict[tuple[str, str], float] = {}
+        self._ewma_alpha = ewma_alpha
+        self._estimates: dict[str, DemandEstimate] = {}
+        # End of the last flow window (ISO timestamp + monotonic clock).
+        self._flow_since: str | None = None
+        self._flow_at: float = 0.0
+        self._decisions: deque[dict] = deque(maxlen=_DECISION_HISTORY)
 
     async def run(self, interval: float = 15.0) -> None:
         """Main scaling loop.
@@ -97,6 +201,24 @@ class AutoScaler:
         """Record the timestamp of a scaling action."""
         self._last_scale_at[(role_name, direction)] = time.monotonic()
 
+    def _record_decision(
+        self, role_name: str, direction: str, count: int,
+        pending: int, active: int, target: int | None,
+    ) -> None:
+        est = self._estimates.get(role_name)
+        self._decisions.append({
+            "at": datetime.now(timezone.utc).isoformat(),
+            "role": role_name,
+            "direction": direction,
+            "count": count,
+            "pending": pending,
+            "active": active,
+            "target": target,
+            "arrival_rate": est.arrival_rate if est else None,
+            "service_time": est.service_time if est else None,
+            "dry_run": self._dry_run,
+        })
+
     @staticmethod
     def _idle_seconds(instance: dict) -> float:
         """Return how long *instance* has been idle based on its heartbeat.
@@ -129,18 +251,59 @@ class AutoScaler:
             return float(role_cfg.auto_scale.scale_down_idle) * 60.0
         return self._idle_threshold_seconds
 
+    async def _refresh_estimates(self, role_names: list[str]) -> None:
+        """Fold the arrivals/completions since the last tick into the EWMAs.
+
+        The first call only opens the window.
+        """
+        now_iso = datetime.now(timezone.utc).isoformat()
+        now = time.monotonic()
+        since, elapsed = self._flow_since, now - self._flow_at
+        self._flow_since, self._flow_at = now_iso, now
+        if since is None:
+            return
+        stats = await self._board.get_flow_stats(since, until=now_iso)
+        for role_name in role_names:
+            flow = stats.get(role_name, {})
+            self._estimates.setdefault(
+                role_name, DemandEstimate(self._ewma_alpha),
+            ).observe(
+                elapsed,
+                flow.get("arrivals", 0),
+                flow.get("completions", 0),
+                flow.get("service_seconds", 0.0),
+            )
+
+    def _forecast_target(
+        self, role_name: str, role_cfg: RoleConfig, pending: int,
+    ) -> int | None:
+        """Forecast instance count for roles with a ``target_latency``."""
+        latency = _target_latency_seconds(role_cfg)
+        est = self._estimates.get(role_name)
+        if latency is None or est is None:
+            return None
+        return est.desired_instances(pending, latency)
+
     async def _check_and_scale(self) -> None:
         """Check queue depths and decide scaling actions."""
-        for role_name, role_cfg in self._roles.items():
-            if not role_cfg.auto_scale or not role_cfg.auto_scale.enabled:
-                continue
+        scaled = {
+            name: cfg for name, cfg in self._roles.items()
+            if cfg.auto_scale and cfg.auto_scale.enabled
+        }
+        if not scaled:
+            return
 
-            # Count pending tasks for this role
-            board = await self._board.get_board(assigned_to=role_name)
-            pending_count = len(board.get("pending", []))
+        # One grouped COUNT and one instance listing per tick, shared by
+        # every role (instead of a full get_board() per role).
+        depths = await self._board.get_queue_depths()
+        by_role: dict[str, list[dict]] = {}
+        for inst in await self._instances.get_all_instances():
+            by_role.setdefault(inst["role"], []).append(inst)
+        await self._refresh_estimates(list(scaled))
 
-            # Count active instances
-            instances = await self._instances.get_instances_by_role(role_name)
+        for role_name, role_cfg in scaled.items():
+            pending_count = depths.get(role_name, 0)
+            instances = by_role.get(role_name, [])
             active_count = len(
                 [i for i in instances if i["status"] in ("idle", "working")]
             )
@@ -148,26 +311,31 @@ class AutoScaler:
             threshold = role_cfg.auto_scale.scale_up_threshold
             max_instances = role_cfg.max_instances
             idle_threshold = self._idle_threshold_for(role_cfg)
+            target = self._forecast_target(role_name, role_cfg, pending_count)
 
-            # Scale up: if pending > threshold and room to grow (with cooldown)
-            if (
-                pending_count > threshold
-                and active_count < max_instances
-                and not self._is_on_cooldown(role_name, "up")
-            ):
-                needed = min(
-                    pending_count - threshold,
-                    max_instances - active_count,
-                )
+            # Scale up: queue above threshold or forecast above current
+            # capacity, with room to grow (and cooldown).
+            needed = _scale_up_count(
+                pending_count, active_count, max_instances, threshold, target,
+            )
+            if needed > 0 and not self._is_on_cooldown(role_name, "up"):
                 logger.info(
-                    "Auto-scaling %s: %d pending tasks, %d active, scaling up by %d",
+                    "Auto-scaling %s: %d pending tasks, %d active, forecast %s, "
+                    "scaling up by %d%s",
                     role_name,
                     pending_count,
                     active_count,
+                    target,
                     needed,
+                    " (dry run)" if self._dry_run else "",
+                )
+                self._record_decision(
+                    role_name, "up", needed, pending_count, active_count, target,
                 )
                 spawned = 0
-                if self._agent_factory:
+                if self._dry_run:
+                    self._record_scale(role_name, "up")
+                elif self._agent_factory:
                     for j in range(needed):
                         instance_id = f"{role_name}-auto-{self._active_extra.get(role_name, 0) + j + 1}"
                         try:
@@ -197,15 +365,13 @@ class AutoScaler:
 
             # Scale down: terminate idle instances when (a) current count
             # exceeds max_instances (operator lowered the limit), or
-            # (b) auto-spawned extras are idle with no pending work.
+            # (b) auto-spawned extras are idle with no pending work and
+            # no forecast demand for them.
             extra = self._active_extra.get(role_name, 0)
-            over_max = max(active_count - max_instances, 0)
-            want_down = max(extra, over_max)
-            allow_idle_only = pending_count == 0
-            # When we're over the configured ceiling, scale down even
-            # if there are pending tasks: the operator explicitly asked
-            # for fewer instances.
-            if want_down > 0 and (allow_idle_only or over_max > 0) and not self._is_on_cooldown(role_name, "down"):
+            want_down = _scale_down_count(
+                pending_count, active_count, extra, max_instances, target,
+            )
+            if want_down > 0 and not self._is_on_cooldown(role_name, "down"):
                 idle_instances = [
                     i for i in instances
                     if i["status"] == "idle"
@@ -226,10 +392,17 @@ class AutoScaler:
                 scale_down = min(want_down, len(idle_instances))
                 if scale_down > 0:
                     logger.info(
-                        "Auto-scaling %s: scaling down by %d",
+                        "Auto-scaling %s: scaling down by %d%s",
                         role_name,
                         scale_down,
+                        " (dry run)" if self._dry_run else "",
+                    )
+                    self._record_decision(
+                        role_name, "down", scale_down, pending_count, active_count, target,
                     )
+                    if self._dry_run:
+                        self._record_scale(role_name, "down")
+                        continue
                     stopped = 0
                     if self._agent_stopper:
                         for inst in idle_instances[:scale_down]:
@@ -268,8 +441,172 @@ class AutoScaler:
         return {
             "extra_instances": dict(self._active_extra),
             "running": self._running,
+            "dry_run": self._dry_run,
+            "estimates": {
+                role: {
+                    "arrival_rate": est.arrival_rate,
+                    "service_time": est.service_time,
+                }
+                for role, est in self._estimates.items()
+            },
+            "recent_decisions": list(self._decisions),
         }
 
     def stop(self) -> None:
         """Signal the scaling loop to exit after the current iteration."""
         self._running = False
+
+
+# ------------------------------------------------------------------
+# Offline replay
+# ------------------------------------------------------------------
+
+
+def _parse_ts(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        ts = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.timestamp()
+
+
+async def replay_history(
+    db,
+    roles: dict[str, RoleConfig],
+    *,
+    since: str | None = None,
+    interval: float = 60.0,
+    base_instances: int = 1,
+    ewma_alpha: float = DEFAULT_EWMA_ALPHA,
+    cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+) -> dict[str, dict]:
+    """Replay recorded task flow through the scaling policy (dry run).
+
+    Arrivals, claims and completions are rebuilt from the ``tasks``
+    table's ``created_at``/``started_at``/``completed_at`` columns and
+    stepped in *interval*-second ticks; each role starts with
+    *base_instances* and follows the same up/down rules as the live
+    scaler (idle time is not modelled, so scale-down happens as soon as
+    the rules allow). Pass ``roles`` with adjusted ``auto_scale``
+    settings to compare thresholds or target latencies.
+
+    Returns ``{role: {"decisions": [...], "peak_instances",
+    "peak_pending", "instance_seconds", "ticks"}}`` for every role with
+    ``auto_scale.enabled``.
+    """
+    scaled = {
+        name: cfg for name, cfg in roles.items()
+        if cfg.auto_scale and cfg.auto_scale.enabled
+    }
+    if not scaled or interval <= 0:
+        return {}
+
+    placeholders = ",".join("?" for _ in scaled)
+    params: list = list(scaled)
+    where = f"assigned_to IN ({placeholders})"
+    if since:
+        where += " AND created_at >= ?"
+        params.append(since)
+    rows = await db.execute_fetchall(
+        "SELECT assigned_to, status, created_at, started_at, completed_at "
+        f"FROM tasks WHERE {where}",
+        tuple(params),
+    )
+
+    # Per role: sorted arrival / queue-exit times and (completion time,
+    # service seconds) pairs.
+    arrivals: dict[str, list[float]] = {r: [] for r in scaled}
+    exits: dict[str, list[float]] = {r: [] for r in scaled}
+    done: dict[str, list[tuple[float, float]]] = {r: [] for r in scaled}
+    start = end = None
+    for row in rows:
+        created = _parse_ts(row["created_at"])
+        if created is None:
+            continue
+        role = row["assigned_to"]
+        started = _parse_ts(row["started_at"])
+        completed = _parse_ts(row["completed_at"])
+        arrivals[role].append(created)
+        if row["status"] not in ("pending", "blocked"):
+            # Tasks that never ran (cancelled, ...) leave the queue at
+            # their last recorded timestamp.
+            exits[role].append(started or completed or created)
+        if started is not None and completed is not None and row["status"] == "completed":
+            done[role].append((completed, max(completed - started, 0.0)))
+        last = max(t for t in (created, started, completed) if t is not None)
+        start = created if start is None else min(start, created)
+        end = last if end is None else max(end, last)
+    if start is None:
+        return {r: {"decisions": [], "peak_instances": base_instances,
+                    "peak_pending": 0, "instance_seconds": 0.0, "ticks": 0}
+                for r in scaled}
+    for role in scaled:
+        arrivals[role].sort()
+        exits[role].sort()
+        done[role].sort()
+
+    results: dict[str, dict] = {}
+    for role, cfg in scaled.items():
+        est = DemandEstimate(ewma_alpha)
+        latency = _target_latency_seconds(cfg)
+        active = base_instances
+        last_up = last_down = -math.inf
+        decisions: list[dict] = []
+        peak_instances, peak_pending, instance_seconds, ticks = active, 0, 0.0, 0
+        completions = done[role]
+        completion_times = [c[0] for c in completions]
+        prev = start
+        t = start + interval
+        while prev < end:
+            ticks += 1
+            window_arrivals = (
+                bisect.bisect_right(arrivals[role], t) - bisect.bisect_right(arrivals[role], prev)
+            )
+            lo = bisect.bisect_right(completion_times, prev)
+            hi = bisect.bisect_right(completion_times, t)
+            est.observe(
+                interval, window_arrivals, hi - lo, sum(c[1] for c in completions[lo:hi]),
+            )
+            pending = bisect.bisect_right(arrivals[role], t) - bisect.bisect_right(exits[role], t)
+            target = est.desired_instances(pending, latency) if latency else None
+            extra = max(active - base_instances, 0)
+
+            up = _scale_up_count(
+                pending, active, cfg.max_instances, cfg.auto_scale.scale_up_threshold, target,
+            )
+            down = 0 if up else _scale_down_count(
+                pending, active, extra, cfg.max_instances, target,
+            )
+            step = 0
+            if up and t - last_up >= cooldown_seconds:
+                step, last_up = up, t
+            elif down and t - last_down >= cooldown_seconds:
+                step, last_down = -down, t
+            if step:
+                decisions.append({
+                    "at": datetime.fromtimestamp(t, timezone.utc).isoformat(),
+                    "direction": "up" if step > 0 else "down",
+                    "from": active,
+                    "to": active + step,
+                    "pending": pending,
+                    "target": target,
+                    "arrival_rate": est.arrival_rate,
+                    "service_time": est.service_time,
+                })
+                active += step
+            peak_instances = max(peak_instances, active)
+            peak_pending = max(peak_pending, pending)
+            instance_seconds += active * interval
+            prev, t = t, t + interval
+        results[role] = {
+            "decisions": decisions,
+            "peak_instances": peak_instances,
+            "peak_pending": peak_pending,
+            "instance_seconds": instance_seconds,
+            "ticks": ticks,
+        }
+    return results
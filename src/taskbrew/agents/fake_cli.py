@@ -0,0 +1,124 @@
+"""Deterministic in-process provider for benchmarks and tests.
+
+Selected by a ``fake-*`` model name or ``cli_provider: fake``. ``query``
+never spawns a CLI: it sleeps for a simulated model latency, awaits the
+configured :attr:`FakeBehavior.on_run` hook (standing in for the MCP
+tool calls a real agent makes, e.g. creating child tasks) and yields one
+assistant message and one result message with plausible usage.
+
+Whether a run fails, and how long it takes, is a pure function of the
+seed and the prompt, so a benchmark with the same seed replays the same
+workload. Behaviour is process-wide; set it with :func:`configure`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import re
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from taskbrew.agents.provider_base import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ToolUseBlock,
+)
+
+__all__ = [
+    "AssistantMessage",
+    "FakeBehavior",
+    "FakeCLIError",
+    "FakeOptions",
+    "ResultMessage",
+    "TextBlock",
+    "ToolUseBlock",
+    "configure",
+    "query",
+]
+
+# AgentLoop.build_context renders the task as "**<id>**: <title>".
+_TASK_ID_RE = re.compile(r"^\*\*([A-Za-z0-9_.-]+)\*\*:", re.MULTILINE)
+
+
+class FakeCLIError(Exception):
+    """A simulated, non-retryable provider failure."""
+
+
+@dataclass
+class FakeOptions:
+    system_prompt: str | None = None
+    model: str | None = None
+    max_turns: int | None = None
+    cwd: str | None = None
+    cli_path: str | None = None
+    allowed_tools: list[str] = field(default_factory=list)
+    permission_mode: str = "default"
+    mcp_servers: dict[str, dict[str, Any]] = field(default_factory=dict)
+
+
+@dataclass
+class FakeBehavior:
+    """How the fake provider answers.
+
+    ``on_run(task_id, prompt)`` is awaited before a successful run
+    returns; *task_id* is parsed from the prompt and is None when the
+    prompt does not come from an agent loop.
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+    output_tokens: int = 200
+    on_run: Callable[[str | None, str], Awaitable[None]] | None = None
+
+
+_behavior = FakeBehavior()
+
+
+def configure(behavior: FakeBehavior | None = None) -> FakeBehavior:
+    """Install *behavior* (or the default) and return the previous one."""
+    global _behavior
+    previous = _behavior
+    _behavior = behavior or FakeBehavior()
+    return previous
+
+
+async def query(
+    *, prompt: str, options: FakeOptions,
+) -> AsyncIterator[AssistantMessage | ResultMessage]:
+    behavior = _behavior
+    match = _TASK_ID_RE.search(prompt)
+    task_id = match.group(1) if match else None
+    digest = hashlib.sha256(f"{behavior.seed}:{prompt}".encode()).hexdigest()
+    rng = random.Random(int(digest[:16], 16))
+    session_id = f"fake-{digest[:12]}"
+
+    started = time.monotonic()
+    delay_ms = behavior.latency_ms + rng.uniform(-behavior.jitter_ms, behavior.jitter_ms)
+    if delay_ms > 0:
+        await asyncio.sleep(delay_ms / 1000)
+    if rng.random() < behavior.failure_rate:
+        raise FakeCLIError(f"simulated provider failure ({task_id or 'prompt'})")
+    if behavior.on_run is not None:
+        await behavior.on_run(task_id, prompt)
+
+    text = f"Done: {task_id}" if task_id else "Done."
+    yield AssistantMessage(content=[TextBlock(text=text)], session_id=session_id)
+    elapsed_ms = int((time.monotonic() - started) * 1000)
+    yield ResultMessage(
+        result=text,
+        session_id=session_id,
+        total_cost_usd=0.0,
+        usage={
+            "input_tokens": len(prompt) // 4,
+            "output_tokens": behavior.output_tokens,
+        },
+        duration_ms=elapsed_ms,
+        duration_api_ms=elapsed_ms,
+    )
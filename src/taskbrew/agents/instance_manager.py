@@ -3,11 +3,33 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
+from typing import Callable
 
 from taskbrew.config_loader import RoleConfig
 from taskbrew.orchestrator.database import Database
 
 
+_PERFORMANCE_COLUMNS = (
+    "SELECT agent_id, COUNT(*) as tasks, "
+    "AVG(duration_api_ms) as avg_duration, "
+    "SUM(cost_usd) as total_cost, "
+    "AVG(num_turns) as avg_turns "
+)
+_INSTANCE_PERFORMANCE_SQL = (
+    _PERFORMANCE_COLUMNS + "FROM task_usage WHERE agent_id = ? GROUP BY agent_id"
+)
+_ALL_INSTANCES_PERFORMANCE_SQL = (
+    _PERFORMANCE_COLUMNS + "FROM task_usage GROUP BY agent_id ORDER BY tasks DESC"
+)
+_ROLE_PERFORMANCE_SQL = (
+    "SELECT role, "
+    "COUNT(*) as tasks, "
+    "AVG(duration_api_ms) as avg_duration, "
+    "SUM(cost_usd) as total_cost "
+    "FROM task_usage GROUP BY role ORDER BY tasks DESC"
+)
+
+
 def _utcnow() -> str:
     """Return the current UTC time as an ISO-8601 string."""
     return datetime.now(timezone.utc).isoformat()
@@ -35,12 +57,27 @@ class InstanceManager:
     def __init__(self, db: Database) -> None:
         self._db = db
         self._paused_roles: set[str] = set()
+        self._pause_listeners: list[Callable[[list[str]], None]] = []
+
+    def add_pause_listener(self, listener: Callable[[list[str]], None]) -> None:
+        """Call ``listener(paused_roles)`` whenever the paused set changes.
+
+        Used to push pause state to agent worker processes.
+        """
+        self._pause_listeners.append(listener)
+
+    def _pause_changed(self) -> None:
+        roles = self.get_paused_roles()
+        for listener in self._pause_listeners:
+            listener(roles)
 
     def pause_role(self, role: str) -> None:
         self._paused_roles.add(role)
+        self._pause_changed()
 
     def resume_role(self, role: str) -> None:
         self._paused_roles.discard(role)
+        self._pause_changed()
 
     def is_role_paused(self, role: str) -> bool:
         return role in self._paused_roles
@@ -50,9 +87,16 @@ class InstanceManager:
 
     def pause_all(self, roles: list[str]) -> None:
         self._paused_roles.update(roles)
+        self._pause_changed()
 
     def resume_all(self) -> None:
         self._paused_roles.clear()
+        self._pause_changed()
+
+    def set_paused_roles(self, roles: list[str]) -> None:
+        """Replace the paused set, e.g. with the API process's copy."""
+        self._paused_roles = set(roles)
+        self._pause_changed()
 
     async def register_instance(
         self, instance_id: str, role_config: RoleConfig
@@ -113,6 +157,28 @@ class InstanceManager:
             (now, instance_id),
         )
 
+    async def heartbeat_many(self, instance_ids: list[str]) -> None:
+        """Update ``last_heartbeat`` for every id in one statement."""
+        if not instance_ids:
+            return
+        placeholders = ", ".join("?" for _ in instance_ids)
+        await self._db.execute(
+            f"UPDATE agent_instances SET last_heartbeat = ? "
+            f"WHERE instance_id IN ({placeholders})",
+            (_utcnow(), *instance_ids),
+        )
+
+    async def reset_to_idle(self, instance_ids: list[str]) -> None:
+        """Mark every id ``'idle'`` with no current task, in one statement."""
+        if not instance_ids:
+            return
+        placeholders = ", ".join("?" for _ in instance_ids)
+        await self._db.execute(
+            f"UPDATE agent_instances SET status = 'idle', current_task = NULL "
+            f"WHERE instance_id IN ({placeholders})",
+            tuple(instance_ids),
+        )
+
     async def get_instance(self, instance_id: str) -> dict | None:
         """Return a single instance by ID, or None if not found."""
         return await self._db.execute_fetchone(
@@ -175,31 +241,14 @@ class InstanceManager:
         """
         if instance_id:
             return await self._db.execute_fetchall(
-                "SELECT agent_id, COUNT(*) as tasks, "
-                "AVG(duration_api_ms) as avg_duration, "
-                "SUM(cost_usd) as total_cost, "
-                "AVG(num_turns) as avg_turns "
-                "FROM task_usage WHERE agent_id = ? GROUP BY agent_id",
-                (instance_id,),
+                _INSTANCE_PERFORMANCE_SQL, (instance_id,),
             )
-        return await self._db.execute_fetchall(
-            "SELECT agent_id, COUNT(*) as tasks, "
-            "AVG(duration_api_ms) as avg_duration, "
-            "SUM(cost_usd) as total_cost, "
-            "AVG(num_turns) as avg_turns "
-            "FROM task_usage GROUP BY agent_id ORDER BY tasks DESC"
-        )
+        return await self._db.execute_fetchall(_ALL_INSTANCES_PERFORMANCE_SQL)
 
     async def get_role_performance(self) -> list[dict]:
         """Get aggregated performance by role.
 
-        Derives the role name from the agent_id prefix (everything before
-        the first ``'-'``).
+        Groups on the ``role`` column stored with each usage row (see
+        migration 36), which is served by ``idx_task_usage_role``.
         """
-        return await self._db.execute_fetchall(
-            "SELECT SUBSTR(agent_id, 1, INSTR(agent_id, '-') - 1) as role, "
-            "COUNT(*) as tasks, "
-            "AVG(duration_api_ms) as avg_duration, "
-            "SUM(cost_usd) as total_cost "
-            "FROM task_usage GROUP BY role ORDER BY tasks DESC"
-        )
+        return await self._db.execute_fetchall(_ROLE_PERFORMANCE_SQL)
@@ -2,7 +2,8 @@
 
 Dispatches to the correct SDK based on model name or explicit provider string.
 Both SDKs expose a compatible ``query()`` async generator and similar message
-types, so the abstraction is thin.
+types, so the abstraction is thin. A fourth, in-process ``fake`` provider
+(:mod:`taskbrew.agents.fake_cli`) serves benchmarks and tests.
 """
 
 from __future__ import annotations
@@ -17,6 +18,7 @@ from typing import Any, AsyncIterator
 
 import yaml
 
+from taskbrew.auth import agent_api_token
 from taskbrew.config_loader import MCPServerConfig
 
 logger = logging.getLogger(__name__)
@@ -42,16 +44,18 @@ def _interpolate_env(env: dict[str, str]) -> dict[str, str]:
     return result
 
 
+# Both builtin servers proxy to the dashboard API, so they get its URL
+# and the per-run agent token (accepted with auth enabled).
+_BUILTIN_API_ENV = {"TASKBREW_API_URL": "api_url", "TASKBREW_API_TOKEN": "api_token"}
+
 _BUILTIN_MCP_SERVERS = {
     "task-tools": {
         "module": "taskbrew.tools.task_tools",
-        "env_key": "TASKBREW_API_URL",
-        "env_source": "api_url",
+        "env": _BUILTIN_API_ENV,
     },
     "intelligence-tools": {
         "module": "taskbrew.tools.intelligence_tools",
-        "env_key": "TASKBREW_DB_PATH",
-        "env_source": "db_path",
+        "env": _BUILTIN_API_ENV,
     },
 }
 
@@ -62,7 +66,7 @@ def _build_mcp_dict(
     db_path: str = "data/tasks.db",
 ) -> dict[str, dict]:
     """Convert MCPServerConfig objects into SDK-compatible dicts."""
-    env_sources = {"api_url": api_url, "db_path": db_path}
+    env_sources = {"api_url": api_url, "db_path": db_path, "api_token": agent_api_token()}
     result = {}
     for name, cfg in servers.items():
         if cfg.builtin and name in _BUILTIN_MCP_SERVERS:
@@ -71,7 +75,7 @@ def _build_mcp_dict(
                 "type": "stdio",
                 "command": sys.executable,
                 "args": ["-m", builtin["module"]],
-                "env": {builtin["env_key"]: env_sources[builtin["env_source"]]},
+                "env": {key: env_sources[source] for key, source in builtin["env"].items()},
             }
         elif not cfg.builtin:
             if not cfg.command or not cfg.command.strip():
@@ -110,6 +114,7 @@ class ProviderRegistry:
         self.register("claude", detect_patterns=["claude-*"], builtin=True)
         self.register("gemini", detect_patterns=["gemini-*"], builtin=True)
         self.register("codex", detect_patterns=["codex-*", "gpt-*", "o[0-9]*"], builtin=True)
+        self.register("fake", detect_patterns=["fake-*"], builtin=True)
 
     def detect(self, model: str) -> str:
         """Detect provider from model name. Returns 'claude' as default."""
@@ -165,6 +170,8 @@ def detect_provider(model: str | None = None, cli_provider: str = "claude") -> s
     """
     if model and model.startswith("gemini"):
         return "gemini"
+    if model and model.startswith("fake"):
+        return "fake"
     if model and model.startswith("claude"):
         return "claude"
     if model and (
@@ -261,6 +268,19 @@ def build_sdk_options(
             opts.cli_path = cli_path
         return opts
 
+    if provider == "fake":
+        from taskbrew.agents.fake_cli import FakeOptions
+
+        return FakeOptions(
+            system_prompt=system_prompt,
+            model=model,
+            max_turns=max_turns,
+            cwd=cwd,
+            cli_path=cli_path,
+            allowed_tools=allowed_tools or [],
+            permission_mode=permission_mode,
+        )
+
     # Default: Claude
     from claude_agent_sdk import ClaudeAgentOptions
 
@@ -302,6 +322,10 @@ async def sdk_query(prompt: str, options: Any, provider: str) -> AsyncIterator:
         from taskbrew.agents.codex_cli import query
         async for message in query(prompt=prompt, options=options):
             yield message
+    elif provider == "fake":
+        from taskbrew.agents.fake_cli import query
+        async for message in query(prompt=prompt, options=options):
+            yield message
     else:
         from claude_agent_sdk import query
         async for message in query(prompt=prompt, options=options):
@@ -346,6 +370,20 @@ def get_message_types(provider: str) -> dict[str, type]:
             "ToolUseBlock": ToolUseBlock,
         }
 
+    if provider == "fake":
+        from taskbrew.agents.fake_cli import (
+            AssistantMessage,
+            ResultMessage,
+            TextBlock,
+            ToolUseBlock,
+        )
+        return {
+            "AssistantMessage": AssistantMessage,
+            "ResultMessage": ResultMessage,
+            "TextBlock": TextBlock,
+            "ToolUseBlock": ToolUseBlock,
+        }
+
     from claude_agent_sdk import (
         AssistantMessage,
         ResultMessage,
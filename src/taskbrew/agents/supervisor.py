@@ -0,0 +1,270 @@
+"""Fleet-wide liveness supervision for agent loops.
+
+Each :class:`~taskbrew.agents.agent_loop.AgentLoop` used to run its own
+heartbeat task (one ``UPDATE`` every 15 s) and, while executing, an idle
+watchdog (one ``SELECT awaiting_input_since`` every 15 s), and the
+orphan-recovery loop in ``main`` scanned for stale instances on top.
+That is two statements per agent per tick.
+
+:class:`AgentSupervisor` replaces all three with one task. Agents
+register on start and report SDK activity with :meth:`touch`; the
+supervisor keeps last-activity times in memory. Whether a task is
+waiting on a manual ``ask_question`` answer is mirrored from the
+``question.pending`` / ``question.closed`` events that
+:class:`~taskbrew.orchestrator.agent_questions.AgentQuestionManager`
+emits when it sets and clears ``tasks.awaiting_input_since``. Each tick:
+
+1. cancels executions idle past their ``idle_timeout`` (in memory);
+2. writes ``last_heartbeat`` for every live agent in one ``UPDATE``;
+3. every ``recovery_interval`` seconds, recovers tasks held by dead
+   instances and blocked tasks whose dependencies are all terminal.
+
+Recovery trusts the in-memory state first: an agent whose loop task is
+still running here is never treated as stale, whatever its heartbeat
+row says, and one whose loop task has died is recovered without waiting
+for ``heartbeat_timeout``. Statement count per tick is constant in the
+fleet size.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from taskbrew.agents.instance_manager import InstanceManager
+from taskbrew.orchestrator.event_bus import EventBus
+from taskbrew.orchestrator.task_board import TaskBoard
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _AgentState:
+    loop_task: asyncio.Task | None
+    last_activity: float
+    task_id: str | None = None
+    target: asyncio.Task | None = None
+    idle_timeout: float = 0.0
+
+    def alive(self) -> bool:
+        return self.loop_task is None or not self.loop_task.done()
+
+
+class AgentSupervisor:
+    """Heartbeats, idle watchdogs and orphan recovery for every agent.
+
+    Parameters
+    ----------
+    instance_manager:
+        Used for the batched heartbeat and for stale-instance lookups.
+    task_board:
+        Used to recover tasks held by dead instances.
+    event_bus:
+        Source of ``question.*`` events; ``task.recovered`` is emitted here.
+    interval:
+        Seconds between ticks (heartbeat and idle checks).
+    heartbeat_timeout:
+        A ``'working'`` instance not registered here whose heartbeat is
+        older than this is considered dead.
+    recovery_interval:
+        Seconds between orphan-recovery passes.
+    """
+
+    def __init__(
+        self,
+        instance_manager: InstanceManager,
+        task_board: TaskBoard,
+        event_bus: EventBus,
+        *,
+        interval: float = 15.0,
+        heartbeat_timeout: float = 90.0,
+        recovery_interval: float = 30.0,
+    ) -> None:
+        self._instances = instance_manager
+        self._board = task_board
+        self._event_bus = event_bus
+        self.interval = interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.recovery_interval = recovery_interval
+        self._agents: dict[str, _AgentState] = {}
+        self._awaiting: set[str] = set()
+        self._last_recovery = time.monotonic()
+        self._stopping = asyncio.Event()
+        self._ticks = 0
+        self._idle_kills = 0
+        self._recovered = 0
+
+    # ------------------------------------------------------------------
+    # Agent-facing API (all synchronous, no I/O)
+    # ------------------------------------------------------------------
+
+    def register(self, instance_id: str, loop_task: asyncio.Task | None = None) -> None:
+        """Start supervising *instance_id*, whose loop runs in *loop_task*."""
+        self._agents[instance_id] = _AgentState(
+            loop_task=loop_task, last_activity=time.monotonic(),
+        )
+
+    def unregister(self, instance_id: str) -> None:
+        self._agents.pop(instance_id, None)
+
+    def touch(self, instance_id: str) -> None:
+        """Record SDK activity for *instance_id*."""
+        state = self._agents.get(instance_id)
+        if state is not None:
+            state.last_activity = time.monotonic()
+
+    def watch(
+        self,
+        instance_id: str,
+        *,
+        task_id: str,
+        target: asyncio.Task,
+        idle_timeout: float,
+    ) -> None:
+        """Cancel *target* once the agent is idle for *idle_timeout* seconds.
+
+        Time spent while *task_id* awaits user input does not count.
+        """
+        state = self._agents.get(instance_id)
+        if state is None:
+            state = self._agents[instance_id] = _AgentState(
+                loop_task=None, last_activity=time.monotonic(),
+            )
+        state.task_id = task_id
+        state.target = target
+        state.idle_timeout = idle_timeout
+        state.last_activity = time.monotonic()
+
+    def unwatch(self, instance_id: str) -> None:
+        state = self._agents.get(instance_id)
+        if state is not None:
+            state.task_id = None
+            state.target = None
+
+    def is_awaiting_input(self, task_id: str) -> bool:
+        return task_id in self._awaiting
+
+    # ------------------------------------------------------------------
+    # Question events
+    # ------------------------------------------------------------------
+
+    async def _on_question_pending(self, event: dict) -> None:
+        if event.get("task_id"):
+            self._awaiting.add(event["task_id"])
+
+    async def _on_question_closed(self, event: dict) -> None:
+        task_id = event.get("task_id")
+        self._awaiting.discard(task_id)
+        # Restart the idle clock so the wait itself is not counted.
+        for state in self._agents.values():
+            if state.task_id == task_id:
+                state.last_activity = time.monotonic()
+
+    def attach(self) -> None:
+        self._event_bus.subscribe("question.pending", self._on_question_pending)
+        self._event_bus.subscribe("question.closed", self._on_question_closed)
+
+    def detach(self) -> None:
+        self._event_bus.unsubscribe("question.pending", self._on_question_pending)
+        self._event_bus.unsubscribe("question.closed", self._on_question_closed)
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+
+    def _check_idle(self, now: float) -> None:
+        for state in self._agents.values():
+            target = state.target
+            if target is None or target.done():
+                continue
+            if state.task_id in self._awaiting:
+                state.last_activity = now
+                continue
+            elapsed = now - state.last_activity
+            if elapsed > state.idle_timeout:
+                logger.error(
+                    "Task %s idle for %.0fs (limit %ds); cancelling",
+                    state.task_id, elapsed, state.idle_timeout,
+                )
+                target.cancel()
+                state.target = None
+                self._idle_kills += 1
+
+    async def tick(self) -> None:
+        """One supervision pass: idle checks, heartbeats, maybe recovery."""
+        now = time.monotonic()
+        self._ticks += 1
+        self._check_idle(now)
+
+        live = [iid for iid, s in self._agents.items() if s.alive()]
+        try:
+            await self._instances.heartbeat_many(live)
+        except Exception:
+            logger.warning("Batched heartbeat failed", exc_info=True)
+
+        if now - self._last_recovery >= self.recovery_interval:
+            self._last_recovery = now
+            await self.recover()
+
+    async def recover(self) -> None:
+        """Recover tasks held by dead instances and stuck blocked tasks."""
+        dead = {iid for iid, s in self._agents.items() if not s.alive()}
+        stale = await self._instances.get_stale_instances(
+            timeout_seconds=self.heartbeat_timeout,
+        )
+        dead.update(
+            inst["instance_id"] for inst in stale
+            if inst["instance_id"] not in self._agents
+        )
+        if dead:
+            stale_ids = sorted(dead)
+            logger.warning(
+                "Detected %d stale agent instances: %s", len(stale_ids), stale_ids,
+            )
+            recovered = await self._board.recover_stale_in_progress_tasks(stale_ids)
+            for t in recovered:
+                logger.info("Recovered orphaned task %s", t["id"])
+                await self._event_bus.emit("task.recovered", {"task_id": t["id"]})
+            self._recovered += len(recovered)
+            await self._instances.reset_to_idle(stale_ids)
+            for iid in stale_ids:
+                self._agents.pop(iid, None)
+
+        stuck = await self._board.recover_stuck_blocked_tasks()
+        if stuck:
+            logger.info("Recovered %d stuck blocked tasks", len(stuck))
+            for t in stuck:
+                await self._event_bus.emit("task.recovered", {"task_id": t["id"]})
+
+    def stop(self) -> None:
+        """Make :meth:`run` return without waiting out the interval."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Tick every ``interval`` seconds until stopped or cancelled."""
+        self.attach()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.interval)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    await self.tick()
+                except Exception:
+                    logger.exception("Agent supervisor tick failed")
+        finally:
+            self.detach()
+
+    def stats(self) -> dict:
+        return {
+            "agents": len(self._agents),
+            "executing": sum(1 for s in self._agents.values() if s.target is not None),
+            "awaiting_input": len(self._awaiting),
+            "ticks": self._ticks,
+            "idle_kills": self._idle_kills,
+            "recovered": self._recovered,
+        }
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import os
 import secrets
 import time
 from datetime import datetime, timezone
@@ -16,6 +17,26 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Carries the agent token from the API process to agent worker processes.
+AGENT_TOKEN_ENV = "TASKBREW_AGENT_TOKEN"
+
+_agent_token: str | None = None
+
+
+def agent_api_token() -> str:
+    """Return this run's bearer token for the builtin MCP tool servers.
+
+    The tool servers are spawned by agents and call back into the
+    dashboard API, so with auth enabled they need a token nobody has to
+    configure. It is minted once per run (inherited from
+    ``AGENT_TOKEN_ENV`` in worker processes), accepted by the dashboard
+    and never written to disk.
+    """
+    global _agent_token
+    if _agent_token is None:
+        _agent_token = os.environ.get(AGENT_TOKEN_ENV) or secrets.token_urlsafe(32)
+    return _agent_token
+
 
 class AuthManager:
     """Manages API authentication tokens with optional rate limiting.
@@ -337,6 +358,10 @@ class AuthManager:
                 self.rate_limit_lockout,
             )
 
+    def register_token(self, token: str) -> None:
+        """Accept an externally minted *token* (in-memory only)."""
+        self._tokens.add(self._hash_token(token))
+
     def generate_token(self) -> str:
         """Create and store a new bearer token (in-memory only).
 
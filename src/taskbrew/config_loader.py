@@ -71,6 +71,54 @@ class GuardrailsConfig:
     rejection_cycle_limit: int = 3
 
 
+@dataclass
+class DatabaseConfig:
+    """SQLite connection tuning (see ``CONNECTION_PROFILES`` in
+    :mod:`taskbrew.orchestrator.database`).
+
+    ``overrides`` holds any other keys of the ``database`` section
+    (``synchronous``, ``cache_size_mb``, ``mmap_size_mb``, ``temp_store``,
+    ``cached_statements``, ``optimize_on_close``), applied on top of the
+    named profile.
+    """
+
+    profile: str = "balanced"
+    overrides: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class TracingConfig:
+    """Hot-path tracing (see :mod:`taskbrew.orchestrator.tracing`).
+
+    ``export_path`` is an optional OTLP/JSON-lines file for finished
+    spans, relative to the project directory. ``slow_callback_ms`` is
+    the event-loop stall threshold of
+    :class:`~taskbrew.orchestrator.profiler.LoopStallDetector`
+    (0 disables it).
+    """
+
+    enabled: bool = True
+    export_path: str | None = None
+    slow_callback_ms: int = 250
+
+
+@dataclass
+class MaintenanceConfig:
+    """Background maintenance jobs (see :mod:`taskbrew.orchestrator.maintenance`).
+
+    ``intervals`` overrides a job's period in seconds by job name; 0
+    leaves a job to manual runs only. ``retention`` overrides the
+    per-table policies of :mod:`taskbrew.orchestrator.retention`;
+    archived rows go to ``archive_dir`` (relative to the project).
+    """
+
+    enabled: bool = True
+    intervals: dict[str, int] = field(default_factory=dict)
+    retention: dict[str, Any] = field(default_factory=dict)
+    archive_dir: str = "data/archive"
+    vacuum_free_ratio: float = 0.2
+
+
 @dataclass
 class ExecutionConfig:
     """Orchestrator-level execution settings from team.yaml.
@@ -82,7 +130,14 @@ class ExecutionConfig:
     max_concurrent_api_calls: int = 5
     base_branch: str = "main"
     worktree_retention_days: int = 7
+    # Idle pre-created worktrees kept ready for claims (0 = off), and
+    # ignored dependency dirs hardlinked into each one.
+    worktree_pool_size: int = 0
+    worktree_warm_paths: list[str] = field(default_factory=list)
     max_pipeline_depth: int = 20
+    # Agent runner processes beside the dashboard API (0 = run agents
+    # in the API process); ``taskbrew start --workers`` overrides.
+    agent_workers: int = 0
     artifact_exclude_patterns: list[str] = field(default_factory=lambda: [
         "*.env", "credentials*", "*.key", "*.pem", "*.secret",
     ])
@@ -110,6 +165,9 @@ class TeamConfig:
     mcp_servers: dict[str, MCPServerConfig] = field(default_factory=dict)
     guardrails: GuardrailsConfig = field(default_factory=GuardrailsConfig)
     execution: ExecutionConfig = field(default_factory=ExecutionConfig)
+    database: DatabaseConfig = field(default_factory=DatabaseConfig)
+    tracing: TracingConfig = field(default_factory=TracingConfig)
+    maintenance: MaintenanceConfig = field(default_factory=MaintenanceConfig)
 
 
 def load_team_config(path: Path) -> TeamConfig:
@@ -179,12 +237,39 @@ def load_team_config(path: Path) -> TeamConfig:
         max_concurrent_api_calls=exec_raw.get("max_concurrent_api_calls", 5),
         base_branch=exec_raw.get("base_branch", "main"),
         worktree_retention_days=exec_raw.get("worktree_retention_days", 7),
+        worktree_pool_size=exec_raw.get("worktree_pool_size", 0),
+        worktree_warm_paths=exec_raw.get("worktree_warm_paths", []) or [],
         max_pipeline_depth=exec_raw.get("max_pipeline_depth", 20),
+        agent_workers=exec_raw.get("agent_workers", 0),
         artifact_exclude_patterns=exec_raw.get(
             "artifact_exclude_patterns", default_excludes
         ),
     )
 
+    database_raw = data.get("database", {}) or {}
+    database = DatabaseConfig(
+        profile=database_raw.get("profile", "balanced"),
+        overrides={
+            k: v for k, v in database_raw.items() if k not in ("path", "profile")
+        },
+    )
+
+    tracing_raw = data.get("tracing", {}) or {}
+    tracing = TracingConfig(
+        enabled=bool(tracing_raw.get("enabled", True)),
+        export_path=tracing_raw.get("export_path") or None,
+        slow_callback_ms=tracing_raw.get("slow_callback_ms", 250),
+    )
+
+    maintenance_raw = data.get("maintenance", {}) or {}
+    maintenance = MaintenanceConfig(
+        enabled=bool(maintenance_raw.get("enabled", True)),
+        intervals=dict(maintenance_raw.get("intervals", {}) or {}),
+        retention=dict(maintenance_raw.get("retention", {}) or {}),
+        archive_dir=maintenance_raw.get("archive_dir", "data/archive"),
+        vacuum_free_ratio=maintenance_raw.get("vacuum_free_ratio", 0.2),
+    )
+
     team_config = TeamConfig(
         team_name=_get_required(data, "team_name", "team.yaml"),
         db_path=str(Path(_get_required(data, "database.path", "team.yaml")).expanduser()),
@@ -208,12 +293,21 @@ def load_team_config(path: Path) -> TeamConfig:
         mcp_servers=mcp_servers,
         guardrails=guardrails,
         execution=execution,
+        database=database,
+        tracing=tracing,
+        maintenance=maintenance,
     )
 
     # Fix 2: Numeric bounds validation
     _validate_range(team_config.dashboard_port, "dashboard.port", 1, 65535)
     _validate_range(team_config.default_max_instances, "defaults.max_instances", 1)
     _validate_range(team_config.default_poll_interval, "defaults.poll_interval_seconds", 1)
+    _validate_range(execution.worktree_pool_size, "execution.worktree_pool_size", 0, 32)
+    _validate_range(execution.agent_workers, "execution.agent_workers", 0, 64)
+    _validate_range(tracing.slow_callback_ms, "tracing.slow_callback_ms", 0)
+    _validate_range(maintenance.vacuum_free_ratio, "maintenance.vacuum_free_ratio", 0, 1)
+    for job, interval in maintenance.intervals.items():
+        _validate_range(interval, f"maintenance.intervals.{job}", 0)
 
     return team_config
 
@@ -427,6 +521,10 @@ class AutoScaleConfig:
     enabled: bool = False
     scale_up_threshold: int = 3
     scale_down_idle: int = 15
+    # Target queue wait in MINUTES. When set, the auto-scaler also sizes
+    # the role from its estimated arrival rate and service time so the
+    # backlog drains within this budget (see agents/auto_scaler.py).
+    target_latency: float | None = None
 
 
 @dataclass
@@ -507,6 +605,7 @@ def _parse_role(data: dict) -> RoleConfig:
             enabled=auto_scale_raw.get("enabled", False),
             scale_up_threshold=auto_scale_raw.get("scale_up_threshold", 3),
             scale_down_idle=auto_scale_raw.get("scale_down_idle", 15),
+            target_latency=auto_scale_raw.get("target_latency"),
         )
 
     role_cfg = RoleConfig(
@@ -15,7 +15,7 @@ from fastapi.templating import Jinja2Templates
 from fastapi.responses import JSONResponse
 from starlette.requests import Request
 
-from taskbrew.auth import AuthManager
+from taskbrew.auth import AuthManager, agent_api_token
 from taskbrew.config_loader import RoleConfig, TeamConfig
 from taskbrew.orchestrator.event_bus import EventBus
 from taskbrew.orchestrator.task_board import TaskBoard
@@ -151,6 +151,10 @@ def create_app(
         _auth_enabled = _auth_env.lower() == "true"
 
     _auth_manager = AuthManager(enabled=_auth_enabled)
+    # The builtin MCP tool servers authenticate with the per-run agent
+    # token (see agents/provider.py), whichever auth surface is active.
+    _agent_token = agent_api_token()
+    _auth_manager.register_token(_agent_token)
     if not _auth_enabled:
         _logger.info(
             "API authentication is disabled (AUTH_ENABLED=%s). Production "
@@ -209,7 +213,7 @@ def create_app(
         # below is a defense-in-depth vs. timing leaks.
         env_ok = env_requires and _auth_manager.verify_token_string(token)
         team_ok = False
-        if team_requires and _tc and _tc.auth_tokens:
+        if team_requires and _tc:
             import hmac as _hmac
             # isinstance guard: YAML scalars that look like numbers are
             # parsed as int by PyYAML unless quoted. hmac.compare_digest
@@ -218,7 +222,7 @@ def create_app(
             team_ok = any(
                 isinstance(candidate, str)
                 and _hmac.compare_digest(token, candidate)
-                for candidate in _tc.auth_tokens
+                for candidate in (*(_tc.auth_tokens or ()), _agent_token)
             )
         if not (env_ok or team_ok):
             return JSONResponse({"error": "Invalid token"}, status_code=401)
@@ -247,12 +251,12 @@ def create_app(
 
         env_ok = env_requires and _auth_manager.verify_token_string(token)
         team_ok = False
-        if team_requires and _tc and _tc.auth_tokens:
+        if team_requires and _tc:
             import hmac as _hmac
             team_ok = any(
                 isinstance(candidate, str)
                 and _hmac.compare_digest(token, candidate)
-                for candidate in _tc.auth_tokens
+                for candidate in (*(_tc.auth_tokens or ()), _agent_token)
             )
         if not (env_ok or team_ok):
             raise HTTPException(status_code=401, detail="Invalid token")
@@ -428,6 +432,7 @@ def create_app(
     from taskbrew.dashboard.routers.pipeline_editor import router as pipeline_editor_router
     from taskbrew.dashboard.routers.mcp_tools import router as mcp_tools_router
     from taskbrew.dashboard.routers.interactions import router as interactions_router
+    from taskbrew.dashboard.routers.debug import router as debug_router
 
     app.include_router(tasks_router, tags=["Tasks"])
     # audit 10 F#28: /api/agents/pause and /api/agents/resume mutate
@@ -563,6 +568,12 @@ def create_app(
         tags=["System"],
         dependencies=[Depends(verify_admin)],
     )
+    # Profiles expose stack frames and cost CPU while they run; admin only.
+    app.include_router(
+        debug_router,
+        tags=["Debug"],
+        dependencies=[Depends(verify_admin)],
+    )
     app.include_router(ws_router.router)
 
     # ------------------------------------------------------------------
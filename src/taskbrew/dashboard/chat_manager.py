@@ -1,8 +1,26 @@
-"""Chat manager for bidirectional agent conversations."""
+"""Chat manager for bidirectional agent conversations.
+
+Each chat keeps one ClaudeSDKClient whose CLI process holds the
+conversation, so a turn sends only the new user message. The SDK
+session id from every result is remembered; a client that is recreated
+after idle eviction or a crash resumes that session (``resume=``) rather
+than replaying history. Only when no resumable session exists is the
+prompt prefixed with a bounded context block: a rolling summary of every
+turn older than the last few, plus those last few verbatim.
+
+With a database, every turn is appended to ``chat_messages`` and the
+in-memory history is a fixed window; older turns are read back in pages
+(:meth:`ChatManager.get_history_page`). Idle sessions are suspended:
+their client is disconnected and their history dropped from memory
+until the next message reconnects them. :meth:`ChatManager.clear_history`
+forgets a conversation entirely.
+"""
 
 from __future__ import annotations
 
 import asyncio
+import logging
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
@@ -19,6 +37,21 @@ from claude_agent_sdk._errors import MessageParseError
 
 from taskbrew.config import AgentConfig
 
+logger = logging.getLogger(__name__)
+
+# Prior turns quoted verbatim when a prompt has to carry context.
+_CONTEXT_TURNS = 8
+# Per-message cap inside the context block.
+_CONTEXT_MESSAGE_CHARS = 300
+# Per-message cap and total cap of the rolling summary of older turns.
+_SUMMARY_LINE_CHARS = 120
+_SUMMARY_MAX_CHARS = 2000
+
+_HISTORY_PAGE_SQL = (
+    "SELECT seq, id, role, content, timestamp FROM chat_messages "
+    "WHERE agent_name = ? AND seq < ? ORDER BY seq DESC LIMIT ?"
+)
+
 
 @dataclass
 class ChatMessage:
@@ -28,6 +61,7 @@ class ChatMessage:
     role: str  # "user" or "assistant"
     content: str
     timestamp: str
+    seq: int | None = None  # chat_messages row, once persisted
 
 
 @dataclass
@@ -42,16 +76,47 @@ class ChatSession:
     is_connected: bool = False
     is_responding: bool = False
     created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    # SDK conversation to resume when the client has to be recreated.
+    sdk_session_id: str | None = None
+    # Set when the client holds none of the prior turns, so the next
+    # prompt must carry the summary + recent-turn context block.
+    needs_context: bool = False
+    # Rolling summary of every turn before the last _CONTEXT_TURNS.
+    summary: str = ""
+    # Leading messages of ``history`` already folded into ``summary``.
+    summarized: int = 0
+    # Idle-evicted: client disconnected, reconnected on next use.
+    suspended: bool = False
+    last_active: float = field(default_factory=time.monotonic)
+    message_count: int = 0
 
 
 class ChatManager:
-    """Manages active chat sessions with agents."""
+    """Manages active chat sessions with agents.
+
+    Parameters
+    ----------
+    db:
+        Optional Database. When given, turns are persisted to
+        ``chat_messages`` and sessions survive eviction and restarts.
+    idle_timeout:
+        Seconds without a message after which a session is suspended.
+        ``0`` disables eviction.
+    history_window:
+        Messages kept in memory per session; older ones stay readable
+        from the database. The rolling summary covers everything before
+        the last ``_CONTEXT_TURNS`` messages regardless.
+    """
 
     def __init__(
         self,
         cli_path: str | None = None,
         project_dir: str | None = None,
         max_concurrent_chats: int = 6,
+        *,
+        db=None,
+        idle_timeout: float = 1800.0,
+        history_window: int = 50,
     ):
         self.cli_path = cli_path
         self.project_dir = project_dir
@@ -61,6 +126,9 @@ class ChatManager:
         # racing for the same agent_name cannot both spawn a subprocess.
         self._start_locks: dict[str, asyncio.Lock] = {}
         self._start_locks_mutex = asyncio.Lock()
+        self._db = db
+        self.idle_timeout = idle_timeout
+        self.history_window = max(int(history_window), _CONTEXT_TURNS)
 
     async def _get_start_lock(self, agent_name: str) -> asyncio.Lock:
         async with self._start_locks_mutex:
@@ -70,6 +138,49 @@ class ChatManager:
                 self._start_locks[agent_name] = lock
             return lock
 
+    def _options(self, agent_config: AgentConfig, resume: str | None) -> ClaudeAgentOptions:
+        opts = ClaudeAgentOptions(
+            system_prompt=agent_config.system_prompt,
+            allowed_tools=agent_config.allowed_tools,
+            permission_mode=agent_config.permission_mode,
+            env={"CLAUDECODE": ""},
+        )
+        if self.cli_path:
+            opts.cli_path = self.cli_path
+        if self.project_dir:
+            opts.cwd = self.project_dir
+        if resume:
+            opts.resume = resume
+        return opts
+
+    async def _connect(self, session: ChatSession) -> None:
+        """Attach a fresh SDK client to *session*, resuming when possible.
+
+        If the CLI refuses the resume (session expired or pruned), connect
+        a plain client and let the next prompt carry the context block.
+        """
+        resume = session.sdk_session_id
+        client = ClaudeSDKClient(options=self._options(session.agent_config, resume))
+        try:
+            await client.connect()
+        except Exception:
+            if not resume:
+                raise
+            logger.info(
+                "Chat %s: could not resume SDK session %s, re-prompting with context",
+                session.agent_name, resume,
+            )
+            session.sdk_session_id = None
+            client = ClaudeSDKClient(options=self._options(session.agent_config, None))
+            await client.connect()
+        session.client = client
+        session.is_connected = True
+        session.suspended = False
+        session.needs_context = session.sdk_session_id is None and (
+            bool(session.history) or bool(session.summary)
+        )
+        session.last_active = time.monotonic()
+
     async def start_session(self, agent_name: str, agent_config: AgentConfig) -> ChatSession:
         """Start a (or attach to an existing) chat session for an agent.
 
@@ -77,17 +188,20 @@ class ChatManager:
         exists, return it. The WS handler relies on this so that a
         second tab / page refresh / reconnect after disconnect can
         attach to a session another connection started, rather than
-        the user seeing "already exists" errors.
+        the user seeing "already exists" errors. A suspended (idle-
+        evicted) session is reconnected in place and returned.
 
         Stale sessions (``client is None`` or ``is_connected = False``)
         are torn down and recreated. This catches the case where a
-        prior SDK process died but the dict entry survived.
+        prior SDK process died but the dict entry survived. The new
+        session picks up the persisted history and SDK session id.
 
         audit 10 F#25: take a per-agent lock around the
         check-then-spawn window so two concurrent callers for the same
         agent_name cannot both pass the ``if agent_name in self.sessions``
         check and then both spawn an SDK client (leaking the first one).
         """
+        await self.evict_idle()
         lock = await self._get_start_lock(agent_name)
         async with lock:
             existing = self.sessions.get(agent_name)
@@ -96,6 +210,9 @@ class ChatManager:
                 # uses identity to decide ownership.
                 if existing.is_connected and existing.client is not None:
                     return existing
+                if existing.suspended:
+                    await self._resume_suspended(existing)
+                    return existing
                 # Stale entry from a crashed prior client. Best-effort
                 # disconnect, then drop it and fall through to create
                 # a fresh one.
@@ -107,31 +224,20 @@ class ChatManager:
                 existing.is_connected = False
                 self.sessions.pop(agent_name, None)
 
-            session_id = str(uuid.uuid4())[:8]
-            opts = ClaudeAgentOptions(
-                system_prompt=agent_config.system_prompt,
-                allowed_tools=agent_config.allowed_tools,
-                permission_mode=agent_config.permission_mode,
-                env={"CLAUDECODE": ""},
-            )
-            if self.cli_path:
-                opts.cli_path = self.cli_path
-            if self.project_dir:
-                opts.cwd = self.project_dir
-
-            client = ClaudeSDKClient(options=opts)
-            await client.connect()
-
             session = ChatSession(
-                session_id=session_id,
+                session_id=str(uuid.uuid4())[:8],
                 agent_name=agent_name,
                 agent_config=agent_config,
-                client=client,
-                is_connected=True,
             )
+            await self._load_persisted(session)
+            await self._connect(session)
             self.sessions[agent_name] = session
             return session
 
+    async def _resume_suspended(self, session: ChatSession) -> None:
+        await self._load_persisted(session)
+        await self._connect(session)
+
     async def send_message(
         self,
         agent_name: str,
@@ -140,8 +246,14 @@ class ChatManager:
         on_tool_use: Callable[[str, dict], Awaitable[None]] | None = None,
     ) -> str:
         """Send a message and stream the response."""
+        await self.evict_idle()
         async with self._semaphore:
             session = self.sessions.get(agent_name)
+            if session is not None and session.suspended:
+                lock = await self._get_start_lock(agent_name)
+                async with lock:
+                    if session.suspended:
+                        await self._resume_suspended(session)
             if not session or not session.client:
                 raise ValueError(f"No active chat session for '{agent_name}'")
             if session.is_responding:
@@ -163,6 +275,7 @@ class ChatManager:
             session.history.append(user_msg)
 
             session.is_responding = True
+            session.last_active = time.monotonic()
             try:
                 try:
                     full_text = await asyncio.wait_for(
@@ -170,64 +283,157 @@ class ChatManager:
                         timeout=300,  # 5 min
                     )
                 except asyncio.TimeoutError:
-                    session.history.append(ChatMessage(
-                        id=str(uuid.uuid4())[:8],
-                        role="assistant",
-                        content="[error: response timed out]",
-                        timestamp=datetime.now(timezone.utc).isoformat(),
-                    ))
+                    await self._record_turn(session, user_msg, "[error: response timed out]")
                     return "error: Response timed out"
                 except Exception:
-                    session.history.append(ChatMessage(
-                        id=str(uuid.uuid4())[:8],
-                        role="assistant",
-                        content="[error: stream failed]",
-                        timestamp=datetime.now(timezone.utc).isoformat(),
-                    ))
+                    await self._record_turn(session, user_msg, "[error: stream failed]")
                     raise
 
-                # Record assistant message
-                assistant_msg = ChatMessage(
-                    id=str(uuid.uuid4())[:8],
-                    role="assistant",
-                    content=full_text,
-                    timestamp=datetime.now(timezone.utc).isoformat(),
-                )
-                session.history.append(assistant_msg)
+                await self._record_turn(session, user_msg, full_text)
                 return full_text
             finally:
                 session.is_responding = False
+                session.last_active = time.monotonic()
+
+    async def _record_turn(
+        self, session: ChatSession, user_msg: ChatMessage, reply: str,
+    ) -> None:
+        """Append the assistant reply, persist the turn and trim memory."""
+        assistant_msg = ChatMessage(
+            id=str(uuid.uuid4())[:8],
+            role="assistant",
+            content=reply,
+            timestamp=datetime.now(timezone.utc).isoformat(),
+        )
+        session.history.append(assistant_msg)
+        session.message_count += 2
+        # Everything the context block would not quote verbatim goes into
+        # the summary, so a session rebuilt without resume loses nothing.
+        fold_end = len(session.history) - _CONTEXT_TURNS
+        if fold_end > session.summarized:
+            session.summary = self._fold_summary(
+                session.summary, session.history[session.summarized:fold_end],
+            )
+            session.summarized = fold_end
+        overflow = len(session.history) - self.history_window
+        if overflow > 0:
+            del session.history[:overflow]
+            session.summarized = max(session.summarized - overflow, 0)
+        if self._db is None:
+            return
+        try:
+            async with self._db.transaction() as conn:
+                for msg in (user_msg, assistant_msg):
+                    cursor = await conn.execute(
+                        "INSERT INTO chat_messages "
+                        "(id, agent_name, session_id, role, content, timestamp) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (msg.id, session.agent_name, session.session_id,
+                         msg.role, msg.content, msg.timestamp),
+                    )
+                    msg.seq = cursor.lastrowid
+                await conn.execute(
+                    "INSERT INTO chat_sessions (agent_name, sdk_session_id, summary, updated_at) "
+                    "VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(agent_name) DO UPDATE SET "
+                    "sdk_session_id = excluded.sdk_session_id, "
+                    "summary = excluded.summary, updated_at = excluded.updated_at",
+                    (session.agent_name, session.sdk_session_id, session.summary,
+                     assistant_msg.timestamp),
+                )
+        except Exception:
+            logger.warning("Failed to persist chat turn for %s", session.agent_name, exc_info=True)
+
+    async def _load_persisted(self, session: ChatSession) -> None:
+        """Fill *session* from the database: SDK session, summary, recent window."""
+        if self._db is None:
+            return
+        row = await self._db.execute_fetchone(
+            "SELECT sdk_session_id, summary FROM chat_sessions WHERE agent_name = ?",
+            (session.agent_name,),
+        )
+        if row is None:
+            return
+        session.sdk_session_id = row["sdk_session_id"]
+        session.summary = row["summary"] or ""
+        session.history = await self._fetch_page(
+            session.agent_name, None, self.history_window,
+        )
+        # The persisted summary already covers all but the last few turns.
+        session.summarized = max(len(session.history) - _CONTEXT_TURNS, 0)
+        count = await self._db.execute_fetchone(
+            "SELECT COUNT(*) AS n FROM chat_messages WHERE agent_name = ?",
+            (session.agent_name,),
+        )
+        session.message_count = count["n"] if count else len(session.history)
+
+    async def _fetch_page(
+        self, agent_name: str, before: int | None, limit: int,
+    ) -> list[ChatMessage]:
+        rows = await self._db.execute_fetchall(
+            _HISTORY_PAGE_SQL,
+            (agent_name, before if before is not None else 2**62, limit),
+        )
+        return [
+            ChatMessage(
+                id=r["id"], role=r["role"], content=r["content"],
+                timestamp=r["timestamp"], seq=r["seq"],
+            )
+            for r in reversed(rows)
+        ]
+
+    @staticmethod
+    def _fold_summary(summary: str, dropped: list[ChatMessage]) -> str:
+        """Append one clipped line per dropped message, keeping the newest tail."""
+        lines = [summary] if summary else []
+        for msg in dropped:
+            prefix = "User" if msg.role == "user" else "Assistant"
+            text = " ".join(msg.content.split())
+            if len(text) > _SUMMARY_LINE_CHARS:
+                text = text[:_SUMMARY_LINE_CHARS] + "..."
+            lines.append(f"{prefix}: {text}")
+        folded = "\n".join(lines)
+        if len(folded) > _SUMMARY_MAX_CHARS:
+            folded = folded[-_SUMMARY_MAX_CHARS:]
+            folded = folded[folded.find("\n") + 1:] if "\n" in folded else folded
+        return folded
 
     @staticmethod
     def _build_contextual_prompt(session: ChatSession) -> str:
-        """Build a prompt that includes conversation history for context.
-
-        The ClaudeSDKClient uses a persistent subprocess that maintains its own
-        conversation state across ``query()`` calls.  However, that internal
-        context can be lost (e.g. auto-compaction on long conversations).  To
-        be defensive we prepend a concise summary of the prior conversation
-        turns so the model always has context, even if the subprocess state
-        has been truncated.
+        """Build the prompt for the latest user message.
+
+        The ClaudeSDKClient's CLI process keeps the conversation, and a
+        recreated client resumes it by SDK session id, so normally only
+        the new message is sent. When the client holds none of the prior
+        turns (``needs_context``: resume unavailable or refused) the
+        prompt carries a bounded context block instead: the rolling
+        summary of older turns plus the last few turns, each truncated.
+        Its size does not grow with the length of the conversation.
         """
         history = session.history
         latest_message = history[-1].content
 
         # Only the latest message — no prior history to include.
-        if len(history) <= 1:
+        if not session.needs_context or (len(history) <= 1 and not session.summary):
             return latest_message
 
-        # Build a brief conversation context from prior turns (skip the
-        # latest message which we append verbatim at the end).
+        parts: list[str] = []
+        if session.summary:
+            parts.append(f"[Earlier conversation, summarized]\n{session.summary}")
+
+        # Skip the latest message, which we append verbatim at the end.
         prior_turns: list[str] = []
-        for msg in history[:-1]:
+        for msg in history[:-1][-_CONTEXT_TURNS:]:
             prefix = "User" if msg.role == "user" else "Assistant"
             # Truncate long messages to keep the context prompt reasonable.
             content = msg.content
-            if len(content) > 300:
-                content = content[:300] + "..."
+            if len(content) > _CONTEXT_MESSAGE_CHARS:
+                content = content[:_CONTEXT_MESSAGE_CHARS] + "..."
             prior_turns.append(f"{prefix}: {content}")
+        if prior_turns:
+            parts.append("\n".join(prior_turns))
 
-        context_block = "\n".join(prior_turns)
+        context_block = "\n".join(parts)
         return (
             f"[Conversation context]\n{context_block}\n"
             f"[End context]\n\n{latest_message}"
@@ -243,6 +449,8 @@ class ChatManager:
         full_text = ""
         prompt = self._build_contextual_prompt(session)
         await session.client.query(prompt)
+        # The client now holds this turn (and the context it carried).
+        session.needs_context = False
 
         async for message in self._receive_safe(session.client):
             if isinstance(message, AssistantMessage):
@@ -252,6 +460,9 @@ class ChatManager:
                         if on_token:
                             await on_token(block.text)
             elif isinstance(message, ResultMessage):
+                sdk_session_id = getattr(message, "session_id", None)
+                if isinstance(sdk_session_id, str) and sdk_session_id:
+                    session.sdk_session_id = sdk_session_id
                 if hasattr(message, "result") and message.result:
                     full_text = message.result
 
@@ -277,8 +488,46 @@ class ChatManager:
                 # Unknown message type encountered — restart iteration
                 continue
 
+    async def evict_idle(self) -> list[str]:
+        """Suspend sessions idle longer than ``idle_timeout``.
+
+        The SDK client is disconnected and, when history is persisted,
+        the in-memory history is dropped. The session entry stays so the
+        next message (or start_session) reconnects and resumes it.
+        Returns the suspended agent names.
+        """
+        if self.idle_timeout <= 0:
+            return []
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted: list[str] = []
+        for agent_name, session in list(self.sessions.items()):
+            if (
+                session.suspended
+                or session.is_responding
+                or not session.is_connected
+                or session.last_active > cutoff
+            ):
+                continue
+            client, session.client = session.client, None
+            session.is_connected = False
+            session.suspended = True
+            if self._db is not None:
+                session.history = []
+            if client is not None:
+                try:
+                    await client.disconnect()
+                except Exception:
+                    pass
+            evicted.append(agent_name)
+        if evicted:
+            logger.info("Suspended idle chat sessions: %s", ", ".join(evicted))
+        return evicted
+
     async def stop_session(self, agent_name: str) -> None:
-        """Stop and remove a chat session."""
+        """Stop and remove a chat session.
+
+        Persisted history is kept; a later start_session resumes it.
+        """
         session = self.sessions.get(agent_name)
         if not session:
             return
@@ -290,17 +539,58 @@ class ChatManager:
         session.is_connected = False
         del self.sessions[agent_name]
 
+    async def clear_history(self, agent_name: str) -> int:
+        """Stop the session and forget the conversation with *agent_name*.
+
+        Drops the persisted messages, the summary and the SDK session id,
+        so the next start_session begins a fresh conversation. Returns
+        the number of messages deleted.
+        """
+        session = self.sessions.get(agent_name)
+        count = session.message_count if session else 0
+        await self.stop_session(agent_name)
+        if self._db is None:
+            return count
+        async with self._db.transaction() as conn:
+            cursor = await conn.execute(
+                "DELETE FROM chat_messages WHERE agent_name = ?", (agent_name,),
+            )
+            await conn.execute(
+                "DELETE FROM chat_sessions WHERE agent_name = ?", (agent_name,),
+            )
+        return cursor.rowcount
+
     def get_session(self, agent_name: str) -> ChatSession | None:
         """Get a session by agent name."""
         return self.sessions.get(agent_name)
 
     def get_history(self, agent_name: str) -> list[ChatMessage] | None:
-        """Get the conversation history for an agent."""
+        """Get the in-memory (most recent) conversation history for an agent."""
         session = self.sessions.get(agent_name)
         if not session:
             return None
         return list(session.history)
 
+    async def get_history_page(
+        self, agent_name: str, *, before: int | None = None, limit: int = 50,
+    ) -> list[ChatMessage] | None:
+        """Return up to *limit* messages older than seq *before*, oldest first.
+
+        Reads the database when there is one, so pages reach back past
+        the in-memory window. None when the agent has no chat at all.
+        """
+        if self._db is None:
+            history = self.get_history(agent_name)
+            if history is None:
+                return None
+            if before is not None:
+                return []
+            return history[-limit:]
+        page = await self._fetch_page(agent_name, before, limit)
+        if not page and before is None and agent_name not in self.sessions:
+            return None
+        return page
+
     async def stop_all(self) -> None:
         """Stop all active sessions."""
         for agent_name in list(self.sessions):
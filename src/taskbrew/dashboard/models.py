@@ -38,6 +38,10 @@ class CreateTaskBody(BaseModel):
     requires_fanout: Optional[bool] = None
 
 
+class CreateTasksBody(BaseModel):
+    tasks: list[CreateTaskBody]
+
+
 class SubmitGoalBody(BaseModel):
     title: str
     description: str = ""
@@ -275,6 +279,36 @@ class StoreMemoryBody(BaseModel):
     project_id: Optional[str] = None
 
 
+class RecallMemoryBody(BaseModel):
+    agent_role: str
+    query: str
+    memory_type: Optional[str] = None
+    limit: int = Field(default=5, ge=1, le=100)
+
+
+class StoreLessonBody(BaseModel):
+    agent_role: str
+    title: str
+    content: str
+    source_task_id: Optional[str] = None
+
+
+class ProjectContextBody(BaseModel):
+    agent_role: str
+    query: str = "project"
+    project_id: Optional[str] = None
+
+
+class CheckImpactBody(BaseModel):
+    file_paths: list[str] = Field(max_length=100)
+
+
+class ReportConfidenceBody(BaseModel):
+    task_id: str
+    agent_role: str
+    output_text: str
+
+
 class AssessRiskBody(BaseModel):
     files: list[str] = []
 
@@ -460,6 +494,10 @@ class RecordTimingBody(BaseModel):
     duration_ms: float
 
 
+class RecordTimingsBody(BaseModel):
+    timings: list[RecordTimingBody] = Field(max_length=10_000)
+
+
 # ---------------------------------------------------------------------------
 # Intelligence V2 – Security (Features 34-38)
 # ---------------------------------------------------------------------------
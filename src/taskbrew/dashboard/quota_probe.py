@@ -0,0 +1,215 @@
+"""Background, single-flight CLI quota probes.
+
+Reading plan limits means driving an interactive CLI (``claude`` or
+``gemini``) through ``/usage`` under pexpect, which takes 20+ seconds.
+A :class:`QuotaProbe` runs that on a schedule and keeps the last good
+result. Callers get that result at once, with its age and staleness.
+A stale read starts a refresh in the background and does not wait for
+it. Concurrent refreshes share one run. All probes share one spawn lock,
+held until the worker thread really exits (even past the timeout), so
+at most one CLI is ever running.
+
+Probes are only scheduled while someone is looking: :meth:`QuotaProbe.run`
+stops spawning once nobody has read the probe for ``idle_after``
+seconds. The next read wakes it up again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class QuotaProbe:
+    """Cached, background-refreshed result of a blocking probe function.
+
+    Parameters
+    ----------
+    name:
+        Label used in logs and metrics.
+    probe:
+        Blocking callable returning the parsed result or None on failure;
+        run in a worker thread.
+    spawn_lock:
+        Lock shared by every probe that spawns a CLI.
+    max_age:
+        Seconds after which a result is stale and a read triggers a
+        refresh.
+    timeout:
+        Seconds after which a probe is reported failed. The lock is still
+        held until the worker thread returns.
+    idle_after:
+        :meth:`run` skips scheduled refreshes when the probe has not been
+        read for this long.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        probe: Callable[[], dict | None],
+        spawn_lock: asyncio.Lock,
+        *,
+        max_age: float = 120.0,
+        timeout: float = 50.0,
+        idle_after: float = 600.0,
+    ) -> None:
+        self.name = name
+        self._probe = probe
+        self._spawn_lock = spawn_lock
+        self.max_age = max_age
+        self.timeout = timeout
+        self.idle_after = idle_after
+        self._result: dict | None = None
+        self._fetched_at: float | None = None  # wall clock, for display
+        self._fetched_mono: float | None = None
+        self._last_read = 0.0
+        self._task: asyncio.Task | None = None
+        self._probes = 0
+        self._failures = 0
+        self._total_duration = 0.0
+        self._last_duration: float | None = None
+        self._last_error: str | None = None
+        self._last_attempt_at: float | None = None
+        self._last_attempt_mono: float | None = None
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def _inflight(self) -> asyncio.Task | None:
+        task = self._task
+        if task is None or task.done():
+            return None
+        # A task from a loop that has since closed will never finish.
+        if task.get_loop() is not asyncio.get_running_loop():
+            return None
+        return task
+
+    def refresh(self) -> asyncio.Task:
+        """Start a refresh unless one is running; return the running one."""
+        task = self._inflight()
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._refresh())
+            self._task = task
+        return task
+
+    async def _refresh(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._spawn_lock:
+            started = time.monotonic()
+            self._last_attempt_at = time.time()
+            self._last_attempt_mono = started
+            self._probes += 1
+            future = loop.run_in_executor(None, self._probe)
+            done, _ = await asyncio.wait({future}, timeout=self.timeout)
+            if not done:
+                self._record_failure(started, f"timed out after {self.timeout:.0f}s")
+                logger.warning("%s quota probe timed out", self.name)
+            # Keep the lock until the thread exits so a retry cannot put a
+            # second CLI beside one that is still winding down.
+            try:
+                result = await future
+            except Exception as exc:  # noqa: BLE001 -- any probe failure is recorded
+                if done:
+                    self._record_failure(started, str(exc) or type(exc).__name__)
+                logger.error("%s quota probe failed: %s", self.name, exc)
+                return
+            if not done:
+                # Late but usable: keep it; the timeout is already counted.
+                if result:
+                    self._store(result)
+                return
+            if result:
+                self._store(result)
+                self._last_error = None
+                self._record_duration(started)
+            else:
+                self._record_failure(started, "no usage data in CLI output")
+
+    def _store(self, result: dict) -> None:
+        self._result = result
+        self._fetched_at = time.time()
+        self._fetched_mono = time.monotonic()
+
+    def _record_duration(self, started: float) -> None:
+        self._last_duration = time.monotonic() - started
+        self._total_duration += self._last_duration
+
+    def _record_failure(self, started: float, error: str) -> None:
+        self._failures += 1
+        self._last_error = error
+        self._record_duration(started)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def age(self) -> float | None:
+        if self._fetched_mono is None:
+            return None
+        return time.monotonic() - self._fetched_mono
+
+    def is_stale(self) -> bool:
+        age = self.age()
+        return age is None or age >= self.max_age
+
+    def _due(self) -> bool:
+        """Stale, and not retried within the last quarter of ``max_age``.
+
+        The retry spacing stops a missing or broken CLI from being
+        respawned on every page load.
+        """
+        if not self.is_stale():
+            return False
+        last = self._last_attempt_mono
+        return last is None or time.monotonic() - last >= self.max_age / 4
+
+    def get(self) -> dict | None:
+        """Return the last result at once; refresh in the background if due."""
+        self._last_read = time.monotonic()
+        if self._due():
+            self.refresh()
+        return self._result
+
+    def status(self) -> dict:
+        """Staleness metadata for the last result."""
+        age = self.age()
+        return {
+            "fetched_at": self._fetched_at,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "stale": self.is_stale(),
+            "refreshing": self._task is not None and not self._task.done(),
+            "last_error": self._last_error,
+        }
+
+    def metrics(self) -> dict:
+        """Probe counters: attempts, failures and durations."""
+        completed = self._probes - (1 if self.status()["refreshing"] else 0)
+        return {
+            "probes": self._probes,
+            "failures": self._failures,
+            "last_duration_seconds": (
+                round(self._last_duration, 2) if self._last_duration is not None else None
+            ),
+            "avg_duration_seconds": (
+                round(self._total_duration / completed, 2) if completed > 0 else None
+            ),
+            "last_attempt_at": self._last_attempt_at,
+            **self.status(),
+        }
+
+    async def run(self) -> None:
+        """Refresh on a schedule while the probe is being read."""
+        while True:
+            if time.monotonic() - self._last_read < self.idle_after and self._due():
+                try:
+                    await asyncio.shield(self.refresh())
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.warning("%s quota probe refresh failed", self.name, exc_info=True)
+            await asyncio.sleep(max(self.max_age / 4, 1.0))
@@ -10,6 +10,73 @@ from taskbrew.dashboard.routers._deps import get_orch
 
 router = APIRouter()
 
+_AGENT_SUMMARY_SQL = (
+    "WITH usage AS ("
+    "  SELECT agent_id, "
+    "    COUNT(*) as total_runs, "
+    "    COALESCE(SUM(input_tokens), 0) as total_input_tokens, "
+    "    COALESCE(SUM(output_tokens), 0) as total_output_tokens, "
+    "    COALESCE(SUM(cost_usd), 0) as total_cost, "
+    "    COALESCE(AVG(cost_usd), 0) as avg_cost_per_run, "
+    "    COALESCE(AVG(duration_api_ms), 0) as avg_duration_ms, "
+    "    COALESCE(SUM(num_turns), 0) as total_turns, "
+    "    COALESCE(AVG(num_turns), 0) as avg_turns_per_run "
+    "  FROM task_usage WHERE recorded_at >= ? "
+    "  GROUP BY agent_id"
+    "), outcomes AS ("
+    "  SELECT claimed_by, "
+    "    COUNT(*) as total_tasks, "
+    "    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed, "
+    "    SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed "
+    "  FROM tasks "
+    "  WHERE created_at >= ? AND claimed_by IN (SELECT agent_id FROM usage) "
+    "  GROUP BY claimed_by"
+    ") "
+    "SELECT u.*, "
+    "  COALESCE(o.total_tasks, 0) as total_tasks, "
+    "  COALESCE(o.completed, 0) as completed, "
+    "  COALESCE(o.failed, 0) as failed "
+    "FROM usage u LEFT JOIN outcomes o ON o.claimed_by = u.agent_id "
+    "ORDER BY u.total_runs DESC"
+)
+
+_AGENT_DAILY_USAGE_SQL = (
+    "SELECT DATE(recorded_at) as day, "
+    "  COUNT(*) as runs, "
+    "  SUM(cost_usd) as cost, "
+    "  AVG(duration_api_ms) as avg_duration_ms, "
+    "  SUM(input_tokens) as input_tokens, "
+    "  SUM(output_tokens) as output_tokens "
+    "FROM task_usage "
+    "WHERE agent_id = ? AND recorded_at >= ? "
+    "GROUP BY DATE(recorded_at) ORDER BY day"
+)
+
+_AGENT_RECENT_TASKS_SQL = (
+    "SELECT id, title, status, priority, started_at, completed_at "
+    "FROM tasks WHERE claimed_by = ? AND created_at >= ? "
+    "ORDER BY created_at DESC LIMIT 20"
+)
+
+_DAILY_THROUGHPUT_SQL = (
+    "SELECT DATE(completed_at) as day, COUNT(*) as completed "
+    "FROM tasks WHERE status = 'completed' AND completed_at >= ? "
+    "GROUP BY DATE(completed_at) ORDER BY day"
+)
+
+_EFFICIENCY_SQL = (
+    "SELECT t.priority, t.task_type, t.id IS NOT NULL as matched, "
+    "  COUNT(*) as runs, "
+    "  COALESCE(SUM(u.cost_usd), 0) as cost, "
+    "  COALESCE(SUM(u.input_tokens + u.output_tokens), 0) as tokens, "
+    "  COALESCE(SUM(u.duration_api_ms), 0) as duration_ms, "
+    "  COALESCE(SUM(u.num_turns), 0) as turns "
+    "FROM task_usage u "
+    "LEFT JOIN tasks t ON u.task_id = t.id "
+    "WHERE u.recorded_at >= ? "
+    "GROUP BY t.priority, t.task_type, matched"
+)
+
 
 # ------------------------------------------------------------------
 # Agent Performance Summary
@@ -23,41 +90,16 @@ async def agent_performance_summary(days: int = Query(30, ge=1, le=365)):
     db = orch.task_board._db
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
+    # One statement: usage aggregates per agent joined to task outcomes
+    # per claimer, instead of a follow-up tasks query for every agent.
     rows = await db.execute_fetchall(
-        "SELECT "
-        "  u.agent_id, "
-        "  COUNT(*) as total_runs, "
-        "  COALESCE(SUM(u.input_tokens), 0) as total_input_tokens, "
-        "  COALESCE(SUM(u.output_tokens), 0) as total_output_tokens, "
-        "  COALESCE(SUM(u.cost_usd), 0) as total_cost, "
-        "  COALESCE(AVG(u.cost_usd), 0) as avg_cost_per_run, "
-        "  COALESCE(AVG(u.duration_api_ms), 0) as avg_duration_ms, "
-        "  COALESCE(SUM(u.num_turns), 0) as total_turns, "
-        "  COALESCE(AVG(u.num_turns), 0) as avg_turns_per_run "
-        "FROM task_usage u "
-        "WHERE u.recorded_at >= ? "
-        "GROUP BY u.agent_id "
-        "ORDER BY total_runs DESC",
-        (cutoff,),
+        _AGENT_SUMMARY_SQL,
+        (cutoff, cutoff),
     )
 
     agents = []
     for r in rows:
-        # Get task completion stats for this agent
-        task_stats = await db.execute_fetchone(
-            "SELECT "
-            "  COUNT(*) as total_tasks, "
-            "  SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as completed, "
-            "  SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed "
-            "FROM tasks WHERE claimed_by = ? AND created_at >= ?",
-            (r["agent_id"], cutoff),
-        )
-
-        total_tasks = task_stats["total_tasks"] if task_stats else 0
-        completed = task_stats["completed"] if task_stats else 0
-        failed = task_stats["failed"] if task_stats else 0
-        success_rate = round(completed / max(total_tasks, 1) * 100, 1)
-
+        success_rate = round(r["completed"] / max(r["total_tasks"], 1) * 100, 1)
         agents.append({
             "agent_id": r["agent_id"],
             "total_runs": r["total_runs"],
@@ -68,8 +110,8 @@ async def agent_performance_summary(days: int = Query(30, ge=1, le=365)):
             "avg_duration_ms": round(r["avg_duration_ms"]),
             "total_turns": r["total_turns"],
             "avg_turns_per_run": round(r["avg_turns_per_run"], 1),
-            "tasks_completed": completed,
-            "tasks_failed": failed,
+            "tasks_completed": r["completed"],
+            "tasks_failed": r["failed"],
             "success_rate": success_rate,
         })
 
@@ -90,23 +132,13 @@ async def agent_detail(agent_id: str, days: int = Query(30, ge=1, le=365)):
 
     # Usage over time
     daily = await db.execute_fetchall(
-        "SELECT DATE(recorded_at) as day, "
-        "  COUNT(*) as runs, "
-        "  SUM(cost_usd) as cost, "
-        "  AVG(duration_api_ms) as avg_duration_ms, "
-        "  SUM(input_tokens) as input_tokens, "
-        "  SUM(output_tokens) as output_tokens "
-        "FROM task_usage "
-        "WHERE agent_id = ? AND recorded_at >= ? "
-        "GROUP BY DATE(recorded_at) ORDER BY day",
+        _AGENT_DAILY_USAGE_SQL,
         (agent_id, cutoff),
     )
 
     # Recent tasks
     recent_tasks = await db.execute_fetchall(
-        "SELECT id, title, status, priority, started_at, completed_at "
-        "FROM tasks WHERE claimed_by = ? AND created_at >= ? "
-        "ORDER BY created_at DESC LIMIT 20",
+        _AGENT_RECENT_TASKS_SQL,
         (agent_id, cutoff),
     )
 
@@ -139,9 +171,7 @@ async def throughput_metrics(days: int = Query(7, ge=1, le=90)):
 
     # Daily throughput
     daily = await db.execute_fetchall(
-        "SELECT DATE(completed_at) as day, COUNT(*) as completed "
-        "FROM tasks WHERE status = 'completed' AND completed_at >= ? "
-        "GROUP BY DATE(completed_at) ORDER BY day",
+        _DAILY_THROUGHPUT_SQL,
         (cutoff,),
     )
 
@@ -176,47 +206,49 @@ async def efficiency_metrics(days: int = Query(30, ge=1, le=365)):
     db = orch.task_board._db
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-    # Overall efficiency
-    overall = await db.execute_fetchone(
-        "SELECT "
-        "  COUNT(*) as total_runs, "
-        "  COALESCE(AVG(cost_usd), 0) as avg_cost, "
-        "  COALESCE(AVG(input_tokens + output_tokens), 0) as avg_tokens, "
-        "  COALESCE(AVG(duration_api_ms), 0) as avg_duration_ms, "
-        "  COALESCE(AVG(num_turns), 0) as avg_turns "
-        "FROM task_usage WHERE recorded_at >= ?",
+    # A single pass grouped by (priority, task_type); the overall and
+    # per-dimension figures are rolled up from the sums below. ``matched``
+    # separates usage rows whose task no longer exists, which only count
+    # towards the overall figures.
+    rows = await db.execute_fetchall(
+        _EFFICIENCY_SQL,
         (cutoff,),
     )
 
-    # By priority
-    by_priority = await db.execute_fetchall(
-        "SELECT t.priority, "
-        "  COUNT(*) as runs, "
-        "  AVG(u.cost_usd) as avg_cost, "
-        "  AVG(u.duration_api_ms) as avg_duration_ms "
-        "FROM task_usage u "
-        "JOIN tasks t ON u.task_id = t.id "
-        "WHERE u.recorded_at >= ? "
-        "GROUP BY t.priority",
-        (cutoff,),
-    )
+    total_runs = sum(r["runs"] for r in rows)
+    runs = max(total_runs, 1)
+    overall = {
+        "total_runs": total_runs,
+        "avg_cost": sum(r["cost"] for r in rows) / runs,
+        "avg_tokens": sum(r["tokens"] for r in rows) / runs,
+        "avg_duration_ms": sum(r["duration_ms"] for r in rows) / runs,
+        "avg_turns": sum(r["turns"] for r in rows) / runs,
+    }
 
-    # By task type
-    by_type = await db.execute_fetchall(
-        "SELECT t.task_type, "
-        "  COUNT(*) as runs, "
-        "  AVG(u.cost_usd) as avg_cost, "
-        "  AVG(u.duration_api_ms) as avg_duration_ms "
-        "FROM task_usage u "
-        "JOIN tasks t ON u.task_id = t.id "
-        "WHERE u.recorded_at >= ? "
-        "GROUP BY t.task_type",
-        (cutoff,),
-    )
+    def _rollup(key: str) -> list[dict]:
+        groups: dict = {}
+        for r in rows:
+            if not r["matched"]:
+                continue
+            g = groups.setdefault(r[key], [0, 0.0, 0])
+            g[0] += r["runs"]
+            g[1] += r["cost"]
+            g[2] += r["duration_ms"]
+        return [
+            {
+                key: k,
+                "runs": n,
+                "avg_cost": cost / n,
+                "avg_duration_ms": duration / n,
+            }
+            for k, (n, cost, duration) in sorted(
+                groups.items(), key=lambda kv: (kv[0] is not None, kv[0] or ""),
+            )
+        ]
 
     return {
         "days": days,
-        "overall": dict(overall) if overall else {},
-        "by_priority": [dict(r) for r in by_priority],
-        "by_task_type": [dict(r) for r in by_type],
+        "overall": overall,
+        "by_priority": _rollup("priority"),
+        "by_task_type": _rollup("task_type"),
     }
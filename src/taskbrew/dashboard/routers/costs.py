@@ -26,10 +26,19 @@ def _get_db():
 # ------------------------------------------------------------------
 
 
+def _get_cost_manager():
+    """Return the orchestrator's CostManager, if one was wired in."""
+    return getattr(get_orch(), "cost_manager", None)
+
+
 @router.get("/api/costs/summary")
 async def get_cost_summary():
     """Return current budget utilization for all active budgets."""
     db = _get_db()
+    cost_manager = _get_cost_manager()
+    if cost_manager is not None:
+        # Spend is buffered in the CostManager ledger; persist it first.
+        await cost_manager.flush()
     now = datetime.now(timezone.utc).isoformat()
 
     budgets = await db.execute_fetchall(
@@ -72,6 +81,28 @@ async def get_cost_summary():
     }
 
 
+# ------------------------------------------------------------------
+# GET /api/costs/forecast — Projected end-of-period spend per budget
+# ------------------------------------------------------------------
+
+
+@router.get("/api/costs/forecast")
+async def get_cost_forecast(
+    role: str | None = Query(default=None),
+    group_id: str | None = Query(default=None),
+):
+    """Return projected end-of-period spend at the current burn rate."""
+    cost_manager = _get_cost_manager()
+    if cost_manager is None:
+        from taskbrew.orchestrator.cost_manager import CostManager
+        cost_manager = CostManager(_get_db())
+    forecasts = await cost_manager.forecast(role=role, group_id=group_id)
+    return {
+        "forecasts": forecasts,
+        "at_risk": [f["id"] for f in forecasts if f["will_exceed"]],
+    }
+
+
 # ------------------------------------------------------------------
 # GET /api/costs/history?days=30 — Daily cost totals for past N days
 # ------------------------------------------------------------------
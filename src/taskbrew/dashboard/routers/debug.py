@@ -0,0 +1,48 @@
+"""Admin-only diagnostics for the running process: sampling profiles and
+event-loop stall reports."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from taskbrew.orchestrator import profiler
+
+router = APIRouter()
+
+
+@router.get("/api/debug/profile")
+async def capture_profile(
+    seconds: float = Query(5.0, gt=0, le=profiler.MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    format: Literal["json", "collapsed"] = "json",
+):
+    """Wall-clock sampling profile of all threads and asyncio tasks.
+
+    ``format=collapsed`` returns ``stack count`` lines for flamegraph.pl
+    or speedscope; the default JSON carries the same stacks plus sample
+    counts.
+    """
+    try:
+        profile = await profiler.sample_profile(seconds, interval_ms / 1000)
+    except profiler.ProfilerBusyError as exc:
+        raise HTTPException(409, str(exc))
+    if format == "collapsed":
+        return PlainTextResponse(profiler.collapsed(profile))
+    return profile
+
+
+@router.get("/api/debug/stalls")
+async def get_loop_stalls():
+    """Recent event-loop stalls caught by the stall detector."""
+    detector = profiler.get_stall_detector()
+    if detector is None:
+        return {"enabled": False, "threshold_ms": None, "stalls": 0, "recent": []}
+    return {
+        "enabled": True,
+        "threshold_ms": detector.threshold * 1000,
+        "stalls": detector.stalls,
+        "recent": detector.recent(),
+    }
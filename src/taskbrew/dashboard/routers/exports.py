@@ -63,6 +63,11 @@ def _capped_query(base_sql: str) -> str:
     return f"{base_sql} LIMIT {MAX_EXPORT_ROWS + 1}"
 
 
+_USAGE_EXPORT_SQL = _capped_query(
+    "SELECT * FROM task_usage WHERE recorded_at >= ? ORDER BY recorded_at"
+)
+
+
 def _truncate_and_flag(rows: list[dict]) -> tuple[list[dict], bool]:
     if len(rows) > MAX_EXPORT_ROWS:
         return rows[:MAX_EXPORT_ROWS], True
@@ -281,8 +286,7 @@ async def export_usage(
 
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
     rows = await db.execute_fetchall(
-        _capped_query("SELECT * FROM task_usage WHERE recorded_at >= ? ORDER BY recorded_at"),
-        (cutoff,),
+        _USAGE_EXPORT_SQL, (cutoff,),
     )
     usage, truncated = _truncate_and_flag(rows)
 
@@ -8,6 +8,7 @@ import logging
 from fastapi import APIRouter, HTTPException, Query
 
 from taskbrew.dashboard.routers._deps import get_orch_optional
+from taskbrew.tools.git_service import GitError, GitTimeoutError, get_git_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -30,19 +31,18 @@ def _require_project_dir() -> str:
 async def _run_git(
     *args: str, cwd: str | None = None, timeout: float = 10.0
 ) -> tuple[str, str, int]:
-    """Run a git command and return (stdout, stderr, returncode)."""
-    proc = await asyncio.create_subprocess_exec(
-        "git", *args,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
-        cwd=cwd,
-    )
+    """Run a git command and return (stdout, stderr, returncode).
+
+    Goes through the project's shared GitService so dashboard polling
+    counts against the same concurrency bound as the agents' git work.
+    """
     try:
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        rc, stdout, stderr = await get_git_service(cwd or ".").exec(
+            *args, cwd=cwd, timeout=timeout,
+        )
     except asyncio.TimeoutError:
-        proc.kill()
         raise HTTPException(504, "Git command timed out")
-    return stdout.decode(errors="replace"), stderr.decode(errors="replace"), proc.returncode
+    return stdout, stderr, rc
 
 
 def _get_project_dir() -> str | None:
@@ -104,11 +104,12 @@ async def git_log(limit: int = Query(20, ge=1, le=100)):
     """Get recent commit log."""
     cwd = _require_project_dir()
     fmt = "%H%n%h%n%an%n%ae%n%ai%n%s"
-    stdout, stderr, rc = await _run_git(
-        "log", f"--max-count={limit}", f"--format={fmt}", cwd=cwd
-    )
-    if rc != 0:
-        raise HTTPException(500, f"git log failed: {stderr.strip()}")
+    try:
+        stdout = await get_git_service(cwd).log(limit, fmt)
+    except GitTimeoutError:
+        raise HTTPException(504, "Git command timed out")
+    except GitError as exc:
+        raise HTTPException(500, f"git log failed: {exc}")
 
     commits = []
     lines = stdout.strip().split("\n") if stdout.strip() else []
@@ -136,22 +137,54 @@ async def git_log(limit: int = Query(20, ge=1, le=100)):
 async def git_branches():
     """List all local branches with current branch indicated."""
     cwd = _require_project_dir()
-    stdout, stderr, rc = await _run_git("branch", "--list", "-v", cwd=cwd)
-    if rc != 0:
-        raise HTTPException(500, f"git branch failed: {stderr.strip()}")
+    git = get_git_service(cwd)
+    try:
+        refs = await git.refs()
+        current = await git.current_branch()
+    except GitTimeoutError:
+        raise HTTPException(504, "Git command timed out")
+    except GitError as exc:
+        raise HTTPException(500, f"git for-each-ref failed: {exc}")
+
+    branches = [
+        {"name": name, "current": name == current}
+        for name in sorted(
+            ref[len("refs/heads/"):] for ref in refs if ref.startswith("refs/heads/")
+        )
+    ]
+    return {"current": current, "branches": branches, "count": len(branches)}
 
-    branches = []
-    current = None
-    for line in stdout.strip().split("\n"):
-        if not line.strip():
-            continue
-        is_current = line.startswith("*")
-        name = line.lstrip("* ").split()[0]
-        if is_current:
-            current = name
-        branches.append({"name": name, "current": is_current})
 
-    return {"current": current, "branches": branches, "count": len(branches)}
+@router.get("/api/git/branches/diff-stats")
+async def git_branch_diff_stats(base: str = Query("main", min_length=1, max_length=200)):
+    """Changed files and lines of every local branch against *base*.
+
+    All branches are diffed in one batched git call; branches whose
+    commits have not moved since the last request are served from cache.
+    """
+    cwd = _require_project_dir()
+    git = get_git_service(cwd)
+    try:
+        refs = await git.refs()
+        names = sorted(
+            ref[len("refs/heads/"):] for ref in refs if ref.startswith("refs/heads/")
+        )
+        stats = await git.diff_stats([n for n in names if n != base], base=base)
+    except GitTimeoutError:
+        raise HTTPException(504, "Git command timed out")
+    except GitError as exc:
+        raise HTTPException(500, f"git diff-tree failed: {exc}")
+
+    branches = [
+        {
+            "name": name,
+            "files": len(numstat),
+            "added": sum(a for a, _, _ in numstat if a is not None),
+            "removed": sum(r for _, r, _ in numstat if r is not None),
+        }
+        for name, numstat in stats.items()
+    ]
+    return {"base": base, "branches": branches, "count": len(branches)}
 
 
 # ------------------------------------------------------------------
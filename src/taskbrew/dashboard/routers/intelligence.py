@@ -4,6 +4,7 @@ escalations, checkpoints, and tools."""
 
 from __future__ import annotations
 
+import os
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -11,16 +12,21 @@ from fastapi import APIRouter, HTTPException, Query
 
 from taskbrew.dashboard.models import (
     AssessRiskBody,
+    CheckImpactBody,
     CreateEscalationBody,
     DecideCheckpointBody,
     PairSessionBody,
     PeerReviewBody,
+    ProjectContextBody,
     RebuildKGRequest,
+    RecallMemoryBody,
+    ReportConfidenceBody,
     ResolveEscalationBody,
     SelectToolsBody,
     SendMessageBody,
     SetModelRoutingBody,
     StartDebateBody,
+    StoreLessonBody,
     StoreMemoryBody,
 )
 from taskbrew.dashboard.routers._deps import get_orch
@@ -70,6 +76,87 @@ async def delete_memory(memory_id: int):
     return {"status": "deleted"}
 
 
+# ------------------------------------------------------------------
+# Agent intelligence tools
+#
+# The intelligence-tools MCP server each agent spawns is a thin proxy
+# over these endpoints, so every agent shares the orchestrator's
+# managers (and its one DB connection and recall cache) instead of
+# opening its own database.
+# ------------------------------------------------------------------
+
+
+@router.post("/api/memories/recall")
+async def recall_memories(body: RecallMemoryBody):
+    orch = get_orch()
+    if not orch.memory_manager:
+        raise HTTPException(status_code=503, detail="Memory manager not initialized")
+    return await orch.memory_manager.recall(
+        agent_role=body.agent_role,
+        query=body.query,
+        memory_type=body.memory_type or None,
+        limit=body.limit,
+    )
+
+
+@router.post("/api/memories/lessons")
+async def store_lesson(body: StoreLessonBody):
+    orch = get_orch()
+    if not orch.memory_manager:
+        raise HTTPException(status_code=503, detail="Memory manager not initialized")
+    memory = await orch.memory_manager.store_lesson(
+        role=body.agent_role,
+        title=body.title,
+        content=body.content,
+        source_task_id=body.source_task_id or None,
+    )
+    return {"stored": True, "memory": memory}
+
+
+@router.post("/api/memories/project-context")
+async def get_project_context(body: ProjectContextBody):
+    orch = get_orch()
+    if not orch.memory_manager:
+        raise HTTPException(status_code=503, detail="Memory manager not initialized")
+    context = await orch.memory_manager.get_project_context(
+        role=body.agent_role,
+        query=body.query or "project",
+        project_id=body.project_id or None,
+    )
+    return {"context": context}
+
+
+@router.post("/api/impact/check")
+async def check_impact(body: CheckImpactBody):
+    orch = get_orch()
+    if not orch.impact_analyzer:
+        raise HTTPException(status_code=503, detail="Impact analyzer not initialized")
+    project_real = os.path.realpath(str(orch.project_dir))
+    results: dict[str, dict] = {}
+    for path in body.file_paths:
+        path = path.strip()
+        if not path:
+            continue
+        # Paths come from agents; keep the analyzer inside the project.
+        full = os.path.realpath(os.path.join(project_real, path))
+        if path.startswith("/") or not full.startswith(project_real + os.sep):
+            results[path] = {"error": "path is outside the project directory"}
+            continue
+        results[path] = await orch.impact_analyzer.trace_dependencies(path)
+    return results
+
+
+@router.post("/api/quality/confidence")
+async def report_confidence(body: ReportConfidenceBody):
+    orch = get_orch()
+    if not orch.quality_manager:
+        raise HTTPException(status_code=503, detail="Quality manager not initialized")
+    confidence = await orch.quality_manager.score_confidence(
+        body.task_id, body.agent_role, body.output_text,
+    )
+    return {"task_id": body.task_id, "confidence": confidence}
+
+
 # ------------------------------------------------------------------
 # Planning & Pre-flight
 # ------------------------------------------------------------------
@@ -34,6 +34,7 @@ from taskbrew.dashboard.models import (
     # Testing & Quality
     PredictRegressionBody,
     RecordTimingBody,
+    RecordTimingsBody,
     # Security
     FlagSecurityBody,
     # Observability
@@ -741,6 +742,14 @@ async def record_test_timing(body: RecordTimingBody):
     )
 
 
+@router.post("/api/v2/testing/timings/bulk")
+async def record_test_timings(body: RecordTimingsBody):
+    mgr = await _ensure_testing()
+    return await mgr.record_test_timings(
+        [t.model_dump() for t in body.timings],
+    )
+
+
 @router.get("/api/v2/testing/regressions")
 async def detect_perf_regressions(threshold_pct: float = 20.0):
     mgr = await _ensure_testing()
@@ -956,6 +965,15 @@ async def get_schedule(group_id: str):
     return await mgr.get_schedule(group_id=group_id)
 
 
+@router.get("/api/groups/{group_id}/critical-path")
+async def get_critical_path(group_id: str, refresh: bool = False):
+    mgr = await _ensure_planning()
+    try:
+        return await mgr.get_critical_path(group_id=group_id, refresh=refresh)
+    except ValueError as exc:
+        raise HTTPException(409, str(exc))
+
+
 @router.get("/api/v2/planning/resources")
 async def snapshot_resources():
     mgr = await _ensure_planning()
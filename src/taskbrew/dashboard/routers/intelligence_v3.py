@@ -3,7 +3,7 @@ from __future__ import annotations
 
 import asyncio
 import weakref as _weakref
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
@@ -289,6 +289,12 @@ class RecordRunBody(BaseModel):
     duration_ms: int | None = None
     run_id: str | None = None
 
+class IngestReportBody(BaseModel):
+    # JUnit XML text, or a pytest-json-report document (object or text).
+    report: str | dict
+    format: Literal["auto", "junit", "pytest-json"] = "auto"
+    run_id: str | None = Field(default=None, max_length=128)
+
 class MineSpecBody(BaseModel):
     test_file: str
     test_name: str
@@ -1543,6 +1549,23 @@ async def record_run(body: RecordRunBody):
     )
 
 
+# Large suites produce multi-megabyte JUnit files; cap the text we parse.
+_MAX_REPORT_CHARS = 20_000_000
+
+
+@router.post("/verification/test-reports")
+async def ingest_test_report(body: IngestReportBody):
+    if isinstance(body.report, str) and len(body.report) > _MAX_REPORT_CHARS:
+        raise HTTPException(413, "test report too large")
+    mgr = await _ensure_verification()
+    try:
+        return await mgr.ingest_report(
+            body.report, fmt=body.format, run_id=body.run_id,
+        )
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
+
+
 @router.get("/verification/flaky-tests")
 async def detect_flaky(
     min_runs: int = 5, threshold: float = 0.1, limit: int = 20,
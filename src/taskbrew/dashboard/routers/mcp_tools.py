@@ -270,7 +270,10 @@ async def mcp_ask_question(
     persisted with selected_by="agent" and the call returns
     immediately. In ``manual`` mode the call blocks indefinitely
     until either a human submits an answer via
-    ``POST /api/questions/{id}/answer`` or the task is cancelled.
+    ``POST /api/questions/{id}/answer`` or the task is cancelled --
+    unless the body carries ``wait_seconds``, in which case it returns
+    ``status="pending"`` after that long and the caller long-polls
+    ``GET /mcp/tools/ask_question/{request_id}``.
 
     Mode is read from the role's ``clarification_mode`` config.
     Enforces ``max_clarification_requests`` per (task, role); the
@@ -287,6 +290,7 @@ async def mcp_ask_question(
     options = body.get("options") or []
     preferred_answer = body.get("preferred_answer") or ""
     reasoning = body.get("reasoning") or ""
+    wait = _long_poll_seconds(body.get("wait_seconds"))
 
     for label, value in (
         ("task_id", task_id), ("group_id", group_id),
@@ -353,12 +357,54 @@ async def mcp_ask_question(
             preferred_answer=preferred_answer,
             reasoning=reasoning,
             mode=mode,
+            wait=wait,
         )
     except ValueError as exc:
         raise HTTPException(400, str(exc))
     return result
 
 
+# Upper bound for one long-poll round trip; stays well under common
+# proxy / client idle timeouts.
+_MAX_LONG_POLL_SECONDS = 60.0
+
+
+def _long_poll_seconds(value) -> float | None:
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise HTTPException(400, "wait_seconds must be a number")
+    return min(max(seconds, 0.0), _MAX_LONG_POLL_SECONDS)
+
+
+@router.get("/mcp/tools/ask_question/{question_id}")
+async def mcp_poll_question(
+    question_id: str,
+    wait: float = 25.0,
+    authorization: Optional[str] = Header(None),
+):
+    """Long-poll a manual-mode question created with ``wait_seconds``.
+
+    Returns as soon as the question is answered or cancelled, or with
+    ``status="pending"`` after *wait* seconds (capped at 60).
+    """
+    _get_token(authorization)
+    if not _orchestrator_getter:
+        raise HTTPException(503, "orchestrator not wired")
+    orch = _orchestrator_getter()
+    qmgr = getattr(orch, "agent_question_manager", None) if orch else None
+    if qmgr is None:
+        raise HTTPException(503, "agent_question_manager not configured")
+    try:
+        return await qmgr.wait_for_answer(
+            question_id, timeout=_long_poll_seconds(wait),
+        )
+    except ValueError as exc:
+        raise HTTPException(404, str(exc))
+
+
 _VALID_TASK_PRIORITIES = frozenset({"low", "medium", "high", "critical"})
 _MAX_MCP_TITLE_LEN = 500
 _MAX_MCP_DESCRIPTION_LEN = 20_000
@@ -11,6 +11,11 @@ from taskbrew.dashboard.routers._deps import get_orch
 
 router = APIRouter()
 
+_TASK_USAGE_TOTALS_SQL = (
+    "SELECT SUM(cost_usd) as cost, SUM(duration_api_ms) as duration, COUNT(*) as runs "
+    "FROM task_usage WHERE task_id = ?"
+)
+
 
 # ------------------------------------------------------------------
 # Workflow execution overview
@@ -138,11 +143,7 @@ async def pipeline_detail(group_id: str):
     # Task nodes with usage data
     nodes = []
     for t in tasks:
-        usage = await db.execute_fetchone(
-            "SELECT SUM(cost_usd) as cost, SUM(duration_api_ms) as duration, COUNT(*) as runs "
-            "FROM task_usage WHERE task_id = ?",
-            (t["id"],),
-        )
+        usage = await db.execute_fetchone(_TASK_USAGE_TOTALS_SQL, (t["id"],))
         nodes.append({
             "id": t["id"],
             "title": t["title"],
@@ -394,6 +394,7 @@ async def get_roles_settings():
                 "enabled": rc.auto_scale.enabled,
                 "scale_up_threshold": rc.auto_scale.scale_up_threshold,
                 "scale_down_idle": rc.auto_scale.scale_down_idle,
+                "target_latency": rc.auto_scale.target_latency,
             } if rc.auto_scale else None,
             "max_turns": rc.max_turns,
             "max_execution_time": rc.max_execution_time,
@@ -492,6 +493,7 @@ async def update_role_settings(role_name: str, body: UpdateRoleSettingsBody):
                 enabled=asc.get("enabled", False),
                 scale_up_threshold=asc.get("scale_up_threshold", 3),
                 scale_down_idle=asc.get("scale_down_idle", 15),
+                target_latency=asc.get("target_latency"),
             )
 
     # Validate routing after in-memory updates.  If the new settings
@@ -550,6 +552,8 @@ async def update_role_settings(role_name: str, body: UpdateRoleSettingsBody):
                     detail=f"Failed to persist role YAML: {exc}",
                 ) from exc
 
+    # Agent workers (multi-process mode) reload their roles on this.
+    await orch.event_bus.emit("role.updated", {"role": role_name})
     return {"status": "ok", "role": role_name}
 
 
@@ -683,6 +687,7 @@ async def create_role(body: CreateRoleBody):
                 detail=f"Failed to persist role YAML: {exc}",
             ) from exc
 
+    await orch.event_bus.emit("role.created", {"role": role_name})
     return {"status": "ok", "role": role_name}
 
 
@@ -774,6 +779,7 @@ async def delete_role(role_name: str):
         except asyncio.TimeoutError:
             pass
 
+    await orch.event_bus.emit("role.deleted", {"role": role_name})
     return {"status": "ok", "role": role_name}
 
 
@@ -850,6 +856,48 @@ async def mark_all_read():
     return {"status": "ok"}
 
 
+# ------------------------------------------------------------------
+# Maintenance
+# ------------------------------------------------------------------
+
+
+def _get_maintenance():
+    runner = getattr(get_orch(), "maintenance", None)
+    if runner is None:
+        raise HTTPException(503, "Maintenance runner is not running")
+    return runner
+
+
+@router.get("/api/maintenance")
+async def get_maintenance_stats():
+    """Per-job run counts, durations and last results."""
+    return _get_maintenance().stats()
+
+
+@router.post("/api/maintenance/jobs/{job_name}/run")
+async def run_maintenance_job(job_name: str):
+    """Run one maintenance job now instead of waiting for its interval."""
+    runner = _get_maintenance()
+    if job_name not in runner.job_names:
+        raise HTTPException(404, f"Unknown maintenance job: {job_name}")
+    return await runner.run_job(job_name)
+
+
+@router.get("/api/workers")
+async def get_agent_workers():
+    """Agent worker processes and event-hub traffic (multi-process mode)."""
+    orch = get_orch()
+    pool = getattr(orch, "worker_pool", None)
+    if pool is None:
+        return {"mode": "single_process", "count": 0, "workers": [], "hub": None}
+    hub = getattr(orch, "event_hub", None)
+    return {
+        "mode": "multi_process",
+        **pool.stats(),
+        "hub": hub.stats() if hub is not None else None,
+    }
+
+
 # ------------------------------------------------------------------
 # Cost Budgets
 # ------------------------------------------------------------------
@@ -859,12 +907,25 @@ async def mark_all_read():
 async def get_budgets():
     """List all cost budgets."""
     orch = get_orch()
+    cost_manager = getattr(orch, "cost_manager", None)
+    if cost_manager is not None:
+        # Flushes the in-memory ledger so the listing is current.
+        return await cost_manager.get_budgets()
     return await orch.task_board._db.execute_fetchall("SELECT * FROM cost_budgets ORDER BY scope")
 
 
 @router.post("/api/budgets")
 async def create_budget(body: CreateBudgetBody):
     orch = get_orch()
+    cost_manager = getattr(orch, "cost_manager", None)
+    if cost_manager is not None:
+        # Route through the CostManager so its in-memory ledger sees the
+        # new budget without a reload.
+        created = await cost_manager.create_budget(
+            scope=body.scope, budget_usd=body.budget_usd,
+            scope_id=body.scope_id, period=body.period,
+        )
+        return {"id": created["id"], "scope": created["scope"], "budget_usd": created["budget_usd"]}
     import uuid
     budget_id = str(uuid.uuid4())[:8]
     now = datetime.now(timezone.utc)
@@ -916,6 +977,10 @@ async def create_budget(body: CreateBudgetBody):
 @router.delete("/api/budgets/{budget_id}")
 async def delete_budget(budget_id: str):
     orch = get_orch()
+    cost_manager = getattr(orch, "cost_manager", None)
+    if cost_manager is not None:
+        await cost_manager.delete_budget(budget_id)
+        return {"status": "ok"}
     await orch.task_board._db.execute("DELETE FROM cost_budgets WHERE id = ?", (budget_id,))
     return {"status": "ok"}
 
@@ -9,9 +9,11 @@ import logging
 import re
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from starlette.responses import Response
 
 
@@ -20,6 +22,7 @@ from taskbrew.dashboard.models import (
     CancelTaskBody,
     CompleteTaskBody,
     CreateTaskBody,
+    CreateTasksBody,
     CreateTemplateBody,
     CreateWorkflowBody,
     InstantiateTemplateBody,
@@ -29,6 +32,7 @@ from taskbrew.dashboard.models import (
     UpdateTaskBody,
 )
 from taskbrew.dashboard.routers._deps import get_orch, get_orch_optional
+from taskbrew.orchestrator.tracing import get_tracer
 
 # audit 11a F#4 / F#6: shared clamps for task endpoint pagination and
 # batch operations. 500 is generous for UI pagination; 200 tasks per
@@ -39,6 +43,40 @@ MAX_BATCH_SIZE = 200
 
 logger = logging.getLogger(__name__)
 
+# Usage totals per task of a group trace; ``{placeholders}`` is one ``?``
+# per task id.
+_TRACE_USAGE_SQL = (
+    "SELECT task_id, SUM(input_tokens) AS input_tokens, "
+    "SUM(output_tokens) AS output_tokens, SUM(cost_usd) AS cost_usd, "
+    "SUM(num_turns) AS num_turns, SUM(duration_api_ms) AS duration_api_ms "
+    "FROM task_usage WHERE task_id IN ({placeholders}) "
+    "GROUP BY task_id"
+)
+
+# audit 11a F#12: cap the number of buckets returned per
+# series so a long-lived project with many distinct models
+# doesn't blow up the JSON response. 5000 is ~7 months of
+# hourly data per model -- generous but bounded.
+_MAX_TIMESERIES_ROWS = 5000
+_USAGE_TIMESERIES_SQL = (
+    "SELECT strftime(?, recorded_at) AS bucket, "
+    "  model, "
+    "  SUM(cost_usd) AS cost, "
+    "  SUM(input_tokens) AS input_tokens, "
+    "  SUM(output_tokens) AS output_tokens, "
+    "  COUNT(*) AS task_count "
+    "FROM task_usage WHERE recorded_at >= ? "
+    "GROUP BY bucket, model ORDER BY bucket "
+    f"LIMIT {_MAX_TIMESERIES_ROWS + 1}"
+)
+_TASK_TIMESERIES_SQL = (
+    "SELECT strftime(?, completed_at) AS bucket, "
+    "  status, COUNT(*) AS count "
+    "FROM tasks WHERE completed_at IS NOT NULL AND completed_at >= ? "
+    "GROUP BY bucket, status ORDER BY bucket "
+    f"LIMIT {_MAX_TIMESERIES_ROWS + 1}"
+)
+
 router = APIRouter()
 
 
@@ -79,21 +117,62 @@ async def health():
 # ------------------------------------------------------------------
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/api/board")
 async def get_board(
+    request: Request,
     group_id: str | None = None,
     assigned_to: str | None = None,
     claimed_by: str | None = None,
     task_type: str | None = None,
     priority: str | None = None,
+    since: Annotated[int | None, Query(ge=0)] = None,
+    view: Literal["full", "summary"] = "full",
 ):
+    """Tasks grouped by status, or only the changes after ``since``.
+
+    Every task mutation bumps the board version, returned in the
+    ``X-Board-Version`` header and the ``ETag``. A client sends that
+    version back as ``since`` to get ``{version, changed, deleted,
+    reset}`` (see ``TaskBoard.get_board_changes``) or revalidates with
+    ``If-None-Match`` and gets a bodiless 304 when nothing changed.
+    ``view=summary`` drops the large text columns.
+    """
     orch = get_orch()
-    return await orch.task_board.get_board(
-        group_id=group_id,
-        assigned_to=assigned_to,
-        claimed_by=claimed_by,
-        task_type=task_type,
-        priority=priority,
+    board = orch.task_board
+    filters = {
+        "group_id": group_id, "assigned_to": assigned_to,
+        "claimed_by": claimed_by, "task_type": task_type, "priority": priority,
+    }
+    summary = view == "summary"
+
+    version = await board.get_board_version()
+    etag = f'W/"board-{version}"'
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "X-Board-Version": str(version)},
+        )
+    if since is None:
+        data = await board.get_board(**filters, summary=summary)
+    else:
+        data = await board.get_board_changes(since, **filters, summary=summary)
+        # The delta is computed against its own (possibly newer) read.
+        version = data["version"]
+        etag = f'W/"board-{version}"'
+    return JSONResponse(
+        jsonable_encoder(data),
+        headers={
+            "ETag": etag,
+            "X-Board-Version": str(version),
+            "Cache-Control": "no-cache",
+        },
     )
 
 
@@ -242,12 +321,7 @@ async def get_group_trace(group_id: str):
     if task_ids:
         placeholders = ",".join("?" * len(task_ids))
         usage_rows = await db.execute_fetchall(
-            "SELECT task_id, SUM(input_tokens) AS input_tokens, "
-            "SUM(output_tokens) AS output_tokens, SUM(cost_usd) AS cost_usd, "
-            "SUM(num_turns) AS num_turns, SUM(duration_api_ms) AS duration_api_ms "
-            f"FROM task_usage WHERE task_id IN ({placeholders}) "
-            "GROUP BY task_id",
-            tuple(task_ids),
+            _TRACE_USAGE_SQL.format(placeholders=placeholders), tuple(task_ids),
         )
         usage_by_task = {r["task_id"]: r for r in usage_rows}
 
@@ -551,6 +625,33 @@ async def create_task(body: CreateTaskBody):
     return task
 
 
+@router.post("/api/tasks/bulk")
+async def create_tasks_bulk(body: CreateTasksBody):
+    """Create several tasks in one request (used by the ``create_tasks`` MCP tool).
+
+    Each entry goes through exactly the same validation as
+    ``POST /api/tasks`` and is created in order; a rejected entry is
+    reported in place and does not stop the rest of the batch.
+    """
+    if len(body.tasks) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(body.tasks)} tasks (max {MAX_BATCH_SIZE})",
+        )
+    results = []
+    for item in body.tasks:
+        try:
+            task = await create_task(item)
+        except HTTPException as exc:
+            results.append({"error": exc.detail, "status_code": exc.status_code})
+        else:
+            results.append(task)
+    return {
+        "created": sum(1 for r in results if "error" not in r),
+        "results": results,
+    }
+
+
 # ------------------------------------------------------------------
 # Task Search
 # ------------------------------------------------------------------
@@ -1093,34 +1194,15 @@ async def get_metrics_timeseries(
     else:
         fmt = "%Y-%m-%dT00:00:00"
 
-    # audit 11a F#12: cap the number of buckets returned per
-    # series so a long-lived project with many distinct models
-    # doesn't blow up the JSON response. 5000 is ~7 months of
-    # hourly data per model -- generous but bounded.
-    _MAX_TIMESERIES_ROWS = 5000
     usage_rows = await orch.task_board._db.execute_fetchall(
-        "SELECT strftime(?, recorded_at) AS bucket, "
-        "  model, "
-        "  SUM(cost_usd) AS cost, "
-        "  SUM(input_tokens) AS input_tokens, "
-        "  SUM(output_tokens) AS output_tokens, "
-        "  COUNT(*) AS task_count "
-        "FROM task_usage WHERE recorded_at >= ? "
-        "GROUP BY bucket, model ORDER BY bucket "
-        f"LIMIT {_MAX_TIMESERIES_ROWS + 1}",
-        (fmt, since),
+        _USAGE_TIMESERIES_SQL, (fmt, since),
     )
     usage_truncated = len(usage_rows) > _MAX_TIMESERIES_ROWS
     if usage_truncated:
         usage_rows = usage_rows[:_MAX_TIMESERIES_ROWS]
 
     task_rows = await orch.task_board._db.execute_fetchall(
-        "SELECT strftime(?, completed_at) AS bucket, "
-        "  status, COUNT(*) AS count "
-        "FROM tasks WHERE completed_at IS NOT NULL AND completed_at >= ? "
-        "GROUP BY bucket, status ORDER BY bucket "
-        f"LIMIT {_MAX_TIMESERIES_ROWS + 1}",
-        (fmt, since),
+        _TASK_TIMESERIES_SQL, (fmt, since),
     )
     tasks_truncated = len(task_rows) > _MAX_TIMESERIES_ROWS
     if tasks_truncated:
@@ -1155,25 +1237,19 @@ async def get_metrics_roles():
         "  SUM(CASE WHEN status='failed' THEN 1 ELSE 0 END) AS failed "
         "FROM tasks GROUP BY assigned_to ORDER BY total DESC"
     )
-    # audit 11a F#13: SUBSTR + INSTR on agent_ids that have no '-'
-    # (e.g. a legacy agent_id stored as bare ``"pm"``) returns
-    # INSTR()=0, which means SUBSTR(..., 1, -1) = '' -- every such
-    # row rolls up into an empty-string role bucket that the UI
-    # rendered as a mystery row. Filter out empty roles and fall
-    # back to the full agent_id when no '-' separator is present.
+    # audit 11a F#13: legacy agent_ids with no '-' used to roll up into
+    # an empty-string role bucket. The role is now stored per usage row
+    # (migration 36, back-filled from the task's assignee), so group on
+    # it directly and keep filtering out rows without one.
     role_costs = await orch.task_board._db.execute_fetchall(
-        "SELECT "
-        "  CASE WHEN INSTR(agent_id, '-') > 0 "
-        "       THEN SUBSTR(agent_id, 1, INSTR(agent_id, '-') - 1) "
-        "       ELSE agent_id "
-        "  END AS role, "
+        "SELECT role, "
         "  SUM(cost_usd) AS cost, "
         "  SUM(input_tokens) AS input_tokens, "
         "  SUM(output_tokens) AS output_tokens, "
         "  AVG(duration_api_ms) AS avg_duration_ms, "
         "  SUM(num_turns) AS total_turns "
         "FROM task_usage "
-        "WHERE agent_id IS NOT NULL AND agent_id != '' "
+        "WHERE role IS NOT NULL AND role != '' "
         "GROUP BY role ORDER BY cost DESC"
     )
     return {"task_stats": role_tasks, "cost_stats": role_costs}
@@ -1212,6 +1288,21 @@ async def get_metrics_failures(limit: int = 20):
     return rows
 
 
+@router.get("/api/metrics/prometheus")
+async def get_metrics_prometheus():
+    """Hot-path stage and SQL statement histograms, Prometheus text format."""
+    return Response(
+        content=get_tracer().render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/api/metrics/hotpaths")
+async def get_metrics_hotpaths(top: int = Query(20, ge=1, le=256)):
+    """Per-stage timings and the slowest statement fingerprints as JSON."""
+    return get_tracer().snapshot(top=top)
+
+
 # ------------------------------------------------------------------
 # Export
 # ------------------------------------------------------------------
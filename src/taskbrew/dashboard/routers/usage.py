@@ -3,6 +3,7 @@
 Reads:
   - ~/.claude/stats-cache.json          → weekly/all-time aggregated stats
   - ~/.claude/projects/*/SESSION.jsonl  → per-message token usage for live sessions
+                                          (tailed by session_usage.SessionUsageAggregator)
   - /api/oauth/profile (Anthropic)      → plan type, rate tier, extra usage flag
   - Interactive `claude /usage` command  → actual plan usage percentages & reset times
 """
@@ -22,6 +23,9 @@ import httpx
 from fastapi import APIRouter, Depends
 from starlette.requests import Request
 
+from taskbrew.dashboard.quota_probe import QuotaProbe
+from taskbrew.dashboard.session_usage import SessionUsageAggregator
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -96,8 +100,6 @@ def _read_stats() -> dict:
 # /usage scraper — launches interactive Claude Code to get plan limits
 # ------------------------------------------------------------------
 
-_usage_cache: dict | None = None
-_usage_cache_ts: float = 0
 _USAGE_CACHE_TTL = 120  # seconds
 
 
@@ -235,43 +237,17 @@ def _run_usage_cli_sync() -> dict | None:
         return None
 
 
-async def _fetch_usage_via_cli() -> dict | None:
-    """Run interactive Claude Code with /usage command and parse output.
-
-    Cached for 2 minutes to avoid spawning too many processes.
-    """
-    global _usage_cache, _usage_cache_ts
-
-    now = _time.time()
-    if _usage_cache and now - _usage_cache_ts < _USAGE_CACHE_TTL:
-        return _usage_cache
-
-    try:
-        # Serialise CLI spawns across concurrent callers (audit 11a F#17).
-        async with _cli_spawn_lock:
-            # Re-check cache under the lock in case another caller just
-            # populated it while we were queued.
-            if _usage_cache and _time.time() - _usage_cache_ts < _USAGE_CACHE_TTL:
-                return _usage_cache
-            loop = asyncio.get_event_loop()
-            result = await asyncio.wait_for(
-                loop.run_in_executor(None, _run_usage_cli_sync),
-                timeout=50,
-            )
+claude_quota = QuotaProbe(
+    "claude", _run_usage_cli_sync, _cli_spawn_lock, max_age=_USAGE_CACHE_TTL,
+)
 
-        if result:
-            _usage_cache = result
-            _usage_cache_ts = now
-            return result
 
-        return _usage_cache
+async def _fetch_usage_via_cli() -> dict | None:
+    """Return the last Claude /usage result without waiting for the CLI.
 
-    except asyncio.TimeoutError:
-        logger.warning("Claude /usage timed out")
-        return _usage_cache
-    except Exception as e:
-        logger.error("Failed to run Claude /usage: %s", e)
-        return _usage_cache
+    A stale result starts a background refresh (see QuotaProbe).
+    """
+    return claude_quota.get()
 
 
 # ------------------------------------------------------------------
@@ -294,10 +270,6 @@ GEMINI_MODEL_COLORS = {
     "gemini-2.0-flash": "#137333",
 }
 
-_gemini_usage_cache: dict | None = None
-_gemini_usage_cache_ts: float = 0
-
-
 def _parse_gemini_usage_text(text: str) -> dict:
     """Parse the cleaned Gemini CLI /usage output into structured data.
 
@@ -421,41 +393,14 @@ def _run_gemini_usage_cli_sync() -> dict | None:
         return None
 
 
-async def _fetch_gemini_usage_via_cli() -> dict | None:
-    """Run interactive Gemini CLI with /usage and parse output.
-
-    Cached for 2 minutes.
-    """
-    global _gemini_usage_cache, _gemini_usage_cache_ts
-
-    now = _time.time()
-    if _gemini_usage_cache and now - _gemini_usage_cache_ts < _USAGE_CACHE_TTL:
-        return _gemini_usage_cache
-
-    try:
-        async with _cli_spawn_lock:
-            # Re-check under lock; another caller may have populated it.
-            if _gemini_usage_cache and _time.time() - _gemini_usage_cache_ts < _USAGE_CACHE_TTL:
-                return _gemini_usage_cache
-            loop = asyncio.get_event_loop()
-            result = await asyncio.wait_for(
-                loop.run_in_executor(None, _run_gemini_usage_cli_sync),
-                timeout=50,
-            )
-
-        if result:
-            _gemini_usage_cache = result
-            _gemini_usage_cache_ts = now
-            return result
+gemini_quota = QuotaProbe(
+    "gemini", _run_gemini_usage_cli_sync, _cli_spawn_lock, max_age=_USAGE_CACHE_TTL,
+)
 
-        return _gemini_usage_cache
 
-    except asyncio.TimeoutError:
-        logger.warning("Gemini /usage timed out")
-        return _gemini_usage_cache
-    except Exception as e:
-        logger.error("Failed to run Gemini /usage: %s", e)
-        return _gemini_usage_cache
+async def _fetch_gemini_usage_via_cli() -> dict | None:
+    """Return the last Gemini /usage result without waiting for the CLI."""
+    return gemini_quota.get()
 
 
 @router.get(
@@ -465,15 +410,27 @@ async def _fetch_gemini_usage_via_cli() -> dict | None:
 async def get_gemini_usage_summary():
     """Return Gemini CLI usage data for the dashboard.
 
-    Admin-only: this endpoint spawns the Gemini CLI via pexpect (50s).
+    Admin-only: a stale result makes the background probe spawn the
+    Gemini CLI via pexpect. The response never waits for it;
+    ``status`` says how old ``usage`` is.
     """
     usage = await _fetch_gemini_usage_via_cli()
     return {
         "available": usage is not None and bool(usage.get("models")),
         "usage": usage,
+        "status": gemini_quota.status(),
     }
 
 
+@router.get(
+    "/api/usage/probes",
+    dependencies=[Depends(_verify_admin_dep)],
+)
+async def get_quota_probe_metrics():
+    """Probe counts, failures and durations for the CLI quota probes."""
+    return {"claude": claude_quota.metrics(), "gemini": gemini_quota.metrics()}
+
+
 _profile_cache: dict = {}
 _profile_ts: float = 0
 
@@ -515,74 +472,9 @@ def _week_range(ref: datetime | None = None) -> tuple[str, str]:
     return monday.strftime("%Y-%m-%d"), sunday.strftime("%Y-%m-%d")
 
 
-def _find_active_sessions() -> list[Path]:
-    """Find the most recently modified JSONL session files (likely active)."""
-    if not PROJECTS_DIR.exists():
-        return []
-    jsonl_files: list[tuple[float, Path]] = []
-    for proj_dir in PROJECTS_DIR.iterdir():
-        if not proj_dir.is_dir():
-            continue
-        for f in proj_dir.glob("*.jsonl"):
-            jsonl_files.append((f.stat().st_mtime, f))
-    jsonl_files.sort(key=lambda x: x[0], reverse=True)
-    return [f for _, f in jsonl_files[:5]]
-
-
-def _parse_session(path: Path) -> dict:
-    """Parse a JSONL session file for token usage by model."""
-    models: dict[str, dict] = {}
-    first_ts = last_ts = None
-    msg_count = 0
-
-    try:
-        with open(path) as f:
-            for line in f:
-                try:
-                    d = json.loads(line)
-                except (json.JSONDecodeError, ValueError):
-                    continue
-
-                ts = d.get("timestamp")
-                if ts:
-                    if first_ts is None:
-                        first_ts = ts
-                    last_ts = ts
-
-                if d.get("type") != "assistant" or "message" not in d:
-                    continue
-
-                msg_count += 1
-                msg = d["message"]
-                usage = msg.get("usage", {})
-                model = msg.get("model", "unknown")
-                if model == "<synthetic>":
-                    continue
-
-                if model not in models:
-                    models[model] = {
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "cache_read": 0,
-                        "cache_create": 0,
-                        "messages": 0,
-                    }
-                m = models[model]
-                m["input_tokens"] += usage.get("input_tokens", 0)
-                m["output_tokens"] += usage.get("output_tokens", 0)
-                m["cache_read"] += usage.get("cache_read_input_tokens", 0)
-                m["cache_create"] += usage.get("cache_creation_input_tokens", 0)
-                m["messages"] += 1
-    except OSError:
-        pass
-
-    return {
-        "file": path.name,
-        "first_ts": first_ts,
-        "last_ts": last_ts,
-        "messages": msg_count,
-        "models": models,
-    }
+# Session logs are tailed incrementally; the summary endpoint serves the
+# aggregator's counters instead of re-parsing every JSONL on each call.
+session_usage = SessionUsageAggregator()
 
 
 # ------------------------------------------------------------------
@@ -638,9 +530,9 @@ async def get_usage_summary():
 
     # ---- Current session (most recently modified JSONL) ----
     session_data = None
-    active = _find_active_sessions()
-    if active:
-        parsed = _parse_session(active[0])
+    await session_usage.refresh_async(PROJECTS_DIR)
+    parsed = session_usage.latest()
+    if parsed:
         total_out = sum(m["output_tokens"] for m in parsed["models"].values())
         total_in = sum(m["input_tokens"] for m in parsed["models"].values())
         total_cache = sum(
@@ -727,6 +619,7 @@ async def get_usage_summary():
 
     # ---- Plan limits from /usage CLI ----
     plan_limits = await _fetch_usage_via_cli()
+    plan_limits_status = claude_quota.status()
 
     return {
         "available": bool(stats) or session_data is not None,
@@ -734,6 +627,7 @@ async def get_usage_summary():
         "week": week_data,
         "plan": plan_data,
         "plan_limits": plan_limits,
+        "plan_limits_status": plan_limits_status,
         "today": today_activity,
         "hour_window": _hour_window_info(),
         "stats_last_computed": stats.get("lastComputedDate") if stats else None,
@@ -155,7 +155,7 @@ def register_chat_routes(app, chat_manager):
     These are registered directly on the app because they depend on
     the chat_manager being conditionally available.
     """
-    from fastapi import HTTPException
+    from fastapi import HTTPException, Query
     from taskbrew.agents.roles import get_agent_config
     from taskbrew.dashboard.routers._deps import get_orch_optional
 
@@ -167,17 +167,30 @@ def register_chat_routes(app, chat_manager):
                 "agent_name": s.agent_name,
                 "is_connected": s.is_connected,
                 "is_responding": s.is_responding,
-                "message_count": len(s.history),
+                "suspended": s.suspended,
+                "message_count": max(s.message_count, len(s.history)),
             }
             for name, s in chat_manager.sessions.items()
         }
 
     @app.get("/api/chat/{agent_name}/history")
-    async def get_chat_history(agent_name: str):
-        history = chat_manager.get_history(agent_name)
+    async def get_chat_history(
+        agent_name: str,
+        before: int | None = Query(None, ge=1),
+        limit: int = Query(50, ge=1, le=500),
+    ):
+        """One page of chat history, oldest first.
+
+        Pass the smallest ``seq`` of a page as ``before`` to fetch the
+        page preceding it.
+        """
+        history = await chat_manager.get_history_page(agent_name, before=before, limit=limit)
         if history is None:
             raise HTTPException(status_code=404, detail=f"No chat session for '{agent_name}'")
-        return [{"id": m.id, "role": m.role, "content": m.content, "timestamp": m.timestamp} for m in history]
+        return [
+            {"id": m.id, "seq": m.seq, "role": m.role, "content": m.content, "timestamp": m.timestamp}
+            for m in history
+        ]
 
     @app.delete("/api/chat/{agent_name}")
     async def delete_chat_session(agent_name: str):
@@ -187,6 +200,12 @@ def register_chat_routes(app, chat_manager):
         await chat_manager.stop_session(agent_name)
         return {"agent": agent_name, "status": "disconnected"}
 
+    @app.delete("/api/chat/{agent_name}/history")
+    async def clear_chat_history(agent_name: str):
+        """Forget the conversation: messages, summary and SDK session."""
+        deleted = await chat_manager.clear_history(agent_name)
+        return {"agent": agent_name, "status": "cleared", "deleted": deleted}
+
     @app.websocket("/ws/chat/{agent_name}")
     async def chat_websocket(ws: WebSocket, agent_name: str):
         """Chat channel for a single agent instance.
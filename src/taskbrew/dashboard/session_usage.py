@@ -0,0 +1,298 @@
+"""Incremental token-usage aggregation over Claude Code session logs.
+
+``~/.claude/projects/*/<session>.jsonl`` files grow to hundreds of MB.
+:class:`SessionUsageAggregator` keeps per-file counters in memory and,
+on each refresh, reads only the bytes appended since the previous one.
+A file's position is keyed by inode and size: a different inode (the
+file was replaced) or a size below the stored offset (it was truncated)
+restarts that file from zero.
+
+Refreshes run in a worker thread. Each one ends by publishing an
+immutable summary, which is all the loop-side readers touch, so a
+refresh in progress never changes a dict a reader is iterating.
+
+Directory listings are cached too. A project directory is re-listed
+only when its mtime changes (a session file was created or removed).
+Between full rescans only the tracked, most recent files are
+re-stat'ed. The full rescan catches appends to older sessions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Re-stat every session file this often; in between only the tracked
+# most-recent files and re-listed directories are checked.
+_FULL_SCAN_INTERVAL_S = 60.0
+# Bytes read per call while tailing a log.
+_READ_CHUNK = 1 << 20
+
+
+@dataclass
+class _FileState:
+    inode: int
+    offset: int = 0
+    first_ts: str | None = None
+    last_ts: str | None = None
+    messages: int = 0
+    models: dict[str, dict] = field(default_factory=dict)
+
+    def apply(self, record: dict) -> None:
+        ts = record.get("timestamp")
+        if ts:
+            if self.first_ts is None:
+                self.first_ts = ts
+            self.last_ts = ts
+
+        if record.get("type") != "assistant" or "message" not in record:
+            return
+
+        self.messages += 1
+        msg = record["message"]
+        if not isinstance(msg, dict):
+            return
+        usage = msg.get("usage") or {}
+        model = msg.get("model", "unknown")
+        if model == "<synthetic>":
+            return
+
+        m = self.models.get(model)
+        if m is None:
+            m = self.models[model] = {
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cache_read": 0,
+                "cache_create": 0,
+                "messages": 0,
+            }
+        m["input_tokens"] += usage.get("input_tokens", 0)
+        m["output_tokens"] += usage.get("output_tokens", 0)
+        m["cache_read"] += usage.get("cache_read_input_tokens", 0)
+        m["cache_create"] += usage.get("cache_creation_input_tokens", 0)
+        m["messages"] += 1
+
+
+class SessionUsageAggregator:
+    """Tail session JSONL files and keep per-model token counters.
+
+    Parameters
+    ----------
+    max_files:
+        How many of the most recently modified session files are tailed.
+        Older files are dropped from memory.
+    min_interval:
+        :meth:`refresh_async` skips the refresh when the previous one for
+        the same root is younger than this many seconds.
+    """
+
+    def __init__(self, *, max_files: int = 5, min_interval: float = 2.0) -> None:
+        self.max_files = max_files
+        self.min_interval = min_interval
+        self._root: Path | None = None
+        self._dir_mtimes: dict[Path, int] = {}
+        self._mtimes: dict[Path, float] = {}  # every known session file
+        self._states: dict[Path, _FileState] = {}  # tailed files only
+        self._active: list[Path] = []
+        # Built at the end of refresh(); readers never see _states.
+        self._snapshot: list[dict] = []
+        self._last_refresh = 0.0
+        self._last_full_scan = 0.0
+        self._lock: asyncio.Lock | None = None
+        self.bytes_read = 0
+
+    def _reset(self, root: Path) -> None:
+        self._root = root
+        self._dir_mtimes.clear()
+        self._mtimes.clear()
+        self._states.clear()
+        self._active = []
+        self._snapshot = []
+        self._last_refresh = 0.0
+        self._last_full_scan = 0.0
+
+    # ------------------------------------------------------------------
+    # Discovery
+    # ------------------------------------------------------------------
+
+    def _scan(self, root: Path, full: bool) -> None:
+        try:
+            proj_dirs = [p for p in root.iterdir() if p.is_dir()]
+        except OSError:
+            self._dir_mtimes.clear()
+            self._mtimes.clear()
+            return
+        seen_dirs = set(proj_dirs)
+        for gone in [d for d in self._dir_mtimes if d not in seen_dirs]:
+            del self._dir_mtimes[gone]
+            for f in [f for f in self._mtimes if f.parent == gone]:
+                del self._mtimes[f]
+
+        for proj_dir in proj_dirs:
+            try:
+                dir_mtime = proj_dir.stat().st_mtime_ns
+            except OSError:
+                continue
+            if not full and self._dir_mtimes.get(proj_dir) == dir_mtime:
+                continue
+            self._dir_mtimes[proj_dir] = dir_mtime
+            for f in [f for f in self._mtimes if f.parent == proj_dir]:
+                del self._mtimes[f]
+            for f in proj_dir.glob("*.jsonl"):
+                try:
+                    self._mtimes[f] = f.stat().st_mtime
+                except OSError:
+                    continue
+
+        # Appends do not touch the directory, so re-stat tracked files.
+        for f in list(self._states):
+            try:
+                self._mtimes[f] = f.stat().st_mtime
+            except OSError:
+                self._mtimes.pop(f, None)
+
+    # ------------------------------------------------------------------
+    # Tailing
+    # ------------------------------------------------------------------
+
+    def _tail(self, path: Path) -> None:
+        try:
+            st = path.stat()
+        except OSError:
+            self._states.pop(path, None)
+            return
+        state = self._states.get(path)
+        if state is None or state.inode != st.st_ino or st.st_size < state.offset:
+            state = _FileState(inode=st.st_ino)
+            self._states[path] = state
+        if st.st_size == state.offset:
+            return
+        # Read in bounded chunks so the first pass over a large log does
+        # not hold all of it in memory; a partial last line carries over.
+        pending = b""
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(state.offset)
+                remaining = st.st_size - state.offset
+                while remaining > 0:
+                    chunk = fh.read(min(_READ_CHUNK, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    self.bytes_read += len(chunk)
+                    data = pending + chunk
+                    cut = data.rfind(b"\n") + 1
+                    for line in data[:cut].splitlines():
+                        self._apply_line(state, line)
+                    state.offset += cut
+                    pending = data[cut:]
+        except OSError:
+            return
+
+        # A last line without a newline is only consumed once it parses;
+        # otherwise the writer is mid-line and it is read next time.
+        if pending.strip():
+            try:
+                record = json.loads(pending)
+            except (json.JSONDecodeError, ValueError):
+                return
+            if isinstance(record, dict):
+                state.apply(record)
+                state.offset += len(pending)
+        else:
+            state.offset += len(pending)
+
+    @staticmethod
+    def _apply_line(state: _FileState, line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, ValueError):
+            return
+        if isinstance(record, dict):
+            state.apply(record)
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, root: Path) -> None:
+        """Bring the counters for *root* up to date (blocking I/O)."""
+        if root != self._root:
+            self._reset(root)
+        now = time.monotonic()
+        full = now - self._last_full_scan >= _FULL_SCAN_INTERVAL_S
+        self._scan(root, full)
+        if full:
+            self._last_full_scan = now
+
+        ranked = sorted(self._mtimes.items(), key=lambda kv: kv[1], reverse=True)
+        self._active = [f for f, _ in ranked[: self.max_files]]
+        for f in [f for f in self._states if f not in self._active]:
+            del self._states[f]
+        for f in self._active:
+            self._tail(f)
+        self._snapshot = self._summarize()
+        self._last_refresh = time.monotonic()
+
+    async def refresh_async(self, root: Path, *, force: bool = False) -> None:
+        """Refresh in a worker thread; concurrent callers share one run."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            fresh = time.monotonic() - self._last_refresh < self.min_interval
+            if root == self._root and fresh and not force:
+                return
+            await asyncio.to_thread(self.refresh, root)
+
+    async def run(self, root_getter, interval: float = 10.0) -> None:
+        """Refresh forever in the background; ``root_getter()`` names the root."""
+        while True:
+            try:
+                await self.refresh_async(root_getter(), force=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Session usage refresh failed", exc_info=True)
+            await asyncio.sleep(interval)
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def _summarize(self) -> list[dict]:
+        out = []
+        for f in self._active:
+            state = self._states.get(f)
+            if state is None:
+                continue
+            out.append({
+                "file": f.name,
+                "first_ts": state.first_ts,
+                "last_ts": state.last_ts,
+                "messages": state.messages,
+                "models": {k: dict(v) for k, v in state.models.items()},
+            })
+        return out
+
+    def sessions(self) -> list[dict]:
+        """Return the tailed sessions, most recently modified first.
+
+        Reads the summary published by the last completed refresh.
+        """
+        return [
+            {**s, "models": {k: dict(v) for k, v in s["models"].items()}}
+            for s in self._snapshot
+        ]
+
+    def latest(self) -> dict | None:
+        """Return the most recently modified session, or None."""
+        sessions = self.sessions()
+        return sessions[0] if sessions else None
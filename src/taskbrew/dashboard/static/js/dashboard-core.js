@@ -430,11 +430,50 @@ async function submitGoal() {
 // ================================================================
 // Data Fetching
 // ================================================================
+// Local copy of the board, kept current with /api/board?since=<version>
+// so a refresh only transfers the tasks that changed.
+let boardCache = { key: null, version: null, tasks: new Map() };
+
+function applyBoardResponse(data, version) {
+    if (Array.isArray(data.changed)) {
+        if (data.reset) boardCache.tasks.clear();
+        for (const id of data.deleted || []) boardCache.tasks.delete(id);
+        for (const t of data.changed) boardCache.tasks.set(t.id, t);
+        boardCache.version = data.version;
+        return;
+    }
+    boardCache.tasks.clear();
+    for (const tasks of Object.values(data)) {
+        for (const t of tasks) boardCache.tasks.set(t.id, t);
+    }
+    boardCache.version = version;
+}
+
+function groupCachedBoard() {
+    const data = {};
+    const tasks = [...boardCache.tasks.values()].sort((a, b) =>
+        (a.created_at || '').localeCompare(b.created_at || ''));
+    for (const t of tasks) {
+        (data[t.status] = data[t.status] || []).push(t);
+    }
+    return data;
+}
+
 async function refreshBoard() {
     try {
         const params = new URLSearchParams(currentFilters);
+        const key = params.toString();
+        if (boardCache.key !== key) {
+            boardCache = { key: key, version: null, tasks: new Map() };
+        }
+        if (boardCache.version !== null) params.set('since', boardCache.version);
         const resp = await fetch('/api/board?' + params.toString());
-        const data = await resp.json();
+        if (resp.status !== 304) {
+            if (!resp.ok) throw new Error('HTTP ' + resp.status);
+            const version = parseInt(resp.headers.get('X-Board-Version'), 10);
+            applyBoardResponse(await resp.json(), isNaN(version) ? null : version);
+        }
+        const data = groupCachedBoard();
 
         // Flatten all tasks for list view and stats
         allTasks = [];
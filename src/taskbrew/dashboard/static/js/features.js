@@ -149,14 +149,15 @@ function fetchMonAgentStatus() {
             if (!r.ok) throw new Error('HTTP ' + r.status);
             return r.json();
         }).catch(function() { return []; }),
-        fetch('/api/board').then(function(r) {
-            if (r.status === 503 || r.status === 404) return [];
+        // Only in-progress tasks matter here, in the compact projection.
+        fetch('/api/board?view=summary').then(function(r) {
+            if (r.status === 503 || r.status === 404) return {};
             if (!r.ok) throw new Error('HTTP ' + r.status);
             return r.json();
-        }).catch(function() { return []; })
+        }).catch(function() { return {}; })
     ]).then(function(results) {
         var agents = Array.isArray(results[0]) ? results[0] : (results[0].agents || []);
-        var tasks = Array.isArray(results[1]) ? results[1] : (results[1].tasks || []);
+        var tasks = results[1].in_progress || [];
         if (!agents.length) {
             container.innerHTML = '<div class="intel-empty">No agents found</div>';
             return;
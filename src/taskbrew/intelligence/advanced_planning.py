@@ -2,15 +2,22 @@
 
 from __future__ import annotations
 
+import heapq
 import json
 import logging
 import re
 import uuid
 from collections import Counter
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
+# Fallback duration (hours) when no estimate or history exists for a task.
+_DEFAULT_TASK_HOURS = 1.0
+
+# Slack below this many hours counts as zero (floating-point noise).
+_SLACK_EPSILON = 1e-9
+
 
 def _utcnow() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -20,6 +27,119 @@ def _new_id() -> str:
     return uuid.uuid4().hex[:12]
 
 
+class _ScheduleGraph:
+    """In-memory dependency DAG for one group.
+
+    Levels come from Kahn's algorithm; timings from a critical-path
+    (CPM) forward/backward pass weighted by per-task duration estimates.
+    Both passes are O(V + E), so a schedule can be recomputed on every
+    task completion without touching the database.
+    """
+
+    def __init__(
+        self,
+        group_id: str,
+        tasks: list[dict],
+        dep_map: dict[str, list[str]],
+        durations: dict[str, float],
+    ) -> None:
+        self.group_id = group_id
+        self.tasks = {t["id"]: t for t in tasks}
+        self.dep_map = dep_map
+        self.durations = durations
+        self.successors: dict[str, list[str]] = {tid: [] for tid in dep_map}
+        for tid, deps in dep_map.items():
+            for dep in deps:
+                self.successors[dep].append(tid)
+
+        self.order: list[str] = []
+        self.levels: dict[str, int] = {}
+        self.earliest_start: dict[str, float] = {}
+        self.slack: dict[str, float] = {}
+        self.makespan = 0.0
+        self._toposort()
+        self.compute_timings()
+
+    def _toposort(self) -> None:
+        """Assign each task the length of its longest dependency chain."""
+        in_degree = {tid: len(deps) for tid, deps in self.dep_map.items()}
+        frontier = sorted(tid for tid, n in in_degree.items() if n == 0)
+        level = 0
+        while frontier:
+            next_frontier: list[str] = []
+            for tid in frontier:
+                self.levels[tid] = level
+                self.order.append(tid)
+                for succ in self.successors[tid]:
+                    in_degree[succ] -= 1
+                    if in_degree[succ] == 0:
+                        next_frontier.append(succ)
+            frontier = sorted(next_frontier)
+            level += 1
+
+        if len(self.order) < len(self.dep_map):
+            # Everything left with unmet in-degree is on, or downstream
+            # of, a cycle.
+            remaining = sorted(tid for tid, n in in_degree.items() if n > 0)
+            logger.warning(
+                "Dependency cycle detected involving tasks: %s", remaining,
+            )
+            raise ValueError(
+                f"Dependency cycle in group {self.group_id!r}: {remaining}"
+            )
+
+    def duration(self, task_id: str) -> float:
+        """Remaining hours for *task_id* (zero once completed)."""
+        if self.tasks[task_id].get("status") == "completed":
+            return 0.0
+        return self.durations.get(task_id, _DEFAULT_TASK_HOURS)
+
+    def compute_timings(self) -> None:
+        """Recompute earliest start, slack and makespan from current state."""
+        earliest_finish: dict[str, float] = {}
+        for tid in self.order:
+            start = max(
+                (earliest_finish[d] for d in self.dep_map[tid]), default=0.0,
+            )
+            self.earliest_start[tid] = start
+            earliest_finish[tid] = start + self.duration(tid)
+        self.makespan = max(earliest_finish.values(), default=0.0)
+
+        latest_finish: dict[str, float] = {}
+        for tid in reversed(self.order):
+            latest_finish[tid] = min(
+                (latest_finish[s] - self.duration(s) for s in self.successors[tid]),
+                default=self.makespan,
+            )
+            self.slack[tid] = latest_finish[tid] - earliest_finish[tid]
+
+    def is_critical(self, task_id: str) -> bool:
+        return self.slack[task_id] <= _SLACK_EPSILON
+
+    def critical_path(self) -> list[str]:
+        """Return one longest chain of zero-slack tasks, first to last."""
+        path: list[str] = []
+        current = None
+        for tid in reversed(self.order):
+            finish = self.earliest_start[tid] + self.duration(tid)
+            if self.is_critical(tid) and abs(finish - self.makespan) <= _SLACK_EPSILON:
+                current = tid
+                break
+        while current is not None:
+            path.append(current)
+            start = self.earliest_start[current]
+            current = next(
+                (
+                    d for d in self.dep_map[current]
+                    if self.is_critical(d)
+                    and abs(self.earliest_start[d] + self.duration(d) - start) <= _SLACK_EPSILON
+                ),
+                None,
+            )
+        path.reverse()
+        return path
+
+
 class AdvancedPlanningManager:
     """Advanced planning and scheduling for the AI team pipeline."""
 
@@ -35,12 +155,19 @@ class AdvancedPlanningManager:
         db,
         task_board=None,
         *,
+        event_bus=None,
         confidence_low_multiplier: float | None = None,
         confidence_high_multiplier: float | None = None,
         scope_creep_growth_threshold_pct: float | None = None,
     ) -> None:
         self._db = db
         self._task_board = task_board
+        # Cached dependency graphs (group_id -> graph) so completions and
+        # critical-path reads don't re-read the whole group.
+        self._graphs: dict[str, _ScheduleGraph] = {}
+        self._task_groups: dict[str, str] = {}
+        if event_bus is not None:
+            event_bus.subscribe("task.completed", self._on_task_completed)
         if confidence_low_multiplier is not None:
             self.CONFIDENCE_LOW_MULTIPLIER = confidence_low_multiplier
         if confidence_high_multiplier is not None:
@@ -60,7 +187,11 @@ class AdvancedPlanningManager:
                 task_id TEXT NOT NULL,
                 depends_on TEXT,
                 scheduled_order INTEGER NOT NULL DEFAULT 0,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                estimated_hours REAL,
+                earliest_start_hours REAL,
+                slack_hours REAL,
+                is_critical INTEGER NOT NULL DEFAULT 0
             );
             CREATE TABLE IF NOT EXISTS resource_snapshots (
                 id TEXT PRIMARY KEY,
@@ -114,12 +245,129 @@ class AdvancedPlanningManager:
     # Feature 45: Dependency-Aware Scheduling
     # ------------------------------------------------------------------
 
+    async def _fetchall_optional(self, sql: str, params: tuple = ()) -> list[dict]:
+        """Run a query against a table another manager may not have created yet."""
+        try:
+            return await self._db.execute_fetchall(sql, params)
+        except Exception as exc:  # narrowed below
+            if "no such table" in str(exc).lower():
+                return []
+            raise
+
+    async def _load_group_tasks(self, group_id: str) -> tuple[list[dict], dict[str, list[str]]]:
+        """Return a group's tasks and their in-group dependency lists.
+
+        Dependencies are the union of ``task_dependencies`` rows and the
+        legacy comma-separated ``tasks.depends_on`` column (when present).
+        """
+        try:
+            tasks = await self._db.execute_fetchall(
+                "SELECT id, title, status, task_type, depends_on FROM tasks WHERE group_id = ?",
+                (group_id,),
+            )
+        except Exception as exc:  # narrowed below
+            if "no such column" not in str(exc).lower():
+                raise
+            tasks = await self._db.execute_fetchall(
+                "SELECT id, title, status, task_type FROM tasks WHERE group_id = ?",
+                (group_id,),
+            )
+        if not tasks:
+            return [], {}
+
+        task_ids = {t["id"] for t in tasks}
+        dep_map: dict[str, dict[str, None]] = {tid: {} for tid in task_ids}
+        for t in tasks:
+            for d in (t.get("depends_on") or "").split(","):
+                d = d.strip()
+                if d and d in task_ids:
+                    dep_map[t["id"]][d] = None
+
+        edges = await self._db.execute_fetchall(
+            "SELECT d.task_id, d.blocked_by FROM task_dependencies d "
+            "JOIN tasks t ON t.id = d.task_id WHERE t.group_id = ?",
+            (group_id,),
+        )
+        for e in edges:
+            if e["blocked_by"] in task_ids:
+                dep_map[e["task_id"]][e["blocked_by"]] = None
+
+        return tasks, {tid: list(deps) for tid, deps in dep_map.items()}
+
+    async def _type_duration_averages(self, task_type: str | None = None) -> dict[str, tuple[float, int]]:
+        """Return ``{task_type: (avg_hours, samples)}`` from completed tasks.
+
+        Aggregated in SQL so deadline estimates cost one grouped scan
+        rather than a Python loop over every completed task.
+        """
+        sql = (
+            "SELECT COALESCE(task_type, 'general') AS task_type, "
+            "AVG(hours) AS avg_hours, COUNT(hours) AS samples FROM ("
+            "  SELECT task_type, "
+            "  (julianday(completed_at) - julianday(started_at)) * 24.0 AS hours "
+            "  FROM tasks WHERE status = 'completed' "
+            "  AND started_at IS NOT NULL AND completed_at IS NOT NULL"
+        )
+        params: tuple = ()
+        if task_type is not None:
+            sql += " AND task_type = ?"
+            params = (task_type,)
+        sql += ") WHERE hours >= 0 GROUP BY COALESCE(task_type, 'general')"
+        rows = await self._db.execute_fetchall(sql, params)
+        return {
+            r["task_type"]: (r["avg_hours"], r["samples"])
+            for r in rows if r["samples"]
+        }
+
+    async def _load_durations(self, group_id: str, tasks: list[dict]) -> dict[str, float]:
+        """Return an hours estimate for every task in *tasks*.
+
+        Preference order: the task intelligence effort estimate, the most
+        recent deadline estimate, the historical average for the task
+        type, then ``_DEFAULT_TASK_HOURS``.
+        """
+        type_avgs = await self._type_duration_averages()
+        deadlines = await self._db.execute_fetchall(
+            "SELECT de.task_id, de.estimated_hours FROM deadline_estimates de "
+            "JOIN tasks t ON t.id = de.task_id WHERE t.group_id = ? "
+            "ORDER BY de.estimated_at",
+            (group_id,),
+        )
+        effort = await self._fetchall_optional(
+            "SELECT et.task_id, et.estimated_duration_ms FROM effort_tracking et "
+            "JOIN tasks t ON t.id = et.task_id WHERE t.group_id = ?",
+            (group_id,),
+        )
+
+        durations: dict[str, float] = {}
+        for t in tasks:
+            avg = type_avgs.get(t.get("task_type") or "general")
+            durations[t["id"]] = avg[0] if avg else _DEFAULT_TASK_HOURS
+        for row in deadlines:  # ordered oldest first, so latest wins
+            if row["estimated_hours"] is not None:
+                durations[row["task_id"]] = row["estimated_hours"]
+        for row in effort:
+            if row["estimated_duration_ms"] and row["estimated_duration_ms"] > 0:
+                durations[row["task_id"]] = row["estimated_duration_ms"] / 3_600_000.0
+        return durations
+
+    def _cache_graph(self, graph: _ScheduleGraph) -> None:
+        old = self._graphs.pop(graph.group_id, None)
+        if old is not None:
+            for tid in old.tasks:
+                self._task_groups.pop(tid, None)
+        self._graphs[graph.group_id] = graph
+        for tid in graph.tasks:
+            self._task_groups[tid] = graph.group_id
+
     async def build_schedule(self, group_id: str) -> list[dict]:
         """Build a dependency-aware schedule for all tasks in a group.
 
-        Reads the ``depends_on`` field (comma-separated task IDs or NULL) from
-        the tasks table, performs a topological sort, and persists the ordered
-        schedule into the ``scheduling_graph`` table.
+        Dependencies come from ``task_dependencies`` and the legacy
+        ``depends_on`` column (comma-separated task IDs or NULL). Tasks are
+        levelled with Kahn's algorithm, timed with a critical-path pass,
+        and the ordered schedule -- including per-task slack -- is
+        persisted into the ``scheduling_graph`` table.
 
         audit 06a F#3: a dependency cycle used to be "detected" by
         emitting a warning log and assigning every remaining task the
@@ -137,77 +385,135 @@ class AdvancedPlanningManager:
         """
         now = _utcnow()
 
-        tasks = await self._db.execute_fetchall(
-            "SELECT id, title, status, task_type, depends_on FROM tasks WHERE group_id = ?",
-            (group_id,),
-        )
+        tasks, dep_map = await self._load_group_tasks(group_id)
         if not tasks:
             return []
 
-        # Build lookup: task_id -> list of dependency task_ids
-        task_ids = {t["id"] for t in tasks}
-        dep_map: dict[str, list[str]] = {}
-        for t in tasks:
-            raw = t.get("depends_on") or ""
-            deps = [d.strip() for d in raw.split(",") if d.strip() and d.strip() in task_ids]
-            dep_map[t["id"]] = deps
-
-        # Topological sort by levels:
-        # Level 0 = no dependencies, level N = all deps satisfied at level < N
-        assigned: dict[str, int] = {}
-        remaining = set(task_ids)
-
-        current_order = 0
-        while remaining:
-            # Find tasks whose dependencies are all already assigned
-            ready = []
-            for tid in remaining:
-                if all(d in assigned for d in dep_map[tid]):
-                    ready.append(tid)
-            if not ready:
-                # audit 06a F#3: raise a real error rather than silently
-                # emitting a schedule that violates dependencies.
-                logger.warning(
-                    "Dependency cycle detected involving tasks: %s",
-                    list(remaining),
-                )
-                raise ValueError(
-                    f"Dependency cycle in group {group_id!r}: {sorted(remaining)}"
-                )
-            for tid in ready:
-                assigned[tid] = current_order
-                remaining.discard(tid)
-            current_order += 1
-
-        # audit 06a F#9: wrap the delete + per-row insert in one
-        # transaction so a crash mid-loop rolls back the whole
-        # schedule instead of leaving scheduling_graph empty.
+        durations = await self._load_durations(group_id, tasks)
+        graph = _ScheduleGraph(group_id, tasks, dep_map, durations)
+
         schedule: list[dict] = []
+        for tid in graph.order:
+            deps_str = ",".join(dep_map[tid]) if dep_map[tid] else None
+            schedule.append({
+                "id": _new_id(),
+                "group_id": group_id,
+                "task_id": tid,
+                "depends_on": deps_str,
+                "scheduled_order": graph.levels[tid],
+                "created_at": now,
+                "estimated_hours": round(durations[tid], 4),
+                "earliest_start_hours": round(graph.earliest_start[tid], 4),
+                "slack_hours": round(graph.slack[tid], 4),
+                "is_critical": int(graph.is_critical(tid)),
+            })
+
+        # audit 06a F#9: wrap the delete + insert in one transaction so
+        # a crash mid-write rolls back the whole schedule instead of
+        # leaving scheduling_graph empty.
         async with self._db.transaction() as conn:
             await conn.execute(
                 "DELETE FROM scheduling_graph WHERE group_id = ?", (group_id,),
             )
-            for t in sorted(tasks, key=lambda x: assigned.get(x["id"], 0)):
-                tid = t["id"]
-                sid = _new_id()
-                deps_str = ",".join(dep_map[tid]) if dep_map[tid] else None
-                order = assigned[tid]
-                await conn.execute(
-                    "INSERT INTO scheduling_graph (id, group_id, task_id, depends_on, scheduled_order, created_at) "
-                    "VALUES (?, ?, ?, ?, ?, ?)",
-                    (sid, group_id, tid, deps_str, order, now),
-                )
-                schedule.append({
-                    "id": sid,
-                    "group_id": group_id,
-                    "task_id": tid,
-                    "depends_on": deps_str,
-                    "scheduled_order": order,
-                    "created_at": now,
-                })
+            await conn.executemany(
+                "INSERT INTO scheduling_graph (id, group_id, task_id, depends_on, "
+                "scheduled_order, created_at, estimated_hours, earliest_start_hours, "
+                "slack_hours, is_critical) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        s["id"], s["group_id"], s["task_id"], s["depends_on"],
+                        s["scheduled_order"], s["created_at"], s["estimated_hours"],
+                        s["earliest_start_hours"], s["slack_hours"], s["is_critical"],
+                    )
+                    for s in schedule
+                ],
+            )
 
+        self._cache_graph(graph)
         return schedule
 
+    async def get_critical_path(self, group_id: str, refresh: bool = False) -> dict:
+        """Return the critical path, per-task slack and ETA for a group.
+
+        Served from the cached graph when one exists; ``refresh`` (or a
+        cache miss) rebuilds and persists the schedule first.
+        """
+        if refresh or group_id not in self._graphs:
+            await self.build_schedule(group_id)
+        graph = self._graphs.get(group_id)
+        if graph is None:
+            return {
+                "group_id": group_id,
+                "critical_path": [],
+                "remaining_hours": 0.0,
+                "estimated_completion_at": None,
+                "tasks": [],
+            }
+
+        eta = datetime.now(timezone.utc) + timedelta(hours=graph.makespan)
+        return {
+            "group_id": group_id,
+            "critical_path": graph.critical_path(),
+            "remaining_hours": round(graph.makespan, 4),
+            "estimated_completion_at": eta.isoformat(),
+            "tasks": [
+                {
+                    "task_id": tid,
+                    "status": graph.tasks[tid].get("status"),
+                    "scheduled_order": graph.levels[tid],
+                    "estimated_hours": round(graph.duration(tid), 4),
+                    "earliest_start_hours": round(graph.earliest_start[tid], 4),
+                    "slack_hours": round(graph.slack[tid], 4),
+                    "is_critical": graph.is_critical(tid),
+                }
+                for tid in graph.order
+            ],
+        }
+
+    async def mark_task_completed(self, task_id: str) -> dict | None:
+        """Update the cached schedule after *task_id* completes.
+
+        Re-times the group in memory (levels are unchanged) and writes the
+        new timings back to ``scheduling_graph`` in one transaction.
+        Returns ``None`` when the task is not part of a cached schedule.
+        """
+        group_id = self._task_groups.get(task_id)
+        graph = self._graphs.get(group_id) if group_id else None
+        if graph is None:
+            return None
+
+        graph.tasks[task_id]["status"] = "completed"
+        graph.compute_timings()
+
+        async with self._db.transaction() as conn:
+            await conn.executemany(
+                "UPDATE scheduling_graph SET estimated_hours = ?, "
+                "earliest_start_hours = ?, slack_hours = ?, is_critical = ? "
+                "WHERE group_id = ? AND task_id = ?",
+                [
+                    (
+                        round(graph.duration(tid), 4),
+                        round(graph.earliest_start[tid], 4),
+                        round(graph.slack[tid], 4),
+                        int(graph.is_critical(tid)),
+                        group_id,
+                        tid,
+                    )
+                    for tid in graph.order
+                ],
+            )
+        return {
+            "group_id": group_id,
+            "task_id": task_id,
+            "remaining_hours": round(graph.makespan, 4),
+            "critical_path": graph.critical_path(),
+        }
+
+    async def _on_task_completed(self, event: dict) -> None:
+        task_id = event.get("task_id")
+        if task_id and event.get("status", "completed") == "completed":
+            await self.mark_task_completed(task_id)
+
     async def get_schedule(self, group_id: str) -> list[dict]:
         """Return the ordered schedule for a group."""
         return await self._db.execute_fetchall(
@@ -231,22 +537,24 @@ class AdvancedPlanningManager:
 
         snapshots: list[dict] = []
         for row in rows:
-            agent_id = row["agent_id"]
             active = row["active_tasks"]
-            capacity = "busy" if active > 0 else "available"
-            sid = _new_id()
-            await self._db.execute(
-                "INSERT INTO resource_snapshots (id, agent_id, active_tasks, capacity, snapshot_at) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (sid, agent_id, active, capacity, now),
-            )
             snapshots.append({
-                "id": sid,
-                "agent_id": agent_id,
+                "id": _new_id(),
+                "agent_id": row["agent_id"],
                 "active_tasks": active,
-                "capacity": capacity,
+                "capacity": "busy" if active > 0 else "available",
                 "snapshot_at": now,
             })
+        if snapshots:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
+                    "INSERT INTO resource_snapshots (id, agent_id, active_tasks, capacity, snapshot_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (s["id"], s["agent_id"], s["active_tasks"], s["capacity"], now)
+                        for s in snapshots
+                    ],
+                )
         return snapshots
 
     async def plan_with_resources(self, group_id: str) -> list[dict]:
@@ -282,13 +590,18 @@ class AdvancedPlanningManager:
             (group_id,),
         )
 
+        # Min-heap of (load, agent) so each pick is O(log agents) instead
+        # of a full scan of load_map per pending task.
+        heap = [(load, agent) for agent, load in load_map.items()]
+        heapq.heapify(heap)
+
         assignments: list[dict] = []
         for task in pending:
-            if not load_map:
+            if not heap:
                 break
             # Pick least-busy agent
-            least_busy = min(load_map, key=load_map.get)
-            load_map[least_busy] += 1
+            load, least_busy = heapq.heappop(heap)
+            heapq.heappush(heap, (load + 1, least_busy))
             assignments.append({
                 "task_id": task["id"],
                 "assigned_to": least_busy,
@@ -323,35 +636,12 @@ class AdvancedPlanningManager:
 
         task_type = task.get("task_type") or "general"
 
-        # Query historical completed tasks of the same type with both timestamps
-        completed = await self._db.execute_fetchall(
-            "SELECT started_at, completed_at FROM tasks "
-            "WHERE task_type = ? AND status = 'completed' "
-            "AND started_at IS NOT NULL AND completed_at IS NOT NULL",
-            (task_type,),
-        )
-
-        if completed:
-            durations_hours: list[float] = []
-            for row in completed:
-                try:
-                    start = datetime.fromisoformat(row["started_at"])
-                    end = datetime.fromisoformat(row["completed_at"])
-                    hours = (end - start).total_seconds() / 3600.0
-                    if hours >= 0:
-                        durations_hours.append(hours)
-                except (ValueError, TypeError) as exc:
-                    logger.warning("Invalid timestamp in deadline estimation for task: %s", exc)
-                    continue
-
-            if durations_hours:
-                avg_hours = sum(durations_hours) / len(durations_hours)
-                samples = len(durations_hours)
-            else:
-                avg_hours = 1.0
-                samples = 0
+        # Historical average for the same type, aggregated in SQL.
+        stats = (await self._type_duration_averages(task_type)).get(task_type)
+        if stats:
+            avg_hours, samples = stats
         else:
-            avg_hours = 1.0
+            avg_hours = _DEFAULT_TASK_HOURS
             samples = 0
 
         confidence_low = round(avg_hours * self.CONFIDENCE_LOW_MULTIPLIER, 4)
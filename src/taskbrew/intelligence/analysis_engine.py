@@ -0,0 +1,470 @@
+"""Shared static-analysis engine for the code-scanning intelligence managers.
+
+code_intel, security_intel, learning and testing_quality used to each walk
+the tree, read and ``ast.parse`` every file on the event loop, one file at
+a time, so a single analysis run read the same file three or four times.
+The engine replaces those loops:
+
+- the tree is walked once (symlink-safe, see audit 07a F#2) and each file
+  is read and hashed in a worker thread, off the event loop;
+- files whose content hash is not in the result cache are shipped in
+  batches to a ``ProcessPoolExecutor``, where the file is parsed once and
+  every registered visitor runs against that single parse;
+- results are cached by content hash, so an unchanged file is never
+  re-parsed, whichever manager asks next.
+
+Visitors are plain module-level functions registered with
+:func:`register_visitor` by the modules that own the analysis. They must
+be picklable (no lambdas or closures) and must return picklable values
+that do not depend on the file's location -- the cache is shared between
+identical files -- so managers attach paths, ids and timestamps
+themselves.
+"""
+
+from __future__ import annotations
+
+import ast
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+from taskbrew.intelligence._utils import _DEFAULT_MAX_READ_BYTES
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Visitor registry
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SourceFile:
+    """One decoded source file as seen by a visitor.
+
+    ``name`` is the bare file name (for extension checks); the full path
+    is deliberately withheld so visitor output stays location-independent.
+    ``tree`` is ``None`` when the file is not Python or failed to parse.
+    ``parents`` and ``scope()`` are computed once per tree, on first use,
+    and shared by every visitor that runs on the file.
+    """
+
+    name: str
+    source: str
+    lines: list[str]
+    tree: ast.Module | None = None
+
+    @cached_property
+    def _links(self) -> tuple[dict[ast.AST, ast.AST], dict[ast.AST, tuple[ast.AST, ...]]]:
+        # One breadth-first walk builds both maps. Parents are visited
+        # before their children, so a child's scope chain is its parent's
+        # chain plus the parent itself when that is a class or function.
+        # This replaces per-node re-walks of the whole tree, which made
+        # indexing quadratic in the number of nodes.
+        parents: dict[ast.AST, ast.AST] = {}
+        scopes: dict[ast.AST, tuple[ast.AST, ...]] = {}
+        if self.tree is None:
+            return parents, scopes
+        scopes[self.tree] = ()
+        queue = deque([self.tree])
+        while queue:
+            node = queue.popleft()
+            chain = scopes[node]
+            if isinstance(node, _SCOPE_NODES):
+                chain = (node, *chain)
+            for child in ast.iter_child_nodes(node):
+                parents[child] = node
+                scopes[child] = chain
+                queue.append(child)
+        return parents, scopes
+
+    @property
+    def parents(self) -> dict[ast.AST, ast.AST]:
+        """Map of every node to its direct parent (the module has none)."""
+        return self._links[0]
+
+    def scope(self, node: ast.AST) -> tuple[ast.AST, ...]:
+        """Enclosing class/function nodes of *node*, innermost first."""
+        return self._links[1].get(node, ())
+
+
+_SCOPE_NODES = (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+@dataclass(frozen=True)
+class Visitor:
+    """A registered analysis pass."""
+
+    name: str
+    func: Callable[[SourceFile], Any]
+    suffixes: frozenset[str]
+    needs_ast: bool = True
+
+    def applies_to(self, file_name: str) -> bool:
+        return file_name.endswith(tuple(self.suffixes))
+
+
+_VISITORS: dict[str, Visitor] = {}
+
+
+def register_visitor(
+    name: str,
+    *,
+    suffixes: Iterable[str] = (".py",),
+    needs_ast: bool = True,
+):
+    """Decorator registering *func* as the visitor called *name*.
+
+    *suffixes* limits which files the visitor runs on during a directory
+    scan (matched against the end of the file name, so ``".env"`` covers
+    both ``.env`` and ``prod.env``). A visitor that is explicitly
+    requested always runs, whatever the file's suffix. Visitors with
+    ``needs_ast=False`` only see ``source``/``lines`` and still run when
+    the file does not parse.
+    """
+
+    def decorator(func: Callable[[SourceFile], Any]) -> Callable[[SourceFile], Any]:
+        _VISITORS[name] = Visitor(name, func, frozenset(suffixes), needs_ast)
+        return func
+
+    return decorator
+
+
+def registered_visitors() -> dict[str, Visitor]:
+    """Return a snapshot of the visitor registry."""
+    return dict(_VISITORS)
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the process pool)
+# ---------------------------------------------------------------------------
+
+
+def _analyze_source(
+    name: str, data: bytes, visitors: tuple[Visitor, ...]
+) -> tuple[dict[str, Any], str | None]:
+    """Decode, parse once and run *visitors* over one file."""
+    source = data.decode("utf-8", errors="replace")
+    lines = source.splitlines()
+    tree = None
+    error = None
+    if any(v.needs_ast for v in visitors):
+        try:
+            tree = ast.parse(source, filename=name)
+        except (SyntaxError, ValueError) as exc:
+            error = f"{type(exc).__name__}: {exc}"
+    src = SourceFile(name=name, source=source, lines=lines, tree=tree)
+
+    results: dict[str, Any] = {}
+    for visitor in visitors:
+        if visitor.needs_ast and tree is None:
+            results[visitor.name] = None
+            continue
+        try:
+            results[visitor.name] = visitor.func(src)
+        except Exception as exc:  # noqa: BLE001 -- one bad visitor must not sink the batch
+            results[visitor.name] = None
+            error = error or f"{visitor.name}: {type(exc).__name__}: {exc}"
+    return results, error
+
+
+def _analyze_batch(
+    batch: list[tuple[str, bytes, tuple[Visitor, ...]]],
+) -> list[tuple[dict[str, Any], str | None]]:
+    """Pool entry point: analyze a batch of ``(name, data, visitors)``."""
+    return [_analyze_source(name, data, visitors) for name, data, visitors in batch]
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class FileAnalysis:
+    """Visitor results for one file, keyed by visitor name."""
+
+    path: str
+    digest: str
+    size: int
+    results: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def iter_source_files(root: Path, suffixes: Iterable[str]) -> Iterator[Path]:
+    """Yield regular files under *root* whose name ends with one of *suffixes*.
+
+    audit 07a F#2: rglob by default follows directory symlinks, so a
+    symlink loop or a symlink pointing outside the tree could cause
+    infinite recursion or an arbitrary-directory scan. We walk only
+    regular files under the resolved directory and refuse to descend
+    into anything that isn't a real directory.
+    """
+    suffixes = tuple(suffixes)
+    try:
+        root_real = root.resolve()
+    except (OSError, ValueError):
+        return
+    stack = [root]
+    seen: set[str] = set()
+    while stack:
+        current = stack.pop()
+        try:
+            if current.is_symlink() or not current.is_dir():
+                continue
+            real = current.resolve()
+            if str(real) in seen:
+                continue
+            seen.add(str(real))
+            # Refuse to descend outside the original tree.
+            try:
+                real.relative_to(root_real)
+            except ValueError:
+                continue
+            for child in current.iterdir():
+                if child.is_symlink():
+                    continue
+                if child.is_dir():
+                    stack.append(child)
+                elif child.name.endswith(suffixes):
+                    yield child
+        except OSError:
+            continue
+
+
+def _read_capped(path: Path, max_bytes: int) -> bytes | None:
+    """Read *path* as bytes, or ``None`` if it is not a readable regular
+    file within the size cap (same contract as ``safe_read_text``)."""
+    try:
+        if path.is_symlink() or not path.is_file():
+            return None
+        size = path.stat().st_size
+        if size > max_bytes:
+            logger.warning(
+                "analysis engine: %s is %d bytes (cap %d) -- skipped",
+                path, size, max_bytes,
+            )
+            return None
+        return path.read_bytes()
+    except OSError:
+        return None
+
+
+def _cache_key(digest: str, file_name: str) -> tuple[str, str]:
+    # Some visitors branch on the extension (e.g. the XSS rule only
+    # applies to .html/.js), so identical bytes under different
+    # extensions are cached separately.
+    ext = os.path.splitext(file_name)[1] or file_name
+    return digest, ext
+
+
+class AnalysisEngine:
+    """Walk, hash, parse-once and cache static analysis across managers.
+
+    Small jobs (at most *inline_threshold* cache misses) run in a worker
+    thread, because spinning up a process pool costs more than parsing a
+    handful of files. Larger jobs are split into batches of *batch_size*
+    files and spread over a lazily-created process pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int | None = None,
+        cache_size: int = 8192,
+        inline_threshold: int = 8,
+        batch_size: int = 16,
+    ) -> None:
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._cache_size = cache_size
+        self._inline_threshold = inline_threshold
+        self._batch_size = max(1, batch_size)
+        # (digest, ext) -> (results, error); parse errors are cached too,
+        # the same bytes will fail the same way next time.
+        self._cache: OrderedDict[
+            tuple[str, str], tuple[dict[str, Any], str | None]
+        ] = OrderedDict()
+        self._pool: ProcessPoolExecutor | None = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    # -- public API ----------------------------------------------------
+
+    async def scan(
+        self,
+        root: str | Path,
+        visitors: Iterable[str],
+        *,
+        suffixes: Iterable[str] = (".py",),
+        max_bytes: int = _DEFAULT_MAX_READ_BYTES,
+    ) -> list[FileAnalysis]:
+        """Analyze every matching file under *root*, ordered by path.
+
+        Unreadable, symlinked and oversized files are left out.
+        """
+        root = Path(root)
+        suffixes = tuple(suffixes)
+        paths = await asyncio.to_thread(
+            lambda: sorted(iter_source_files(root, suffixes))
+        )
+        return await self.analyze_files(paths, visitors, max_bytes=max_bytes)
+
+    async def analyze_files(
+        self,
+        paths: Iterable[str | Path],
+        visitors: Iterable[str],
+        *,
+        max_bytes: int = _DEFAULT_MAX_READ_BYTES,
+    ) -> list[FileAnalysis]:
+        """Analyze explicit *paths*; unreadable files are left out.
+
+        ``FileAnalysis.results`` may be shared with the cache -- treat it
+        as read-only.
+        """
+        requested = tuple(visitors)
+        unknown = [name for name in requested if name not in _VISITORS]
+        if unknown:
+            raise ValueError(f"Unknown analysis visitor(s): {unknown}")
+
+        loaded = await asyncio.to_thread(self._load, [Path(p) for p in paths], max_bytes)
+
+        analyses: list[FileAnalysis] = []
+        pending: list[tuple[FileAnalysis, bytes, tuple[Visitor, ...]]] = []
+        for path, data, digest in loaded:
+            analysis = FileAnalysis(path=str(path), digest=digest, size=len(data))
+            analyses.append(analysis)
+            key = _cache_key(digest, path.name)
+            cached = self._cache.get(key)
+            if cached is not None and all(name in cached[0] for name in requested):
+                self._cache.move_to_end(key)
+                analysis.results, analysis.error = cached
+                self.stats["hits"] += 1
+                continue
+            self.stats["misses"] += 1
+            # Run every registered visitor that applies to this file, not
+            # just the requested ones, so the next manager to ask about
+            # it is answered from the cache instead of a second parse.
+            run = tuple(
+                v for v in _VISITORS.values()
+                if v.name in requested or v.applies_to(path.name)
+            )
+            pending.append((analysis, data, run))
+
+        if pending:
+            outputs = await self._execute(
+                [(Path(a.path).name, data, run) for a, data, run in pending]
+            )
+            for (analysis, _data, _run), (results, error) in zip(pending, outputs):
+                analysis.results = results
+                analysis.error = error
+                self._store(
+                    _cache_key(analysis.digest, Path(analysis.path).name),
+                    (results, error),
+                )
+
+        return analyses
+
+    async def analyze_file(
+        self,
+        path: str | Path,
+        visitor: str,
+        *,
+        max_bytes: int = _DEFAULT_MAX_READ_BYTES,
+    ) -> FileAnalysis | None:
+        """Single-file convenience wrapper; ``None`` if unreadable."""
+        analyses = await self.analyze_files([path], [visitor], max_bytes=max_bytes)
+        return analyses[0] if analyses else None
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def close(self) -> None:
+        """Shut down the process pool (the cache is kept)."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # -- internals -----------------------------------------------------
+
+    @staticmethod
+    def _load(paths: list[Path], max_bytes: int) -> list[tuple[Path, bytes, str]]:
+        loaded = []
+        for path in paths:
+            data = _read_capped(path, max_bytes)
+            if data is None:
+                continue
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            loaded.append((path, data, digest))
+        return loaded
+
+    def _store(
+        self, key: tuple[str, str], entry: tuple[dict[str, Any], str | None]
+    ) -> None:
+        self._cache[key] = entry
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: the parent runs aiosqlite and asyncio
+            # threads, and a forked child can inherit a lock one of them
+            # held at fork time.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    async def _execute(
+        self, jobs: list[tuple[str, bytes, tuple[Visitor, ...]]]
+    ) -> list[tuple[dict[str, Any], str | None]]:
+        if len(jobs) <= self._inline_threshold or self._max_workers <= 1:
+            return await asyncio.to_thread(_analyze_batch, jobs)
+
+        batches = [
+            jobs[i:i + self._batch_size]
+            for i in range(0, len(jobs), self._batch_size)
+        ]
+        loop = asyncio.get_running_loop()
+        try:
+            pool = self._get_pool()
+            chunks = await asyncio.gather(
+                *(loop.run_in_executor(pool, _analyze_batch, batch) for batch in batches)
+            )
+        except (BrokenExecutor, OSError) as exc:
+            # Sandboxes without working semaphores or a crashed worker:
+            # degrade to a thread rather than failing the scan.
+            logger.warning("analysis process pool unavailable (%s); running inline", exc)
+            self.close()
+            return await asyncio.to_thread(_analyze_batch, jobs)
+        return [output for chunk in chunks for output in chunk]
+
+
+# ---------------------------------------------------------------------------
+# Shared instance
+# ---------------------------------------------------------------------------
+
+_default_engine: AnalysisEngine | None = None
+
+
+def get_analysis_engine() -> AnalysisEngine:
+    """Return the process-wide engine shared by the intelligence managers."""
+    global _default_engine
+    if _default_engine is None:
+        _default_engine = AnalysisEngine()
+    return _default_engine
+
+
+def shutdown_analysis_engine() -> None:
+    """Stop the shared engine's process pool, if one was started."""
+    if _default_engine is not None:
+        _default_engine.close()
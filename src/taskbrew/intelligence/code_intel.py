@@ -1,6 +1,7 @@
 """Advanced code intelligence: semantic search, pattern detection, smells, debt, test gaps, contracts, dead code.
 
-Audit 07a F#1: file reads now route through ``safe_read_text``, which
+Audit 07a F#1: file reads now route through ``safe_read_text`` (or the
+analysis engine's reader, which has the same contract), which
 enforces a 2 MiB cap and refuses symlinks. Oversized files skip
 silently; the analyzer sees "no patterns" and moves on rather than
 OOM'ing the worker on a generated asset.
@@ -16,6 +17,12 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from taskbrew.intelligence._utils import safe_read_text
+from taskbrew.intelligence.analysis_engine import (
+    SourceFile,
+    get_analysis_engine,
+    register_visitor,
+)
+from taskbrew.intelligence.embeddings import EmbeddingStore
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +30,19 @@ logger = logging.getLogger(__name__)
 class CodeIntelligenceManager:
     """Analyze code quality, patterns, and structure."""
 
-    def __init__(self, db, project_dir: str = ".") -> None:
+    def __init__(self, db, project_dir: str = ".", *, engine=None) -> None:
         self._db = db
         self._project_dir = project_dir
+        self._engine = engine or get_analysis_engine()
+        self._embeddings = EmbeddingStore(
+            db,
+            "code_embeddings",
+            text_columns=("symbol_name", "description"),
+            result_columns=(
+                "file_path", "symbol_name", "symbol_type", "description", "last_updated",
+            ),
+            changed_column="last_updated",
+        )
 
     # --- Feature 6: Semantic Code Search ---
 
@@ -34,119 +51,83 @@ class CodeIntelligenceManager:
 
         Returns the number of symbols indexed.
         """
-        try:
-            source = safe_read_text(file_path)
-            if not source:
-                return []
-            tree = ast.parse(source, filename=file_path)
-        except (SyntaxError, OSError) as exc:
-            logger.warning("Cannot parse %s for indexing: %s", file_path, exc)
+        analysis = await self._engine.analyze_file(file_path, "symbols")
+        if analysis is None:
+            return 0
+        symbols = analysis.results.get("symbols")
+        if symbols is None:
+            logger.warning("Cannot parse %s for indexing: %s", file_path, analysis.error)
             return 0
 
         now = datetime.now(timezone.utc).isoformat()
-        count = 0
+        await self._upsert_embeddings(file_path, symbols, now)
+        return len(symbols)
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                docstring = ast.get_docstring(node) or f"Class {node.name}"
-                await self._upsert_embedding(
-                    file_path, node.name, "class", docstring, now
-                )
-                count += 1
-                # Index methods inside the class
-                for item in node.body:
-                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                        method_doc = (
-                            ast.get_docstring(item)
-                            or f"Method {item.name} of {node.name}"
-                        )
-                        await self._upsert_embedding(
-                            file_path,
-                            f"{node.name}.{item.name}",
-                            "method",
-                            method_doc,
-                            now,
-                        )
-                        count += 1
-            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Top-level functions only (methods handled above)
-                if not any(
-                    isinstance(p, ast.ClassDef)
-                    for p in _iter_parents(tree, node)
-                ):
-                    docstring = ast.get_docstring(node) or f"Function {node.name}"
-                    await self._upsert_embedding(
-                        file_path, node.name, "function", docstring, now
-                    )
-                    count += 1
-
-        return count
-
-    async def _upsert_embedding(
+    async def _upsert_embeddings(
         self,
         file_path: str,
-        symbol_name: str,
-        symbol_type: str,
-        description: str,
+        symbols: list[tuple[str, str, str]],
         now: str,
     ) -> None:
-        """Insert or update a code_embeddings row."""
-        existing = await self._db.execute_fetchone(
-            "SELECT id FROM code_embeddings WHERE file_path = ? AND symbol_name = ?",
-            (file_path, symbol_name),
+        """Insert or update the code_embeddings rows for one file.
+
+        One SELECT finds the file's existing rows; updates and inserts
+        then go out as two ``executemany`` calls in a single transaction
+        instead of a SELECT plus a write per symbol. Each row carries its
+        float32 embedding, which also lands in the in-memory search index.
+        """
+        rows = await self._db.execute_fetchall(
+            "SELECT id, symbol_name FROM code_embeddings WHERE file_path = ?",
+            (file_path,),
         )
-        if existing:
-            await self._db.execute(
-                "UPDATE code_embeddings SET symbol_type = ?, description = ?, "
-                "last_updated = ? WHERE id = ?",
-                (symbol_type, description, now, existing["id"]),
-            )
-        else:
-            emb_id = f"CE-{uuid.uuid4().hex[:6]}"
-            await self._db.execute(
-                "INSERT INTO code_embeddings "
-                "(id, file_path, symbol_name, symbol_type, embedding, description, last_updated) "
-                "VALUES (?, ?, ?, ?, NULL, ?, ?)",
-                (emb_id, file_path, symbol_name, symbol_type, description, now),
+        existing = {row["symbol_name"]: row["id"] for row in rows}
+        # A name defined twice keeps the last definition, as repeated
+        # per-symbol upserts used to.
+        latest = {name: (symbol_type, desc) for name, symbol_type, desc in symbols}
+
+        updates = []
+        inserts = []
+        for name, (symbol_type, description) in latest.items():
+            row_id = existing.get(name) or f"CE-{uuid.uuid4().hex[:12]}"
+            blob = self._embeddings.embed_row(
+                row_id, {"symbol_name": name, "description": description}
             )
+            if name in existing:
+                updates.append((symbol_type, description, blob, now, row_id))
+            else:
+                # 12 hex chars: a whole-tree index inserts thousands of
+                # rows, enough for 6-char ids to collide.
+                inserts.append((row_id, file_path, name, symbol_type, blob, description, now))
+
+        async with self._db.transaction() as conn:
+            if updates:
+                await conn.executemany(
+                    "UPDATE code_embeddings SET symbol_type = ?, description = ?, "
+                    "embedding = ?, last_updated = ? WHERE id = ?",
+                    updates,
+                )
+            if inserts:
+                await conn.executemany(
+                    "INSERT INTO code_embeddings "
+                    "(id, file_path, symbol_name, symbol_type, embedding, description, last_updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    inserts,
+                )
 
     async def search_by_intent(self, query: str, limit: int = 10) -> list[dict]:
-        """Search indexed symbols by keyword matching on description and name.
-
-        audit 07a F#5: the previous implementation joined keyword
-        conditions with OR, so ``"user login"`` matched rows that
-        mentioned EITHER "user" OR "login". That turned every search
-        into a noisy bag-of-tokens full scan, sorted only by recency.
-        We now AND the per-keyword conditions (tokens must all
-        appear) and escape LIKE wildcards in the caller-supplied
-        input so ``%`` / ``_`` are literal.
-        """
-        keywords = [k.strip() for k in query.lower().split() if k.strip()]
-        if not keywords:
-            return []
+        """Rank indexed symbols by semantic similarity to *query*.
 
-        def _escape(s: str) -> str:
-            return (
-                s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-            )
+        Uses the offline hashed TF-IDF vectors in ``code_embeddings``
+        (see ``intelligence.embeddings``) blended with keyword coverage,
+        so "find code that averages numbers" surfaces
+        ``calculate_average`` without every word having to appear.
+        Results carry a ``score`` and are ordered best first.
 
-        conditions = []
-        params: list = []
-        for kw in keywords:
-            esc = _escape(kw)
-            conditions.append(
-                "(LOWER(description) LIKE ? ESCAPE '\\' OR "
-                "LOWER(symbol_name) LIKE ? ESCAPE '\\')"
-            )
-            params.extend([f"%{esc}%", f"%{esc}%"])
-
-        where = " AND ".join(conditions)
-        params.append(limit)
-        return await self._db.execute_fetchall(
-            f"SELECT * FROM code_embeddings WHERE {where} "
-            "ORDER BY last_updated DESC LIMIT ?",
-            tuple(params),
-        )
+        audit 07a F#5: the LIKE scan this replaces OR-ed its keywords
+        and later AND-ed them; neither ranked by relevance. Query text
+        never reaches SQL now, so there is nothing to escape.
+        """
+        return await self._embeddings.search(query, limit)
 
     # --- Feature 7: Architecture Pattern Detection ---
 
@@ -159,105 +140,42 @@ class CodeIntelligenceManager:
         - Observer (classes with ``subscribe`` / ``notify`` methods)
         - Registry (class with a dict of registered items)
         """
-        try:
-            source = safe_read_text(file_path)
-            if not source:
-                return []
-            tree = ast.parse(source, filename=file_path)
-        except (SyntaxError, OSError) as exc:
-            logger.warning("Cannot parse %s for pattern detection: %s", file_path, exc)
+        analysis = await self._engine.analyze_file(file_path, "patterns")
+        if analysis is None:
+            return []
+        found = analysis.results.get("patterns")
+        if found is None:
+            logger.warning(
+                "Cannot parse %s for pattern detection: %s", file_path, analysis.error
+            )
             return []
 
         now = datetime.now(timezone.utc).isoformat()
-        patterns: list[dict] = []
+        patterns = [
+            self._make_pattern(pattern_type, file_path, detail, now)
+            for pattern_type, detail in found
+        ]
 
-        for node in ast.walk(tree):
-            if not isinstance(node, ast.ClassDef):
-                continue
-
-            method_names = {
-                item.name
-                for item in node.body
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
-            }
-            attr_names = set()
-            for item in ast.walk(node):
-                if isinstance(item, ast.Attribute):
-                    attr_names.add(item.attr)
-                if isinstance(item, ast.Name):
-                    attr_names.add(item.id)
-
-            # Singleton: has _instance attribute
-            if "_instance" in attr_names:
-                patterns.append(
-                    self._make_pattern("singleton", file_path, node.name, now)
-                )
-
-            # Factory: method with conditional returns (if/match returning different things)
-            for item in node.body:
-                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    has_conditional_return = False
-                    return_count = 0
-                    for child in ast.walk(item):
-                        if isinstance(child, ast.Return):
-                            return_count += 1
-                    if return_count >= 2:
-                        for child in ast.walk(item):
-                            if isinstance(child, (ast.If, ast.Match)):
-                                has_conditional_return = True
-                                break
-                    if has_conditional_return:
-                        patterns.append(
-                            self._make_pattern(
-                                "factory",
-                                file_path,
-                                f"{node.name}.{item.name}",
-                                now,
-                            )
+        # Persist patterns
+        if patterns:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
+                    "INSERT INTO architecture_patterns "
+                    "(id, pattern_type, file_path, details, severity, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            p["id"],
+                            p["pattern_type"],
+                            p["file_path"],
+                            p["details"],
+                            p["severity"],
+                            p["created_at"],
                         )
-                        break  # one per class
-
-            # Observer: has subscribe and notify methods
-            if "subscribe" in method_names and "notify" in method_names:
-                patterns.append(
-                    self._make_pattern("observer", file_path, node.name, now)
+                        for p in patterns
+                    ],
                 )
 
-            # Registry: class with register method and a dict attribute
-            if "register" in method_names:
-                has_dict = False
-                for item in node.body:
-                    if isinstance(item, ast.FunctionDef) and item.name == "__init__":
-                        for child in ast.walk(item):
-                            if isinstance(child, ast.Call):
-                                func = child.func
-                                if isinstance(func, ast.Name) and func.id == "dict":
-                                    has_dict = True
-                                if isinstance(func, ast.Attribute) and func.attr == "dict":
-                                    has_dict = True
-                            if isinstance(child, ast.Dict):
-                                has_dict = True
-                if has_dict:
-                    patterns.append(
-                        self._make_pattern("registry", file_path, node.name, now)
-                    )
-
-        # Persist patterns
-        for p in patterns:
-            await self._db.execute(
-                "INSERT INTO architecture_patterns "
-                "(id, pattern_type, file_path, details, severity, created_at) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (
-                    p["id"],
-                    p["pattern_type"],
-                    p["file_path"],
-                    p["details"],
-                    p["severity"],
-                    p["created_at"],
-                ),
-            )
-
         return patterns
 
     def _make_pattern(
@@ -298,88 +216,25 @@ class CodeIntelligenceManager:
         - Too Many Parameters (function with > 5 params)
         - Deep Nesting (> 4 indent levels)
         """
-        try:
-            source = safe_read_text(file_path)
-            if not source:
-                return []
-            tree = ast.parse(source, filename=file_path)
-        except (SyntaxError, OSError) as exc:
-            logger.warning("Cannot parse %s for smell detection: %s", file_path, exc)
+        analysis = await self._engine.analyze_file(file_path, "smells")
+        if analysis is None:
+            return []
+        found = analysis.results.get("smells")
+        if found is None:
+            logger.warning(
+                "Cannot parse %s for smell detection: %s", file_path, analysis.error
+            )
             return []
 
-        smells: list[dict] = []
-        lines = source.splitlines()
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                method_count = sum(
-                    1
-                    for item in node.body
-                    if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef))
-                )
-                if method_count > 10:
-                    smells.append(
-                        {
-                            "type": "god_class",
-                            "location": f"{file_path}:{node.lineno}",
-                            "severity": "high",
-                            "detail": f"Class '{node.name}' has {method_count} methods",
-                        }
-                    )
-
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                # Long Method
-                end_lineno = getattr(node, "end_lineno", None)
-                if end_lineno:
-                    func_lines = end_lineno - node.lineno + 1
-                    if func_lines > 50:
-                        smells.append(
-                            {
-                                "type": "long_method",
-                                "location": f"{file_path}:{node.lineno}",
-                                "severity": "medium",
-                                "detail": f"Function '{node.name}' is {func_lines} lines",
-                            }
-                        )
-
-                # Too Many Parameters
-                params = node.args
-                param_count = (
-                    len(params.args)
-                    + len(params.posonlyargs)
-                    + len(params.kwonlyargs)
-                )
-                # Exclude 'self' and 'cls'
-                if params.args and params.args[0].arg in ("self", "cls"):
-                    param_count -= 1
-                if param_count > 5:
-                    smells.append(
-                        {
-                            "type": "too_many_parameters",
-                            "location": f"{file_path}:{node.lineno}",
-                            "severity": "medium",
-                            "detail": (
-                                f"Function '{node.name}' has {param_count} parameters"
-                            ),
-                        }
-                    )
-
-        # Deep nesting check (indent-based)
-        for i, line in enumerate(lines, 1):
-            if line.strip():
-                indent = len(line) - len(line.lstrip())
-                # Assume 4-space indent; >4 levels = >16 spaces
-                if indent > 16:
-                    smells.append(
-                        {
-                            "type": "deep_nesting",
-                            "location": f"{file_path}:{i}",
-                            "severity": "low",
-                            "detail": f"Line {i} has {indent // 4} indent levels",
-                        }
-                    )
-
-        return smells
+        return [
+            {
+                "type": smell_type,
+                "location": f"{file_path}:{lineno}",
+                "severity": severity,
+                "detail": detail,
+            }
+            for smell_type, lineno, severity, detail in found
+        ]
 
     # --- Feature 9: Technical Debt Scoring ---
 
@@ -388,60 +243,16 @@ class CodeIntelligenceManager:
 
         Score is normalized to [0, 1] where 1 = high debt.
         """
-        try:
-            source = safe_read_text(file_path)
-            if not source:
-                return []
-            tree = ast.parse(source, filename=file_path)
-        except (SyntaxError, OSError) as exc:
-            logger.warning("Cannot parse %s for debt scoring: %s", file_path, exc)
+        analysis = await self._engine.analyze_file(file_path, "debt")
+        if analysis is None:
             return {"file_path": file_path, "score": 0.0, "details": {}}
-
-        lines = source.splitlines()
-        total_lines = len(lines)
-
-        # Cyclomatic complexity: count branching statements
-        complexity = 0
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.Try)):
-                complexity += 1
-
-        # Function count and max function length
-        func_count = 0
-        max_func_length = 0
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                func_count += 1
-                end_lineno = getattr(node, "end_lineno", None)
-                if end_lineno:
-                    length = end_lineno - node.lineno + 1
-                    max_func_length = max(max_func_length, length)
-
-        # Normalize components to [0, 1]
-        complexity_score = min(complexity / 20.0, 1.0)
-        length_score = min(total_lines / 500.0, 1.0)
-        func_count_score = min(func_count / 20.0, 1.0)
-        max_func_score = min(max_func_length / 100.0, 1.0)
-
-        # Weighted sum
-        score = round(
-            0.3 * complexity_score
-            + 0.2 * length_score
-            + 0.2 * func_count_score
-            + 0.3 * max_func_score,
-            4,
-        )
-
-        details = {
-            "cyclomatic_complexity": complexity,
-            "total_lines": total_lines,
-            "function_count": func_count,
-            "max_function_length": max_func_length,
-            "complexity_score": round(complexity_score, 4),
-            "length_score": round(length_score, 4),
-            "func_count_score": round(func_count_score, 4),
-            "max_func_score": round(max_func_score, 4),
-        }
+        found = analysis.results.get("debt")
+        if found is None:
+            logger.warning(
+                "Cannot parse %s for debt scoring: %s", file_path, analysis.error
+            )
+            return {"file_path": file_path, "score": 0.0, "details": {}}
+        score, details = found[0], dict(found[1])
 
         now = datetime.now(timezone.utc).isoformat()
         debt_id = f"TD-{uuid.uuid4().hex[:6]}"
@@ -472,44 +283,39 @@ class CodeIntelligenceManager:
 
     async def analyze_test_gaps(self, source_file: str) -> list[dict]:
         """Find functions in *source_file* that lack corresponding tests."""
-        try:
-            source = safe_read_text(source_file)
-            if not source:
-                return []
-            tree = ast.parse(source, filename=source_file)
-        except (SyntaxError, OSError) as exc:
-            logger.warning("Cannot parse %s for test gap analysis: %s", source_file, exc)
-            return []
-
-        # Gather source function names
-        source_funcs: list[str] = []
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                if not node.name.startswith("_"):
-                    source_funcs.append(node.name)
-
         # Find corresponding test file
         src_path = Path(source_file)
         test_name = f"test_{src_path.name}"
         test_path = src_path.parent / test_name
         # Also check a tests/ sibling directory
         tests_dir = src_path.parent.parent / "tests" / test_name
-        tested_funcs: set[str] = set()
 
-        for tp in [test_path, tests_dir]:
-            if tp.is_file():
-                try:
-                    test_source = safe_read_text(tp)
-                    if not test_source:
-                        continue
-                    test_tree = ast.parse(test_source, filename=str(tp))
-                    for node in ast.walk(test_tree):
-                        if isinstance(
-                            node, (ast.FunctionDef, ast.AsyncFunctionDef)
-                        ):
-                            tested_funcs.add(node.name)
-                except (SyntaxError, OSError) as exc:
-                    logger.warning("Cannot parse test file %s: %s", tp, exc)
+        # One engine call parses the source and both candidate test files.
+        analyses = await self._engine.analyze_files(
+            [src_path, test_path, tests_dir], ["definitions"]
+        )
+        if not analyses or analyses[0].path != str(src_path):
+            return []
+        found = analyses[0].results.get("definitions")
+        if found is None:
+            logger.warning(
+                "Cannot parse %s for test gap analysis: %s", source_file, analyses[0].error
+            )
+            return []
+
+        # Gather source function names
+        source_funcs = [
+            name for name in found["functions"] if not name.startswith("_")
+        ]
+        tested_funcs: set[str] = set()
+        for test_analysis in analyses[1:]:
+            test_found = test_analysis.results.get("definitions")
+            if test_found is None:
+                logger.warning(
+                    "Cannot parse test file %s: %s", test_analysis.path, test_analysis.error
+                )
+                continue
+            tested_funcs.update(test_found["functions"])
 
         now = datetime.now(timezone.utc).isoformat()
         gaps: list[dict] = []
@@ -527,13 +333,20 @@ class CodeIntelligenceManager:
                     "suggested_test": f"test_{func}",
                     "created_at": now,
                 }
-                await self._db.execute(
+                gaps.append(gap)
+
+        if gaps:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
                     "INSERT INTO test_gaps "
                     "(id, file_path, function_name, gap_type, suggested_test, created_at) "
                     "VALUES (?, ?, ?, ?, ?, ?)",
-                    (gap_id, source_file, func, "untested_function", f"test_{func}", now),
+                    [
+                        (g["id"], g["file_path"], g["function_name"], g["gap_type"],
+                         g["suggested_test"], g["created_at"])
+                        for g in gaps
+                    ],
                 )
-                gaps.append(gap)
 
         return gaps
 
@@ -628,96 +441,39 @@ class CodeIntelligenceManager:
         Excludes ``__init__``, ``__main__``, test files, and decorated functions
         (e.g. ``@app.get``).
 
-        audit 07a F#2: rglob by default follows directory symlinks, so a
-        symlink loop or a symlink pointing outside the tree could cause
-        infinite recursion or an arbitrary-directory scan. We now walk
-        only regular files under the resolved directory and refuse to
-        descend into anything that isn't a real directory.
+        audit 07a F#2: the walk (``analysis_engine.iter_source_files``)
+        skips symlinks and never descends outside the resolved directory.
         """
         dir_path = Path(directory)
         if not dir_path.is_dir():
             return []
 
-        try:
-            dir_real = dir_path.resolve()
-        except (OSError, ValueError):
-            return []
-
-        def _walk_py(root: Path):
-            stack = [root]
-            seen: set[str] = set()
-            while stack:
-                current = stack.pop()
-                try:
-                    if current.is_symlink() or not current.is_dir():
-                        continue
-                    real = str(current.resolve())
-                    if real in seen:
-                        continue
-                    seen.add(real)
-                    # Refuse to descend outside the original tree.
-                    try:
-                        current.resolve().relative_to(dir_real)
-                    except ValueError:
-                        continue
-                    for child in current.iterdir():
-                        if child.is_symlink():
-                            continue
-                        if child.is_dir():
-                            stack.append(child)
-                        elif child.suffix == ".py":
-                            yield child
-                except OSError:
-                    continue
-
-        # Phase 1: collect all defined functions and all called names
+        # Phase 1: collect all defined functions and all called names.
+        # The engine walks the tree symlink-safely and parses each file
+        # once, in the process pool on a cold cache.
         all_defs: list[dict] = []  # {"name", "file_path", "lineno", "decorated"}
         all_calls: set[str] = set()
 
-        for py_file in _walk_py(dir_path):
-            if py_file.name.startswith("test_"):
+        for analysis in await self._engine.scan(dir_path, ["definitions"]):
+            if Path(analysis.path).name.startswith("test_"):
                 continue
-            try:
-                source = safe_read_text(py_file)
-                if not source:
-                    continue
-                tree = ast.parse(source, filename=str(py_file))
-            except (SyntaxError, OSError) as exc:
-                logger.warning("Cannot parse %s for dead code analysis: %s", py_file, exc)
+            found = analysis.results.get("definitions")
+            if found is None:
+                logger.warning(
+                    "Cannot parse %s for dead code analysis: %s",
+                    analysis.path, analysis.error,
+                )
                 continue
-
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                    if node.name.startswith("__"):
-                        continue
-                    # Skip methods defined inside classes (called via self.method())
-                    parents = list(_iter_parents(tree, node))
-                    is_inside_class = any(isinstance(p, ast.ClassDef) for p in parents)
-                    if is_inside_class:
-                        continue
-                    # Skip nested/inner functions (closures/helpers)
-                    is_inside_function = any(
-                        isinstance(p, (ast.FunctionDef, ast.AsyncFunctionDef))
-                        for p in parents
-                    )
-                    if is_inside_function:
-                        continue
-                    decorated = len(node.decorator_list) > 0
-                    all_defs.append(
-                        {
-                            "name": node.name,
-                            "file_path": str(py_file),
-                            "lineno": node.lineno,
-                            "decorated": decorated,
-                        }
-                    )
-
-                # Collect call targets
-                if isinstance(node, ast.Call):
-                    if isinstance(node.func, ast.Name):
-                        all_calls.add(node.func.id)
-                    elif isinstance(node.func, ast.Attribute):
-                        all_calls.add(node.func.attr)
+            for name, lineno, decorated in found["top_level"]:
+                all_defs.append(
+                    {
+                        "name": name,
+                        "file_path": analysis.path,
+                        "lineno": lineno,
+                        "decorated": decorated,
+                    }
+                )
+            all_calls.update(found["calls"])
 
         # Phase 2: find unreferenced functions
         dead: list[dict] = []
@@ -736,14 +492,240 @@ class CodeIntelligenceManager:
         return dead
 
 
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
 # ---------------------------------------------------------------------------
-# Helpers
+# Analysis-engine visitors
+#
+# These run inside the engine's process pool, so they must stay
+# module-level and return plain, location-independent data; the manager
+# methods above attach paths, ids and timestamps.
 # ---------------------------------------------------------------------------
 
 
-def _iter_parents(tree: ast.AST, target: ast.AST):
-    """Yield ancestor nodes of *target* in *tree*."""
-    for node in ast.walk(tree):
-        for child in ast.iter_child_nodes(node):
-            if child is target:
-                yield node
+@register_visitor("symbols")
+def _symbols_visitor(src: SourceFile) -> list[tuple[str, str, str]]:
+    """``(symbol_name, symbol_type, description)`` for semantic indexing."""
+    symbols: list[tuple[str, str, str]] = []
+    for node in ast.walk(src.tree):
+        if isinstance(node, ast.ClassDef):
+            symbols.append(
+                (node.name, "class", ast.get_docstring(node) or f"Class {node.name}")
+            )
+            # Index methods inside the class
+            for item in node.body:
+                if isinstance(item, _FUNCTION_NODES):
+                    symbols.append((
+                        f"{node.name}.{item.name}",
+                        "method",
+                        ast.get_docstring(item) or f"Method {item.name} of {node.name}",
+                    ))
+        elif isinstance(node, _FUNCTION_NODES):
+            # Functions outside any class only (methods handled above)
+            if not any(isinstance(p, ast.ClassDef) for p in src.scope(node)):
+                symbols.append((
+                    node.name,
+                    "function",
+                    ast.get_docstring(node) or f"Function {node.name}",
+                ))
+    return symbols
+
+
+@register_visitor("definitions")
+def _definitions_visitor(src: SourceFile) -> dict:
+    """Module-level functions, call targets and every function name.
+
+    ``top_level`` holds ``(name, lineno, decorated)`` for functions not
+    nested in a class or another function (dunder names excluded).
+    """
+    top_level: list[tuple[str, int, bool]] = []
+    calls: set[str] = set()
+    functions: set[str] = set()
+    for node in ast.walk(src.tree):
+        if isinstance(node, _FUNCTION_NODES):
+            functions.add(node.name)
+            if not src.scope(node) and not node.name.startswith("__"):
+                top_level.append((node.name, node.lineno, bool(node.decorator_list)))
+        elif isinstance(node, ast.Call):
+            if isinstance(node.func, ast.Name):
+                calls.add(node.func.id)
+            elif isinstance(node.func, ast.Attribute):
+                calls.add(node.func.attr)
+    top_level.sort(key=lambda d: d[1])
+    return {
+        "top_level": top_level,
+        "calls": sorted(calls),
+        "functions": sorted(functions),
+    }
+
+
+@register_visitor("patterns")
+def _patterns_visitor(src: SourceFile) -> list[tuple[str, str]]:
+    """``(pattern_type, detail)`` for each architecture pattern found.
+
+    One walk attributes every node to its enclosing classes/functions via
+    ``src.scope`` instead of re-walking each class and method subtree.
+    """
+    classes: list[ast.ClassDef] = []
+    class_names: dict[ast.AST, set[str]] = {}
+    return_counts: dict[ast.AST, int] = {}
+    branching: set[ast.AST] = set()
+    builds_dict: set[ast.AST] = set()
+
+    for node in ast.walk(src.tree):
+        if isinstance(node, ast.ClassDef):
+            classes.append(node)
+        chain = src.scope(node)
+        if not chain:
+            continue
+        if isinstance(node, (ast.Attribute, ast.Name)):
+            name = node.attr if isinstance(node, ast.Attribute) else node.id
+            for scope in chain:
+                if isinstance(scope, ast.ClassDef):
+                    class_names.setdefault(scope, set()).add(name)
+        elif isinstance(node, ast.Return):
+            for scope in chain:
+                return_counts[scope] = return_counts.get(scope, 0) + 1
+        elif isinstance(node, (ast.If, ast.Match)):
+            branching.update(chain)
+        if isinstance(node, ast.Dict) or (
+            isinstance(node, ast.Call)
+            and (
+                (isinstance(node.func, ast.Name) and node.func.id == "dict")
+                or (isinstance(node.func, ast.Attribute) and node.func.attr == "dict")
+            )
+        ):
+            builds_dict.update(chain)
+
+    patterns: list[tuple[str, str]] = []
+    for node in classes:
+        methods = [item for item in node.body if isinstance(item, _FUNCTION_NODES)]
+        method_names = {item.name for item in methods}
+
+        # Singleton: has _instance attribute
+        if "_instance" in class_names.get(node, ()):
+            patterns.append(("singleton", node.name))
+
+        # Factory: method with conditional returns (if/match returning different things)
+        for item in methods:
+            if return_counts.get(item, 0) >= 2 and item in branching:
+                patterns.append(("factory", f"{node.name}.{item.name}"))
+                break  # one per class
+
+        # Observer: has subscribe and notify methods
+        if "subscribe" in method_names and "notify" in method_names:
+            patterns.append(("observer", node.name))
+
+        # Registry: class with register method and a dict attribute
+        if "register" in method_names and any(
+            isinstance(item, ast.FunctionDef)
+            and item.name == "__init__"
+            and item in builds_dict
+            for item in methods
+        ):
+            patterns.append(("registry", node.name))
+
+    return patterns
+
+
+@register_visitor("smells")
+def _smells_visitor(src: SourceFile) -> list[tuple[str, int, str, str]]:
+    """``(type, lineno, severity, detail)`` for each code smell found."""
+    smells: list[tuple[str, int, str, str]] = []
+
+    for node in ast.walk(src.tree):
+        if isinstance(node, ast.ClassDef):
+            method_count = sum(
+                1 for item in node.body if isinstance(item, _FUNCTION_NODES)
+            )
+            if method_count > 10:
+                smells.append((
+                    "god_class", node.lineno, "high",
+                    f"Class '{node.name}' has {method_count} methods",
+                ))
+
+        if isinstance(node, _FUNCTION_NODES):
+            # Long Method
+            end_lineno = getattr(node, "end_lineno", None)
+            if end_lineno:
+                func_lines = end_lineno - node.lineno + 1
+                if func_lines > 50:
+                    smells.append((
+                        "long_method", node.lineno, "medium",
+                        f"Function '{node.name}' is {func_lines} lines",
+                    ))
+
+            # Too Many Parameters
+            params = node.args
+            param_count = (
+                len(params.args) + len(params.posonlyargs) + len(params.kwonlyargs)
+            )
+            # Exclude 'self' and 'cls'
+            if params.args and params.args[0].arg in ("self", "cls"):
+                param_count -= 1
+            if param_count > 5:
+                smells.append((
+                    "too_many_parameters", node.lineno, "medium",
+                    f"Function '{node.name}' has {param_count} parameters",
+                ))
+
+    # Deep nesting check (indent-based)
+    for i, line in enumerate(src.lines, 1):
+        if line.strip():
+            indent = len(line) - len(line.lstrip())
+            # Assume 4-space indent; >4 levels = >16 spaces
+            if indent > 16:
+                smells.append((
+                    "deep_nesting", i, "low",
+                    f"Line {i} has {indent // 4} indent levels",
+                ))
+
+    return smells
+
+
+@register_visitor("debt")
+def _debt_visitor(src: SourceFile) -> tuple[float, dict]:
+    """``(score, details)`` technical-debt breakdown for one file."""
+    total_lines = len(src.lines)
+
+    # Cyclomatic complexity: count branching statements; function count
+    # and max function length come from the same walk.
+    complexity = 0
+    func_count = 0
+    max_func_length = 0
+    for node in ast.walk(src.tree):
+        if isinstance(node, (ast.If, ast.For, ast.While, ast.Try)):
+            complexity += 1
+        elif isinstance(node, _FUNCTION_NODES):
+            func_count += 1
+            end_lineno = getattr(node, "end_lineno", None)
+            if end_lineno:
+                max_func_length = max(max_func_length, end_lineno - node.lineno + 1)
+
+    # Normalize components to [0, 1]
+    complexity_score = min(complexity / 20.0, 1.0)
+    length_score = min(total_lines / 500.0, 1.0)
+    func_count_score = min(func_count / 20.0, 1.0)
+    max_func_score = min(max_func_length / 100.0, 1.0)
+
+    # Weighted sum
+    score = round(
+        0.3 * complexity_score
+        + 0.2 * length_score
+        + 0.2 * func_count_score
+        + 0.3 * max_func_score,
+        4,
+    )
+
+    details = {
+        "cyclomatic_complexity": complexity,
+        "total_lines": total_lines,
+        "function_count": func_count,
+        "max_function_length": max_func_length,
+        "complexity_score": round(complexity_score, 4),
+        "length_score": round(length_score, 4),
+        "func_count_score": round(func_count_score, 4),
+        "max_func_score": round(max_func_score, 4),
+    }
+    return score, details
@@ -8,6 +8,7 @@ import re
 from collections import deque
 
 from taskbrew.intelligence._utils import utcnow, new_id, validate_path, clamp, safe_read_text
+from taskbrew.intelligence.embeddings import EmbeddingStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,15 @@ class CodeReasoningManager:
     def __init__(self, db, project_dir: str = ".") -> None:
         self._db = db
         self._project_dir = project_dir
+        self._semantic = EmbeddingStore(
+            db,
+            "semantic_index",
+            text_columns=("function_name", "intent_description", "keywords"),
+            result_columns=(
+                "file_path", "function_name", "intent_description", "keywords", "created_at",
+            ),
+            changed_column="created_at",
+        )
 
     # ------------------------------------------------------------------
     # Schema bootstrap
@@ -31,7 +41,8 @@ class CodeReasoningManager:
                 function_name TEXT NOT NULL,
                 intent_description TEXT NOT NULL,
                 keywords TEXT,
-                created_at TEXT NOT NULL
+                created_at TEXT NOT NULL,
+                embedding BLOB
             );
             CREATE TABLE IF NOT EXISTS dependency_graph (
                 id TEXT PRIMARY KEY,
@@ -124,11 +135,16 @@ class CodeReasoningManager:
 
         now = utcnow()
         item_id = f"SI-{new_id(8)}"
+        embedding = self._semantic.embed_row(item_id, {
+            "function_name": function_name,
+            "intent_description": intent_description,
+            "keywords": keywords_str,
+        })
         await self._db.execute(
             "INSERT INTO semantic_index "
-            "(id, file_path, function_name, intent_description, keywords, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (item_id, file_path, function_name, intent_description, keywords_str, now),
+            "(id, file_path, function_name, intent_description, keywords, created_at, embedding) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (item_id, file_path, function_name, intent_description, keywords_str, now, embedding),
         )
         return {
             "id": item_id,
@@ -140,37 +156,14 @@ class CodeReasoningManager:
         }
 
     async def search_by_intent(self, query: str, limit: int = 10) -> list[dict]:
-        """Keyword match on intent_description and keywords.
+        """Rank indexed intents by semantic similarity to *query*.
 
-        audit 07a F#5: tokens are joined with AND, not OR, so every
-        supplied word must appear. LIKE wildcards are escaped.
+        Hybrid of cosine similarity over the stored hashed TF-IDF
+        vectors and keyword coverage of intent_description/keywords;
+        each result carries a ``score``, best first. Rows written before
+        embeddings existed are back-filled on the first search.
         """
-        tokens = [t.strip().lower() for t in query.split() if t.strip()]
-        if not tokens:
-            return []
-
-        def _escape(s: str) -> str:
-            return (
-                s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-            )
-
-        conditions = []
-        params: list = []
-        for token in tokens:
-            esc = _escape(token)
-            conditions.append(
-                "(LOWER(intent_description) LIKE ? ESCAPE '\\' OR "
-                "LOWER(keywords) LIKE ? ESCAPE '\\')"
-            )
-            params.extend([f"%{esc}%", f"%{esc}%"])
-
-        where = " AND ".join(conditions)
-        params.append(limit)
-        return await self._db.execute_fetchall(
-            f"SELECT * FROM semantic_index WHERE {where} "
-            "ORDER BY created_at DESC LIMIT ?",
-            tuple(params),
-        )
+        return await self._semantic.search(query, limit)
 
     async def get_index_stats(self) -> list[dict]:
         """Count of indexed items grouped by file."""
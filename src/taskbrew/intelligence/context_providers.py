@@ -2,14 +2,14 @@
 
 from __future__ import annotations
 
-import asyncio
 import json
 import logging
-import subprocess
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Protocol
 
+from taskbrew.tools.git_service import get_git_service
+
 logger = logging.getLogger(__name__)
 
 
@@ -92,39 +92,21 @@ class GitHistoryProvider:
         self._project_dir = project_dir
 
     async def gather(self, scope: str | None = None) -> str:
+        # Served through the shared GitService: the log is memoised by
+        # HEAD commit and the branch comes from the cached ref snapshot.
+        git = get_git_service(self._project_dir)
         try:
-            result = await asyncio.to_thread(
-                subprocess.run,
-                ["git", "log", "--oneline", "-20"],
-                cwd=self._project_dir,
-                capture_output=True, text=True, timeout=10,
-            )
-        except (FileNotFoundError, subprocess.TimeoutExpired, PermissionError) as exc:
+            log = await git.log(20, "%h %s")
+        except (FileNotFoundError, PermissionError, RuntimeError) as exc:
             logger.warning("GitHistoryProvider: git log failed (%s)", exc)
             return ""
-        if result.returncode != 0:
-            logger.warning(
-                "GitHistoryProvider: git log exit=%s stderr=%r",
-                result.returncode, result.stderr.strip()[:200],
-            )
-            return ""
 
         try:
-            branch_result = await asyncio.to_thread(
-                subprocess.run,
-                ["git", "branch", "--show-current"],
-                cwd=self._project_dir,
-                capture_output=True, text=True, timeout=5,
-            )
-            branch = (
-                branch_result.stdout.strip()
-                if branch_result.returncode == 0
-                else "unknown"
-            )
-        except (FileNotFoundError, subprocess.TimeoutExpired, PermissionError):
+            branch = await git.current_branch() or "unknown"
+        except (FileNotFoundError, PermissionError, RuntimeError):
             branch = "unknown"
 
-        return f"## Git Context\nBranch: {branch}\n\nRecent commits:\n{result.stdout.strip()}"
+        return f"## Git Context\nBranch: {branch}\n\nRecent commits:\n{log.strip()}"
 
 
 class CoverageContextProvider:
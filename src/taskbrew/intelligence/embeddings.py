@@ -0,0 +1,407 @@
+"""Offline text embeddings and an in-memory vector index for code search.
+
+``code_embeddings.embedding`` used to be always NULL and both
+``search_by_intent`` implementations fell back to AND-ed ``LIKE`` scans
+over the whole table. This module supplies the missing pieces, with no
+network access and no model download:
+
+- :func:`embed_text` turns text into a hashed bag of features -- words
+  (identifiers are split on ``snake_case`` / ``camelCase``) plus
+  character trigrams, so ``auth`` still lands near ``authenticate`` --
+  with sublinear term frequency. Vectors are stored as compact float32
+  blobs (:func:`encode_embedding`).
+- :class:`VectorIndex` holds the vectors as one matrix, applies IDF
+  weights computed from the indexed corpus, and answers cosine top-k
+  with a single vectorised dot product. Past ``ivf_threshold`` rows it
+  partitions the matrix with spherical k-means (IVF) and only scores the
+  closest partitions.
+- :class:`EmbeddingStore` binds an index to a table with an
+  ``embedding`` BLOB column and blends the cosine score with a keyword
+  match for the final ranking.
+
+NumPy is optional (``pip install taskbrew[numpy]``) and used when
+installed. Without it the index scores its sparse vectors in pure
+Python with IDF weights taken from running document frequencies, so
+adding a row never triggers a rebuild; that is fine for a few thousand
+symbols.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import re
+import sys
+import zlib
+from array import array
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    np = None
+    _HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 512
+
+# How far back an index re-reads rows another process changed, to cover
+# writes stamped just before our last sync but committed after it.
+_SYNC_SLACK = timedelta(seconds=30)
+
+# Character trigrams add recall for partial words but should not outvote
+# a whole-word match.
+_NGRAM_WEIGHT = 0.35
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "the", "this", "that", "to", "with", "self",
+})
+
+
+# ---------------------------------------------------------------------------
+# Featurisation
+# ---------------------------------------------------------------------------
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased words of *text*, with identifiers split into parts."""
+    tokens: list[str] = []
+    for chunk in _WORD_RE.findall(text or ""):
+        for part in _CAMEL_RE.findall(chunk):
+            word = part.lower()
+            if len(word) > 1 and word not in _STOPWORDS:
+                tokens.append(word)
+    return tokens
+
+
+def _bucket(feature: str, dim: int) -> int:
+    # crc32 rather than hash(): the bucket must be stable across
+    # processes because vectors are persisted.
+    return zlib.crc32(feature.encode("utf-8")) % dim
+
+
+def embed_text(text: str, dim: int = EMBEDDING_DIM) -> list[float]:
+    """Return the hashed term-frequency vector for *text* (not normalised).
+
+    IDF weighting and normalisation happen in :class:`VectorIndex`, so a
+    stored vector does not depend on the rest of the corpus.
+    """
+    counts: dict[int, float] = {}
+    words = tokenize(text)
+    for word in words:
+        b = _bucket("w:" + word, dim)
+        counts[b] = counts.get(b, 0.0) + 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            b = _bucket("g:" + padded[i:i + 3], dim)
+            counts[b] = counts.get(b, 0.0) + _NGRAM_WEIGHT
+    vector = [0.0] * dim
+    for b, c in counts.items():
+        # Sublinear tf: 1 + log(tf), scaled so trigram-only buckets stay small.
+        vector[b] = 1.0 + math.log(c) if c >= 1.0 else c
+    return vector
+
+
+def encode_embedding(vector: Sequence[float]) -> bytes:
+    """Pack *vector* as little-endian float32 bytes."""
+    packed = array("f", vector)
+    if sys.byteorder == "big":  # pragma: no cover
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode_embedding(blob: bytes | None, dim: int = EMBEDDING_DIM) -> array | None:
+    """Unpack a stored blob, or ``None`` if it is missing or the wrong size."""
+    if not blob or len(blob) != dim * 4:
+        return None
+    vector = array("f")
+    vector.frombytes(blob)
+    if sys.byteorder == "big":  # pragma: no cover
+        vector.byteswap()
+    return vector
+
+
+# ---------------------------------------------------------------------------
+# Vector index
+# ---------------------------------------------------------------------------
+
+
+class VectorIndex:
+    """Cosine top-k over TF-IDF weighted hashed vectors.
+
+    Vectors are kept sparse, with per-dimension document frequencies
+    updated on every add and remove. With NumPy the weighted, normalised
+    matrix (and the IVF partitions, for large indexes) is rebuilt lazily
+    on the next search after a change; the pure-Python scorer weights
+    rows at query time and needs no build.
+    """
+
+    def __init__(
+        self,
+        dim: int = EMBEDDING_DIM,
+        *,
+        ivf_threshold: int = 20_000,
+        nprobe: int = 8,
+    ) -> None:
+        self.dim = dim
+        self._ivf_threshold = ivf_threshold
+        self._nprobe = nprobe
+        self._vectors: dict[str, dict[int, float]] = {}
+        self._df = [0] * dim
+        self._dirty = True
+        # Built state
+        self._keys: list[str] = []
+        self._idf = None
+        self._matrix = None  # numpy (n, dim)
+        self._centroids = None
+        self._lists: list = []
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._vectors
+
+    def add(self, key: str, vector: Sequence[float]) -> None:
+        if len(vector) != self.dim:
+            raise ValueError(f"Expected a {self.dim}-dim vector, got {len(vector)}")
+        self.remove(key)
+        sparse = {j: float(v) for j, v in enumerate(vector) if v}
+        for j in sparse:
+            self._df[j] += 1
+        self._vectors[key] = sparse
+        self._dirty = True
+
+    def remove(self, key: str) -> None:
+        sparse = self._vectors.pop(key, None)
+        if sparse is not None:
+            for j in sparse:
+                self._df[j] -= 1
+            self._dirty = True
+
+    def search(self, query: Sequence[float], k: int = 10) -> list[tuple[str, float]]:
+        """Return up to *k* ``(key, cosine)`` pairs with cosine > 0, best first."""
+        if not self._vectors or k <= 0:
+            return []
+        if not _HAS_NUMPY:
+            return self._search_python(query, k)
+        if self._dirty:
+            self._build()
+        return self._search_numpy(query, k)
+
+    # -- build ---------------------------------------------------------
+
+    def _build(self) -> None:
+        self._keys = list(self._vectors)
+        n = len(self._keys)
+        raw = np.zeros((n, self.dim), dtype=np.float32)
+        for i, key in enumerate(self._keys):
+            sparse = self._vectors[key]
+            raw[i, list(sparse)] = list(sparse.values())
+        df = np.asarray(self._df, dtype=np.float32)
+        idf = (np.log((1.0 + n) / (1.0 + df)) + 1.0).astype(np.float32)
+        weighted = raw * idf
+        norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._matrix = weighted / norms
+        self._idf = idf
+        if n >= self._ivf_threshold:
+            self._build_ivf()
+        else:
+            self._centroids = None
+            self._lists = []
+        self._dirty = False
+
+    def _build_ivf(self, iterations: int = 8) -> None:
+        """Spherical k-means over the normalised rows (sqrt(n) lists)."""
+        matrix = self._matrix
+        n = matrix.shape[0]
+        nlist = max(1, int(math.sqrt(n)))
+        rng = np.random.default_rng(0)
+        centroids = matrix[rng.choice(n, size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(matrix @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = matrix[assign == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm:
+                        centroids[c] = centroid / norm
+        assign = np.argmax(matrix @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assign == c) for c in range(nlist)]
+
+    # -- query ---------------------------------------------------------
+
+    def _search_numpy(self, query: Sequence[float], k: int) -> list[tuple[str, float]]:
+        q = np.asarray(query, dtype=np.float32) * self._idf
+        norm = np.linalg.norm(q)
+        if not norm:
+            return []
+        q /= norm
+        if self._centroids is not None:
+            probe = np.argsort(self._centroids @ q)[::-1][: self._nprobe]
+            rows = np.concatenate([self._lists[c] for c in probe])
+            scores = self._matrix[rows] @ q
+        else:
+            rows = None
+            scores = self._matrix @ q
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for i in top:
+            score = float(scores[i])
+            if score <= 0:
+                break
+            row = int(rows[i]) if rows is not None else int(i)
+            results.append((self._keys[row], score))
+        return results
+
+    def _search_python(self, query: Sequence[float], k: int) -> list[tuple[str, float]]:
+        n = len(self._vectors)
+        idf = [math.log((1.0 + n) / (1.0 + d)) + 1.0 for d in self._df]
+        q = {j: v * idf[j] for j, v in enumerate(query) if v}
+        norm = math.sqrt(sum(w * w for w in q.values()))
+        if not norm:
+            return []
+        scored = []
+        for key, row in self._vectors.items():
+            dot = sum(w * row[j] * idf[j] for j, w in q.items() if j in row)
+            if dot <= 0:
+                continue
+            # Only rows sharing a feature with the query pay for a norm.
+            row_norm = math.sqrt(sum((v * idf[j]) ** 2 for j, v in row.items()))
+            scored.append((dot / (norm * row_norm), key))
+        scored.sort(reverse=True)
+        return [(key, score) for score, key in scored[:k]]
+
+
+# ---------------------------------------------------------------------------
+# Table binding
+# ---------------------------------------------------------------------------
+
+
+class EmbeddingStore:
+    """A :class:`VectorIndex` over the rows of one table.
+
+    The table needs an ``id`` primary key and an ``embedding`` BLOB
+    column; *text_columns* are concatenated to form each row's text.
+    The index is loaded on first search; rows without an embedding (or
+    with one from a different dimension) are embedded and back-filled
+    then. Writers call :meth:`embed_row` so the index stays current
+    without a reload. With *changed_column* (an ISO timestamp set on
+    every write) each search also picks up rows that other processes,
+    such as agent workers, wrote since the last one.
+    """
+
+    def __init__(
+        self,
+        db,
+        table: str,
+        *,
+        text_columns: Iterable[str],
+        result_columns: Iterable[str],
+        keyword_weight: float = 0.3,
+        dim: int = EMBEDDING_DIM,
+        changed_column: str | None = None,
+    ) -> None:
+        self._db = db
+        self._table = table
+        self._text_columns = tuple(text_columns)
+        self._result_columns = tuple(result_columns)
+        self._keyword_weight = keyword_weight
+        self._dim = dim
+        self._changed_column = changed_column
+        self._index = VectorIndex(dim)
+        self._loaded = False
+        self._synced_at: str | None = None
+
+    def text_for(self, row: dict) -> str:
+        return " ".join(str(row.get(col) or "") for col in self._text_columns)
+
+    def embed_row(self, row_id: str, row: dict) -> bytes:
+        """Embed *row*, add it to the loaded index and return the blob to store."""
+        vector = embed_text(self.text_for(row), self._dim)
+        if self._loaded:
+            self._index.add(row_id, vector)
+        return encode_embedding(vector)
+
+    async def load(self) -> None:
+        await self._add_rows()
+        self._loaded = True
+
+    async def _add_rows(self, since: str | None = None) -> None:
+        """Index every row, or those whose *changed_column* is >= *since*."""
+        started = datetime.now(timezone.utc)
+        cols = ", ".join(("id", "embedding", *self._text_columns))
+        sql = f"SELECT {cols} FROM {self._table}"
+        params: tuple = ()
+        if since is not None:
+            sql += f" WHERE {self._changed_column} >= ?"
+            params = (since,)
+        rows = await self._db.execute_fetchall(sql, params)
+        backfill = []
+        for row in rows:
+            vector = decode_embedding(row["embedding"], self._dim)
+            if vector is None:
+                vector = embed_text(self.text_for(row), self._dim)
+                backfill.append((encode_embedding(vector), row["id"]))
+            self._index.add(row["id"], vector)
+        if backfill:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
+                    f"UPDATE {self._table} SET embedding = ? WHERE id = ?", backfill
+                )
+            logger.info("Back-filled %d embeddings in %s", len(backfill), self._table)
+        if self._changed_column:
+            self._synced_at = (started - _SYNC_SLACK).isoformat()
+
+    async def search(self, query: str, limit: int = 10) -> list[dict]:
+        """Hybrid search: cosine similarity blended with keyword coverage.
+
+        Each result row carries a ``score`` in [0, 1]. Keyword coverage is
+        the share of query words found (as substrings) in the row's text,
+        so rows matching every word -- what the old AND-ed ``LIKE`` scan
+        returned -- still rank first among equally similar rows.
+        """
+        words = [w.strip().lower() for w in query.split() if w.strip()]
+        if not words or limit <= 0:
+            return []
+        if not self._loaded:
+            await self.load()
+        elif self._changed_column:
+            await self._add_rows(self._synced_at)
+
+        candidates = self._index.search(embed_text(query, self._dim), k=max(limit * 4, 20))
+        if not candidates:
+            return []
+        similarity = dict(candidates)
+        placeholders = ",".join("?" for _ in candidates)
+        select = ", ".join(dict.fromkeys(("id", *self._result_columns, *self._text_columns)))
+        rows = await self._db.execute_fetchall(
+            f"SELECT {select} FROM {self._table} WHERE id IN ({placeholders})",
+            tuple(similarity),
+        )
+
+        w = self._keyword_weight
+        results = []
+        for row in rows:
+            text = self.text_for(row).lower()
+            coverage = sum(1 for word in words if word in text) / len(words)
+            score = (1.0 - w) * similarity[row["id"]] + w * coverage
+            result = {col: row[col] for col in ("id", *self._result_columns)}
+            result["score"] = round(score, 4)
+            results.append(result)
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return results[:limit]
@@ -7,6 +7,8 @@ from datetime import datetime, timezone, timedelta
 
 logger = logging.getLogger(__name__)
 
+_TASK_ESCALATIONS_SQL = "SELECT * FROM escalations WHERE task_id = ? ORDER BY created_at DESC"
+
 
 class EscalationManager:
     """Detect stuck tasks and manage escalation workflows."""
@@ -84,6 +86,6 @@ class EscalationManager:
     async def get_escalations_for_task(self, task_id: str) -> list[dict]:
         """Get all escalations for a specific task."""
         return await self._db.execute_fetchall(
-            "SELECT * FROM escalations WHERE task_id = ? ORDER BY created_at DESC",
+            _TASK_ESCALATIONS_SQL,
             (task_id,),
         )
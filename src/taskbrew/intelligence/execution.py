@@ -8,6 +8,11 @@ from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+_TASK_EVENTS_SQL = "SELECT * FROM events WHERE task_id = ? ORDER BY created_at DESC LIMIT 20"
+_TASK_QUALITY_SCORES_SQL = (
+    "SELECT * FROM quality_scores WHERE task_id = ? ORDER BY created_at DESC"
+)
+
 
 class CommitPlanner:
     """Plan atomic multi-file commits from task output."""
@@ -78,7 +83,7 @@ class DebuggingHelper:
 
         # Get related events
         events = await self._db.execute_fetchall(
-            "SELECT * FROM events WHERE task_id = ? ORDER BY created_at DESC LIMIT 20",
+            _TASK_EVENTS_SQL,
             (task_id,),
         )
 
@@ -90,7 +95,7 @@ class DebuggingHelper:
 
         # Get quality scores
         scores = await self._db.execute_fetchall(
-            "SELECT * FROM quality_scores WHERE task_id = ? ORDER BY created_at DESC",
+            _TASK_QUALITY_SCORES_SQL,
             (task_id,),
         )
 
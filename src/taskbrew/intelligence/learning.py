@@ -4,13 +4,13 @@ from __future__ import annotations
 
 import json
 import logging
-import os
 import re
 import uuid
 from collections import Counter
 from datetime import datetime, timezone
 
 from ._utils import validate_path
+from .analysis_engine import SourceFile, get_analysis_engine, register_visitor
 
 logger = logging.getLogger(__name__)
 
@@ -18,9 +18,10 @@ logger = logging.getLogger(__name__)
 class LearningManager:
     """Track learning signals and adapt agent behaviour over time."""
 
-    def __init__(self, db, memory_manager=None) -> None:
+    def __init__(self, db, memory_manager=None, *, engine=None) -> None:
         self._db = db
         self._memory_manager = memory_manager
+        self._engine = engine or get_analysis_engine()
 
     # ------------------------------------------------------------------
     # Feature 13: Prompt A/B Testing
@@ -284,44 +285,13 @@ class LearningManager:
 
         conventions: dict[tuple[str, str], dict] = {}
 
-        for root, _dirs, files in os.walk(directory):
-            for fname in files:
-                if not fname.endswith(".py"):
-                    continue
-                fpath = os.path.join(root, fname)
-                try:
-                    with open(fpath, encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-                except OSError as exc:
-                    logger.warning("Cannot read %s: %s", fpath, exc)
-                    continue
-
-                # Detect snake_case function names
-                func_names = re.findall(r'def\s+([a-z_][a-z0-9_]*)\s*\(', content)
-                for name in func_names:
-                    key = ("function_naming", "snake_case")
-                    entry = conventions.setdefault(key, {"count": 0, "examples": []})
-                    entry["count"] += 1
-                    if len(entry["examples"]) < 3:
-                        entry["examples"].append(name)
-
-                # Detect CamelCase class names
-                class_names = re.findall(r'class\s+([A-Z][a-zA-Z0-9]*)', content)
-                for name in class_names:
-                    key = ("class_naming", "CamelCase")
-                    entry = conventions.setdefault(key, {"count": 0, "examples": []})
-                    entry["count"] += 1
-                    if len(entry["examples"]) < 3:
-                        entry["examples"].append(name)
-
-                # Detect UPPER_CASE constants
-                constant_names = re.findall(r'^([A-Z][A-Z0-9_]+)\s*=', content, re.MULTILINE)
-                for name in constant_names:
-                    key = ("constant_naming", "UPPER_CASE")
-                    entry = conventions.setdefault(key, {"count": 0, "examples": []})
-                    entry["count"] += 1
-                    if len(entry["examples"]) < 3:
-                        entry["examples"].append(name)
+        for analysis in await self._engine.scan(directory, ["conventions"]):
+            for conv_type, pattern, count, examples in analysis.results["conventions"]:
+                entry = conventions.setdefault(
+                    (conv_type, pattern), {"count": 0, "examples": []}
+                )
+                entry["count"] += count
+                entry["examples"].extend(examples[: 3 - len(entry["examples"])])
 
         results: list[dict] = []
         for (conv_type, pattern), data in conventions.items():
@@ -391,29 +361,35 @@ class LearningManager:
         for word, count in word_counter.most_common(10):
             if count < 2:
                 continue
-            cluster_name = f"error-{word}"
-            prevention_hint = f"Address recurring '{word}' issues by reviewing related patterns before implementation."
-
-            await self._db.execute(
-                "INSERT INTO error_clusters (id, cluster_name, root_cause, error_pattern, "
-                "occurrence_count, last_seen, prevention_hint) VALUES (?, ?, ?, ?, ?, ?, ?) "
-                "ON CONFLICT(cluster_name) DO UPDATE SET "
-                "occurrence_count = ?, last_seen = ?, prevention_hint = ?",
-                (
-                    f"EC-{uuid.uuid4().hex[:8]}",
-                    cluster_name, word, word, count, now, prevention_hint,
-                    count, now, prevention_hint,
-                ),
-            )
-
             clusters.append({
-                "cluster_name": cluster_name,
+                "cluster_name": f"error-{word}",
                 "root_cause": word,
                 "error_pattern": word,
                 "occurrence_count": count,
-                "prevention_hint": prevention_hint,
+                "prevention_hint": (
+                    f"Address recurring '{word}' issues by reviewing related "
+                    f"patterns before implementation."
+                ),
             })
+        if not clusters:
+            return []
 
+        async with self._db.transaction() as conn:
+            await conn.executemany(
+                "INSERT INTO error_clusters (id, cluster_name, root_cause, error_pattern, "
+                "occurrence_count, last_seen, prevention_hint) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(cluster_name) DO UPDATE SET "
+                "occurrence_count = excluded.occurrence_count, "
+                "last_seen = excluded.last_seen, "
+                "prevention_hint = excluded.prevention_hint",
+                [
+                    (
+                        f"EC-{uuid.uuid4().hex[:8]}", c["cluster_name"], c["root_cause"],
+                        c["error_pattern"], c["occurrence_count"], now, c["prevention_hint"],
+                    )
+                    for c in clusters
+                ],
+            )
         return clusters
 
     async def get_prevention_hints(self, error_pattern: str) -> list[dict]:
@@ -428,3 +404,28 @@ class LearningManager:
             "WHERE error_pattern LIKE ? ESCAPE '\\'",
             (f"%{esc}%",),
         )
+
+
+# ---------------------------------------------------------------------------
+# Analysis-engine visitors (run in the engine's process pool)
+# ---------------------------------------------------------------------------
+
+_CONVENTION_PATTERNS = [
+    # Detect snake_case function names
+    ("function_naming", "snake_case", re.compile(r'def\s+([a-z_][a-z0-9_]*)\s*\(')),
+    # Detect CamelCase class names
+    ("class_naming", "CamelCase", re.compile(r'class\s+([A-Z][a-zA-Z0-9]*)')),
+    # Detect UPPER_CASE constants
+    ("constant_naming", "UPPER_CASE", re.compile(r'^([A-Z][A-Z0-9_]+)\s*=', re.MULTILINE)),
+]
+
+
+@register_visitor("conventions", needs_ast=False)
+def _conventions_visitor(src: SourceFile) -> list[tuple[str, str, int, list[str]]]:
+    """``(convention_type, pattern, count, first_examples)`` per naming convention."""
+    found = []
+    for conv_type, pattern, regex in _CONVENTION_PATTERNS:
+        names = regex.findall(src.source)
+        if names:
+            found.append((conv_type, pattern, len(names), names[:3]))
+    return found
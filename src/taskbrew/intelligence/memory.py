@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
+import time
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
@@ -27,8 +28,21 @@ class MemoryManager:
     - preference: Project-specific knowledge
     """
 
-    def __init__(self, db) -> None:
+    def __init__(self, db, *, recall_cache_ttl: float = 0.0) -> None:
         self._db = db
+        # Optional short-lived cache for :meth:`recall`, keyed by the full
+        # query. Used by the orchestrator's shared instance, which answers
+        # every agent's recall_memory tool call. Writes through this
+        # manager invalidate it; other writers are bounded by the TTL.
+        self._recall_cache_ttl = recall_cache_ttl
+        self._recall_cache: dict[tuple, tuple[float, list[dict]]] = {}
+
+    def _invalidate_recall_cache(self, agent_role: str | None = None) -> None:
+        if agent_role is None:
+            self._recall_cache.clear()
+            return
+        for key in [k for k in self._recall_cache if k[0] == agent_role]:
+            del self._recall_cache[key]
 
     async def store_memory(
         self,
@@ -41,6 +55,7 @@ class MemoryManager:
         project_id: str | None = None,
     ) -> dict:
         """Store a new memory. Returns the created memory dict."""
+        self._invalidate_recall_cache(agent_role)
         now = datetime.now(timezone.utc).isoformat()
         tags_json = json.dumps(tags) if tags else None
         await self._db.execute(
@@ -68,8 +83,16 @@ class MemoryManager:
         """Recall memories matching a query. Uses LIKE search + relevance scoring.
 
         Updates access_count and last_accessed for returned memories.
-        Results ordered by relevance_score * recency.
+        Results ordered by relevance_score * recency.  With a
+        ``recall_cache_ttl`` repeated identical recalls inside the TTL are
+        answered from memory and counted as a single access.
         """
+        cache_key = (agent_role, query, memory_type, limit)
+        if self._recall_cache_ttl > 0:
+            cached = self._recall_cache.get(cache_key)
+            if cached is not None and cached[0] > time.monotonic():
+                return [dict(m) for m in cached[1]]
+
         conditions = ["agent_role = ?"]
         params: list = [agent_role]
 
@@ -109,6 +132,11 @@ class MemoryManager:
                 (now, *ids),
             )
 
+        if self._recall_cache_ttl > 0:
+            self._recall_cache[cache_key] = (
+                time.monotonic() + self._recall_cache_ttl,
+                [dict(m) for m in memories],
+            )
         return memories
 
     async def store_lesson(
@@ -208,24 +236,16 @@ class MemoryManager:
     async def decay_scores(self, age_days: int = 30) -> int:
         """Decay relevance scores for memories older than age_days. Returns count updated."""
         cutoff = datetime.now(timezone.utc).isoformat()
-        result = await self._db.execute_fetchall(
-            "SELECT id, relevance_score FROM agent_memories WHERE last_accessed < date(?, '-' || ? || ' days')",
-            (cutoff, str(age_days)),
-        )
-        if not result:
-            return 0
-        # Batch update: group by new_score to minimize queries
-        score_updates: dict[float, list[int]] = {}
-        for row in result:
-            new_score = max(0.1, round(row["relevance_score"] * 0.9, 10))
-            score_updates.setdefault(new_score, []).append(row["id"])
-        for new_score, ids in score_updates.items():
-            placeholders = ",".join(["?" for _ in ids])
-            await self._db.execute(
-                f"UPDATE agent_memories SET relevance_score = ? WHERE id IN ({placeholders})",
-                (new_score, *ids),
+        async with self._db.transaction() as conn:
+            cursor = await conn.execute(
+                "UPDATE agent_memories "
+                "SET relevance_score = MAX(0.1, ROUND(relevance_score * 0.9, 10)) "
+                "WHERE last_accessed < date(?, '-' || ? || ' days')",
+                (cutoff, str(age_days)),
             )
-        return len(result)
+        if cursor.rowcount:
+            self._invalidate_recall_cache()
+        return cursor.rowcount
 
     async def get_memories(self, agent_role: str | None = None, memory_type: str | None = None, limit: int = 50) -> list[dict]:
         """List memories with optional filters."""
@@ -246,4 +266,5 @@ class MemoryManager:
 
     async def delete_memory(self, memory_id: int) -> None:
         """Delete a memory by ID."""
+        self._invalidate_recall_cache()
         await self._db.execute("DELETE FROM agent_memories WHERE id = ?", (memory_id,))
@@ -9,6 +9,13 @@ from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+_HISTORY_BY_TYPE_SQL = (
+    "SELECT AVG(cost_usd) as avg_cost, AVG(duration_api_ms) as avg_duration, "
+    "AVG(num_turns) as avg_turns, COUNT(*) as sample_size "
+    "FROM task_usage tu JOIN tasks t ON tu.task_id = t.id "
+    "WHERE t.task_type = ?"
+)
+
 
 class PlanningManager:
     """Manage task planning: decomposition, estimation, risk, alternatives, and rollback."""
@@ -110,10 +117,7 @@ class PlanningManager:
 
         # Historical averages from task_usage
         historical = await self._db.execute_fetchone(
-            "SELECT AVG(cost_usd) as avg_cost, AVG(duration_api_ms) as avg_duration, "
-            "AVG(num_turns) as avg_turns, COUNT(*) as sample_size "
-            "FROM task_usage tu JOIN tasks t ON tu.task_id = t.id "
-            "WHERE t.task_type = ?",
+            _HISTORY_BY_TYPE_SQL,
             (task_type,),
         )
 
@@ -227,23 +227,20 @@ class ProcessIntelligenceManager:
         )
 
     async def refresh_scores(self) -> dict:
-        """Recalculate all risk scores from stored metrics. Returns count updated."""
-        rows = await self._db.execute_fetchall(
-            "SELECT * FROM risk_scores",
-        )
-        count = 0
-        now = utcnow()
-        for row in rows:
-            coverage_fraction = clamp(row["test_coverage_pct"] / 100.0)
-            new_risk = round(
-                row["change_frequency"] * row["complexity_score"] * (1.0 - coverage_fraction), 4
-            )
-            await self._db.execute(
-                "UPDATE risk_scores SET risk_score = ?, updated_at = ? WHERE id = ?",
-                (new_risk, now, row["id"]),
+        """Recalculate all risk scores from stored metrics. Returns count updated.
+
+        One set-based UPDATE in one transaction; the expression mirrors
+        :meth:`score_file` (coverage clamped to [0, 100]).
+        """
+        async with self._db.transaction() as conn:
+            cursor = await conn.execute(
+                "UPDATE risk_scores SET "
+                "risk_score = ROUND(change_frequency * complexity_score * "
+                "(1.0 - MIN(MAX(test_coverage_pct / 100.0, 0.0), 1.0)), 4), "
+                "updated_at = ?",
+                (utcnow(),),
             )
-            count += 1
-        return {"updated": count}
+        return {"updated": cursor.rowcount}
 
     # ------------------------------------------------------------------
     # Feature 41: Process Bottleneck Miner
@@ -18,6 +18,7 @@ import re
 from pathlib import Path
 
 from ._utils import utcnow as _utcnow, new_id as _new_id, validate_path, safe_read_text
+from .analysis_engine import SourceFile, get_analysis_engine, register_visitor
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +118,44 @@ _SECRET_PATTERNS = [
 # File extensions to scan for secrets
 _SCANNABLE_EXTENSIONS = {".py", ".yaml", ".yml", ".json", ".env"}
 
+# SAST rules: (finding_type, pattern, description, severity, file suffixes
+# the rule is limited to or None for any file).
+_SAST_RULES = [
+    (
+        # SQL injection: string formatting in execute() calls
+        "sql_injection",
+        re.compile(r"""(?:execute|query|cursor)\s*\(.*(?:f['"]|%s|%d|\.format\(|\+\s*\w)"""),
+        "Possible SQL injection via string formatting in execute() call",
+        "high",
+        None,
+    ),
+    (
+        # XSS: unescaped user input in HTML (innerHTML, document.write, etc.)
+        "xss",
+        re.compile(r"innerHTML\s*=|document\.write\s*\("),
+        "Possible XSS via unescaped user input in HTML",
+        "high",
+        (".html", ".js"),
+    ),
+    (
+        # Path traversal: os.path.join with user input without sanitization
+        "path_traversal",
+        re.compile(r"os\.path\.join\s*\(.*(?:user_input|request|args|params)"),
+        "Possible path traversal via os.path.join with user input",
+        "high",
+        None,
+    ),
+    (
+        # Command injection: os.system() or subprocess with shell=True
+        "command_injection",
+        re.compile(r"os\.system\s*\(|subprocess\.call\s*\(.*shell\s*=\s*True"),
+        "Possible command injection via os.system() or subprocess with shell=True",
+        "critical",
+        None,
+    ),
+]
+_SAST_RULE_INFO = {rule[0]: (rule[2], rule[3]) for rule in _SAST_RULES}
+
 # Security-sensitive path/content keywords
 _SECURITY_KEYWORDS = ["auth", "security", "crypto", "password", "token", "secret", "api_key"]
 
@@ -133,9 +172,11 @@ class SecurityIntelManager:
         project_dir: str = ".",
         *,
         max_scan_file_size: int | None = None,
+        engine=None,
     ) -> None:
         self._db = db
         self._project_dir = project_dir
+        self._engine = engine or get_analysis_engine()
         if max_scan_file_size is not None:
             self.MAX_SCAN_FILE_SIZE = max_scan_file_size
 
@@ -397,68 +438,70 @@ class SecurityIntelManager:
         file_path = validate_path(file_path)
         full_path = os.path.join(self._project_dir, file_path)
 
-        try:
-            if os.path.getsize(full_path) > self.MAX_SCAN_FILE_SIZE:
-                logger.info("Skipping %s: file exceeds %d byte size limit", file_path, self.MAX_SCAN_FILE_SIZE)
-                return []
-            with open(full_path) as f:
-                lines = f.readlines()
-        except (FileNotFoundError, OSError) as exc:
-            logger.warning("Cannot read %s: %s", file_path, exc)
+        analysis = await self._engine.analyze_file(
+            full_path, "secrets", max_bytes=self.MAX_SCAN_FILE_SIZE
+        )
+        if analysis is None:
+            logger.warning("Cannot read %s: missing, symlinked or oversized", file_path)
             return []
-
-        now = _utcnow()
-        detections: list[dict] = []
-
-        for line_no, line in enumerate(lines, start=1):
-            for secret_type, pattern in _SECRET_PATTERNS:
-                match = pattern.search(line)
-                if match:
-                    rec_id = _new_id()
-                    detection = {
-                        "id": rec_id,
-                        "file_path": file_path,
-                        "line_number": line_no,
-                        "secret_type": secret_type,
-                        "pattern_matched": match.group(0)[:80],
-                        "severity": "critical",
-                        "detected_at": now,
-                    }
-                    await self._db.execute(
-                        "INSERT INTO secret_detections "
-                        "(id, file_path, line_number, secret_type, pattern_matched, severity, detected_at) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            rec_id,
-                            file_path,
-                            line_no,
-                            secret_type,
-                            match.group(0)[:80],
-                            "critical",
-                            now,
-                        ),
-                    )
-                    detections.append(detection)
-
-        return detections
+        return await self._record_secrets([(file_path, analysis.results["secrets"])])
 
     async def scan_directory(self, directory: str = ".") -> list[dict]:
         """Scan all .py, .yaml, .yml, .json, .env files in a directory."""
         await self.ensure_tables()
         directory = validate_path(directory)
         dir_path = Path(self._project_dir) / directory
-        all_detections: list[dict] = []
 
         if not dir_path.exists():
             return []
 
-        for ext in _SCANNABLE_EXTENSIONS:
-            for found_file in dir_path.rglob(f"*{ext}"):
-                rel = str(found_file.relative_to(self._project_dir))
-                detections = await self.scan_for_secrets(rel)
-                all_detections.extend(detections)
+        analyses = await self._engine.scan(
+            dir_path,
+            ["secrets"],
+            suffixes=_SCANNABLE_EXTENSIONS,
+            max_bytes=self.MAX_SCAN_FILE_SIZE,
+        )
+        return await self._record_secrets([
+            (
+                str(Path(analysis.path).relative_to(self._project_dir)),
+                analysis.results["secrets"],
+            )
+            for analysis in analyses
+        ])
 
-        return all_detections
+    async def _record_secrets(
+        self, per_file: list[tuple[str, list[tuple[int, str, str]]]]
+    ) -> list[dict]:
+        """Persist secret matches in one transaction and return the detections."""
+        now = _utcnow()
+        detections = [
+            {
+                "id": _new_id(),
+                "file_path": file_path,
+                "line_number": line_no,
+                "secret_type": secret_type,
+                "pattern_matched": matched,
+                "severity": "critical",
+                "detected_at": now,
+            }
+            for file_path, matches in per_file
+            for line_no, secret_type, matched in matches
+        ]
+        if detections:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
+                    "INSERT INTO secret_detections "
+                    "(id, file_path, line_number, secret_type, pattern_matched, severity, detected_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            d["id"], d["file_path"], d["line_number"], d["secret_type"],
+                            d["pattern_matched"], d["severity"], d["detected_at"],
+                        )
+                        for d in detections
+                    ],
+                )
+        return detections
 
     # ------------------------------------------------------------------
     # Feature 36: Static Analysis Security Testing (SAST)
@@ -479,149 +522,42 @@ class SecurityIntelManager:
         file_path = validate_path(file_path)
         full_path = os.path.join(self._project_dir, file_path)
 
-        try:
-            if os.path.getsize(full_path) > self.MAX_SCAN_FILE_SIZE:
-                logger.info("Skipping SAST for %s: file exceeds %d byte size limit", file_path, self.MAX_SCAN_FILE_SIZE)
-                return []
-            with open(full_path) as f:
-                content = f.read()
-                lines = content.splitlines()
-        except (FileNotFoundError, OSError) as exc:
-            logger.warning("Cannot read %s: %s", file_path, exc)
+        analysis = await self._engine.analyze_file(
+            full_path, "sast", max_bytes=self.MAX_SCAN_FILE_SIZE
+        )
+        if analysis is None:
+            logger.warning("Cannot read %s: missing, symlinked or oversized", file_path)
             return []
 
         now = _utcnow()
         findings: list[dict] = []
-
-        for line_no, line in enumerate(lines, start=1):
-            # SQL injection: string formatting in execute() calls
-            if re.search(
-                r"""(?:execute|query|cursor)\s*\(.*(?:f['"]|%s|%d|\.format\(|\+\s*\w)""",
-                line,
-            ):
-                rec_id = _new_id()
-                finding = {
-                    "id": rec_id,
-                    "file_path": file_path,
-                    "line_number": line_no,
-                    "finding_type": "sql_injection",
-                    "description": "Possible SQL injection via string formatting in execute() call",
-                    "severity": "high",
-                    "code_snippet": line.strip()[:200],
-                    "detected_at": now,
-                }
-                await self._db.execute(
+        for line_no, finding_type, snippet in analysis.results["sast"]:
+            description, severity = _SAST_RULE_INFO[finding_type]
+            findings.append({
+                "id": _new_id(),
+                "file_path": file_path,
+                "line_number": line_no,
+                "finding_type": finding_type,
+                "description": description,
+                "severity": severity,
+                "code_snippet": snippet,
+                "detected_at": now,
+            })
+
+        if findings:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
                     "INSERT INTO sast_findings "
                     "(id, file_path, line_number, finding_type, description, severity, code_snippet, detected_at) "
                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        rec_id,
-                        file_path,
-                        line_no,
-                        "sql_injection",
-                        finding["description"],
-                        "high",
-                        finding["code_snippet"],
-                        now,
-                    ),
-                )
-                findings.append(finding)
-
-            # XSS: unescaped user input in HTML (innerHTML, document.write, etc.)
-            if file_path.endswith((".html", ".js")) and re.search(
-                r"innerHTML\s*=|document\.write\s*\(", line
-            ):
-                rec_id = _new_id()
-                finding = {
-                    "id": rec_id,
-                    "file_path": file_path,
-                    "line_number": line_no,
-                    "finding_type": "xss",
-                    "description": "Possible XSS via unescaped user input in HTML",
-                    "severity": "high",
-                    "code_snippet": line.strip()[:200],
-                    "detected_at": now,
-                }
-                await self._db.execute(
-                    "INSERT INTO sast_findings "
-                    "(id, file_path, line_number, finding_type, description, severity, code_snippet, detected_at) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        rec_id,
-                        file_path,
-                        line_no,
-                        "xss",
-                        finding["description"],
-                        "high",
-                        finding["code_snippet"],
-                        now,
-                    ),
-                )
-                findings.append(finding)
-
-            # Path traversal: os.path.join with user input without sanitization
-            if re.search(
-                r"os\.path\.join\s*\(.*(?:user_input|request|args|params)", line
-            ):
-                rec_id = _new_id()
-                finding = {
-                    "id": rec_id,
-                    "file_path": file_path,
-                    "line_number": line_no,
-                    "finding_type": "path_traversal",
-                    "description": "Possible path traversal via os.path.join with user input",
-                    "severity": "high",
-                    "code_snippet": line.strip()[:200],
-                    "detected_at": now,
-                }
-                await self._db.execute(
-                    "INSERT INTO sast_findings "
-                    "(id, file_path, line_number, finding_type, description, severity, code_snippet, detected_at) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        rec_id,
-                        file_path,
-                        line_no,
-                        "path_traversal",
-                        finding["description"],
-                        "high",
-                        finding["code_snippet"],
-                        now,
-                    ),
-                )
-                findings.append(finding)
-
-            # Command injection: os.system() or subprocess with shell=True
-            if re.search(r"os\.system\s*\(", line) or re.search(
-                r"subprocess\.call\s*\(.*shell\s*=\s*True", line
-            ):
-                rec_id = _new_id()
-                finding = {
-                    "id": rec_id,
-                    "file_path": file_path,
-                    "line_number": line_no,
-                    "finding_type": "command_injection",
-                    "description": "Possible command injection via os.system() or subprocess with shell=True",
-                    "severity": "critical",
-                    "code_snippet": line.strip()[:200],
-                    "detected_at": now,
-                }
-                await self._db.execute(
-                    "INSERT INTO sast_findings "
-                    "(id, file_path, line_number, finding_type, description, severity, code_snippet, detected_at) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        rec_id,
-                        file_path,
-                        line_no,
-                        "command_injection",
-                        finding["description"],
-                        "critical",
-                        finding["code_snippet"],
-                        now,
-                    ),
+                    [
+                        (
+                            f["id"], f["file_path"], f["line_number"], f["finding_type"],
+                            f["description"], f["severity"], f["code_snippet"], f["detected_at"],
+                        )
+                        for f in findings
+                    ],
                 )
-                findings.append(finding)
 
         return findings
 
@@ -796,3 +732,38 @@ class SecurityIntelManager:
             f"SELECT * FROM security_flags {where} ORDER BY flagged_at DESC",
             tuple(params),
         )
+
+
+# ---------------------------------------------------------------------------
+# Analysis-engine visitors (run in the engine's process pool)
+# ---------------------------------------------------------------------------
+
+
+@register_visitor("secrets", suffixes=_SCANNABLE_EXTENSIONS, needs_ast=False)
+def _secrets_visitor(src: SourceFile) -> list[tuple[int, str, str]]:
+    """``(line_number, secret_type, matched_text)`` for each secret match."""
+    matches: list[tuple[int, str, str]] = []
+    for line_no, line in enumerate(src.lines, start=1):
+        for secret_type, pattern in _SECRET_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                matches.append((line_no, secret_type, match.group(0)[:80]))
+    return matches
+
+
+@register_visitor(
+    "sast", suffixes=_SCANNABLE_EXTENSIONS | {".html", ".js"}, needs_ast=False
+)
+def _sast_visitor(src: SourceFile) -> list[tuple[int, str, str]]:
+    """``(line_number, finding_type, code_snippet)`` for each SAST rule hit."""
+    rules = [
+        (finding_type, pattern)
+        for finding_type, pattern, _desc, _sev, only in _SAST_RULES
+        if only is None or src.name.endswith(only)
+    ]
+    findings: list[tuple[int, str, str]] = []
+    for line_no, line in enumerate(src.lines, start=1):
+        for finding_type, pattern in rules:
+            if pattern.search(line):
+                findings.append((line_no, finding_type, line.strip()[:200]))
+    return findings
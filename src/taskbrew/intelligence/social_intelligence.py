@@ -471,16 +471,15 @@ class SocialIntelligenceManager:
         cutoff = (now_dt - timedelta(hours=self._WORK_AREA_TTL_HOURS)).isoformat()
         # Reap stale rows on the active paths so the table cannot grow
         # unboundedly in long-lived orchestrators.
-        await self._db.execute(
-            "DELETE FROM work_areas WHERE reported_at < ?",
-            (cutoff,),
-        )
-        for fp in file_paths:
-            wid = f"WA-{new_id(8)}"
-            await self._db.execute(
+        async with self._db.transaction() as conn:
+            await conn.execute(
+                "DELETE FROM work_areas WHERE reported_at < ?",
+                (cutoff,),
+            )
+            await conn.executemany(
                 "INSERT INTO work_areas (id, agent_id, file_path, task_id, reported_at) "
                 "VALUES (?, ?, ?, ?, ?)",
-                (wid, agent_id, fp, task_id, now),
+                [(f"WA-{new_id(8)}", agent_id, fp, task_id, now) for fp in file_paths],
             )
         return {
             "agent_id": agent_id,
@@ -501,12 +500,15 @@ class SocialIntelligenceManager:
             datetime.now(timezone.utc)
             - timedelta(hours=self._WORK_AREA_TTL_HOURS)
         ).isoformat()
+        # One row per (agent pair, file); MIN() picks a stable task id
+        # when an agent reported the same file for several tasks.
         rows = await self._db.execute_fetchall(
             "SELECT w1.file_path, w1.agent_id AS agent_a, w2.agent_id AS agent_b, "
-            "w1.task_id AS task_a, w2.task_id AS task_b "
+            "MIN(w1.task_id) AS task_a, MIN(w2.task_id) AS task_b "
             "FROM work_areas w1 "
             "JOIN work_areas w2 ON w1.file_path = w2.file_path AND w1.agent_id < w2.agent_id "
             "WHERE w1.reported_at >= ? AND w2.reported_at >= ? "
+            "GROUP BY w1.file_path, w1.agent_id, w2.agent_id "
             "ORDER BY w1.file_path",
             (cutoff, cutoff),
         )
@@ -514,38 +516,30 @@ class SocialIntelligenceManager:
         if not rows:
             return []
 
+        # audit 09 F#8: dedup across calls -- skip pairs that already
+        # have an unresolved coordination_alert for the same file.
+        # Without this, detect_overlaps() re-fires on every poll and the
+        # UI floods with duplicate alerts for the same still-open
+        # overlap. One lookup for every candidate instead of one each.
+        open_alerts = await self._db.execute_fetchall(
+            "SELECT agent_ids, overlapping_files FROM coordination_alerts "
+            "WHERE resolved = 0 AND overlapping_files IN ("
+            "  SELECT file_path FROM work_areas WHERE reported_at >= ?"
+            ")",
+            (cutoff,),
+        )
+        existing = {(a["agent_ids"], a["overlapping_files"]) for a in open_alerts}
+
         now = utcnow()
         alerts = []
-        seen = set()
+        inserts = []
         for row in rows:
-            pair_key = (row["agent_a"], row["agent_b"], row["file_path"])
-            if pair_key in seen:
-                continue
-            seen.add(pair_key)
-
             agent_ids = json.dumps([row["agent_a"], row["agent_b"]])
-
-            # audit 09 F#8: dedup across calls -- skip if an
-            # unresolved coordination_alert already exists for the
-            # same (agent pair, file). Without this, detect_overlaps()
-            # re-fires on every poll and the UI floods with duplicate
-            # alerts for the same still-open overlap.
-            existing = await self._db.execute_fetchone(
-                "SELECT id FROM coordination_alerts "
-                "WHERE agent_ids = ? AND overlapping_files = ? AND resolved = 0",
-                (agent_ids, row["file_path"]),
-            )
-            if existing:
+            if (agent_ids, row["file_path"]) in existing:
                 continue
-
             alert_id = f"CA-{new_id(8)}"
             task_ids = json.dumps([row["task_a"], row["task_b"]])
-            await self._db.execute(
-                "INSERT INTO coordination_alerts "
-                "(id, agent_ids, overlapping_files, task_ids, created_at) "
-                "VALUES (?, ?, ?, ?, ?)",
-                (alert_id, agent_ids, row["file_path"], task_ids, now),
-            )
+            inserts.append((alert_id, agent_ids, row["file_path"], task_ids, now))
             alerts.append({
                 "id": alert_id,
                 "agents": [row["agent_a"], row["agent_b"]],
@@ -553,6 +547,14 @@ class SocialIntelligenceManager:
                 "tasks": [row["task_a"], row["task_b"]],
             })
 
+        if inserts:
+            async with self._db.transaction() as conn:
+                await conn.executemany(
+                    "INSERT INTO coordination_alerts "
+                    "(id, agent_ids, overlapping_files, task_ids, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    inserts,
+                )
         return alerts
 
     async def get_alerts(self, resolved: bool = False, limit: int = 20) -> list[dict]:
@@ -12,10 +12,48 @@ import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
-from taskbrew.intelligence._utils import safe_read_text, validate_path
+from taskbrew.intelligence._utils import validate_path
+from taskbrew.intelligence.analysis_engine import (
+    SourceFile,
+    get_analysis_engine,
+    register_visitor,
+)
+# Registers the "definitions" visitor used by detect_doc_drift.
+from taskbrew.intelligence import code_intel  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
+# Bound on bound parameters per ``IN (...)`` lookup.
+_LOOKUP_CHUNK = 500
+
+
+def _welford_step(
+    old_avg: float, old_std: float, n: int, duration_ms: float,
+) -> tuple[float, float, int]:
+    """Fold one sample into a stored ``(avg, std, count)`` baseline."""
+    new_n = n + 1
+    new_avg = (old_avg * n + duration_ms) / new_n
+    # audit 08b F#4: Welford's online-variance algorithm
+    # accumulates M2 (sum of squared deviations), not variance.
+    # The previous line squared the stored std and then did
+    # ``(var*n + dx*dy)/new_n`` which is not Welford and
+    # regularly went negative (hence the max(0.0, ...) hack).
+    #
+    # Proper Welford: maintain M2 = sum of (x - mean)**2.
+    # When M2 is unavailable (legacy rows), reconstruct it
+    # from the stored std: M2_old ~= (old_std**2) * n. This
+    # preserves backward compat at the cost of a small bias
+    # on the first post-upgrade sample.
+    old_M2 = (old_std ** 2) * n
+    new_M2 = old_M2 + (duration_ms - old_avg) * (duration_ms - new_avg)
+    # Population std is M2 / new_n; sample std is M2 / (new_n - 1).
+    # Use sample std when we have at least 2 points.
+    divisor = max(new_n - 1, 1)
+    new_std = math.sqrt(new_M2 / divisor) if new_M2 >= 0 else 0.0
+    # Values are stored rounded, so round here too: a batch then lands on
+    # exactly what one call per sample would have stored.
+    return round(new_avg, 4), round(new_std, 4), new_n
+
 # Checklist templates by task type
 _CHECKLIST_TEMPLATES: dict[str, list[str]] = {
     "implementation": [
@@ -59,9 +97,11 @@ class TestingQualityManager:
         regression_threshold_pct: float | None = None,
         risk_file_count_threshold: int | None = None,
         risk_line_count_threshold: int | None = None,
+        engine=None,
     ) -> None:
         self._db = db
         self._project_dir = project_dir
+        self._engine = engine or get_analysis_engine()
         if regression_threshold_pct is not None:
             self.DEFAULT_REGRESSION_THRESHOLD_PCT = regression_threshold_pct
         if risk_file_count_threshold is not None:
@@ -149,8 +189,8 @@ class TestingQualityManager:
         await self._ensure_tables()
         # audit 08b F#3: confine caller-supplied paths to the
         # project root so absolute or traversal inputs can't read
-        # /etc/passwd etc. safe_read_text refuses symlinks and caps
-        # the read at 2 MiB.
+        # /etc/passwd etc. The analysis engine refuses symlinks and
+        # caps the read at 2 MiB.
         try:
             source_file = validate_path(source_file)
         except (ValueError, OSError) as exc:
@@ -158,31 +198,13 @@ class TestingQualityManager:
             return []
         full_path = os.path.join(self._project_dir, source_file)
 
-        try:
-            source = safe_read_text(full_path)
-            if not source:
-                return []
-            tree = ast.parse(source)
-        except (SyntaxError,) as exc:
-            logger.warning("Cannot parse %s: %s", source_file, exc)
+        analysis = await self._engine.analyze_file(full_path, "test_targets")
+        if analysis is None:
+            return []
+        functions = analysis.results.get("test_targets")
+        if functions is None:
+            logger.warning("Cannot parse %s: %s", source_file, analysis.error)
             return []
-
-        functions: list[dict] = []
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                args = []
-                for arg in node.args.args:
-                    if arg.arg == "self":
-                        continue
-                    args.append(arg.arg)
-                ret_annotation = None
-                if node.returns:
-                    ret_annotation = ast.dump(node.returns)
-                functions.append({
-                    "name": node.name,
-                    "args": args,
-                    "return_annotation": ret_annotation,
-                })
 
         now = datetime.now(timezone.utc).isoformat()
         results: list[dict] = []
@@ -237,28 +259,17 @@ class TestingQualityManager:
             return {"error": "invalid path"}
         full_path = os.path.join(self._project_dir, file_path)
 
-        try:
-            source = safe_read_text(full_path)
-            if not source:
-                return {"error": "empty or unreadable"}
-            tree = ast.parse(source)
-        except (SyntaxError,) as exc:
-            logger.warning("Cannot parse %s for mutation analysis: %s", file_path, exc)
-            return {"error": str(exc)}
-
-        total_lines = len(source.splitlines())
-        comparison_ops = 0
-        arithmetic_ops = 0
-        boolean_ops = 0
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Compare):
-                comparison_ops += len(node.ops)
-            elif isinstance(node, ast.BinOp):
-                arithmetic_ops += 1
-            elif isinstance(node, ast.BoolOp):
-                boolean_ops += 1
+        analysis = await self._engine.analyze_file(full_path, "mutation_points")
+        if analysis is None or analysis.size == 0:
+            return {"error": "empty or unreadable"}
+        counts = analysis.results.get("mutation_points")
+        if counts is None:
+            logger.warning(
+                "Cannot parse %s for mutation analysis: %s", file_path, analysis.error
+            )
+            return {"error": analysis.error}
 
+        total_lines, comparison_ops, arithmetic_ops, boolean_ops = counts
         mutation_points = comparison_ops + arithmetic_ops + boolean_ops
         denominator = total_lines * 2 if total_lines > 0 else 1
         score = max(0.0, 1.0 - (mutation_points / denominator))
@@ -331,48 +342,23 @@ class TestingQualityManager:
             return []
         full_path = os.path.join(self._project_dir, source_file)
 
-        try:
-            source = safe_read_text(full_path)
-            if not source:
-                return []
-            tree = ast.parse(source)
-        except (SyntaxError,) as exc:
-            logger.warning("Cannot parse %s: %s", source_file, exc)
+        analysis = await self._engine.analyze_file(full_path, "pure_functions")
+        if analysis is None:
+            return []
+        pure = analysis.results.get("pure_functions")
+        if pure is None:
+            logger.warning("Cannot parse %s: %s", source_file, analysis.error)
             return []
 
-        suggestions: list[dict] = []
-        for node in ast.walk(tree):
-            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                continue
-            # Skip methods (have 'self' as first arg)
-            arg_names = [a.arg for a in node.args.args]
-            if "self" in arg_names:
-                continue
-            # Must have a return statement
-            has_return = any(isinstance(n, ast.Return) and n.value is not None for n in ast.walk(node))
-            if not has_return:
-                continue
-            # Detect side effects: calls to print, open, os.*, sys.*, write, etc.
-            has_side_effects = False
-            for child in ast.walk(node):
-                if isinstance(child, ast.Call):
-                    if isinstance(child.func, ast.Name) and child.func.id in ("print", "open", "input", "exit"):
-                        has_side_effects = True
-                        break
-                    if isinstance(child.func, ast.Attribute) and child.func.attr in ("write", "system", "remove", "mkdir"):
-                        has_side_effects = True
-                        break
-            if has_side_effects:
-                continue
-
-            suggestions.append({
-                "function_name": node.name,
-                "args": [a for a in arg_names],
+        return [
+            {
+                "function_name": name,
+                "args": list(arg_names),
                 "suggestion": "for any valid input, output type should be consistent",
                 "source_file": source_file,
-            })
-
-        return suggestions
+            }
+            for name, arg_names in pure
+        ]
 
     # ------------------------------------------------------------------
     # Feature 30: Regression Risk Prediction
@@ -391,25 +377,32 @@ class TestingQualityManager:
             risk_score += 0.3
             risk_factors.append(f"{len(files_changed)} files changed (>{self.RISK_FILE_COUNT_THRESHOLD})")
 
+        # audit 08b F#3: each entry in files_changed is caller-
+        # supplied and must be confined to the project root.
+        full_paths: dict[str, str] = {}
         for f in files_changed:
-            # +0.2 per file with >500 lines
-            # audit 08b F#3: each entry in files_changed is caller-
-            # supplied and must be confined to the project root.
             try:
-                validated_f = validate_path(f)
+                full_paths[f] = os.path.join(self._project_dir, validate_path(f))
             except (ValueError, OSError) as exc:
                 logger.warning("Skipping invalid path %r in files_changed: %s", f, exc)
+        # Missing, symlinked and oversized files are left out of the
+        # result, so they simply contribute no line-count risk.
+        line_counts = {
+            analysis.path: analysis.results["line_count"]
+            for analysis in await self._engine.analyze_files(
+                full_paths.values(), ["line_count"]
+            )
+            if analysis.size
+        }
+
+        for f in files_changed:
+            if f not in full_paths:
                 continue
-            full_path = os.path.join(self._project_dir, validated_f)
-            try:
-                source = safe_read_text(full_path)
-                if source:
-                    line_count = source.count("\n") + 1
-                    if line_count > self.RISK_LINE_COUNT_THRESHOLD:
-                        risk_score += 0.2
-                        risk_factors.append(f"{f} has {line_count} lines (>{self.RISK_LINE_COUNT_THRESHOLD})")
-            except OSError as exc:
-                logger.warning("Cannot read %s for regression risk analysis: %s", f, exc)
+            # +0.2 per file with >500 lines
+            line_count = line_counts.get(str(Path(full_paths[f])))
+            if line_count is not None and line_count > self.RISK_LINE_COUNT_THRESHOLD:
+                risk_score += 0.2
+                risk_factors.append(f"{f} has {line_count} lines (>{self.RISK_LINE_COUNT_THRESHOLD})")
 
             # +0.2 per file touching __init__ or main
             basename = os.path.basename(f)
@@ -497,16 +490,16 @@ class TestingQualityManager:
         existing_files: set[str] = set()
         existing_functions: set[str] = set()
         if code_root.exists():
-            for py_file in code_root.rglob("*.py"):
-                rel = str(py_file.relative_to(self._project_dir))
-                existing_files.add(rel)
-                try:
-                    tree = ast.parse(py_file.read_text())
-                    for node in ast.walk(tree):
-                        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                            existing_functions.add(node.name)
-                except (SyntaxError, OSError) as exc:
-                    logger.warning("Cannot parse %s for doc drift analysis: %s", py_file, exc)
+            for analysis in await self._engine.scan(code_root, ["definitions"]):
+                existing_files.add(str(Path(analysis.path).relative_to(self._project_dir)))
+                found = analysis.results.get("definitions")
+                if found is None:
+                    logger.warning(
+                        "Cannot parse %s for doc drift analysis: %s",
+                        analysis.path, analysis.error,
+                    )
+                    continue
+                existing_functions.update(found["functions"])
 
         now = datetime.now(timezone.utc).isoformat()
         drifts: list[dict] = []
@@ -576,63 +569,78 @@ class TestingQualityManager:
 
     async def record_test_timing(self, test_name: str, duration_ms: float) -> dict:
         """Record a test timing using a running average (UPSERT)."""
-        await self._ensure_tables()
-        now = datetime.now(timezone.utc).isoformat()
-
-        existing = await self._db.execute_fetchone(
-            "SELECT * FROM perf_baselines WHERE test_name = ?", (test_name,)
+        (baseline,) = await self.record_test_timings(
+            [{"test_name": test_name, "duration_ms": duration_ms}]
         )
+        return baseline
 
-        if existing:
-            old_avg = existing["avg_duration_ms"]
-            n = existing["sample_count"]
-            new_n = n + 1
-            new_avg = (old_avg * n + duration_ms) / new_n
-            # audit 08b F#4: Welford's online-variance algorithm
-            # accumulates M2 (sum of squared deviations), not variance.
-            # The previous line squared the stored std and then did
-            # ``(var*n + dx*dy)/new_n`` which is not Welford and
-            # regularly went negative (hence the max(0.0, ...) hack).
-            #
-            # Proper Welford: maintain M2 = sum of (x - mean)**2.
-            # When M2 is unavailable (legacy rows), reconstruct it
-            # from the stored std: M2_old ~= (old_std**2) * n. This
-            # preserves backward compat at the cost of a small bias
-            # on the first post-upgrade sample.
-            old_std = existing["std_deviation_ms"]
-            old_M2 = (old_std ** 2) * n
-            new_M2 = old_M2 + (duration_ms - old_avg) * (duration_ms - new_avg)
-            # Population std is M2 / new_n; sample std is M2 / (new_n - 1).
-            # Use sample std when we have at least 2 points.
-            divisor = max(new_n - 1, 1)
-            new_std = math.sqrt(new_M2 / divisor) if new_M2 >= 0 else 0.0
+    async def record_test_timings(self, timings: list[dict]) -> list[dict]:
+        """Fold many ``{test_name, duration_ms}`` timings into the baselines.
 
-            await self._db.execute(
-                "UPDATE perf_baselines SET avg_duration_ms = ?, std_deviation_ms = ?, sample_count = ?, last_updated = ? "
-                "WHERE test_name = ?",
-                (round(new_avg, 4), round(new_std, 4), new_n, now, test_name),
-            )
-            return {
-                "test_name": test_name,
-                "avg_duration_ms": round(new_avg, 4),
-                "std_deviation_ms": round(new_std, 4),
-                "sample_count": new_n,
-                "last_updated": now,
-            }
-        else:
-            rec_id = uuid.uuid4().hex[:12]
-            await self._db.execute(
+        One transaction: the existing baselines are read with a single
+        ``IN (...)`` lookup per chunk, every sample is folded in Python in
+        input order, and the results are upserted with ``executemany``.
+        Equivalent to calling :meth:`record_test_timing` once per sample.
+        Returns the final baseline for each distinct test.
+        """
+        await self._ensure_tables()
+        if not timings:
+            return []
+        now = datetime.now(timezone.utc).isoformat()
+        names = list(dict.fromkeys(t["test_name"] for t in timings))
+        baselines: dict[str, dict] = {}
+        async with self._db.transaction() as conn:
+            for i in range(0, len(names), _LOOKUP_CHUNK):
+                chunk = names[i:i + _LOOKUP_CHUNK]
+                cursor = await conn.execute(
+                    "SELECT id, test_name, avg_duration_ms, std_deviation_ms, sample_count "
+                    f"FROM perf_baselines WHERE test_name IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for row in await cursor.fetchall():
+                    baselines[row["test_name"]] = dict(row)
+                await cursor.close()
+            for t in timings:
+                duration_ms = t["duration_ms"]
+                row = baselines.get(t["test_name"])
+                if row is None:
+                    baselines[t["test_name"]] = {
+                        "id": uuid.uuid4().hex[:12],
+                        "test_name": t["test_name"],
+                        "avg_duration_ms": duration_ms,
+                        "std_deviation_ms": 0.0,
+                        "sample_count": 1,
+                    }
+                    continue
+                avg, std, n = _welford_step(
+                    row["avg_duration_ms"], row["std_deviation_ms"],
+                    row["sample_count"], duration_ms,
+                )
+                row.update(avg_duration_ms=avg, std_deviation_ms=std, sample_count=n)
+            await conn.executemany(
                 "INSERT INTO perf_baselines (id, test_name, avg_duration_ms, std_deviation_ms, sample_count, last_updated) "
-                "VALUES (?, ?, ?, ?, ?, ?)",
-                (rec_id, test_name, duration_ms, 0.0, 1, now),
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(test_name) DO UPDATE SET "
+                "avg_duration_ms = excluded.avg_duration_ms, "
+                "std_deviation_ms = excluded.std_deviation_ms, "
+                "sample_count = excluded.sample_count, "
+                "last_updated = excluded.last_updated",
+                [
+                    (b["id"], b["test_name"], b["avg_duration_ms"],
+                     b["std_deviation_ms"], b["sample_count"], now)
+                    for b in baselines.values()
+                ],
             )
-            return {
-                "test_name": test_name,
-                "avg_duration_ms": duration_ms,
-                "std_deviation_ms": 0.0,
-                "sample_count": 1,
+        return [
+            {
+                "test_name": b["test_name"],
+                "avg_duration_ms": b["avg_duration_ms"],
+                "std_deviation_ms": b["std_deviation_ms"],
+                "sample_count": b["sample_count"],
                 "last_updated": now,
             }
+            for b in baselines.values()
+        ]
 
     async def detect_perf_regressions(self, threshold_pct: float | None = None) -> list[dict]:
         """Return baselines where std_deviation exceeds avg * threshold_pct / 100."""
@@ -655,3 +663,75 @@ class TestingQualityManager:
                     "regression_ratio": round(std / avg, 4) if avg > 0 else 0,
                 })
         return regressions
+
+
+# ---------------------------------------------------------------------------
+# Analysis-engine visitors
+# ---------------------------------------------------------------------------
+
+_FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+_SIDE_EFFECT_CALLS = ("print", "open", "input", "exit")
+_SIDE_EFFECT_ATTRS = ("write", "system", "remove", "mkdir")
+
+
+@register_visitor("test_targets")
+def _test_targets_visitor(src: SourceFile) -> list[dict]:
+    """Name, non-``self`` args and dumped return annotation of every function."""
+    functions: list[dict] = []
+    for node in ast.walk(src.tree):
+        if isinstance(node, _FUNCTION_NODES):
+            functions.append({
+                "name": node.name,
+                "args": [arg.arg for arg in node.args.args if arg.arg != "self"],
+                "return_annotation": ast.dump(node.returns) if node.returns else None,
+            })
+    return functions
+
+
+@register_visitor("mutation_points")
+def _mutation_points_visitor(src: SourceFile) -> tuple[int, int, int, int]:
+    """``(total_lines, comparison_ops, arithmetic_ops, boolean_ops)``."""
+    comparison_ops = arithmetic_ops = boolean_ops = 0
+    for node in ast.walk(src.tree):
+        if isinstance(node, ast.Compare):
+            comparison_ops += len(node.ops)
+        elif isinstance(node, ast.BinOp):
+            arithmetic_ops += 1
+        elif isinstance(node, ast.BoolOp):
+            boolean_ops += 1
+    return len(src.lines), comparison_ops, arithmetic_ops, boolean_ops
+
+
+@register_visitor("pure_functions")
+def _pure_functions_visitor(src: SourceFile) -> list[tuple[str, list[str]]]:
+    """``(name, arg_names)`` of functions that look pure.
+
+    Methods (a ``self`` argument), functions without a valued ``return``
+    and functions calling obvious I/O (print, open, write, ...) are skipped.
+    """
+    pure: list[tuple[str, list[str]]] = []
+    for node in ast.walk(src.tree):
+        if not isinstance(node, _FUNCTION_NODES):
+            continue
+        arg_names = [a.arg for a in node.args.args]
+        if "self" in arg_names:
+            continue
+        body = list(ast.walk(node))
+        if not any(isinstance(n, ast.Return) and n.value is not None for n in body):
+            continue
+        if any(
+            isinstance(n, ast.Call) and (
+                (isinstance(n.func, ast.Name) and n.func.id in _SIDE_EFFECT_CALLS)
+                or (isinstance(n.func, ast.Attribute) and n.func.attr in _SIDE_EFFECT_ATTRS)
+            )
+            for n in body
+        ):
+            continue
+        pure.append((node.name, arg_names))
+    return pure
+
+
+@register_visitor("line_count", needs_ast=False)
+def _line_count_visitor(src: SourceFile) -> int:
+    """Newline count plus one, as used by the regression-risk heuristic."""
+    return src.source.count("\n") + 1
@@ -3,10 +3,12 @@
 Honesty caveat (audit 08b F#1)
 ------------------------------
 This module is a *ledger* of verification claims, not an adversarial
-verification engine. It does not shell out to pytest, parse JUnit XML,
-measure coverage, or re-run mutants. ``record_run``, ``fingerprint_regression``,
-``mine_spec``, and ``record_gate_claim`` all accept caller-supplied metrics
-and persist them. Gate evaluations consult those metrics literally.
+verification engine. It does not shell out to pytest, measure coverage,
+or re-run mutants. ``record_run``, ``ingest_report``,
+``fingerprint_regression``, ``mine_spec``, and ``record_gate_claim`` all
+accept caller-supplied results (``ingest_report`` parses a JUnit XML or
+pytest JSON report the caller produced) and persist them. Gate
+evaluations consult those metrics literally.
 
 Any caller (an LLM agent, an HTTP route handler) that can reach these
 methods is implicitly trusted to report accurate numbers. When the caller
@@ -31,11 +33,159 @@ import json
 import logging
 import os
 import re
+import xml.etree.ElementTree as ET  # nosec B405
 
 from taskbrew.intelligence._utils import utcnow, new_id, clamp
 
 logger = logging.getLogger(__name__)
 
+# test_stats keeps the last _RECENT_WINDOW outcomes of each test as a
+# bitmap (bit 0 = newest run, set = failed) and an EWMA of its duration.
+_RECENT_WINDOW = 32
+_RECENT_MASK = (1 << _RECENT_WINDOW) - 1
+_DURATION_EWMA_ALPHA = 0.2
+# Bound on bound parameters per ``IN (...)`` lookup.
+_LOOKUP_CHUNK = 500
+
+_FLAKY_TESTS_SQL = (
+    "SELECT test_name, total_runs, failures, recent_outcomes, recent_count "
+    "FROM test_stats "
+    "WHERE failures > 0 AND failures < total_runs AND total_runs >= 2 "
+    "ORDER BY CAST(failures AS REAL) / total_runs DESC "
+    "LIMIT ?"
+)
+
+# pytest-json-report outcomes; anything else (skipped, xfailed, ...) is
+# not a pass/fail signal and is left out.
+_PYTEST_OUTCOMES = {"passed": True, "failed": False, "error": False}
+
+# Reports arrive over HTTP. JUnit XML never needs a DTD, and refusing one
+# rules out entity-expansion bombs before ElementTree sees the text.
+_XML_DTD_RE = re.compile(r"<!\s*(DOCTYPE|ENTITY)", re.IGNORECASE)
+
+
+def parse_junit_xml(text: str) -> list[dict]:
+    """Parse a JUnit XML report into ``{test_name, passed, duration_ms}`` rows.
+
+    The test name is ``classname::name``. Skipped cases are left out; a
+    ``<failure>`` or ``<error>`` child marks the case failed. Documents
+    with a DOCTYPE or entity declarations are rejected.
+    """
+    if _XML_DTD_RE.search(text):
+        raise ValueError("invalid JUnit XML: DOCTYPE and entity declarations are not allowed")
+    try:
+        root = ET.fromstring(text)  # nosec B314
+    except ET.ParseError as exc:
+        raise ValueError(f"invalid JUnit XML: {exc}") from exc
+    results = []
+    for case in root.iter("testcase"):
+        if case.find("skipped") is not None:
+            continue
+        name = case.get("name") or ""
+        classname = case.get("classname")
+        if not name:
+            continue
+        try:
+            duration_ms = round(float(case.get("time") or 0) * 1000)
+        except ValueError:
+            duration_ms = None
+        results.append({
+            "test_name": f"{classname}::{name}" if classname else name,
+            "passed": case.find("failure") is None and case.find("error") is None,
+            "duration_ms": duration_ms,
+        })
+    return results
+
+
+def parse_pytest_json(report: dict) -> list[dict]:
+    """Parse a pytest-json-report document into result rows.
+
+    Durations are the sum of the setup, call and teardown phases.
+    Raises ValueError for anything that is not a report of that shape.
+    """
+    tests = report.get("tests") if isinstance(report, dict) else None
+    if not isinstance(tests, list):
+        raise ValueError("pytest JSON report has no 'tests' list")
+    results = []
+    for i, test in enumerate(tests):
+        if not isinstance(test, dict):
+            raise ValueError(f"pytest JSON report: tests[{i}] is not an object")
+        outcome, nodeid = test.get("outcome"), test.get("nodeid")
+        if not isinstance(outcome, str) or not isinstance(nodeid, str):
+            continue
+        passed = _PYTEST_OUTCOMES.get(outcome)
+        if passed is None or not nodeid:
+            continue
+        try:
+            seconds = 0.0
+            for phase in ("setup", "call", "teardown"):
+                stage = test.get(phase) or {}
+                if not isinstance(stage, dict):
+                    raise TypeError(f"{phase} is not an object")
+                seconds += float(stage.get("duration") or 0)
+            if not seconds:
+                seconds = float(test.get("duration") or 0)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"pytest JSON report: bad duration in tests[{i}]: {exc}") from exc
+        results.append({
+            "test_name": nodeid,
+            "passed": passed,
+            "duration_ms": round(seconds * 1000),
+        })
+    return results
+
+
+def parse_test_report(report: str | dict, fmt: str = "auto") -> list[dict]:
+    """Parse *report* as ``"junit"``, ``"pytest-json"`` or sniff it (``"auto"``)."""
+    if fmt == "auto":
+        if isinstance(report, dict):
+            fmt = "pytest-json"
+        else:
+            fmt = "junit" if report.lstrip().startswith("<") else "pytest-json"
+    if fmt == "junit":
+        if not isinstance(report, str):
+            raise ValueError("JUnit report must be XML text")
+        return parse_junit_xml(report)
+    if fmt == "pytest-json":
+        if isinstance(report, str):
+            try:
+                report = json.loads(report)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"invalid pytest JSON report: {exc}") from exc
+        return parse_pytest_json(report)
+    raise ValueError(f"unknown report format {fmt!r}")
+
+
+def _fold_outcome(stats: dict, passed: bool, duration_ms: int | None) -> None:
+    """Fold one run into a ``test_stats`` row (in place)."""
+    stats["total_runs"] += 1
+    if not passed:
+        stats["failures"] += 1
+    stats["recent_outcomes"] = (
+        (stats["recent_outcomes"] << 1) | (0 if passed else 1)
+    ) & _RECENT_MASK
+    stats["recent_count"] = min(stats["recent_count"] + 1, _RECENT_WINDOW)
+    if duration_ms is not None:
+        ewma = stats["ewma_duration_ms"]
+        stats["ewma_duration_ms"] = (
+            float(duration_ms) if ewma is None
+            else ewma + _DURATION_EWMA_ALPHA * (duration_ms - ewma)
+        )
+        stats["last_duration_ms"] = duration_ms
+
+
+def _flaky_row(row) -> dict:
+    total = row["total_runs"]
+    failures = row["failures"]
+    return {
+        "test_name": row["test_name"],
+        "total_runs": total,
+        "failures": failures,
+        "failure_rate": round(failures / total, 4) if total > 0 else 0.0,
+        "recent_runs": row["recent_count"],
+        "recent_failures": int(row["recent_outcomes"]).bit_count(),
+    }
+
 
 class VerificationManager:
     """Manage verification and quality assurance intelligence capabilities."""
@@ -75,6 +225,20 @@ class VerificationManager:
                 quarantine_reason TEXT,
                 created_at TEXT NOT NULL
             );
+            CREATE TABLE IF NOT EXISTS test_stats (
+                test_name TEXT PRIMARY KEY,
+                total_runs INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                ewma_duration_ms REAL,
+                last_duration_ms INTEGER,
+                recent_outcomes INTEGER NOT NULL DEFAULT 0,
+                recent_count INTEGER NOT NULL DEFAULT 0,
+                quarantined INTEGER NOT NULL DEFAULT 0,
+                quarantine_reason TEXT,
+                last_run_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_test_stats_flaky ON test_stats(test_name)
+                WHERE failures > 0 AND failures < total_runs;
             CREATE TABLE IF NOT EXISTS behavioral_specs (
                 id TEXT PRIMARY KEY,
                 test_file TEXT NOT NULL,
@@ -279,12 +443,10 @@ class VerificationManager:
         run_id: str | None = None,
     ) -> dict:
         """Record a single test run result."""
-        rec_id = f"TR-{new_id(8)}"
         now = utcnow()
-        await self._db.execute(
-            "INSERT INTO test_runs (id, test_name, passed, duration_ms, run_id, created_at) "
-            "VALUES (?, ?, ?, ?, ?, ?)",
-            (rec_id, test_name, int(passed), duration_ms, run_id, now),
+        (rec_id,) = await self.record_runs(
+            [{"test_name": test_name, "passed": passed, "duration_ms": duration_ms}],
+            run_id=run_id, now=now,
         )
         return {
             "id": rec_id,
@@ -295,6 +457,107 @@ class VerificationManager:
             "created_at": now,
         }
 
+    async def record_runs(
+        self,
+        results: list[dict],
+        run_id: str | None = None,
+        *,
+        now: str | None = None,
+    ) -> list[str]:
+        """Record many ``{test_name, passed, duration_ms}`` results at once.
+
+        One transaction: the raw rows go into ``test_runs`` with
+        ``executemany`` and the per-test ``test_stats`` aggregates are
+        read, folded in Python and upserted the same way, so a suite of
+        thousands of tests costs a handful of statements. Returns the new
+        ``test_runs`` ids in input order.
+        """
+        if not results:
+            return []
+        now = now or utcnow()
+        ids = [f"TR-{new_id(8)}" for _ in results]
+        names = list(dict.fromkeys(r["test_name"] for r in results))
+        async with self._db.transaction() as conn:
+            await conn.executemany(
+                "INSERT INTO test_runs (id, test_name, passed, duration_ms, run_id, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (rec_id, r["test_name"], int(bool(r["passed"])),
+                     r.get("duration_ms"), run_id, now)
+                    for rec_id, r in zip(ids, results)
+                ],
+            )
+            stats: dict[str, dict] = {}
+            for i in range(0, len(names), _LOOKUP_CHUNK):
+                chunk = names[i:i + _LOOKUP_CHUNK]
+                cursor = await conn.execute(
+                    "SELECT test_name, total_runs, failures, ewma_duration_ms, "
+                    "last_duration_ms, recent_outcomes, recent_count "
+                    f"FROM test_stats WHERE test_name IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for row in await cursor.fetchall():
+                    stats[row["test_name"]] = dict(row)
+                await cursor.close()
+            for r in results:
+                row = stats.setdefault(r["test_name"], {
+                    "test_name": r["test_name"], "total_runs": 0, "failures": 0,
+                    "ewma_duration_ms": None, "last_duration_ms": None,
+                    "recent_outcomes": 0, "recent_count": 0,
+                })
+                _fold_outcome(row, bool(r["passed"]), r.get("duration_ms"))
+            await conn.executemany(
+                "INSERT INTO test_stats (test_name, total_runs, failures, "
+                "ewma_duration_ms, last_duration_ms, recent_outcomes, recent_count, "
+                "last_run_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(test_name) DO UPDATE SET "
+                "total_runs = excluded.total_runs, failures = excluded.failures, "
+                "ewma_duration_ms = excluded.ewma_duration_ms, "
+                "last_duration_ms = excluded.last_duration_ms, "
+                "recent_outcomes = excluded.recent_outcomes, "
+                "recent_count = excluded.recent_count, "
+                "last_run_at = excluded.last_run_at",
+                [
+                    (st["test_name"], st["total_runs"], st["failures"],
+                     st["ewma_duration_ms"], st["last_duration_ms"],
+                     st["recent_outcomes"], st["recent_count"], now)
+                    for st in stats.values()
+                ],
+            )
+        return ids
+
+    async def ingest_report(
+        self,
+        report: str | dict,
+        fmt: str = "auto",
+        run_id: str | None = None,
+    ) -> dict:
+        """Parse a JUnit XML or pytest JSON report and record every result.
+
+        Raises ``ValueError`` for a report that cannot be parsed.
+        """
+        results = parse_test_report(report, fmt)
+        run_id = run_id or f"RUN-{new_id(8)}"
+        await self.record_runs(results, run_id=run_id)
+        failed = sum(1 for r in results if not r["passed"])
+        return {
+            "run_id": run_id,
+            "recorded": len(results),
+            "passed": len(results) - failed,
+            "failed": failed,
+        }
+
+    async def get_test_stats(self, test_name: str) -> dict | None:
+        """Return the running aggregates for one test, or None."""
+        row = await self._db.execute_fetchone(
+            "SELECT * FROM test_stats WHERE test_name = ?", (test_name,),
+        )
+        if row is None:
+            return None
+        out = dict(row)
+        out["recent_failures"] = int(out["recent_outcomes"]).bit_count()
+        return out
+
     async def detect_flaky(
         self, min_runs: int = 5, flaky_threshold: float = 0.1
     ) -> list[dict]:
@@ -302,68 +565,49 @@ class VerificationManager:
 
         A test is considered flaky if it has at least *min_runs* total runs
         and its failure rate exceeds *flaky_threshold* but is not 100% (which
-        would indicate a genuine broken test, not a flaky one).
+        would indicate a genuine broken test, not a flaky one). Reads the
+        ``test_stats`` aggregates, not the run history.
         """
         rows = await self._db.execute_fetchall(
-            "SELECT test_name, "
-            "COUNT(*) as total_runs, "
-            "SUM(CASE WHEN passed = 0 THEN 1 ELSE 0 END) as failures "
-            "FROM test_runs "
-            "WHERE quarantined = 0 "
-            "GROUP BY test_name "
-            "HAVING total_runs >= ? ",
+            "SELECT test_name, total_runs, failures, recent_outcomes, recent_count "
+            "FROM test_stats "
+            "WHERE failures > 0 AND failures < total_runs AND total_runs >= ?",
             (min_runs,),
         )
-        flaky = []
-        for row in rows:
-            total = row["total_runs"]
-            failures = row["failures"]
-            failure_rate = failures / total if total > 0 else 0.0
-            # Flaky = fails sometimes but not always
-            if flaky_threshold < failure_rate < 1.0:
-                flaky.append({
-                    "test_name": row["test_name"],
-                    "total_runs": total,
-                    "failures": failures,
-                    "failure_rate": round(failure_rate, 4),
-                })
+        flaky = [
+            _flaky_row(row) for row in rows
+            if row["failures"] / row["total_runs"] > flaky_threshold
+        ]
         return sorted(flaky, key=lambda x: x["failure_rate"], reverse=True)
 
     async def get_flaky_tests(self, limit: int = 20) -> list[dict]:
         """List flaky tests with their failure rate."""
         rows = await self._db.execute_fetchall(
-            "SELECT test_name, "
-            "COUNT(*) as total_runs, "
-            "SUM(CASE WHEN passed = 0 THEN 1 ELSE 0 END) as failures "
-            "FROM test_runs "
-            "WHERE quarantined = 0 "
-            "GROUP BY test_name "
-            "HAVING total_runs >= 2 AND failures > 0 AND failures < total_runs "
-            "ORDER BY CAST(failures AS REAL) / total_runs DESC "
-            "LIMIT ?",
+            _FLAKY_TESTS_SQL,
             (limit,),
         )
-        result = []
-        for row in rows:
-            total = row["total_runs"]
-            failures = row["failures"]
-            result.append({
-                "test_name": row["test_name"],
-                "total_runs": total,
-                "failures": failures,
-                "failure_rate": round(failures / total, 4) if total > 0 else 0.0,
-            })
-        return result
+        return [_flaky_row(row) for row in rows]
 
     async def quarantine_test(
         self, test_name: str, reason: str | None = None
     ) -> dict:
-        """Mark all runs for a test as quarantined."""
+        """Mark all runs for a test as quarantined.
+
+        Quarantined runs stop counting towards flakiness, so the test's
+        aggregates restart from zero; later runs count again.
+        """
         now = utcnow()
-        await self._db.execute(
-            "UPDATE test_runs SET quarantined = 1, quarantine_reason = ? WHERE test_name = ?",
-            (reason, test_name),
-        )
+        async with self._db.transaction() as conn:
+            await conn.execute(
+                "UPDATE test_runs SET quarantined = 1, quarantine_reason = ? WHERE test_name = ?",
+                (reason, test_name),
+            )
+            await conn.execute(
+                "UPDATE test_stats SET total_runs = 0, failures = 0, "
+                "recent_outcomes = 0, recent_count = 0, quarantined = 1, "
+                "quarantine_reason = ? WHERE test_name = ?",
+                (reason, test_name),
+            )
         return {
             "test_name": test_name,
             "quarantined": True,
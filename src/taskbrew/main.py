@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import argparse
+import dataclasses
 import logging
 import os
 import signal
@@ -16,9 +17,11 @@ from taskbrew.agents.agent_loop import AgentLoop
 from taskbrew.agents.instance_manager import InstanceManager
 from taskbrew.config_loader import RoleConfig, load_team_config, load_roles, validate_routing
 from taskbrew.orchestrator.artifact_store import ArtifactStore
-from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.database import Database, connection_profile
 from taskbrew.orchestrator.event_bus import EventBus
+from taskbrew.orchestrator.profiler import start_stall_detector, stop_stall_detector
 from taskbrew.orchestrator.task_board import TaskBoard
+from taskbrew.orchestrator.tracing import configure_tracing, get_tracer
 from taskbrew.tools.worktree_manager import WorktreeManager
 
 
@@ -161,6 +164,7 @@ class Orchestrator:
         self.specialization_manager = None
         self.planning_manager = None
         self.preflight_checker = None
+        self.cost_manager = None
         self.impact_analyzer = None
         self.escalation_manager = None
         self.checkpoint_manager = None
@@ -192,6 +196,16 @@ class Orchestrator:
         # Plugin registry (set during build)
         self.plugin_registry = None
 
+        # Agent supervisor and maintenance runner (set by start_agents)
+        self.supervisor = None
+        self.maintenance = None
+
+        # Multi-process mode: the API process's event hub and agent
+        # workers, or a worker's connection to that hub.
+        self.event_hub = None
+        self.worker_pool = None
+        self.event_bridge = None
+
         # Shutdown state
         self._shutting_down = False
         self._agent_loops: list = []
@@ -206,8 +220,9 @@ class Orchestrator:
 
         Phases:
         1. Signal agent loops and escalation monitor to stop.
-        2. Wait for agent tasks to complete (up to *timeout* seconds),
-           then force-cancel any that remain.
+        2. Stop agent worker processes, then wait for agent tasks to
+           complete (up to *timeout* seconds) and force-cancel any that
+           remain.
         3. Clean up worktrees.
         4. Close the database connection.
 
@@ -223,11 +238,22 @@ class Orchestrator:
         self._logger.info("Phase 1: Signalling agent loops to stop")
         for loop in self._agent_loops:
             loop.stop()
+        if self.supervisor is not None:
+            self.supervisor.stop()
+        if self.maintenance is not None:
+            self.maintenance.stop()
 
         if hasattr(self, '_escalation_stop'):
             self._escalation_stop.set()
 
-        # Phase 2 — wait for agent tasks, then force-cancel stragglers
+        # Phase 2 — stop agent workers, wait for agent tasks, then
+        # force-cancel stragglers
+        if self.worker_pool is not None:
+            self._logger.info("Phase 2: Stopping %d agent workers", self.worker_pool.count)
+            try:
+                await self.worker_pool.stop(timeout=timeout)
+            except Exception:
+                self._logger.exception("Error stopping agent workers")
         if self.agent_tasks:
             self._logger.info("Phase 2: Waiting for %d agent tasks (timeout=%.1fs)",
                               len(self.agent_tasks), timeout)
@@ -259,8 +285,26 @@ class Orchestrator:
                 await self.event_bus.drain(timeout=5.0)
         except Exception:
             self._logger.exception("Error draining event bus")
+        for bridge in (self.event_hub, self.event_bridge):
+            if bridge is not None:
+                try:
+                    await bridge.close()
+                except Exception:
+                    self._logger.exception("Error closing event bridge")
 
-        # Phase 5 — close database
+        # Phase 5 — flush buffered budget spend, then close database
+        try:
+            if self.cost_manager is not None:
+                await self.cost_manager.flush()
+        except Exception:
+            self._logger.exception("Error flushing cost ledger")
+        try:
+            from taskbrew.intelligence.analysis_engine import shutdown_analysis_engine
+            shutdown_analysis_engine()
+        except Exception:
+            self._logger.exception("Error stopping analysis engine")
+        get_tracer().close()
+        stop_stall_detector()
         try:
             self._logger.info("Closing database connection")
             await self.db.close()
@@ -290,9 +334,21 @@ async def build_orchestrator(project_dir: Path | None = None, cli_path: str | No
         cli_provider=cli_provider,
     )
 
+    export_path = team_config.tracing.export_path
+    configure_tracing(
+        enabled=team_config.tracing.enabled,
+        export_path=str(project_dir / export_path) if export_path else None,
+    )
+    start_stall_detector(team_config.tracing.slow_callback_ms)
+
     # Initialize components
     db_path = str(project_dir / team_config.db_path)
-    db = Database(db_path)
+    db = Database(
+        db_path,
+        profile=connection_profile(
+            team_config.database.profile, **team_config.database.overrides,
+        ),
+    )
     await db.initialize()
 
     event_bus = EventBus()
@@ -314,11 +370,15 @@ async def build_orchestrator(project_dir: Path | None = None, cli_path: str | No
     worktree_manager = WorktreeManager(
         repo_dir=str(project_dir),
         worktree_base=str(project_dir / ".worktrees"),
+        pool_size=team_config.execution.worktree_pool_size,
+        warm_paths=team_config.execution.worktree_warm_paths,
     )
     await worktree_manager.prune_stale()
 
     from taskbrew.intelligence.memory import MemoryManager
-    memory_manager = MemoryManager(db)
+    # Shared by every agent's intelligence-tools calls (served over the
+    # dashboard API), so identical recalls within a turn hit the cache.
+    memory_manager = MemoryManager(db, recall_cache_ttl=30.0)
 
     from taskbrew.intelligence.context_providers import (
         ContextProviderRegistry, GitHistoryProvider, CoverageContextProvider,
@@ -367,7 +427,15 @@ async def build_orchestrator(project_dir: Path | None = None, cli_path: str | No
     orch.collaboration_manager = CollaborationManager(db, task_board=task_board, event_bus=event_bus)
     orch.specialization_manager = SpecializationManager(db)
     orch.planning_manager = PlanningManager(db, task_board=task_board)
-    orch.preflight_checker = PreflightChecker(db)
+    # Budgets are answered from CostManager's in-memory ledger, so load it
+    # once here and keep budget checks off the claim path's DB round trips.
+    from taskbrew.orchestrator.cost_manager import CostManager
+    orch.cost_manager = CostManager(db)
+    await orch.cost_manager.load()
+    orch.preflight_checker = PreflightChecker(
+        db,
+        cost_manager=orch.cost_manager if team_config.cost_budgets_enabled else None,
+    )
     orch.impact_analyzer = ImpactAnalyzer(db, project_dir=str(project_dir))
     orch.escalation_manager = EscalationManager(db, task_board=task_board, event_bus=event_bus, instance_manager=instance_manager)
     orch.checkpoint_manager = CheckpointManager(db, event_bus=event_bus)
@@ -399,7 +467,7 @@ async def build_orchestrator(project_dir: Path | None = None, cli_path: str | No
     orch.testing_quality_manager = TestingQualityManager(db, project_dir=str(project_dir))
     orch.security_intel_manager = SecurityIntelManager(db, project_dir=str(project_dir))
     orch.observability_manager = ObservabilityManager(db, event_bus=event_bus)
-    orch.advanced_planning_manager = AdvancedPlanningManager(db)
+    orch.advanced_planning_manager = AdvancedPlanningManager(db, event_bus=event_bus)
 
     # Intelligence managers v3
     from taskbrew.intelligence.self_improvement import SelfImprovementManager
@@ -445,61 +513,6 @@ async def build_orchestrator(project_dir: Path | None = None, cli_path: str | No
     return orch
 
 
-async def _orphan_recovery_loop(
-    orch: Orchestrator,
-    interval: float = 30.0,
-    heartbeat_timeout: float = 90.0,
-) -> None:
-    """Periodically recover orphaned and stuck tasks.
-
-    Runs every *interval* seconds.  Handles two failure modes:
-
-    1. **Stale in_progress tasks** — an agent claimed a task but died (heartbeat
-       older than *heartbeat_timeout* while still in ``'working'`` status).
-       Resets the task to ``pending`` so another agent can pick it up.
-
-    2. **Stuck blocked tasks** — a task is ``blocked`` but all its dependencies
-       are already in terminal states (``completed`` / ``failed``).  The
-       dependency resolution was missed (crash, race).  Resolves the deps and
-       moves the task to ``pending`` or ``failed`` as appropriate.
-    """
-    _logger = logging.getLogger(__name__ + ".orphan_recovery")
-    while True:
-        await asyncio.sleep(interval)
-        try:
-            # 1. Recover tasks stuck on dead agent instances
-            stale = await orch.instance_manager.get_stale_instances(
-                timeout_seconds=heartbeat_timeout
-            )
-            if stale:
-                stale_ids = [inst["instance_id"] for inst in stale]
-                _logger.warning(
-                    "Detected %d stale agent instances: %s", len(stale_ids), stale_ids
-                )
-                recovered = await orch.task_board.recover_stale_in_progress_tasks(
-                    stale_ids
-                )
-                for t in recovered:
-                    _logger.info("Recovered orphaned task %s", t["id"])
-                    await orch.event_bus.emit(
-                        "task.recovered", {"task_id": t["id"]}
-                    )
-                # Reset stale instances to idle
-                for inst_id in stale_ids:
-                    await orch.instance_manager.update_status(inst_id, "idle")
-
-            # 2. Recover blocked tasks whose deps are all terminal
-            stuck = await orch.task_board.recover_stuck_blocked_tasks()
-            if stuck:
-                _logger.info("Recovered %d stuck blocked tasks", len(stuck))
-                for t in stuck:
-                    await orch.event_bus.emit(
-                        "task.recovered", {"task_id": t["id"]}
-                    )
-        except Exception:
-            _logger.exception("Error in orphan recovery loop")
-
-
 # Tools that mutate filesystem state and therefore justify a worktree.
 # Kept conservative: read-only tools (Grep, Glob, Read) don't need isolation.
 _FILE_MUTATING_TOOLS = frozenset({"Bash", "Edit", "Write", "NotebookEdit"})
@@ -519,12 +532,178 @@ def _resolve_needs_worktree(role_config: RoleConfig) -> bool:
     return any(t in _FILE_MUTATING_TOOLS for t in role_config.tools)
 
 
-async def start_agents(orch: Orchestrator):
-    """Start agent loops, recovery tasks, and auto-scaler for *orch*.
+# Default period in seconds of each maintenance job, by job name;
+# overridable per job via ``maintenance.intervals`` in team.yaml.
+_MAINTENANCE_INTERVALS = {
+    "refresh_risk_scores": 900,
+    "decay_memory_scores": 86400,
+    "cluster_errors": 3600,
+    "detect_overlaps": 300,
+    "retention": 3600,
+    "compact": 6 * 3600,
+    "refresh_budgets": 30,
+}
+
+
+def _build_maintenance_runner(orch: Orchestrator, *, shared_db: bool = False):
+    from taskbrew.orchestrator.maintenance import MaintenanceRunner
+    from taskbrew.orchestrator.retention import RetentionManager, build_policies
+
+    config = orch.team_config.maintenance
+    retention = RetentionManager(
+        orch.db,
+        build_policies(config.retention),
+        archive_dir=Path(orch.project_dir) / config.archive_dir,
+        vacuum_free_ratio=config.vacuum_free_ratio,
+        # Workers claim tasks in other processes; they cannot wait out a VACUUM.
+        full_vacuum=not shared_db,
+    )
+    runner = MaintenanceRunner()
+    jobs = {
+        "refresh_risk_scores": (
+            orch.process_intelligence_manager
+            and orch.process_intelligence_manager.refresh_scores
+        ),
+        "decay_memory_scores": orch.memory_manager and orch.memory_manager.decay_scores,
+        "cluster_errors": orch.learning_manager and orch.learning_manager.cluster_errors,
+        "detect_overlaps": (
+            orch.social_intelligence_manager
+            and orch.social_intelligence_manager.detect_overlaps
+        ),
+        "retention": retention.apply_all,
+        "compact": retention.compact,
+        # Agent workers record spend in their own processes.
+        "refresh_budgets": shared_db and orch.cost_manager and orch.cost_manager.refresh,
+    }
+    overrides = config.intervals
+    for name, func in jobs.items():
+        if func:
+            runner.register(
+                name, func, overrides.get(name, _MAINTENANCE_INTERVALS[name]),
+            )
+    return runner
 
-    This is a module-level function so that ``app.py`` can import and call it
-    when activating a project via the API.
+
+def _agent_worker_count(orch: Orchestrator) -> int:
+    """Agent worker processes to run: ``TASKBREW_AGENT_WORKERS`` (set by
+    ``--workers``), else ``execution.agent_workers``; 0 runs agents in
+    this process."""
+    from taskbrew.orchestrator.worker_pool import WORKER_COUNT_ENV
+
+    raw = os.environ.get(WORKER_COUNT_ENV)
+    if raw:
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            logging.getLogger(__name__).warning(
+                "Ignoring non-integer %s=%r", WORKER_COUNT_ENV, raw,
+            )
+    return orch.team_config.execution.agent_workers
+
+
+def _agent_api_url(orch: Orchestrator) -> str:
+    # Map bind host to connect host (0.0.0.0 binds all interfaces but can't be connected to)
+    host = orch.team_config.dashboard_host
+    connect_host = "127.0.0.1" if host in ("0.0.0.0", "::") else host
+    return f"http://{connect_host}:{orch.team_config.dashboard_port}"
+
+
+def _spawn_agent_loop(
+    orch: Orchestrator, instance_id: str, role_config: RoleConfig, api_url: str,
+) -> asyncio.Task:
+    """Create, register and start the AgentLoop for *instance_id*."""
+    # uses_worktree three-state wiring:
+    #   True  -> force worktree on
+    #   False -> force worktree off
+    #   None  -> auto-detect: any role with a file-mutating tool
+    #            gets a worktree so it can't touch the main checkout.
+    needs_worktree = _resolve_needs_worktree(role_config)
+    loop = AgentLoop(
+        instance_id=instance_id,
+        role_config=role_config,
+        board=orch.task_board,
+        event_bus=orch.event_bus,
+        instance_manager=orch.instance_manager,
+        all_roles=orch.roles,
+        project_dir=orch.project_dir,
+        poll_interval=orch.team_config.default_poll_interval,
+        api_url=api_url,
+        worktree_manager=orch.worktree_manager if needs_worktree else None,
+        memory_manager=orch.memory_manager,
+        context_registry=orch.context_registry,
+        observability_manager=orch.observability_manager,
+        cli_provider=getattr(orch.team_config, "cli_provider", "claude") or "claude",
+        mcp_servers=getattr(orch.team_config, "mcp_servers", None),
+        supervisor=orch.supervisor,
+        cost_manager=orch.cost_manager,
+    )
+    # Dict to look up agent loops and their asyncio tasks by instance_id
+    # (used by the auto-scaler stopper callback to cancel running agents)
+    if not hasattr(orch, '_agent_tasks_by_id'):
+        orch._agent_tasks_by_id = {}
+    orch._agent_loops.append(loop)
+    task = asyncio.create_task(loop.run())
+    orch.agent_tasks.append(task)
+    orch._agent_tasks_by_id[instance_id] = (loop, task)
+    return task
+
+
+async def _stop_agent_loop(orch: Orchestrator, instance_id: str) -> None:
+    """Stop the agent loop for *instance_id* and wait for its task to end."""
+    entry = getattr(orch, "_agent_tasks_by_id", {}).pop(instance_id, None)
+    if not entry:
+        return
+    agent_loop, agent_task = entry
+    agent_loop.stop()
+    agent_task.cancel()
+    try:
+        await agent_task
+    except (asyncio.CancelledError, Exception):
+        pass
+    # Remove from the lists so shutdown doesn't try again
+    if agent_loop in orch._agent_loops:
+        orch._agent_loops.remove(agent_loop)
+    if agent_task in orch.agent_tasks:
+        orch.agent_tasks.remove(agent_task)
+
+
+async def _reload_roles(orch: Orchestrator, event: dict | None = None) -> None:
+    """Apply role edits made on the dashboard to an agent worker.
+
+    The API process persists every edit to ``config/roles/`` before it
+    emits ``role.created`` / ``role.updated`` / ``role.deleted``, so a
+    worker re-reads that directory. Existing :class:`RoleConfig` objects
+    are updated in place because the running AgentLoops hold them; the
+    loops of a deleted role are stopped. As in a single process, a new
+    role or a changed ``max_instances`` takes effect on restart.
     """
+    logger = logging.getLogger(__name__)
+    try:
+        fresh = load_roles(Path(orch.project_dir) / "config" / "roles")
+    except Exception:
+        logger.exception("Could not reload roles after %s", (event or {}).get("type"))
+        return
+    for name, role_config in fresh.items():
+        current = orch.roles.get(name)
+        if current is None:
+            orch.roles[name] = role_config
+            continue
+        for f in dataclasses.fields(role_config):
+            setattr(current, f.name, getattr(role_config, f.name))
+    for name in [n for n in orch.roles if n not in fresh]:
+        deleted = orch.roles.pop(name)
+        orch.task_board._role_to_prefix.pop(name, None)
+        if deleted.can_create_groups:
+            orch.task_board._group_prefixes.pop(name, None)
+        for instance_id in [
+            iid for iid in getattr(orch, "_agent_tasks_by_id", {})
+            if iid == name or iid.startswith(f"{name}-")
+        ]:
+            await _stop_agent_loop(orch, instance_id)
+        logger.info("Role %s was deleted; stopped its agents", name)
+
+
+async def _recover_tasks(orch: Orchestrator) -> None:
     # Recover orphaned tasks from previous crash
     recovered = await orch.task_board.recover_orphaned_tasks()
     if recovered:
@@ -539,9 +718,24 @@ async def start_agents(orch: Orchestrator):
         logger = logging.getLogger(__name__)
         logger.info("Recovered %d stuck blocked tasks", len(stuck))
 
-    # Start background orphan recovery loop
-    recovery_task = asyncio.create_task(_orphan_recovery_loop(orch))
-    orch.agent_tasks.append(recovery_task)
+
+def _start_supervisor(orch: Orchestrator) -> None:
+    # One supervisor task batches heartbeats, runs every agent's idle
+    # watchdog in memory and recovers tasks held by dead instances.
+    from taskbrew.agents.supervisor import AgentSupervisor
+
+    orch.supervisor = AgentSupervisor(
+        orch.instance_manager, orch.task_board, orch.event_bus,
+    )
+    orch.agent_tasks.append(asyncio.create_task(orch.supervisor.run()))
+
+
+def _start_background_jobs(orch: Orchestrator, *, shared_db: bool = False) -> None:
+    # Periodic recalculations run here rather than inline with the API
+    # requests that used to trigger them.
+    if orch.team_config.maintenance.enabled:
+        orch.maintenance = _build_maintenance_runner(orch, shared_db=shared_db)
+        orch.agent_tasks.append(asyncio.create_task(orch.maintenance.run()))
 
     # Start escalation monitor background task
     if orch.escalation_manager:
@@ -555,107 +749,212 @@ async def start_agents(orch: Orchestrator):
         )
         orch.agent_tasks.append(orch._escalation_task)
 
+
+def _start_auto_scaler(orch: Orchestrator, api_url: str) -> None:
+    # Start auto-scaler if any role has auto_scale enabled
+    has_auto_scale = any(
+        r.auto_scale and r.auto_scale.enabled for r in orch.roles.values()
+        if hasattr(r, 'auto_scale') and r.auto_scale
+    )
+    if not has_auto_scale:
+        return
+    from taskbrew.agents.auto_scaler import AutoScaler
+
+    hub = orch.event_hub
+
+    async def _agent_factory(instance_id: str, role_config: RoleConfig) -> asyncio.Task | None:
+        if hub is not None:
+            # Multi-process mode: the worker with the fewest agents runs it.
+            hub.spawn_agent(instance_id, role_config.role)
+            return None
+        return _spawn_agent_loop(orch, instance_id, role_config, api_url)
+
+    async def _agent_stopper(instance_id: str) -> None:
+        if hub is not None:
+            if hub.stop_agent(instance_id):
+                return  # the owning worker deregisters it
+        else:
+            await _stop_agent_loop(orch, instance_id)
+        await orch.instance_manager.remove_instance(instance_id)
+
+    scaler = AutoScaler(
+        orch.task_board, orch.instance_manager, orch.roles,
+        agent_factory=_agent_factory, agent_stopper=_agent_stopper,
+    )
+    scaler_task = asyncio.create_task(scaler.run())
+    orch.agent_tasks.append(scaler_task)
+
+
+async def _start_worker_pool(orch: Orchestrator, count: int) -> None:
+    """Run the agents of *orch* in *count* worker processes."""
+    from logging.handlers import RotatingFileHandler
+
+    from taskbrew.orchestrator.event_bridge import EventHub
+    from taskbrew.orchestrator.worker_pool import WorkerPool
+
+    orch.event_hub = EventHub(orch.event_bus, orch.instance_manager)
+    await orch.event_hub.start()
+    # Workers log next to a daemon's log file; otherwise to our stderr.
+    log_dir = next(
+        (
+            Path(h.baseFilename).parent for h in logging.getLogger().handlers
+            if isinstance(h, RotatingFileHandler)
+        ),
+        None,
+    )
+    orch.worker_pool = WorkerPool(orch.project_dir, count, orch.event_hub, log_dir=log_dir)
+    await orch.worker_pool.start()
+    orch.agent_tasks.append(asyncio.create_task(orch.worker_pool.run()))
+
+
+async def start_agents(orch: Orchestrator):
+    """Start agent loops, recovery tasks, and auto-scaler for *orch*.
+
+    This is a module-level function so that ``app.py`` can import and call it
+    when activating a project via the API.
+
+    With agent workers configured (see :func:`_agent_worker_count`) this
+    process keeps recovery, maintenance and the escalation monitor and
+    hands the agent loops to worker processes instead.
+    """
+    await _recover_tasks(orch)
+
+    workers = _agent_worker_count(orch)
+    if workers > 0:
+        _start_background_jobs(orch, shared_db=True)
+        # Pause state lives here and is pushed to the workers.
+        orch.instance_manager.pause_all(list(orch.roles.keys()))
+        await _start_worker_pool(orch, workers)
+        # Scales through the event hub, across all workers.
+        _start_auto_scaler(orch, _agent_api_url(orch))
+        return
+
+    # Pre-create idle worktrees (execution.worktree_pool_size) so
+    # claims check one out instead of building it.
+    if orch.worktree_manager:
+        orch.worktree_manager.start_pool()
+
+    _start_supervisor(orch)
+    _start_background_jobs(orch)
+
     # Spawn agent loops
-    # Map bind host to connect host (0.0.0.0 binds all interfaces but can't be connected to)
-    connect_host = "127.0.0.1" if orch.team_config.dashboard_host in ("0.0.0.0", "::") else orch.team_config.dashboard_host
-    api_url = f"http://{connect_host}:{orch.team_config.dashboard_port}"
-    # Dict to look up agent loops and their asyncio tasks by instance_id
-    # (used by the auto-scaler stopper callback to cancel running agents)
-    if not hasattr(orch, '_agent_tasks_by_id'):
-        orch._agent_tasks_by_id = {}
-    cli_provider = getattr(orch.team_config, "cli_provider", "claude") or "claude"
+    api_url = _agent_api_url(orch)
     for role_name, role_config in orch.roles.items():
-        # uses_worktree three-state wiring:
-        #   True  -> force worktree on
-        #   False -> force worktree off
-        #   None  -> auto-detect: any role with a file-mutating tool
-        #            gets a worktree so it can't touch the main checkout.
-        needs_worktree = _resolve_needs_worktree(role_config)
         for i in range(1, role_config.max_instances + 1):
-            instance_id = f"{role_name}-{i}"
-            loop = AgentLoop(
-                instance_id=instance_id,
-                role_config=role_config,
-                board=orch.task_board,
-                event_bus=orch.event_bus,
-                instance_manager=orch.instance_manager,
-                all_roles=orch.roles,
-                project_dir=orch.project_dir,
-                poll_interval=orch.team_config.default_poll_interval,
-                api_url=api_url,
-                worktree_manager=orch.worktree_manager if needs_worktree else None,
-                memory_manager=orch.memory_manager,
-                context_registry=orch.context_registry,
-                observability_manager=orch.observability_manager,
-                cli_provider=cli_provider,
-                mcp_servers=getattr(orch.team_config, "mcp_servers", None),
-            )
-            orch._agent_loops.append(loop)
-            task = asyncio.create_task(loop.run())
-            orch.agent_tasks.append(task)
-            orch._agent_tasks_by_id[instance_id] = (loop, task)
+            _spawn_agent_loop(orch, f"{role_name}-{i}", role_config, api_url)
 
     # Start all agents in paused state — user must click Resume on the dashboard
     all_role_names = list(orch.roles.keys())
     orch.instance_manager.pause_all(all_role_names)
 
-    # Start auto-scaler if any role has auto_scale enabled
-    has_auto_scale = any(
-        r.auto_scale and r.auto_scale.enabled for r in orch.roles.values()
-        if hasattr(r, 'auto_scale') and r.auto_scale
-    )
-    if has_auto_scale:
-        from taskbrew.agents.auto_scaler import AutoScaler
-
-        async def _agent_factory(instance_id: str, role_config: RoleConfig) -> asyncio.Task:
-            needs_worktree = _resolve_needs_worktree(role_config)
-            loop = AgentLoop(
-                instance_id=instance_id,
-                role_config=role_config,
-                board=orch.task_board,
-                event_bus=orch.event_bus,
-                instance_manager=orch.instance_manager,
-                all_roles=orch.roles,
-                project_dir=orch.project_dir,
-                poll_interval=orch.team_config.default_poll_interval,
-                api_url=api_url,
-                worktree_manager=orch.worktree_manager if needs_worktree else None,
-                memory_manager=orch.memory_manager,
-                context_registry=orch.context_registry,
-                observability_manager=orch.observability_manager,
-                cli_provider=cli_provider,
-                mcp_servers=getattr(orch.team_config, "mcp_servers", None),
-            )
-            orch._agent_loops.append(loop)
-            task = asyncio.create_task(loop.run())
-            orch.agent_tasks.append(task)
-            orch._agent_tasks_by_id[instance_id] = (loop, task)
-            return task
-
-        async def _agent_stopper(instance_id: str) -> None:
-            # Stop the agent loop and cancel its asyncio task
-            entry = orch._agent_tasks_by_id.pop(instance_id, None)
-            if entry:
-                agent_loop, agent_task = entry
-                agent_loop.stop()
-                agent_task.cancel()
-                try:
-                    await agent_task
-                except (asyncio.CancelledError, Exception):
-                    pass
-                # Remove from the lists so shutdown doesn't try again
-                if agent_loop in orch._agent_loops:
-                    orch._agent_loops.remove(agent_loop)
-                if agent_task in orch.agent_tasks:
-                    orch.agent_tasks.remove(agent_task)
-            await orch.instance_manager.remove_instance(instance_id)
+    _start_auto_scaler(orch, api_url)
+
+
+async def start_agent_worker(orch: Orchestrator, index: int, count: int):
+    """Start this worker's share of the agent loops (worker *index* of *count*).
 
-        scaler = AutoScaler(
-            orch.task_board, orch.instance_manager, orch.roles,
-            agent_factory=_agent_factory, agent_stopper=_agent_stopper,
+    The API process has already recovered orphaned tasks, and it runs
+    maintenance and the auto-scaler; a worker runs a supervisor for its
+    own agents, the budget refresh, and starts or stops auto-scaled
+    instances when the event hub asks.
+    """
+    from taskbrew.orchestrator.maintenance import MaintenanceRunner
+    from taskbrew.orchestrator.worker_pool import partition_instances
+
+    if orch.worktree_manager:
+        # Every worker keeps its own warm slots.
+        orch.worktree_manager.slot_prefix += f"w{index}-"
+        orch.worktree_manager.start_pool()
+    _start_supervisor(orch)
+
+    # Budget spend recorded by other workers only reaches this process's
+    # ledger through the database.
+    if orch.cost_manager is not None:
+        orch.maintenance = MaintenanceRunner()
+        orch.maintenance.register(
+            "refresh_budgets", orch.cost_manager.refresh,
+            orch.team_config.maintenance.intervals.get(
+                "refresh_budgets", _MAINTENANCE_INTERVALS["refresh_budgets"],
+            ),
         )
-        scaler_task = asyncio.create_task(scaler.run())
-        orch.agent_tasks.append(scaler_task)
+        orch.agent_tasks.append(asyncio.create_task(orch.maintenance.run()))
+
+    api_url = _agent_api_url(orch)
+    for instance_id, role_config in partition_instances(orch.roles, index, count):
+        _spawn_agent_loop(orch, instance_id, role_config, api_url)
+
+    # Paused until the event hub sends the API process's pause state.
+    orch.instance_manager.pause_all(list(orch.roles.keys()))
+
+    async def _on_role_change(event: dict) -> None:
+        await _reload_roles(orch, event)
+
+    for event_type in ("role.created", "role.updated", "role.deleted"):
+        orch.event_bus.subscribe(event_type, _on_role_change)
+
+    async def _on_hub_command(message: dict) -> None:
+        instance_id = message["instance_id"]
+        if message["kind"] == "stop":
+            await _stop_agent_loop(orch, instance_id)
+            await orch.instance_manager.remove_instance(instance_id)
+            return
+        role_config = orch.roles.get(message.get("role"))
+        if role_config is None:
+            logging.getLogger(__name__).warning(
+                "Cannot start %s: unknown role %r", instance_id, message.get("role"),
+            )
+            return
+        _spawn_agent_loop(orch, instance_id, role_config, api_url)
+
+    if orch.event_bridge is not None:
+        orch.event_bridge.on_command = _on_hub_command
+
+
+async def run_agent_worker(project_dir: Path, index: int, count: int) -> None:
+    """Entry point of an agent worker process (``--_agent_worker``)."""
+    from taskbrew.orchestrator.event_bridge import EventBridgeClient
+    from taskbrew.orchestrator.worker_pool import (
+        HUB_ADDRESS_ENV,
+        HUB_TOKEN_ENV,
+        partition_instances,
+    )
+
+    logger = logging.getLogger(__name__)
+    orch = await build_orchestrator(project_dir=project_dir)
+    bridge = EventBridgeClient(
+        orch.event_bus, orch.instance_manager,
+        address=os.environ[HUB_ADDRESS_ENV],
+        token=os.environ[HUB_TOKEN_ENV],
+        worker_id=f"worker-{index}",
+        instances=[
+            instance_id for instance_id, _ in partition_instances(orch.roles, index, count)
+        ],
+    )
+    try:
+        await bridge.connect()
+    except BaseException:
+        await orch.shutdown()
+        raise
+    orch.event_bridge = bridge
+    await start_agent_worker(orch, index, count)
+    logger.info("Agent worker %d/%d running %d agents", index, count, len(orch._agent_loops))
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    hub_closed = asyncio.create_task(bridge.run())
+    stopping = asyncio.create_task(stop.wait())
+    await asyncio.wait({hub_closed, stopping}, return_when=asyncio.FIRST_COMPLETED)
+    if not stop.is_set():
+        # The API process is gone (or restarting); so are our events.
+        logger.warning("Event hub closed; shutting down agent worker %d", index)
+    stopping.cancel()
+    await orch.shutdown()
+    hub_closed.cancel()
 
 
 async def run_server(project_manager):
@@ -667,6 +966,7 @@ async def run_server(project_manager):
     orch = project_manager.orchestrator
     chat_manager = ChatManager(
         project_dir=orch.project_dir if orch else None,
+        db=orch.db if orch else None,
     )
 
     app = create_app(project_manager=project_manager, chat_manager=chat_manager)
@@ -680,9 +980,26 @@ async def run_server(project_manager):
     host = orch.team_config.dashboard_host if orch else "127.0.0.1"
     port = orch.team_config.dashboard_port if orch else 8420
 
+    # Keep Claude session-log token counters current in the background so
+    # /api/usage/summary only reads what was appended since last time.
+    from taskbrew.dashboard.routers import usage as usage_router
+    usage_tasks = [
+        asyncio.create_task(
+            usage_router.session_usage.run(lambda: usage_router.PROJECTS_DIR)
+        ),
+        # Plan-limit probes refresh on their own schedule while the usage
+        # page is being viewed; requests only read the cached result.
+        asyncio.create_task(usage_router.claude_quota.run()),
+        asyncio.create_task(usage_router.gemini_quota.run()),
+    ]
+
     config = uvicorn.Config(app, host=host, port=port, log_level="info")
     server = uvicorn.Server(config)
-    await server.serve()
+    try:
+        await server.serve()
+    finally:
+        for task in usage_tasks:
+            task.cancel()
 
 
 async def submit_goal(orch: Orchestrator, title: str, description: str = ""):
@@ -728,6 +1045,52 @@ async def show_status(orch: Orchestrator):
                 print(f"    {t['id']}: {t['title']}")
 
 
+async def show_autoscale_replay(
+    orch: Orchestrator,
+    since: str | None = None,
+    interval: float = 60.0,
+    threshold: int | None = None,
+    target_latency: float | None = None,
+):
+    """Replay task history through the auto-scaler and print its decisions."""
+    from taskbrew.agents.auto_scaler import replay_history
+    from taskbrew.config_loader import AutoScaleConfig
+
+    roles = {}
+    for name, rc in orch.roles.items():
+        asc = rc.auto_scale or AutoScaleConfig()
+        # Overrides apply to every role so alternatives can be compared
+        # without editing the YAML.
+        asc = dataclasses.replace(
+            asc,
+            enabled=True,
+            scale_up_threshold=asc.scale_up_threshold if threshold is None else threshold,
+            target_latency=asc.target_latency if target_latency is None else target_latency,
+        )
+        roles[name] = dataclasses.replace(rc, auto_scale=asc)
+
+    results = await replay_history(orch.db, roles, since=since, interval=interval)
+    print("\n=== Auto-scale replay ===\n")
+    for name, res in results.items():
+        asc = roles[name].auto_scale
+        print(
+            f"{name}: threshold={asc.scale_up_threshold} "
+            f"target_latency={asc.target_latency or '-'}min "
+            f"max={roles[name].max_instances}"
+        )
+        print(
+            f"  ticks={res['ticks']} peak_pending={res['peak_pending']} "
+            f"peak_instances={res['peak_instances']} "
+            f"instance_hours={res['instance_seconds'] / 3600:.1f} "
+            f"decisions={len(res['decisions'])}"
+        )
+        for d in res["decisions"][-10:]:
+            print(
+                f"    {d['at']}  {d['direction']:<4} {d['from']} -> {d['to']} "
+                f"(pending {d['pending']}, forecast {d['target']})"
+            )
+
+
 async def async_main(args):
     if args.command == "serve":
         from taskbrew.project_manager import ProjectManager, _slugify
@@ -803,6 +1166,21 @@ async def async_main(args):
         finally:
             await orch.shutdown()
 
+    elif args.command == "autoscale-replay":
+        orch = await build_orchestrator(
+            project_dir=Path(args.project_dir) if args.project_dir else None,
+        )
+        try:
+            await show_autoscale_replay(
+                orch,
+                since=args.since,
+                interval=args.interval,
+                threshold=args.threshold,
+                target_latency=args.target_latency,
+            )
+        finally:
+            await orch.shutdown()
+
 
 def _cmd_init(args):
     """Initialize a new taskbrew project."""
@@ -979,6 +1357,11 @@ def _cmd_doctor(args):
             print(f"  [FAIL] Database directory: {e}")
             all_ok = False
 
+    if getattr(args, "query_plans", False):
+        print("\nAuditing query plans against a synthetic database...\n")
+        if not _check_query_plans(args.query_plan_tasks):
+            all_ok = False
+
     print()
     if all_ok:
         print("All checks passed!")
@@ -986,6 +1369,104 @@ def _cmd_doctor(args):
         print("Some checks failed. Fix the issues above and run again.")
 
 
+def _check_query_plans(tasks: int) -> bool:
+    """Print an EXPLAIN QUERY PLAN audit; return False if any plan is flagged."""
+    from taskbrew.orchestrator.query_plans import audit_query_plans
+
+    reports = asyncio.run(audit_query_plans(tasks=tasks))
+    ok = True
+    for report in reports:
+        shape = report.shape
+        if report.error:
+            print(f"  [FAIL] {shape.name} ({shape.source}): {report.error}")
+            ok = False
+        elif report.unexpected:
+            print(f"  [WARN] {shape.name} ({shape.source}): {', '.join(report.unexpected)}")
+            for line in report.plan:
+                print(f"           {line}")
+            ok = False
+        else:
+            print(f"  [OK] {shape.name}")
+    return ok
+
+
+def _cmd_bench(args):
+    """Run the fake-provider orchestrator benchmark and emit JSON."""
+    import json
+
+    from taskbrew.orchestrator.bench import BenchConfig, compare_results, run_benchmark
+
+    if not args.verbose:
+        # Simulated failures log full tracebacks from the agent loops.
+        logging.getLogger("taskbrew").setLevel(logging.CRITICAL)
+    if args.db_profiles is not None:
+        _cmd_bench_db_profiles(args)
+        return
+    config = BenchConfig(
+        agents_per_role=args.agents,
+        tasks=args.tasks,
+        fanout=args.fanout,
+        failure_rate=args.failure_rate,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        seed=args.seed,
+        timeout=args.timeout,
+    )
+    report = asyncio.run(run_benchmark(config))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        print(
+            f"{report['tasks']['total']} tasks in {report['elapsed_seconds']}s "
+            f"({report['throughput_tasks_per_second']} tasks/s); "
+            f"{report['db_statements']['per_task']} statements/task; "
+            f"wrote {args.output}"
+        )
+    else:
+        print(text)
+    if report["timed_out"]:
+        print("Benchmark timed out before every task was terminal", file=sys.stderr)
+        sys.exit(1)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        regressions = compare_results(baseline, report, args.max_regression)
+        for line in regressions:
+            print(f"  [REGRESSION] {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+def _cmd_bench_db_profiles(args):
+    """Compare SQLite connection profiles on a synthetic database."""
+    import json
+
+    from taskbrew.orchestrator.bench import DbProfileBenchConfig, run_db_profile_benchmark
+
+    config = DbProfileBenchConfig(
+        profiles=tuple(args.db_profiles),
+        tasks=args.db_tasks,
+        read_rounds=args.db_read_rounds,
+        write_transactions=args.db_writes,
+        seed=args.seed,
+    )
+    try:
+        report = asyncio.run(run_db_profile_benchmark(config))
+    except ValueError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(2)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        for name, result in report["profiles"].items():
+            print(
+                f"{name}: {result['read']['per_second']} reads/s, "
+                f"{result['write']['per_second']} writes/s"
+            )
+        print(f"wrote {args.output}")
+    else:
+        print(text)
+
+
 # ---------------------------------------------------------------------------
 # Daemon commands
 # ---------------------------------------------------------------------------
@@ -1006,6 +1487,9 @@ def _cmd_start(args):
     cmd = [sys.executable, "-m", "taskbrew.main", "--_serve_foreground"]
     if getattr(args, "project_dir", None):
         cmd += ["--project-dir", args.project_dir]
+    workers = getattr(args, "workers", None)
+    if workers is not None:
+        cmd += ["--workers", str(workers)]
 
     proc = subprocess.Popen(
         cmd,
@@ -1024,6 +1508,8 @@ def _cmd_start(args):
     port = getattr(args, "port", None) or 8420
 
     print(f"TaskBrew started (PID: {proc.pid}). Dashboard: http://{host}:{port}")
+    if workers:
+        print(f"Agents run in {workers} worker processes.")
     print("Run `taskbrew logs` to view logs, `taskbrew stop` to stop.")
 
 
@@ -1121,6 +1607,11 @@ def cli_main():
             idx = sys.argv.index("--project-dir")
             if idx + 1 < len(sys.argv):
                 args.project_dir = sys.argv[idx + 1]
+        if "--workers" in sys.argv:
+            idx = sys.argv.index("--workers")
+            if idx + 1 < len(sys.argv):
+                from taskbrew.orchestrator.worker_pool import WORKER_COUNT_ENV
+                os.environ[WORKER_COUNT_ENV] = sys.argv[idx + 1]
         if not _write_pid_exclusive(os.getpid()):
             # Another daemon raced us and won. Exit silently so we
             # don't leave two servers fighting for port 8420.
@@ -1131,6 +1622,28 @@ def cli_main():
             _remove_pid()
         return
 
+    # Internal flag: agent worker process spawned by the API process's
+    # WorkerPool (multi-process mode).
+    if "--_agent_worker" in sys.argv:
+        sys.argv.remove("--_agent_worker")
+        from taskbrew.logging_config import setup_file_logging, setup_logging
+        worker_parser = argparse.ArgumentParser(prog="taskbrew-agent-worker")
+        worker_parser.add_argument("--project-dir", required=True)
+        worker_parser.add_argument("--worker-index", type=int, required=True)
+        worker_parser.add_argument("--worker-count", type=int, required=True)
+        worker_parser.add_argument("--log-file", default=None)
+        worker_args = worker_parser.parse_args(sys.argv[1:])
+        if worker_args.log_file:
+            setup_file_logging(Path(worker_args.log_file))
+        else:
+            setup_logging()
+        asyncio.run(run_agent_worker(
+            Path(worker_args.project_dir),
+            worker_args.worker_index,
+            worker_args.worker_count,
+        ))
+        return
+
     from taskbrew.logging_config import setup_logging
     setup_logging()
 
@@ -1142,10 +1655,15 @@ def cli_main():
     start_parser.add_argument("--project-dir", default=None, help="Project directory")
     start_parser.add_argument("--host", default=None)
     start_parser.add_argument("--port", type=int, default=None)
+    start_parser.add_argument("--workers", type=int, default=None,
+                              help="Run agents in this many worker processes "
+                                   "beside the dashboard API (0 = in-process)")
 
     # serve — foreground mode (backwards compat)
     serve_parser = sub.add_parser("serve", help="Start server in foreground")
     serve_parser.add_argument("--project-dir", default=None, help="Project directory")
+    serve_parser.add_argument("--workers", type=int, default=None,
+                              help="Run agents in this many worker processes")
 
     # stop
     sub.add_parser("stop", help="Stop the background server")
@@ -1173,8 +1691,60 @@ def cli_main():
     init_parser.add_argument("--provider", default="claude", choices=["claude", "gemini"],
                              help="CLI provider")
 
+    # autoscale-replay
+    replay_parser = sub.add_parser(
+        "autoscale-replay", help="Replay task history through the auto-scaler (dry run)",
+    )
+    replay_parser.add_argument("--project-dir", default=None, help="Project directory")
+    replay_parser.add_argument("--since", default=None,
+                               help="Only replay tasks created at/after this ISO timestamp")
+    replay_parser.add_argument("--interval", type=float, default=60.0,
+                               help="Simulated scaling tick in seconds")
+    replay_parser.add_argument("--threshold", type=int, default=None,
+                               help="Override scale_up_threshold for every role")
+    replay_parser.add_argument("--target-latency", type=float, default=None,
+                               help="Override target_latency (minutes) for every role")
+
+    # bench
+    bench_parser = sub.add_parser(
+        "bench", help="Benchmark the orchestrator end to end on a fake provider",
+    )
+    bench_parser.add_argument("--agents", type=int, default=2,
+                              help="Agents per role (pm, architect, coder, verifier)")
+    bench_parser.add_argument("--tasks", type=int, default=20, help="Goals to seed")
+    bench_parser.add_argument("--fanout", type=int, default=2,
+                              help="Child tasks each run creates for the next role")
+    bench_parser.add_argument("--failure-rate", type=float, default=0.0,
+                              help="Probability that a fake run fails")
+    bench_parser.add_argument("--latency-ms", type=float, default=5.0,
+                              help="Simulated model latency per run")
+    bench_parser.add_argument("--jitter-ms", type=float, default=2.0)
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--timeout", type=float, default=300.0,
+                              help="Give up after this many seconds")
+    bench_parser.add_argument("--output", "-o", default=None,
+                              help="Write the JSON report here instead of stdout")
+    bench_parser.add_argument("--compare", default=None,
+                              help="Baseline JSON report; exit 1 on regression")
+    bench_parser.add_argument("--max-regression", type=float, default=10.0,
+                              help="Allowed regression per metric, in percent")
+    bench_parser.add_argument("--verbose", action="store_true", help="Keep agent logs")
+    bench_parser.add_argument("--db-profiles", nargs="*", default=None, metavar="PROFILE",
+                              help="Instead compare SQLite connection profiles "
+                                   "(default: all) on a synthetic database")
+    bench_parser.add_argument("--db-tasks", type=int, default=20000,
+                              help="Synthetic tasks for --db-profiles")
+    bench_parser.add_argument("--db-read-rounds", type=int, default=20,
+                              help="Passes over the dashboard query shapes per profile")
+    bench_parser.add_argument("--db-writes", type=int, default=500,
+                              help="Write transactions per profile")
+
     # doctor
-    sub.add_parser("doctor", help="Check system requirements")
+    doctor_parser = sub.add_parser("doctor", help="Check system requirements")
+    doctor_parser.add_argument("--query-plans", action="store_true",
+                               help="Audit EXPLAIN QUERY PLAN for the hot queries")
+    doctor_parser.add_argument("--query-plan-tasks", type=int, default=5000,
+                               help="Synthetic tasks to generate for --query-plans")
 
     args = parser.parse_args()
 
@@ -1182,6 +1752,8 @@ def cli_main():
         _cmd_init(args)
     elif args.command == "doctor":
         _cmd_doctor(args)
+    elif args.command == "bench":
+        _cmd_bench(args)
     elif args.command == "stop":
         _cmd_stop(args)
     elif args.command == "logs":
@@ -1192,12 +1764,17 @@ def cli_main():
         # Foreground mode — run directly
         if not hasattr(args, "project_dir"):
             args.project_dir = None
+        if args.workers is not None:
+            from taskbrew.orchestrator.worker_pool import WORKER_COUNT_ENV
+            os.environ[WORKER_COUNT_ENV] = str(args.workers)
         asyncio.run(async_main(args))
-    elif args.command in ("goal", "status"):
+    elif args.command in ("goal", "status", "autoscale-replay"):
         asyncio.run(async_main(args))
     else:
         # No subcommand given — default to background start
-        args = argparse.Namespace(command="start", project_dir=None, host=None, port=None)
+        args = argparse.Namespace(
+            command="start", project_dir=None, host=None, port=None, workers=None,
+        )
         _cmd_start(args)
 
 
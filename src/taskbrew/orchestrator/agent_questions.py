@@ -5,7 +5,9 @@ In auto mode the manager records the agent's preferred answer and
 returns immediately. In manual mode it sets ``tasks.awaiting_input_since``
 on the task row, blocks on a per-question ``asyncio.Event`` until
 either the user answers via the dashboard or the task is cancelled,
-then clears the pause column and returns the resolved row.
+then clears the pause column and returns the resolved row. Setting
+and clearing the column emit ``question.pending`` / ``question.closed``
+so the agent supervisor can follow it without polling.
 
 Events are in-memory (per-process). On server restart the question
 row stays in 'pending' status; the agent's blocked call is gone
@@ -114,11 +116,17 @@ class AgentQuestionManager:
         preferred_answer: str,
         reasoning: str,
         mode: str,  # "auto" | "manual"
+        wait: float | None = None,
     ) -> dict:
         """Persist a question and (in manual mode) wait for an answer.
 
         Returns a dict shaped for the MCP caller:
         ``{request_id, status, selected_answer, selected_by}``.
+
+        *wait* bounds the manual-mode wait in seconds; when it elapses the
+        result has ``status="pending"`` and the caller long-polls
+        :meth:`wait_for_answer` with the returned ``request_id``.  ``None``
+        blocks until the question is answered or cancelled.
         """
         self._validate(
             question=question, options=options,
@@ -188,20 +196,69 @@ class AgentQuestionManager:
                 "role": agent_role,
             })
 
-        wake = asyncio.Event()
-        slot: dict = {}
-        self._waiters[question_id] = (wake, slot)
+        return await self.wait_for_answer(question_id, timeout=wait)
+
+    async def wait_for_answer(
+        self, question_id: str, timeout: float | None = None,
+    ) -> dict:
+        """Wait up to *timeout* seconds for a manual question to resolve.
+
+        Returns immediately if the question is already answered or
+        cancelled.  On timeout the result has ``status="pending"`` and the
+        task stays marked as awaiting input; otherwise the pause anchor is
+        cleared so the activity watchdog re-arms.
+        """
+        # Register the waiter before reading the row so an answer landing
+        # between the read and the wait still wakes us.
+        wake, slot = self._waiters.setdefault(question_id, (asyncio.Event(), {}))
+        timed_out = False
+        task_id = None
         try:
-            await wake.wait()
-        finally:
-            self._waiters.pop(question_id, None)
-            # Clear the pause anchor so the activity watchdog re-arms.
-            await self._db.execute(
-                "UPDATE tasks SET awaiting_input_since = NULL "
-                "WHERE id = ?",
-                (task_id,),
+            row = await self._db.execute_fetchone(
+                "SELECT task_id, status, selected_answer, selected_by "
+                "FROM agent_questions WHERE id = ?",
+                (question_id,),
             )
+            if row is None:
+                raise ValueError("question not found")
+            task_id = row["task_id"]
+            if row["status"] != "pending":
+                slot.setdefault(
+                    "status",
+                    "cancelled" if row["status"] == "cancelled" else "answered",
+                )
+                slot.setdefault("selected_answer", row["selected_answer"])
+                slot.setdefault("selected_by", row["selected_by"])
+            else:
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    timed_out = True
+        finally:
+            if self._waiters.get(question_id, (None,))[0] is wake:
+                self._waiters.pop(question_id, None)
+            if task_id is not None and not timed_out:
+                # Clear the pause anchor so the activity watchdog re-arms.
+                await self._db.execute(
+                    "UPDATE tasks SET awaiting_input_since = NULL "
+                    "WHERE id = ?",
+                    (task_id,),
+                )
+                # The supervisor mirrors the anchor from this event and
+                # ``question.pending`` instead of polling the column.
+                if self._event_bus is not None:
+                    await self._event_bus.emit("question.closed", {
+                        "question_id": question_id,
+                        "task_id": task_id,
+                    })
 
+        if timed_out:
+            return {
+                "request_id": question_id,
+                "status": "pending",
+                "selected_answer": None,
+                "selected_by": None,
+            }
         return {
             "request_id": question_id,
             "status": slot.get("status", "answered"),
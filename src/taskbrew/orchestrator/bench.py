@@ -0,0 +1,510 @@
+"""End-to-end orchestrator benchmark on the fake provider.
+
+Builds the real :class:`~taskbrew.main.Orchestrator` with
+:func:`~taskbrew.main.build_orchestrator` in a scratch project whose four
+roles (``pm -> architect -> coder -> verifier``) all use
+:mod:`taskbrew.agents.fake_cli`. It then starts the agents with
+:func:`~taskbrew.main.start_agents`, seeds ``tasks`` goals, and lets the
+fleet run until every task is terminal. Each successful fake run creates
+``fanout`` children for the next role, standing in for the agent's
+``create_task`` tool calls. Each run fails with probability
+``failure_rate``, deterministically per seed.
+
+Measured over the run:
+
+* claim latency: wall time of each successful ``TaskBoard.claim_task``;
+* queue wait: ``started_at - created_at`` for every claimed task;
+* throughput: terminal tasks per second;
+* DB statements per task: every statement SQLite executes on any
+  connection, via ``sqlite3`` trace callbacks (the harness's own
+  completion polls are subtracted);
+* event-bus lag: time from ``emit`` to a handler starting;
+* RSS at start, at end and the process peak.
+
+The report is a JSON-able dict (:func:`run_benchmark`), and
+:func:`compare_results` flags regressions against a saved baseline. The
+entry point is ``taskbrew bench``.
+
+:func:`run_db_profile_benchmark` (``taskbrew bench --db-profiles``)
+instead compares the SQLite connection profiles of
+:mod:`taskbrew.orchestrator.database` on a large synthetic database:
+read throughput replays the dashboard query shapes of
+:mod:`taskbrew.orchestrator.query_plans` and write throughput commits
+small task-completion transactions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+from taskbrew.agents import fake_cli
+
+# (role, prefix, task type of the tasks it receives)
+_PIPELINE = (
+    ("pm", "PM", "goal"),
+    ("architect", "AR", "tech_design"),
+    ("coder", "CD", "implementation"),
+    ("verifier", "VR", "verification"),
+)
+_STAGE = {role: i for i, (role, _, _) in enumerate(_PIPELINE)}
+_OPEN_STATUSES = ("pending", "in_progress", "blocked")
+_POLL_INTERVAL = 0.05
+
+# (dotted metric path, True when a larger value is worse)
+_COMPARED_METRICS = (
+    ("throughput_tasks_per_second", False),
+    ("claim_latency_ms.p50", True),
+    ("claim_latency_ms.p99", True),
+    ("queue_wait_ms.p50", True),
+    ("db_statements.per_task", True),
+    ("event_bus_lag_ms.p99", True),
+    ("rss_kb.peak", True),
+)
+
+_emit_started: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "bench_emit_started", default=None,
+)
+
+
+@dataclass
+class BenchConfig:
+    """Workload shape for :func:`run_benchmark`."""
+
+    agents_per_role: int = 2
+    tasks: int = 20
+    fanout: int = 2
+    failure_rate: float = 0.0
+    latency_ms: float = 5.0
+    jitter_ms: float = 2.0
+    seed: int = 0
+    timeout: float = 300.0
+
+
+def percentiles(samples: list[float]) -> dict:
+    """Nearest-rank p50/p90/p99 and max of *samples*, in the same unit."""
+    if not samples:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        return round(ordered[max(0, -(-len(ordered) * p // 100) - 1)], 3)
+
+    return {
+        "count": len(ordered),
+        "p50": rank(50),
+        "p90": rank(90),
+        "p99": rank(99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def _rss_kb() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, timeout=5, check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _write_project(root: Path, config: BenchConfig) -> None:
+    """Write a scratch project whose roles all use the fake provider."""
+    roles_dir = root / "config" / "roles"
+    roles_dir.mkdir(parents=True, exist_ok=True)
+    team = {
+        "team_name": "taskbrew-bench",
+        "database": {"path": "data/bench.db"},
+        "dashboard": {"host": "127.0.0.1", "port": 8420},
+        "artifacts": {"base_dir": "artifacts"},
+        "cli_provider": "fake",
+        "defaults": {"max_instances": 1, "poll_interval_seconds": 1},
+        "guardrails": {"max_task_depth": 10, "max_tasks_per_group": 100_000},
+    }
+    (root / "config" / "team.yaml").write_text(yaml.safe_dump(team))
+    for i, (role, prefix, accepts) in enumerate(_PIPELINE):
+        data = {
+            "role": role,
+            "display_name": role.title(),
+            "prefix": prefix,
+            "color": "#888888",
+            "emoji": "",
+            "system_prompt": f"You are the {role} (benchmark).",
+            "tools": ["Read"],
+            "model": f"fake-{role}",
+            "accepts": [accepts],
+            "max_instances": config.agents_per_role,
+            "uses_worktree": False,
+            "idle_timeout": 600,
+        }
+        if i + 1 < len(_PIPELINE):
+            nxt, _, task_type = _PIPELINE[i + 1]
+            data["routes_to"] = [{"role": nxt, "task_types": [task_type]}]
+            data["produces"] = [task_type]
+        if i == 0:
+            data["can_create_groups"] = True
+            data["group_type"] = "FEAT"
+        (roles_dir / f"{role}.yaml").write_text(yaml.safe_dump(data))
+
+
+class _Probes:
+    """Counters attached to a running orchestrator."""
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.claim_ms: list[float] = []
+        self.bus_lag_ms: list[float] = []
+
+    def _trace(self, sql: str) -> None:
+        # Runs on aiosqlite's worker threads. Trigger bodies are reported
+        # as "-- TRIGGER ..." lines; count the statements that fired them.
+        if not sql.startswith("--"):
+            self.statements += 1
+
+    async def attach(self, orch) -> None:
+        db = orch.db
+        conns = [db._conn]
+        pooled = []
+        if db._pool is not None:
+            while not db._pool.empty():
+                pooled.append(db._pool.get_nowait())
+        try:
+            for conn in conns + pooled:
+                await conn.set_trace_callback(self._trace)
+        finally:
+            for conn in pooled:
+                db._pool.put_nowait(conn)
+
+        board = orch.task_board
+        claim_task = board.claim_task
+
+        async def _timed_claim(*args, **kwargs):
+            started = time.perf_counter()
+            task = await claim_task(*args, **kwargs)
+            if task is not None:
+                self.claim_ms.append((time.perf_counter() - started) * 1000)
+            return task
+
+        board.claim_task = _timed_claim
+
+        bus = orch.event_bus
+        emit = bus.emit
+
+        async def _stamped_emit(event_type, data):
+            # Handler tasks copy the context at spawn time, so each one
+            # sees the moment its own emit started.
+            token = _emit_started.set(time.perf_counter())
+            try:
+                await emit(event_type, data)
+            finally:
+                _emit_started.reset(token)
+
+        async def _measure_lag(_event):
+            started = _emit_started.get()
+            if started is not None:
+                self.bus_lag_ms.append((time.perf_counter() - started) * 1000)
+
+        bus.emit = _stamped_emit
+        bus.subscribe("*", _measure_lag)
+
+
+async def run_benchmark(config: BenchConfig, workdir: Path | None = None) -> dict:
+    """Run the workload described by *config* and return the report."""
+    from taskbrew.main import build_orchestrator, start_agents
+
+    with tempfile.TemporaryDirectory(prefix="taskbrew-bench-") as tmp:
+        root = Path(workdir) if workdir is not None else Path(tmp)
+        _write_project(root, config)
+        orch = None
+
+        async def _fan_out(task_id: str | None, _prompt: str) -> None:
+            if orch is None or task_id is None or config.fanout <= 0:
+                return
+            task = await orch.task_board.get_task(task_id)
+            stage = _STAGE.get(task["assigned_to"]) if task else None
+            # System follow-ups (e.g. the pm's goal_verification) do not fan out.
+            if stage is None or task["task_type"] != _PIPELINE[stage][2]:
+                return
+            if stage + 1 >= len(_PIPELINE):
+                return
+            role, _, task_type = _PIPELINE[stage + 1]
+            for n in range(config.fanout):
+                await orch.task_board.create_task(
+                    group_id=task["group_id"],
+                    title=f"{task_type} {n + 1} for {task_id}",
+                    task_type=task_type,
+                    assigned_to=role,
+                    created_by=task.get("claimed_by") or "bench",
+                    parent_id=task_id,
+                )
+
+        previous = fake_cli.configure(fake_cli.FakeBehavior(
+            latency_ms=config.latency_ms,
+            jitter_ms=config.jitter_ms,
+            failure_rate=config.failure_rate,
+            seed=config.seed,
+            on_run=_fan_out,
+        ))
+        rss_start = _rss_kb()
+        try:
+            orch = await build_orchestrator(project_dir=root)
+            probes = _Probes()
+            await probes.attach(orch)
+            await start_agents(orch)
+            orch.instance_manager.resume_all()
+
+            started = time.perf_counter()
+            role, _, task_type = _PIPELINE[0]
+            for n in range(config.tasks):
+                group = await orch.task_board.create_group(
+                    title=f"Bench goal {n + 1}", origin=role, created_by="bench",
+                )
+                await orch.task_board.create_task(
+                    group_id=group["id"], title=f"Bench goal {n + 1}",
+                    task_type=task_type, assigned_to=role, created_by="bench",
+                )
+
+            placeholders = ", ".join("?" for _ in _OPEN_STATUSES)
+            polls = 0
+            timed_out = False
+            while True:
+                polls += 1
+                # A group is sealed only after its last task is terminal
+                # and any goal_verification follow-up has been spawned, so
+                # open tasks alone can read zero between the two writes.
+                row = await orch.db.execute_fetchone(
+                    f"SELECT (SELECT COUNT(*) FROM tasks WHERE status IN ({placeholders}))"
+                    " + (SELECT COUNT(*) FROM groups WHERE status = 'active') AS n",
+                    _OPEN_STATUSES,
+                )
+                if not row["n"]:
+                    break
+                if time.perf_counter() - started > config.timeout:
+                    timed_out = True
+                    break
+                await asyncio.sleep(_POLL_INTERVAL)
+            elapsed = time.perf_counter() - started
+            statements = probes.statements - polls
+
+            by_status = {
+                r["status"]: r["n"] for r in await orch.db.execute_fetchall(
+                    "SELECT status, COUNT(*) AS n FROM tasks GROUP BY status"
+                )
+            }
+            waits = []
+            for r in await orch.db.execute_fetchall(
+                "SELECT created_at, started_at FROM tasks WHERE started_at IS NOT NULL"
+            ):
+                created = datetime.fromisoformat(r["created_at"])
+                claimed = datetime.fromisoformat(r["started_at"])
+                waits.append((claimed - created).total_seconds() * 1000)
+        finally:
+            if orch is not None:
+                await orch.shutdown(timeout=5.0)
+            fake_cli.configure(previous)
+
+    terminal = by_status.get("completed", 0) + by_status.get("failed", 0)
+    return {
+        "benchmark": "orchestrator",
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "elapsed_seconds": round(elapsed, 3),
+        "timed_out": timed_out,
+        "tasks": {
+            "total": sum(by_status.values()),
+            "completed": by_status.get("completed", 0),
+            "failed": by_status.get("failed", 0),
+            "by_status": by_status,
+        },
+        "throughput_tasks_per_second": round(terminal / elapsed, 2) if elapsed else None,
+        "claim_latency_ms": percentiles(probes.claim_ms),
+        "queue_wait_ms": percentiles(waits),
+        "db_statements": {
+            "total": statements,
+            "per_task": round(statements / terminal, 1) if terminal else None,
+        },
+        "event_bus_lag_ms": percentiles(probes.bus_lag_ms),
+        "rss_kb": {"start": rss_start, "end": _rss_kb(), "peak": _peak_rss_kb()},
+    }
+
+
+def _metric(report: dict, path: str):
+    value = report
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def compare_results(
+    baseline: dict, current: dict, max_regression_pct: float = 10.0,
+) -> list[str]:
+    """Describe every metric that is worse than *baseline* by more than the limit."""
+    regressions = []
+    for path, higher_is_worse in _COMPARED_METRICS:
+        before, after = _metric(baseline, path), _metric(current, path)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        if (change if higher_is_worse else -change) > max_regression_pct:
+            regressions.append(f"{path}: {before} -> {after} ({change:+.1f}%)")
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# Connection-profile benchmark
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class DbProfileBenchConfig:
+    """Workload shape for :func:`run_db_profile_benchmark`."""
+
+    profiles: tuple[str, ...] = ()  # default: every CONNECTION_PROFILES entry
+    tasks: int = 20000
+    read_rounds: int = 20  # each round runs every query shape once
+    write_transactions: int = 500
+    seed: int = 0
+
+
+async def _bench_profile(path: str, profile, config: DbProfileBenchConfig) -> dict:
+    from taskbrew.orchestrator.database import Database
+    from taskbrew.orchestrator.query_plans import QUERY_SHAPES
+
+    db = Database(path, pool_size=1, profile=profile)
+    await db.initialize()
+    try:
+        read_ms: list[float] = []
+        started = time.perf_counter()
+        for _ in range(config.read_rounds):
+            for shape in QUERY_SHAPES:
+                t0 = time.perf_counter()
+                await db.execute_fetchall(shape.sql, shape.params)
+                read_ms.append((time.perf_counter() - t0) * 1000)
+        read_seconds = time.perf_counter() - started
+
+        rows = await db.execute_fetchall(
+            "SELECT id FROM tasks ORDER BY rowid LIMIT ?", (config.write_transactions,),
+        )
+        write_ms: list[float] = []
+        started = time.perf_counter()
+        for row in rows:
+            t0 = time.perf_counter()
+            now = datetime.now(timezone.utc).isoformat()
+            async with db.transaction() as conn:
+                await conn.execute(
+                    "UPDATE tasks SET status = 'completed', completed_at = ? WHERE id = ?",
+                    (now, row["id"]),
+                )
+                await conn.execute(
+                    "INSERT INTO events (event_type, task_id, data, created_at) "
+                    "VALUES ('task.completed', ?, '{}', ?)",
+                    (row["id"], now),
+                )
+            write_ms.append((time.perf_counter() - t0) * 1000)
+        write_seconds = time.perf_counter() - started
+    finally:
+        await db.close()
+
+    return {
+        "settings": asdict(profile),
+        "read": {
+            "queries": len(read_ms),
+            "per_second": round(len(read_ms) / read_seconds, 1) if read_seconds else None,
+            "latency_ms": percentiles(read_ms),
+        },
+        "write": {
+            "transactions": len(write_ms),
+            "per_second": round(len(write_ms) / write_seconds, 1) if write_seconds else None,
+            "latency_ms": percentiles(write_ms),
+        },
+    }
+
+
+async def run_db_profile_benchmark(
+    config: DbProfileBenchConfig, workdir: Path | None = None,
+) -> dict:
+    """Measure read and write throughput of each connection profile.
+
+    One synthetic database is built with
+    :func:`~taskbrew.orchestrator.query_plans.populate_synthetic`; every
+    profile then runs against its own copy, so the writes of one profile
+    never warm or grow the file of the next.
+    """
+    from taskbrew.orchestrator.database import CONNECTION_PROFILES, Database
+    from taskbrew.orchestrator.query_plans import populate_synthetic
+
+    names = list(config.profiles or CONNECTION_PROFILES)
+    unknown = [n for n in names if n not in CONNECTION_PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown database profile(s): {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="taskbrew-dbbench-") as tmp:
+        root = Path(workdir) if workdir is not None else Path(tmp)
+        base = root / "base.db"
+        seed_db = Database(str(base), pool_size=1)
+        await seed_db.initialize()
+        started = time.perf_counter()
+        try:
+            await populate_synthetic(seed_db, tasks=config.tasks, seed=config.seed)
+        finally:
+            await seed_db.close()
+        seed_seconds = time.perf_counter() - started
+
+        results = {}
+        for name in names:
+            copy = root / f"{name}.db"
+            shutil.copyfile(base, copy)
+            results[name] = await _bench_profile(str(copy), CONNECTION_PROFILES[name], config)
+
+        return {
+            "benchmark": "db_profiles",
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "config": asdict(config),
+            "db_bytes": base.stat().st_size,
+            "seed_seconds": round(seed_seconds, 2),
+            "profiles": results,
+        }
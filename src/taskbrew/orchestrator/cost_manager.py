@@ -1,78 +1,267 @@
-"""Cost budget management and enforcement."""
+"""Cost budget management and enforcement.
+
+Budgets are mirrored into an in-process ledger the first time they are
+needed (or eagerly via :meth:`CostManager.load` at startup) so that
+:meth:`CostManager.check_budget` -- which sits on the task claim path --
+never touches the database.  Spend accumulates in memory and is written
+back to ``cost_budgets`` in a single transaction once the unflushed
+amount crosses ``flush_threshold_usd`` or ``flush_interval`` seconds have
+passed since the last flush.
+"""
 
 from __future__ import annotations
 
 import json
 import logging
+import time
 import uuid
 from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
+# Fraction of a budget at which a warning notification is raised.
+_WARNING_RATIO = 0.8
+
+
+def _next_reset(period: str, now: datetime) -> datetime | None:
+    """Return the first period boundary strictly after *now* (UTC aligned).
+
+    Daily budgets reset at 00:00 UTC, weekly budgets on Monday 00:00 UTC
+    and monthly budgets on the first of the month.  Unknown periods never
+    reset.
+    """
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "daily":
+        return midnight + timedelta(days=1)
+    if period == "weekly":
+        return midnight + timedelta(days=7 - now.weekday())
+    if period == "monthly":
+        if now.month == 12:
+            return midnight.replace(year=now.year + 1, month=1, day=1)
+        return midnight.replace(month=now.month + 1, day=1)
+    return None
+
+
+def _period_start(period: str, reset_at: datetime) -> datetime | None:
+    """Return the start of the period that ends at *reset_at*."""
+    if period == "daily":
+        return reset_at - timedelta(days=1)
+    if period == "weekly":
+        return reset_at - timedelta(days=7)
+    if period == "monthly":
+        if reset_at.month == 1:
+            return reset_at.replace(year=reset_at.year - 1, month=12)
+        return reset_at.replace(month=reset_at.month - 1)
+    return None
+
+
+def _parse_ts(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+class _LedgerEntry:
+    """In-memory mirror of a single ``cost_budgets`` row."""
+
+    __slots__ = (
+        "id", "scope", "scope_id", "budget_usd", "spent_usd", "period",
+        "reset_at", "stored_reset_at", "pending_usd", "rolled_over",
+    )
+
+    def __init__(self, row: dict) -> None:
+        self.id: str = row["id"]
+        self.scope: str = row["scope"]
+        self.scope_id: str | None = row.get("scope_id")
+        self.budget_usd: float = row["budget_usd"] or 0.0
+        self.spent_usd: float = row.get("spent_usd") or 0.0
+        self.period: str = row.get("period") or "daily"
+        self.reset_at: datetime | None = _parse_ts(row.get("reset_at"))
+        # reset_at exactly as the database row holds it, so a rollover
+        # only applies if no other process has rolled the row already.
+        self.stored_reset_at: str | None = row.get("reset_at")
+        # Spend not yet written back to the database.
+        self.pending_usd: float = 0.0
+        # True when a period rollover zeroed spent_usd in memory and the
+        # database row may still carry the previous period's total.
+        self.rolled_over: bool = False
+
+    def roll_over(self, now: datetime) -> None:
+        """Start a fresh period if *now* has passed ``reset_at``."""
+        if self.reset_at is None or now < self.reset_at:
+            return
+        # _next_reset is computed from *now*, so a manager that was idle
+        # across several periods jumps straight to the current one.
+        self.reset_at = _next_reset(self.period, now)
+        self.spent_usd = 0.0
+        self.pending_usd = 0.0
+        self.rolled_over = True
+
 
 class CostManager:
-    """Track and enforce cost budgets at global, group, and role scopes."""
+    """Track and enforce cost budgets at global, group, and role scopes.
+
+    Parameters
+    ----------
+    db:
+        The :class:`~taskbrew.orchestrator.database.Database` instance.
+    flush_interval:
+        Maximum number of seconds unflushed spend may sit in memory.
+    flush_threshold_usd:
+        Unflushed spend (summed across budgets) that forces a flush.
+    """
 
-    def __init__(self, db) -> None:
+    def __init__(
+        self,
+        db,
+        flush_interval: float = 30.0,
+        flush_threshold_usd: float = 1.0,
+    ) -> None:
         self._db = db
+        self._flush_interval = flush_interval
+        self._flush_threshold_usd = flush_threshold_usd
+        self._ledger: dict[str, _LedgerEntry] | None = None
+        self._by_scope: dict[tuple[str, str | None], list[_LedgerEntry]] = {}
+        self._last_flush = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Ledger lifecycle
+    # ------------------------------------------------------------------
+
+    async def load(self) -> None:
+        """(Re)load every budget row into the in-memory ledger."""
+        rows = await self._db.execute_fetchall("SELECT * FROM cost_budgets")
+        self._ledger = {}
+        self._by_scope = {}
+        for row in rows:
+            self._add_entry(_LedgerEntry(row))
+        self._last_flush = time.monotonic()
+
+    async def refresh(self) -> dict:
+        """Flush this process's spend, then reload every budget.
+
+        Picks up spend that other processes sharing the database (agent
+        workers) have flushed since the last load.
+        """
+        await self.flush()
+        await self.load()
+        return {"budgets": len(self._ledger)}
+
+    def _add_entry(self, entry: _LedgerEntry) -> None:
+        self._ledger[entry.id] = entry
+        self._by_scope.setdefault((entry.scope, entry.scope_id), []).append(entry)
+
+    def _remove_entry(self, budget_id: str) -> None:
+        entry = self._ledger.pop(budget_id, None)
+        if entry is None:
+            return
+        siblings = self._by_scope.get((entry.scope, entry.scope_id), [])
+        if entry in siblings:
+            siblings.remove(entry)
+        if not siblings:
+            self._by_scope.pop((entry.scope, entry.scope_id), None)
+
+    async def _ensure_loaded(self) -> None:
+        if self._ledger is None:
+            await self.load()
+
+    def _entries_for(
+        self, role: str | None, group_id: str | None, now: datetime,
+    ) -> list[_LedgerEntry]:
+        """Return the ledger entries that apply to a spend, rolled forward to *now*."""
+        keys: list[tuple[str, str | None]] = [("global", None)]
+        if role:
+            keys.append(("role", role))
+        if group_id:
+            keys.append(("group", group_id))
+        entries: list[_LedgerEntry] = []
+        for key in keys:
+            for entry in self._by_scope.get(key, ()):
+                entry.roll_over(now)
+                entries.append(entry)
+        return entries
+
+    async def flush(self) -> None:
+        """Write all unflushed spend and rollovers back to ``cost_budgets``.
+
+        Every dirty budget is updated inside a single transaction, and
+        spend is always added with an increment so the flush composes
+        with other processes sharing the database (agent workers). A
+        rollover first zeroes the row, but only while it still carries
+        the ``reset_at`` this process loaded: when another process has
+        already started the new period, its spend is kept.
+        """
+        self._last_flush = time.monotonic()
+        if not self._ledger:
+            return
+        dirty = [
+            e for e in self._ledger.values() if e.pending_usd or e.rolled_over
+        ]
+        if not dirty:
+            return
+        async with self._db.transaction() as conn:
+            for entry in dirty:
+                if entry.rolled_over:
+                    await conn.execute(
+                        "UPDATE cost_budgets SET spent_usd = 0, reset_at = ? "
+                        "WHERE id = ? AND reset_at IS ?",
+                        (
+                            entry.reset_at.isoformat() if entry.reset_at else None,
+                            entry.id,
+                            entry.stored_reset_at,
+                        ),
+                    )
+                if entry.pending_usd:
+                    await conn.execute(
+                        "UPDATE cost_budgets SET spent_usd = spent_usd + ? WHERE id = ?",
+                        (entry.pending_usd, entry.id),
+                    )
+        for entry in dirty:
+            entry.pending_usd = 0.0
+            if entry.rolled_over:
+                entry.stored_reset_at = (
+                    entry.reset_at.isoformat() if entry.reset_at else None
+                )
+            entry.rolled_over = False
+
+    async def _maybe_flush(self) -> None:
+        pending = sum(e.pending_usd for e in self._ledger.values())
+        if (
+            pending >= self._flush_threshold_usd
+            or time.monotonic() - self._last_flush >= self._flush_interval
+        ):
+            await self.flush()
+
+    # ------------------------------------------------------------------
+    # Enforcement
+    # ------------------------------------------------------------------
 
     async def check_budget(
         self, role: str | None = None, group_id: str | None = None
     ) -> dict:
         """Check if spending is within budget.
 
+        Answered entirely from the in-memory ledger once it is loaded.
+
         Returns
         -------
         dict
             ``{allowed, remaining, budget, spent, scope}``
         """
-        now = datetime.now(timezone.utc).isoformat()
-
-        # Check global budget first
-        global_budget = await self._db.execute_fetchone(
-            "SELECT * FROM cost_budgets WHERE scope = 'global' "
-            "AND (reset_at IS NULL OR reset_at > ?)",
-            (now,),
-        )
-        if global_budget and global_budget["spent_usd"] >= global_budget["budget_usd"]:
-            return {
-                "allowed": False,
-                "remaining": 0,
-                "budget": global_budget["budget_usd"],
-                "spent": global_budget["spent_usd"],
-                "scope": "global",
-            }
-
-        # Check role budget
-        if role:
-            role_budget = await self._db.execute_fetchone(
-                "SELECT * FROM cost_budgets WHERE scope = 'role' AND scope_id = ? "
-                "AND (reset_at IS NULL OR reset_at > ?)",
-                (role, now),
-            )
-            if role_budget and role_budget["spent_usd"] >= role_budget["budget_usd"]:
-                return {
-                    "allowed": False,
-                    "remaining": 0,
-                    "budget": role_budget["budget_usd"],
-                    "spent": role_budget["spent_usd"],
-                    "scope": "role",
-                }
+        await self._ensure_loaded()
+        now = datetime.now(timezone.utc)
 
-        # Check group budget
-        if group_id:
-            group_budget = await self._db.execute_fetchone(
-                "SELECT * FROM cost_budgets WHERE scope = 'group' AND scope_id = ? "
-                "AND (reset_at IS NULL OR reset_at > ?)",
-                (group_id, now),
-            )
-            if group_budget and group_budget["spent_usd"] >= group_budget["budget_usd"]:
+        for entry in self._entries_for(role, group_id, now):
+            if entry.spent_usd >= entry.budget_usd:
                 return {
                     "allowed": False,
                     "remaining": 0,
-                    "budget": group_budget["budget_usd"],
-                    "spent": group_budget["spent_usd"],
-                    "scope": "group",
+                    "budget": entry.budget_usd,
+                    "spent": entry.spent_usd,
+                    "scope": entry.scope,
                 }
 
         return {
@@ -86,64 +275,111 @@ class CostManager:
     async def record_spend(
         self, cost_usd: float, role: str | None = None, group_id: str | None = None
     ) -> None:
-        """Record spending against applicable budgets."""
-        now = datetime.now(timezone.utc).isoformat()
+        """Record spending against applicable budgets.
 
-        # Update global budget
-        await self._db.execute(
-            "UPDATE cost_budgets SET spent_usd = spent_usd + ? "
-            "WHERE scope = 'global' AND (reset_at IS NULL OR reset_at > ?)",
-            (cost_usd, now),
-        )
+        Spend is applied to the ledger immediately; the database is only
+        touched when a flush is due or a budget crosses the warning
+        threshold.
+        """
+        await self._ensure_loaded()
+        now = datetime.now(timezone.utc)
 
-        if role:
-            await self._db.execute(
-                "UPDATE cost_budgets SET spent_usd = spent_usd + ? "
-                "WHERE scope = 'role' AND scope_id = ? "
-                "AND (reset_at IS NULL OR reset_at > ?)",
-                (cost_usd, role, now),
-            )
+        over_threshold: list[_LedgerEntry] = []
+        for entry in self._entries_for(role, group_id, now):
+            entry.spent_usd += cost_usd
+            entry.pending_usd += cost_usd
+            if entry.spent_usd >= entry.budget_usd * _WARNING_RATIO:
+                over_threshold.append(entry)
 
-        if group_id:
-            await self._db.execute(
-                "UPDATE cost_budgets SET spent_usd = spent_usd + ? "
-                "WHERE scope = 'group' AND scope_id = ? "
-                "AND (reset_at IS NULL OR reset_at > ?)",
-                (cost_usd, group_id, now),
-            )
-
-        # Check for budget warnings (80% threshold)
-        budgets = await self._db.execute_fetchall(
-            "SELECT * FROM cost_budgets "
-            "WHERE spent_usd >= budget_usd * 0.8 "
-            "AND (reset_at IS NULL OR reset_at > ?)",
-            (now,),
+        if over_threshold:
+            # Persist before notifying so the dashboard shows the same
+            # figure the notification quotes.
+            await self.flush()
+        else:
+            await self._maybe_flush()
+
+        for entry in over_threshold:
+            await self._notify_threshold(entry)
+
+    async def _notify_threshold(self, entry: _LedgerEntry) -> None:
+        """Create a budget warning notification unless one is still unread."""
+        spent, budget = entry.spent_usd, entry.budget_usd
+        pct = (spent / budget * 100) if budget > 0 else 0
+        severity = "critical" if spent >= budget else "warning"
+
+        # Check for existing unread notification for the same budget
+        # to avoid duplicate warnings.  A new notification is only
+        # created once the previous one has been read/dismissed.
+        existing = await self._db.execute_fetchone(
+            "SELECT id FROM notifications WHERE type = 'budget_warning' "
+            "AND read = 0 AND data LIKE ?",
+            (f'%{entry.id}%',),
         )
-        for b in budgets:
-            pct = (b["spent_usd"] / b["budget_usd"] * 100) if b["budget_usd"] > 0 else 0
-            severity = "critical" if b["spent_usd"] >= b["budget_usd"] else "warning"
-
-            # Check for existing unread notification for the same budget
-            # to avoid duplicate warnings.  A new notification is only
-            # created once the previous one has been read/dismissed.
-            existing = await self._db.execute_fetchone(
-                "SELECT id FROM notifications WHERE type = 'budget_warning' "
-                "AND read = 0 AND data LIKE ?",
-                (f'%{b["id"]}%',),
-            )
-            if existing:
-                continue  # Skip duplicate notification
-
-            await self._db.create_notification(
-                type="budget_warning",
-                title=f"Budget {severity}: {b['scope']} {b.get('scope_id') or 'global'}",
-                message=f"Spent ${b['spent_usd']:.2f} of ${b['budget_usd']:.2f} ({pct:.0f}%)",
-                severity=severity,
-                data=json.dumps({"budget_id": b["id"], "scope": b["scope"], "pct": pct}),
-            )
+        if existing:
+            return
+
+        await self._db.create_notification(
+            type="budget_warning",
+            title=f"Budget {severity}: {entry.scope} {entry.scope_id or 'global'}",
+            message=f"Spent ${spent:.2f} of ${budget:.2f} ({pct:.0f}%)",
+            severity=severity,
+            data=json.dumps({"budget_id": entry.id, "scope": entry.scope, "pct": pct}),
+        )
+
+    async def forecast(
+        self, role: str | None = None, group_id: str | None = None
+    ) -> list[dict]:
+        """Project end-of-period spend at the current burn rate.
+
+        With no arguments every periodic budget is forecast; otherwise
+        only the budgets that would apply to a spend by *role* /
+        *group_id* (always including global budgets).
+
+        Returns
+        -------
+        list[dict]
+            One ``{id, scope, scope_id, budget, spent, burn_rate_per_hour,
+            projected, will_exceed, reset_at}`` dict per budget.
+        """
+        await self._ensure_loaded()
+        now = datetime.now(timezone.utc)
+        if role is None and group_id is None:
+            entries = list(self._ledger.values())
+            for entry in entries:
+                entry.roll_over(now)
+        else:
+            entries = self._entries_for(role, group_id, now)
+
+        results = []
+        for entry in entries:
+            if entry.reset_at is None:
+                continue
+            start = _period_start(entry.period, entry.reset_at)
+            elapsed_h = max((now - start).total_seconds() / 3600, 1e-9)
+            remaining_h = max((entry.reset_at - now).total_seconds() / 3600, 0.0)
+            burn = entry.spent_usd / elapsed_h
+            projected = entry.spent_usd + burn * remaining_h
+            results.append({
+                "id": entry.id,
+                "scope": entry.scope,
+                "scope_id": entry.scope_id,
+                "budget": entry.budget_usd,
+                "spent": round(entry.spent_usd, 6),
+                "burn_rate_per_hour": round(burn, 6),
+                "projected": round(projected, 6),
+                "will_exceed": projected >= entry.budget_usd,
+                "reset_at": entry.reset_at.isoformat(),
+            })
+        return results
+
+    # ------------------------------------------------------------------
+    # CRUD
+    # ------------------------------------------------------------------
 
     async def get_budgets(self) -> list[dict]:
         """Return all budgets ordered by scope."""
+        if self._ledger is not None:
+            await self.flush()
         return await self._db.execute_fetchall(
             "SELECT * FROM cost_budgets ORDER BY scope, scope_id"
         )
@@ -170,32 +406,8 @@ class CostManager:
         """
         budget_id = str(uuid.uuid4())[:8]
         now = datetime.now(timezone.utc)
-
-        if period == "daily":
-            reset_at = (
-                (now + timedelta(days=1))
-                .replace(hour=0, minute=0, second=0, microsecond=0)
-                .isoformat()
-            )
-        elif period == "weekly":
-            reset_at = (
-                (now + timedelta(days=7 - now.weekday()))
-                .replace(hour=0, minute=0, second=0, microsecond=0)
-                .isoformat()
-            )
-        elif period == "monthly":
-            if now.month == 12:
-                reset_at = now.replace(
-                    year=now.year + 1, month=1, day=1,
-                    hour=0, minute=0, second=0, microsecond=0,
-                ).isoformat()
-            else:
-                reset_at = now.replace(
-                    month=now.month + 1, day=1,
-                    hour=0, minute=0, second=0, microsecond=0,
-                ).isoformat()
-        else:
-            reset_at = None
+        reset = _next_reset(period, now)
+        reset_at = reset.isoformat() if reset else None
 
         await self._db.execute(
             "INSERT INTO cost_budgets "
@@ -203,14 +415,27 @@ class CostManager:
             "VALUES (?, ?, ?, ?, ?, ?, ?)",
             (budget_id, scope, scope_id, budget_usd, period, reset_at, now.isoformat()),
         )
+        if self._ledger is not None:
+            self._add_entry(_LedgerEntry({
+                "id": budget_id,
+                "scope": scope,
+                "scope_id": scope_id,
+                "budget_usd": budget_usd,
+                "spent_usd": 0.0,
+                "period": period,
+                "reset_at": reset_at,
+            }))
         return {
             "id": budget_id,
             "scope": scope,
             "scope_id": scope_id,
             "budget_usd": budget_usd,
             "period": period,
+            "reset_at": reset_at,
         }
 
     async def delete_budget(self, budget_id: str) -> None:
         """Delete a cost budget by ID."""
         await self._db.execute("DELETE FROM cost_budgets WHERE id = ?", (budget_id,))
+        if self._ledger is not None:
+            self._remove_entry(budget_id)
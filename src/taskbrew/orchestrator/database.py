@@ -4,11 +4,16 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+import time
 from contextlib import asynccontextmanager
+from dataclasses import dataclass, fields, replace
 from datetime import datetime, timezone
 
 import aiosqlite
 
+from taskbrew.orchestrator.tracing import Tracer, get_tracer
+
 logger = logging.getLogger(__name__)
 
 
@@ -68,7 +73,10 @@ CREATE TABLE IF NOT EXISTS tasks (
     -- enters a manual-mode ask_question wait; cleared on resolve
     -- or task cancel. The activity-based idle watchdog skips tasks
     -- while this is non-NULL.
-    awaiting_input_since   TEXT
+    awaiting_input_since   TEXT,
+    -- Board version at this row's last change (migration 39); kept by
+    -- triggers, read by TaskBoard.get_board_changes.
+    row_version            INTEGER NOT NULL DEFAULT 0
 );
 
 -- Structured agent clarifications (migration 32). Persists every
@@ -147,7 +155,10 @@ CREATE TABLE IF NOT EXISTS task_usage (
     cost_usd REAL DEFAULT 0,
     duration_api_ms INTEGER DEFAULT 0,
     num_turns INTEGER DEFAULT 0,
-    recorded_at TEXT NOT NULL
+    recorded_at TEXT NOT NULL,
+    -- Role of the agent instance (migration 36), stored at write time so
+    -- per-role analytics group on a column instead of parsing agent_id.
+    role TEXT
 );
 
 CREATE TABLE IF NOT EXISTS approvals (
@@ -351,11 +362,147 @@ CREATE INDEX IF NOT EXISTS idx_tasks_instance_token
 """
 
 
+# Instance ids are "<role>-<n>" or, for auto-scaled extras, "<role>-auto-<n>".
+_INSTANCE_SUFFIX_RE = re.compile(r"(?:-auto)?-\d+$")
+
+
+def _role_from_agent_id(agent_id: str) -> str:
+    """Derive the role name from an agent instance id (``coder-2`` -> ``coder``)."""
+    return _INSTANCE_SUFFIX_RE.sub("", agent_id) or agent_id
+
+
 def _utcnow() -> str:
     """Return the current UTC time as an ISO-8601 string."""
     return datetime.now(timezone.utc).isoformat()
 
 
+_USAGE_SUMMARY_SQL = (
+    "SELECT COALESCE(SUM(input_tokens), 0) as input_tokens, "
+    "COALESCE(SUM(output_tokens), 0) as output_tokens, "
+    "COALESCE(SUM(cost_usd), 0) as cost_usd, "
+    "COALESCE(SUM(duration_api_ms), 0) as duration_api_ms, "
+    "COALESCE(SUM(num_turns), 0) as num_turns, "
+    "COUNT(*) as tasks_completed "
+    "FROM task_usage WHERE recorded_at >= ?"
+)
+
+_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+_TEMP_STORE_MODES = ("DEFAULT", "FILE", "MEMORY")
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """Per-connection SQLite tuning applied by :class:`Database`.
+
+    ``synchronous=NORMAL`` is safe from corruption under WAL; a power
+    loss can only drop the most recent commits. ``cache_size_mb`` is the
+    page cache of each connection (SQLite's default is about 2 MB) and
+    ``mmap_size_mb`` memory-maps that much of the file so reads skip
+    the ``read()`` copy. ``cached_statements`` sizes the prepared
+    statement cache of each connection.
+    """
+
+    synchronous: str = "FULL"
+    cache_size_mb: int = 2
+    mmap_size_mb: int = 0
+    temp_store: str = "DEFAULT"
+    cached_statements: int = 128
+    optimize_on_close: bool = True
+
+    def __post_init__(self) -> None:
+        for name, modes in (
+            ("synchronous", _SYNCHRONOUS_MODES), ("temp_store", _TEMP_STORE_MODES),
+        ):
+            value = getattr(self, name)
+            # YAML 1.1 reads a bare ``off`` as False.
+            mode = "OFF" if value is False else str(value).upper()
+            if mode not in modes:
+                raise ValueError(
+                    f"{name} must be one of {', '.join(modes)}, got {value!r}"
+                )
+            object.__setattr__(self, name, mode)
+        if not isinstance(self.optimize_on_close, bool):
+            raise ValueError(
+                f"optimize_on_close must be true or false, got {self.optimize_on_close!r}"
+            )
+        for name in ("cache_size_mb", "mmap_size_mb", "cached_statements"):
+            value = getattr(self, name)
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"{name} must be a non-negative integer, got {value!r}")
+
+    def pragmas(self) -> list[str]:
+        return [
+            f"PRAGMA synchronous = {self.synchronous}",
+            f"PRAGMA cache_size = {-self.cache_size_mb * 1024}",
+            f"PRAGMA mmap_size = {self.mmap_size_mb * 1024 * 1024}",
+            f"PRAGMA temp_store = {self.temp_store}",
+        ]
+
+
+CONNECTION_PROFILES: dict[str, ConnectionProfile] = {
+    # SQLite's own defaults: fsync on every commit, small cache.
+    "safe": ConnectionProfile(),
+    "balanced": ConnectionProfile(
+        synchronous="NORMAL", cache_size_mb=32, temp_store="MEMORY",
+        cached_statements=256,
+    ),
+    # Dashboards and analytics: most of the working set memory-mapped.
+    "read_heavy": ConnectionProfile(
+        synchronous="NORMAL", cache_size_mb=64, mmap_size_mb=256,
+        temp_store="MEMORY", cached_statements=512,
+    ),
+}
+
+
+def connection_profile(name: str = "balanced", **overrides) -> ConnectionProfile:
+    """Return the named entry of :data:`CONNECTION_PROFILES` with *overrides*.
+
+    Raises ValueError for an unknown profile or setting, or an invalid
+    value.
+    """
+    if name not in CONNECTION_PROFILES:
+        raise ValueError(
+            f"Unknown database profile {name!r} "
+            f"(expected one of {', '.join(CONNECTION_PROFILES)})"
+        )
+    known = {f.name for f in fields(ConnectionProfile)}
+    unknown = set(overrides) - known
+    if unknown:
+        raise ValueError(f"Unknown database settings: {', '.join(sorted(unknown))}")
+    return replace(CONNECTION_PROFILES[name], **overrides)
+
+
+class _TracedConnection:
+    """The connection :meth:`Database.transaction` yields.
+
+    ``execute``/``executemany`` are timed and recorded with the tracer
+    like the ``Database.execute*`` helpers, so batch writes done inside
+    transactions show up in the per-statement histograms. Everything
+    else is delegated to the underlying :class:`aiosqlite.Connection`.
+    """
+
+    __slots__ = ("_conn", "_tracer")
+
+    def __init__(self, conn: aiosqlite.Connection, tracer: Tracer) -> None:
+        self._conn = conn
+        self._tracer = tracer
+
+    async def execute(self, sql: str, parameters=None) -> aiosqlite.Cursor:
+        started = time.perf_counter()
+        cursor = await self._conn.execute(sql, parameters)
+        self._tracer.record_query(sql, cursor.rowcount, time.perf_counter() - started)
+        return cursor
+
+    async def executemany(self, sql: str, parameters) -> aiosqlite.Cursor:
+        started = time.perf_counter()
+        cursor = await self._conn.executemany(sql, parameters)
+        self._tracer.record_query(sql, cursor.rowcount, time.perf_counter() - started)
+        return cursor
+
+    def __getattr__(self, name: str):
+        return getattr(self._conn, name)
+
+
 class Database:
     """Async SQLite database wrapper using aiosqlite with connection pooling.
 
@@ -368,11 +515,25 @@ class Database:
         The primary connection (``self._conn``) is always available for
         backward compatibility; the pool provides additional connections
         for concurrent reads.
+    tracer:
+        Receives the duration and row count of every ``execute*`` call;
+        defaults to the process-wide tracer.
+    profile:
+        PRAGMA tuning for every connection (default: the ``balanced``
+        entry of :data:`CONNECTION_PROFILES`).
     """
 
-    def __init__(self, db_path: str, pool_size: int = 5) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        pool_size: int = 5,
+        tracer: Tracer | None = None,
+        profile: ConnectionProfile | None = None,
+    ) -> None:
         self.db_path = db_path
         self.pool_size = pool_size
+        self.tracer = tracer or get_tracer()
+        self.profile = profile or CONNECTION_PROFILES["balanced"]
         self._conn: aiosqlite.Connection | None = None
         self._pool: asyncio.Queue[aiosqlite.Connection] | None = None
         self._tx_lock = asyncio.Lock()
@@ -388,11 +549,20 @@ class Database:
         # isolation_level=None enables autocommit mode, preventing implicit
         # transactions that cause "cannot start a transaction within a
         # transaction" when concurrent coroutines share the connection.
-        conn = await aiosqlite.connect(self.db_path, isolation_level=None)
+        conn = await aiosqlite.connect(
+            self.db_path, isolation_level=None,
+            cached_statements=self.profile.cached_statements,
+        )
         conn.row_factory = aiosqlite.Row
+        # Must precede journal_mode, which writes the header of a new file.
+        # Only takes effect on a new, empty database; older files are
+        # switched over by the first compaction VACUUM (see retention.py).
+        await conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         await conn.execute("PRAGMA journal_mode=WAL")
         await conn.execute("PRAGMA busy_timeout = 5000")
         await conn.execute("PRAGMA foreign_keys=ON")
+        for pragma in self.profile.pragmas():
+            await conn.execute(pragma)
         return conn
 
     async def initialize(self) -> None:
@@ -493,6 +663,14 @@ class Database:
                     break
             self._pool = None
         if self._conn is not None:
+            if self.profile.optimize_on_close and self.db_path != ":memory:":
+                # Refresh planner statistics for the queries this
+                # connection ran; analysis_limit bounds the cost.
+                try:
+                    await self._conn.execute("PRAGMA analysis_limit = 400")
+                    await self._conn.execute("PRAGMA optimize")
+                except Exception as exc:  # noqa: BLE001 -- best effort at shutdown
+                    logger.debug("PRAGMA optimize on close failed: %s", exc)
             await self._conn.close()
             self._conn = None
 
@@ -547,19 +725,31 @@ class Database:
         """Async context manager for multi-statement transactions.
 
         Uses an asyncio lock to prevent concurrent coroutines from
-        attempting nested BEGIN on the shared connection.
+        attempting nested BEGIN on the shared connection. Statements run
+        on the yielded connection are recorded with the tracer.
         """
         if self._conn is None:
             raise RuntimeError("Database not initialized. Call initialize() first.")
         async with self._tx_lock:
             await self._conn.execute("BEGIN")
             try:
-                yield self._conn
+                yield _TracedConnection(self._conn, self.tracer)
                 await self._conn.commit()
             except Exception:
                 await self._conn.rollback()
                 raise
 
+    async def execute_outside_transaction(self, sql: str) -> None:
+        """Run a script that must not share a transaction, such as ``VACUUM``.
+
+        Holds the transaction lock so it cannot commit, or fail inside,
+        a :meth:`transaction` block another coroutine has open.
+        """
+        if self._conn is None:
+            raise RuntimeError("Database not initialized. Call initialize() first.")
+        async with self._tx_lock:
+            await self._conn.executescript(sql)
+
     async def executescript(self, sql: str) -> None:
         """Execute a multi-statement SQL script and commit."""
         if self._conn is None:
@@ -628,8 +818,10 @@ class Database:
         """Execute a query and return all rows as dicts."""
         if self._conn is None:
             raise RuntimeError("Database not initialized. Call initialize() first.")
+        started = time.perf_counter()
         cursor = await self._conn.execute(sql, params)
         rows = await cursor.fetchall()
+        self.tracer.record_query(sql, len(rows), time.perf_counter() - started)
         if not rows:
             return []
         keys = [desc[0] for desc in cursor.description]
@@ -641,8 +833,12 @@ class Database:
         """Execute a query and return the first row as a dict, or None."""
         if self._conn is None:
             raise RuntimeError("Database not initialized. Call initialize() first.")
+        started = time.perf_counter()
         cursor = await self._conn.execute(sql, params)
         row = await cursor.fetchone()
+        self.tracer.record_query(
+            sql, 0 if row is None else 1, time.perf_counter() - started,
+        )
         if row is None:
             return None
         keys = [desc[0] for desc in cursor.description]
@@ -652,16 +848,20 @@ class Database:
         """Execute a statement and commit."""
         if self._conn is None:
             raise RuntimeError("Database not initialized. Call initialize() first.")
-        await self._conn.execute(sql, params)
+        started = time.perf_counter()
+        cursor = await self._conn.execute(sql, params)
         await self._conn.commit()
+        self.tracer.record_query(sql, cursor.rowcount, time.perf_counter() - started)
 
     async def execute_returning(self, sql: str, params: tuple = ()) -> list[dict]:
         """Execute a mutating query with RETURNING clause, commit, and return rows as dicts."""
         if self._conn is None:
             raise RuntimeError("Database not initialized. Call initialize() first.")
+        started = time.perf_counter()
         cursor = await self._conn.execute(sql, params)
         rows = await cursor.fetchall()
         await self._conn.commit()
+        self.tracer.record_query(sql, len(rows), time.perf_counter() - started)
         if not rows:
             return []
         keys = [desc[0] for desc in cursor.description]
@@ -674,27 +874,19 @@ class Database:
     async def record_task_usage(
         self, task_id: str, agent_id: str, input_tokens: int = 0,
         output_tokens: int = 0, cost_usd: float = 0, duration_api_ms: int = 0,
-        num_turns: int = 0,
+        num_turns: int = 0, role: str | None = None,
     ) -> None:
         now = datetime.now(timezone.utc).isoformat()
         await self.execute(
             "INSERT INTO task_usage (task_id, agent_id, input_tokens, output_tokens, "
-            "cost_usd, duration_api_ms, num_turns, recorded_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (task_id, agent_id, input_tokens, output_tokens, cost_usd, duration_api_ms, num_turns, now),
+            "cost_usd, duration_api_ms, num_turns, recorded_at, role) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (task_id, agent_id, input_tokens, output_tokens, cost_usd, duration_api_ms,
+             num_turns, now, role or _role_from_agent_id(agent_id)),
         )
 
     async def get_usage_summary(self, since: str) -> dict:
-        row = await self.execute_fetchone(
-            "SELECT COALESCE(SUM(input_tokens), 0) as input_tokens, "
-            "COALESCE(SUM(output_tokens), 0) as output_tokens, "
-            "COALESCE(SUM(cost_usd), 0) as cost_usd, "
-            "COALESCE(SUM(duration_api_ms), 0) as duration_api_ms, "
-            "COALESCE(SUM(num_turns), 0) as num_turns, "
-            "COUNT(*) as tasks_completed "
-            "FROM task_usage WHERE recorded_at >= ?",
-            (since,),
-        )
+        row = await self.execute_fetchone(_USAGE_SUMMARY_SQL, (since,))
         return dict(row) if row else {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0, "duration_api_ms": 0, "num_turns": 0, "tasks_completed": 0}
 
     # ------------------------------------------------------------------
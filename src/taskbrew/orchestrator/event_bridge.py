@@ -0,0 +1,369 @@
+"""Relay event-bus traffic between the API process and agent workers.
+
+In multi-process mode (``taskbrew start --workers N``) agent loops run in
+worker processes (see :mod:`taskbrew.orchestrator.worker_pool`) while the
+dashboard API keeps its own :class:`~taskbrew.orchestrator.event_bus.EventBus`.
+Work is coordinated through the SQLite task board; this module carries
+the rest:
+
+* events: whatever one process emits is delivered to the bus of every
+  other process, so ``task.available`` wakes idle agents everywhere,
+  ``question.*`` reaches each worker's supervisor and the dashboard
+  WebSocket sees agent activity;
+* pause state: the API process owns which roles are paused and pushes
+  the whole set to every worker whenever it changes;
+* agent placement: the auto-scaler runs in the API process and asks the
+  hub to start an instance on the worker running the fewest agents, or
+  to stop one on the worker that owns it.
+
+:class:`EventHub` runs in the API process and listens on a Unix domain
+socket (loopback TCP where those are unavailable). Each worker connects
+with an :class:`EventBridgeClient` and proves it was spawned by this API
+process with a per-run token. Frames are newline-delimited JSON.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import secrets
+import shutil
+import socket
+import tempfile
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Longest frame either side accepts (StreamReader line limit).
+_FRAME_LIMIT = 16 * 1024 * 1024
+# A peer that stops reading has events dropped instead of buffered
+# without bound in the sender.
+_MAX_BUFFERED = 8 * 1024 * 1024
+_HELLO_TIMEOUT = 10.0
+
+
+def _frame(message: dict[str, Any]) -> bytes:
+    return (json.dumps(message, default=str, separators=(",", ":")) + "\n").encode()
+
+
+class _Peer:
+    """One connected worker as seen by the hub."""
+
+    def __init__(
+        self, worker_id: str, writer: asyncio.StreamWriter, instances: set[str],
+    ) -> None:
+        self.worker_id = worker_id
+        self.writer = writer
+        # Agent instances the worker runs: its share at startup plus
+        # whatever spawn_agent placed on it since.
+        self.instances = instances
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+    def send(self, data: bytes) -> bool:
+        if self.writer.is_closing():
+            return False
+        if self.writer.transport.get_write_buffer_size() > _MAX_BUFFERED:
+            self.dropped += 1
+            return False
+        self.writer.write(data)
+        self.sent += 1
+        return True
+
+
+class EventHub:
+    """Event relay and pause-state source in the API process.
+
+    Parameters
+    ----------
+    event_bus:
+        The API process's bus. Its local events go to every worker and
+        events from workers are delivered to it.
+    instance_manager:
+        Source of the paused-role set pushed to workers.
+    token:
+        Secret workers must present; generated when omitted.
+    """
+
+    def __init__(self, event_bus, instance_manager, *, token: str | None = None) -> None:
+        self._bus = event_bus
+        self._instances = instance_manager
+        self.token = token or secrets.token_hex(16)
+        self.address: str | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._socket_dir: str | None = None
+        self._peers: dict[str, _Peer] = {}
+        self._closed = False
+
+    async def start(self) -> str:
+        """Start listening; returns the address workers connect to."""
+        if hasattr(socket, "AF_UNIX"):
+            # Short private directory: socket paths are limited to ~100 bytes.
+            self._socket_dir = tempfile.mkdtemp(prefix="taskbrew-")
+            path = os.path.join(self._socket_dir, "events.sock")
+            self._server = await asyncio.start_unix_server(
+                self._handle, path=path, limit=_FRAME_LIMIT,
+            )
+            self.address = f"unix:{path}"
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, "127.0.0.1", 0, limit=_FRAME_LIMIT,
+            )
+            port = self._server.sockets[0].getsockname()[1]
+            self.address = f"tcp:127.0.0.1:{port}"
+        self._bus.set_forwarder(self._on_local_event)
+        self._instances.add_pause_listener(self._on_pause_changed)
+        return self.address
+
+    @property
+    def workers(self) -> list[str]:
+        return sorted(self._peers)
+
+    def _broadcast(self, data: bytes, exclude: str | None = None) -> None:
+        for peer in list(self._peers.values()):
+            if peer.worker_id != exclude:
+                peer.send(data)
+
+    def _on_local_event(self, event: dict[str, Any]) -> None:
+        self._broadcast(_frame({"kind": "event", "event": event}))
+
+    def _on_pause_changed(self, roles: list[str]) -> None:
+        if not self._closed:
+            self._broadcast(_frame({"kind": "paused", "roles": roles}))
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+    ) -> None:
+        try:
+            line = await asyncio.wait_for(reader.readline(), _HELLO_TIMEOUT)
+            hello = json.loads(line) if line else None
+        except (asyncio.TimeoutError, ValueError, ConnectionError):
+            hello = None
+        if (
+            not isinstance(hello, dict)
+            or hello.get("kind") != "hello"
+            or not hmac.compare_digest(str(hello.get("token", "")), self.token)
+        ):
+            logger.warning("Rejected event hub connection without a valid hello")
+            writer.close()
+            return
+
+        worker_id = str(hello.get("worker"))
+        previous = self._peers.get(worker_id)
+        if previous is not None:
+            previous.writer.close()
+        instances = hello.get("instances")
+        peer = self._peers[worker_id] = _Peer(
+            worker_id, writer,
+            {str(i) for i in instances} if isinstance(instances, list) else set(),
+        )
+        peer.send(_frame({"kind": "paused", "roles": self._instances.get_paused_roles()}))
+        logger.info("Agent worker %s connected to the event hub", worker_id)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if not isinstance(message, dict) or message.get("kind") != "event":
+                    continue
+                event = message.get("event")
+                if not isinstance(event, dict) or "type" not in event:
+                    continue
+                peer.received += 1
+                self._bus.deliver(event)
+                # Relay the frame as received; no need to re-encode it.
+                self._broadcast(line, exclude=worker_id)
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("Event hub connection from %s failed: %s", worker_id, exc)
+        finally:
+            if self._peers.get(worker_id) is peer:
+                del self._peers[worker_id]
+            writer.close()
+            logger.info("Agent worker %s disconnected from the event hub", worker_id)
+
+    def spawn_agent(self, instance_id: str, role: str) -> str:
+        """Start *instance_id* of *role* on the least-loaded worker.
+
+        Returns the chosen worker's id; raises RuntimeError when no
+        worker is connected.
+        """
+        peers = [p for p in self._peers.values() if not p.writer.is_closing()]
+        if not peers:
+            raise RuntimeError("no agent worker is connected")
+        peer = min(peers, key=lambda p: (len(p.instances), p.worker_id))
+        if not peer.send(_frame({"kind": "spawn", "instance_id": instance_id, "role": role})):
+            raise RuntimeError(f"could not reach {peer.worker_id}")
+        peer.instances.add(instance_id)
+        return peer.worker_id
+
+    def stop_agent(self, instance_id: str) -> bool:
+        """Ask the worker running *instance_id* to stop it.
+
+        Returns False when no connected worker runs that instance.
+        """
+        for peer in self._peers.values():
+            if instance_id in peer.instances:
+                peer.instances.discard(instance_id)
+                return peer.send(_frame({"kind": "stop", "instance_id": instance_id}))
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "address": self.address,
+            "workers": {
+                peer.worker_id: {
+                    "agents": len(peer.instances),
+                    "events_sent": peer.sent,
+                    "events_received": peer.received,
+                    "events_dropped": peer.dropped,
+                }
+                for peer in self._peers.values()
+            },
+        }
+
+    async def close(self) -> None:
+        """Stop relaying and drop every worker connection."""
+        self._closed = True
+        self._bus.set_forwarder(None)
+        for peer in list(self._peers.values()):
+            peer.writer.close()
+        self._peers.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._socket_dir is not None:
+            shutil.rmtree(self._socket_dir, ignore_errors=True)
+            self._socket_dir = None
+
+
+class EventBridgeClient:
+    """A worker's connection to the :class:`EventHub`.
+
+    Parameters
+    ----------
+    event_bus:
+        The worker's bus: its local events go to the hub, and relayed
+        events are delivered to it.
+    instance_manager:
+        Receives the paused-role set pushed by the hub.
+    address, token:
+        From :attr:`EventHub.address` and :attr:`EventHub.token`.
+    worker_id:
+        Name of this worker in hub logs and stats.
+    instances:
+        Agent instances this worker starts with, for the hub's placement.
+    on_command:
+        ``await on_command(message)`` runs for each ``spawn`` / ``stop``
+        request from the hub; may be set after construction.
+    """
+
+    def __init__(
+        self,
+        event_bus,
+        instance_manager,
+        *,
+        address: str,
+        token: str,
+        worker_id: str,
+        instances: list[str] | None = None,
+        on_command: Callable[[dict[str, Any]], Awaitable[None]] | None = None,
+    ) -> None:
+        self._bus = event_bus
+        self._instances = instance_manager
+        self.address = address
+        self._token = token
+        self.worker_id = worker_id
+        self.instances = list(instances or [])
+        self.on_command = on_command
+        self._commands: set[asyncio.Task] = set()
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self.events_sent = 0
+        self.events_received = 0
+        self.events_dropped = 0
+
+    async def connect(self, timeout: float = 10.0) -> None:
+        """Connect and introduce this worker; raises OSError on failure."""
+        kind, _, target = self.address.partition(":")
+        if kind == "unix":
+            opening = asyncio.open_unix_connection(target, limit=_FRAME_LIMIT)
+        elif kind == "tcp":
+            host, _, port = target.rpartition(":")
+            opening = asyncio.open_connection(host, int(port), limit=_FRAME_LIMIT)
+        else:
+            raise ValueError(f"Unsupported event hub address {self.address!r}")
+        self._reader, self._writer = await asyncio.wait_for(opening, timeout)
+        self._writer.write(_frame({
+            "kind": "hello", "worker": self.worker_id, "token": self._token,
+            "instances": self.instances,
+        }))
+        await self._writer.drain()
+        self._bus.set_forwarder(self._on_local_event)
+
+    def _on_local_event(self, event: dict[str, Any]) -> None:
+        writer = self._writer
+        if (
+            writer is None
+            or writer.is_closing()
+            or writer.transport.get_write_buffer_size() > _MAX_BUFFERED
+        ):
+            self.events_dropped += 1
+            return
+        writer.write(_frame({"kind": "event", "event": event}))
+        self.events_sent += 1
+
+    async def run(self) -> None:
+        """Apply frames from the hub until it closes the connection."""
+        if self._reader is None:
+            raise RuntimeError("EventBridgeClient.connect() was not called")
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    continue
+                kind = message.get("kind")
+                if kind == "event" and isinstance(message.get("event"), dict):
+                    self.events_received += 1
+                    self._bus.deliver(message["event"])
+                elif kind == "paused":
+                    self._instances.set_paused_roles(message.get("roles") or [])
+                elif kind in ("spawn", "stop") and isinstance(message.get("instance_id"), str):
+                    self._command(message)
+        except (ConnectionError, ValueError) as exc:
+            logger.warning("Event hub connection lost: %s", exc)
+        finally:
+            self._bus.set_forwarder(None)
+
+    def _command(self, message: dict[str, Any]) -> None:
+        if self.on_command is None:
+            logger.warning("Ignoring %s request from the event hub", message["kind"])
+            return
+        task = asyncio.create_task(self.on_command(message))
+        self._commands.add(task)
+        task.add_done_callback(self._command_done)
+
+    def _command_done(self, task: asyncio.Task) -> None:
+        self._commands.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Event hub request failed", exc_info=task.exception())
+
+    async def close(self) -> None:
+        self._bus.set_forwarder(None)
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self._writer = None
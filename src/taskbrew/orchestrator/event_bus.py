@@ -7,6 +7,11 @@ persisting a row) because the garbage collector had no strong ref to
 keep the task alive. ``_pending`` is a set that retains every spawned
 handler task until it completes; ``drain()`` awaits all pending at
 shutdown so mutating handlers cannot be interrupted.
+
+In multi-process mode (see :mod:`taskbrew.orchestrator.event_bridge`)
+every locally emitted event is also handed to a forwarder, and events
+arriving from other processes are dispatched with :meth:`EventBus.deliver`,
+which does not forward them again.
 """
 
 import asyncio
@@ -15,6 +20,7 @@ from collections import defaultdict
 from typing import Any, Callable, Coroutine
 
 EventHandler = Callable[[dict[str, Any]], Coroutine[Any, Any, None]]
+EventForwarder = Callable[[dict[str, Any]], None]
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,7 @@ class EventBus:
         # Strong refs to in-flight dispatch tasks. Discarded via
         # add_done_callback so the set does not grow unboundedly.
         self._pending: set[asyncio.Task] = set()
+        self._forwarder: EventForwarder | None = None
 
     def subscribe(self, event_type: str, handler: EventHandler) -> None:
         self._handlers[event_type].append(handler)
@@ -45,19 +52,44 @@ class EventBus:
         self._pending.add(task)
         task.add_done_callback(self._pending.discard)
 
-    async def emit(self, event_type: str, data: dict[str, Any]) -> None:
-        event = {"type": event_type, **data}
-        self._history.append(event)
+    def set_forwarder(self, forwarder: EventForwarder | None) -> None:
+        """Also pass every locally emitted event to *forwarder* (or stop).
+
+        The forwarder is called synchronously, before any handler runs.
+        """
+        self._forwarder = forwarder
 
+    def _dispatch(self, event: dict[str, Any]) -> None:
+        self._history.append(event)
         if len(self._history) > self.MAX_HISTORY:
             self._history = self._history[-self.MAX_HISTORY:]
 
-        handlers = list(self._handlers.get(event_type, []))
+        handlers = list(self._handlers.get(event["type"], []))
         handlers.extend(self._handlers.get("*", []))
-
         for handler in handlers:
             self._spawn(handler, event)
 
+    def _forward(self, event: dict[str, Any]) -> None:
+        if self._forwarder is None:
+            return
+        try:
+            self._forwarder(event)
+        except Exception:
+            logger.exception("Event forwarder failed for %s", event.get("type"))
+
+    async def emit(self, event_type: str, data: dict[str, Any]) -> None:
+        event = {"type": event_type, **data}
+        self._dispatch(event)
+        self._forward(event)
+
+    def deliver(self, event: dict[str, Any]) -> None:
+        """Dispatch an event emitted in another process.
+
+        Handlers and history see it like a local event; it is not
+        forwarded again.
+        """
+        self._dispatch(event)
+
     async def send_message(self, from_agent: str, to_agent: str, content: str) -> None:
         """Send a direct message between agents.
 
@@ -70,14 +102,8 @@ class EventBus:
             "to": to_agent,
             "content": content,
         }
-        self._history.append(event)
-        if len(self._history) > self.MAX_HISTORY:
-            self._history = self._history[-self.MAX_HISTORY:]
-
-        handlers = list(self._handlers.get("agent.message", []))
-        handlers.extend(self._handlers.get("*", []))
-        for handler in handlers:
-            self._spawn(handler, event)
+        self._dispatch(event)
+        self._forward(event)
 
     async def _safe_dispatch(self, handler: EventHandler, event: dict[str, Any]) -> None:
         """Dispatch an event to a handler with error handling."""
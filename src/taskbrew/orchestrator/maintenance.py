@@ -0,0 +1,169 @@
+"""Background runner for periodic database maintenance jobs.
+
+Recalculations such as ``ProcessIntelligenceManager.refresh_scores`` or
+``MemoryManager.decay_scores`` used to run only when someone hit the
+matching API endpoint, inline with the request. :class:`MaintenanceRunner`
+owns them instead: each job is registered with an interval, due jobs run
+one at a time from a single background task (so maintenance never
+competes with itself for the write lock), and every run is timed.
+Per-job counters are available from :meth:`MaintenanceRunner.stats`
+(``GET /api/maintenance``) and each run is a ``maintenance.<job>`` stage
+span in :mod:`taskbrew.orchestrator.tracing`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from taskbrew.orchestrator.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Job:
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval: float
+    next_due: float
+    runs: int = 0
+    failures: int = 0
+    total_ms: float = 0.0
+    last_started_at: float | None = None
+    last_duration_ms: float | None = None
+    last_result: Any = None
+    last_error: str | None = None
+
+    def as_dict(self, now: float) -> dict:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval,
+            "next_due_in_seconds": round(max(0.0, self.next_due - now), 1),
+            "runs": self.runs,
+            "failures": self.failures,
+            "total_ms": round(self.total_ms, 1),
+            "mean_ms": round(self.total_ms / self.runs, 1) if self.runs else None,
+            "last_started_at": self.last_started_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_result": self.last_result,
+            "last_error": self.last_error,
+        }
+
+
+class MaintenanceRunner:
+    """Run registered jobs on their intervals from one background task.
+
+    Parameters
+    ----------
+    tick:
+        Seconds between checks for due jobs.
+    """
+
+    def __init__(self, *, tick: float = 30.0) -> None:
+        self.tick_interval = tick
+        self._jobs: dict[str, _Job] = {}
+        self._stopping = asyncio.Event()
+        self._running: str | None = None
+
+    def register(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        *,
+        initial_delay: float | None = None,
+    ) -> None:
+        """Run ``await func()`` every *interval* seconds.
+
+        The first run is after *initial_delay* (default: one interval).
+        A non-positive *interval* leaves the job registered for manual
+        :meth:`run_job` calls only.
+        """
+        delay = interval if initial_delay is None else initial_delay
+        self._jobs[name] = _Job(
+            name=name, func=func, interval=interval,
+            next_due=time.monotonic() + delay if interval > 0 else float("inf"),
+        )
+
+    @property
+    def job_names(self) -> list[str]:
+        return list(self._jobs)
+
+    async def run_job(self, name: str) -> dict:
+        """Run job *name* now and return its updated stats.
+
+        Raises KeyError for an unknown job. Failures are recorded, not
+        raised.
+        """
+        job = self._jobs[name]
+        started = time.perf_counter()
+        job.last_started_at = time.time()
+        self._running = name
+        try:
+            with get_tracer().span(f"maintenance.{name}"):
+                result = await job.func()
+            job.last_result = _summarise(result)
+            job.last_error = None
+        except Exception as exc:
+            job.failures += 1
+            job.last_error = f"{type(exc).__name__}: {exc}"
+            logger.exception("Maintenance job %s failed", name)
+        finally:
+            self._running = None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            job.runs += 1
+            job.total_ms += elapsed_ms
+            job.last_duration_ms = round(elapsed_ms, 1)
+            if job.interval > 0:
+                job.next_due = time.monotonic() + job.interval
+        return job.as_dict(time.monotonic())
+
+    async def tick(self) -> None:
+        """Run every job that is due, one after another."""
+        now = time.monotonic()
+        for job in list(self._jobs.values()):
+            if self._stopping.is_set():
+                return
+            if job.next_due <= now:
+                await self.run_job(job.name)
+
+    def stop(self) -> None:
+        """Make :meth:`run` return without waiting out the tick."""
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Check for due jobs every ``tick_interval`` seconds until stopped."""
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.tick_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.tick()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "running": self._running,
+            "jobs": [job.as_dict(now) for job in self._jobs.values()],
+        }
+
+
+def _summarise(result: Any) -> Any:
+    """Keep job results small enough to hold in memory and serve as JSON."""
+    if isinstance(result, list):
+        return {"items": len(result)}
+    if isinstance(result, (int, float, str, bool)) or result is None:
+        return result
+    if isinstance(result, dict):
+        return {
+            k: v for k, v in result.items()
+            if v is None or isinstance(v, (int, float, str, bool))
+            or (isinstance(v, dict) and len(v) <= 50)
+        }
+    return str(result)[:200]
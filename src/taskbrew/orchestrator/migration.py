@@ -24,6 +24,8 @@ import logging
 import re
 from datetime import datetime, timezone
 
+from taskbrew.orchestrator.database import _role_from_agent_id
+
 logger = logging.getLogger(__name__)
 
 # Match: ALTER TABLE <table> ADD [COLUMN] <column> ...
@@ -33,13 +35,19 @@ _ADD_COLUMN_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Trigger bodies contain ``;``; the splitter joins them back up to ``END``.
+_CREATE_TRIGGER_RE = re.compile(
+    r"^\s*CREATE\s+(?:TEMP(?:ORARY)?\s+)?TRIGGER\b", re.IGNORECASE,
+)
+
 
 def _split_sql_statements(sql: str) -> list[str]:
     """Split a SQL script into individual statements on ``;``.
 
-    Handles SQL line comments (``--``) that may contain semicolons.
-    Our migration scripts do not use string literals containing ``;``,
-    so this simple splitter is sufficient.
+    Handles SQL line comments (``--``) that may contain semicolons, and
+    keeps a ``CREATE TRIGGER ... BEGIN ...; END`` body together as one
+    statement. Our migration scripts do not use string literals
+    containing ``;``, so this simple splitter is sufficient.
     """
     cleaned_lines = []
     for line in sql.splitlines():
@@ -48,7 +56,29 @@ def _split_sql_statements(sql: str) -> list[str]:
             line = line.split("--", 1)[0]
         cleaned_lines.append(line)
     joined = "\n".join(cleaned_lines)
-    return [s.strip() for s in joined.split(";") if s.strip()]
+    statements: list[str] = []
+    trigger: list[str] | None = None
+    for part in joined.split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        if trigger is not None:
+            trigger.append(part)
+            if part.upper() == "END":
+                statements.append(";\n".join(trigger[:-1]) + ";\nEND")
+                trigger = None
+        elif _CREATE_TRIGGER_RE.match(part):
+            trigger = [part]
+        else:
+            statements.append(part)
+    if trigger is not None:
+        raise ValueError("CREATE TRIGGER without a closing END")
+    return statements
+
+
+def _sql_role_from_agent_id(agent_id: str | None) -> str | None:
+    """``role_from_agent_id()`` as registered for migration statements."""
+    return _role_from_agent_id(agent_id) if agent_id else agent_id
 
 
 def _strip_ident(ident: str) -> str:
@@ -1435,6 +1465,180 @@ MIGRATIONS: list[tuple[int, str, str]] = [
         -- so overnight pipelines aren't killed by the idle timeout.
         ALTER TABLE tasks ADD COLUMN awaiting_input_since TEXT;
     """),
+    (33, "add_scheduling_graph_critical_path_columns", """
+        -- Critical-path timings for AdvancedPlanningManager.build_schedule.
+        -- Hours are relative to "now" at schedule time: earliest_start_hours
+        -- is when the task can begin once its dependencies finish, and
+        -- slack_hours is how far it can slip without moving the group ETA.
+        -- is_critical = 1 for zero-slack tasks.
+        ALTER TABLE scheduling_graph ADD COLUMN estimated_hours REAL;
+        ALTER TABLE scheduling_graph ADD COLUMN earliest_start_hours REAL;
+        ALTER TABLE scheduling_graph ADD COLUMN slack_hours REAL;
+        ALTER TABLE scheduling_graph ADD COLUMN is_critical INTEGER NOT NULL DEFAULT 0;
+    """),
+    (34, "add_semantic_index_embedding_column", """
+        -- float32 hashed TF-IDF vectors for CodeReasoningManager.search_by_intent
+        -- (code_embeddings already has an embedding column). NULL rows are
+        -- back-filled the first time the in-memory index loads.
+        ALTER TABLE semantic_index ADD COLUMN embedding BLOB;
+    """),
+    (35, "add_query_plan_audit_indexes", """
+        -- Indexes recommended by the query-plan audit
+        -- (taskbrew.orchestrator.query_plans / taskbrew doctor --query-plans).
+        -- task_usage had no index at all, so the group trace, per-agent
+        -- performance stats, analytics and timeseries endpoints each did a
+        -- full scan plus a temp B-tree sort. The tasks/events/escalations
+        -- indexes cover the per-agent analytics, throughput/timeseries and
+        -- failure-context lookups.
+        CREATE INDEX IF NOT EXISTS idx_task_usage_task ON task_usage(task_id, recorded_at);
+        CREATE INDEX IF NOT EXISTS idx_task_usage_agent ON task_usage(agent_id, recorded_at);
+        CREATE INDEX IF NOT EXISTS idx_task_usage_recorded ON task_usage(recorded_at);
+        CREATE INDEX IF NOT EXISTS idx_tasks_claimed ON tasks(claimed_by, created_at);
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks(completed_at, status);
+        CREATE INDEX IF NOT EXISTS idx_tasks_type ON tasks(task_type);
+        CREATE INDEX IF NOT EXISTS idx_events_task ON events(task_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_escalations_task ON escalations(task_id, created_at);
+    """),
+    (36, "add_task_usage_role_column", """
+        -- Stored role for per-role analytics (InstanceManager.get_role_performance,
+        -- /api/metrics/roles), which used to derive it with SUBSTR/INSTR on
+        -- agent_id for every row. Existing rows take the role the task was
+        -- assigned to; orphaned rows fall back to the role in the agent_id,
+        -- by the same rule record_task_usage applies to new rows.
+        ALTER TABLE task_usage ADD COLUMN role TEXT;
+        UPDATE task_usage SET role = (
+            SELECT t.assigned_to FROM tasks t WHERE t.id = task_usage.task_id
+        ) WHERE role IS NULL;
+        UPDATE task_usage SET role = role_from_agent_id(agent_id)
+            WHERE role IS NULL OR role = '';
+        CREATE INDEX IF NOT EXISTS idx_task_usage_role ON task_usage(role, recorded_at);
+    """),
+    (37, "add_tasks_created_index", """
+        -- Arrival counts for the auto-scaler's demand estimate
+        -- (TaskBoard.get_flow_stats) and the history replay read tasks by
+        -- created_at window every scaling tick.
+        CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at, assigned_to);
+    """),
+    (38, "create_chat_history_tables", """
+        -- Dashboard chat history (ChatManager). Messages are appended per
+        -- turn and read back in pages by seq; chat_sessions keeps the SDK
+        -- session id to resume and the rolling summary of turns that fell
+        -- out of the in-memory window.
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            id TEXT NOT NULL,
+            agent_name TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_chat_messages_agent ON chat_messages(agent_name, seq);
+        CREATE TABLE IF NOT EXISTS chat_sessions (
+            agent_name TEXT PRIMARY KEY,
+            sdk_session_id TEXT,
+            summary TEXT NOT NULL DEFAULT '',
+            updated_at TEXT NOT NULL
+        );
+    """),
+    (39, "add_board_versioning", """
+        -- Delta sync for dashboard board clients (GET /api/board?since=).
+        -- board_version is a single counter bumped by every insert,
+        -- update or delete on tasks; the touched row records the new
+        -- value in row_version and deletions leave a tombstone. Done in
+        -- triggers so raw UPDATEs outside TaskBoard are versioned too.
+        -- RetentionManager prunes tombstones by deleted_at; pruning one
+        -- raises pruned_version, and a delta request older than that gets
+        -- a full reset instead of silently missing the deletion.
+        ALTER TABLE tasks ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0;
+        CREATE TABLE IF NOT EXISTS board_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL,
+            pruned_version INTEGER NOT NULL DEFAULT 0
+        );
+        INSERT OR IGNORE INTO board_version (id, version) VALUES (1, 0);
+        CREATE TABLE IF NOT EXISTS task_tombstones (
+            task_id TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            deleted_at TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_row_version ON tasks(row_version);
+        CREATE INDEX IF NOT EXISTS idx_task_tombstones_version ON task_tombstones(version);
+        CREATE INDEX IF NOT EXISTS idx_task_tombstones_deleted ON task_tombstones(deleted_at);
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_version_insert
+        AFTER INSERT ON tasks
+        BEGIN
+            UPDATE board_version SET version = version + 1 WHERE id = 1;
+            UPDATE tasks SET row_version = (SELECT version FROM board_version WHERE id = 1)
+                WHERE id = NEW.id;
+            DELETE FROM task_tombstones WHERE task_id = NEW.id;
+        END;
+        -- The WHEN guard skips the trigger's own row_version write.
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_version_update
+        AFTER UPDATE ON tasks
+        WHEN NEW.row_version IS OLD.row_version
+        BEGIN
+            UPDATE board_version SET version = version + 1 WHERE id = 1;
+            UPDATE tasks SET row_version = (SELECT version FROM board_version WHERE id = 1)
+                WHERE id = NEW.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_tasks_version_delete
+        AFTER DELETE ON tasks
+        BEGIN
+            UPDATE board_version SET version = version + 1 WHERE id = 1;
+            INSERT OR REPLACE INTO task_tombstones (task_id, version, deleted_at)
+                VALUES (
+                    OLD.id, (SELECT version FROM board_version WHERE id = 1),
+                    strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')
+                );
+        END;
+        -- Also fires when a re-used task id clears its tombstone; that
+        -- only costs clients further behind a reset.
+        CREATE TRIGGER IF NOT EXISTS trg_task_tombstones_pruned
+        AFTER DELETE ON task_tombstones
+        BEGIN
+            UPDATE board_version SET pruned_version = MAX(pruned_version, OLD.version)
+                WHERE id = 1;
+        END;
+    """),
+    (40, "add_test_stats", """
+        -- Running per-test aggregates maintained by
+        -- VerificationManager.record_runs so flaky-test queries read one
+        -- row per test instead of re-aggregating test_runs.
+        -- recent_outcomes is a bitmap of the last 32 runs (bit 0 = newest,
+        -- set = failed); the backfill cannot recover it and starts empty.
+        CREATE TABLE IF NOT EXISTS test_stats (
+            test_name TEXT PRIMARY KEY,
+            total_runs INTEGER NOT NULL DEFAULT 0,
+            failures INTEGER NOT NULL DEFAULT 0,
+            ewma_duration_ms REAL,
+            last_duration_ms INTEGER,
+            recent_outcomes INTEGER NOT NULL DEFAULT 0,
+            recent_count INTEGER NOT NULL DEFAULT 0,
+            quarantined INTEGER NOT NULL DEFAULT 0,
+            quarantine_reason TEXT,
+            last_run_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_test_stats_flaky ON test_stats(test_name)
+            WHERE failures > 0 AND failures < total_runs;
+        INSERT OR IGNORE INTO test_stats
+            (test_name, total_runs, failures, ewma_duration_ms, last_run_at)
+        SELECT test_name, COUNT(*), SUM(CASE WHEN passed = 0 THEN 1 ELSE 0 END),
+               AVG(duration_ms), MAX(created_at)
+        FROM test_runs WHERE quarantined = 0 GROUP BY test_name;
+    """),
+    (41, "add_retention_time_indexes", """
+        -- RetentionManager deletes the oldest rows of these tables in
+        -- batches by their timestamp column; without an index each batch
+        -- was a full scan. task_usage(recorded_at) already exists (35).
+        CREATE INDEX IF NOT EXISTS idx_events_created ON events(created_at);
+        CREATE INDEX IF NOT EXISTS idx_context_snapshots_created ON context_snapshots(created_at);
+        CREATE INDEX IF NOT EXISTS idx_pipeline_bottlenecks_detected ON pipeline_bottlenecks(detected_at);
+        CREATE INDEX IF NOT EXISTS idx_impact_predictions_created ON impact_predictions(created_at);
+        CREATE INDEX IF NOT EXISTS idx_decision_audit_log_created ON decision_audit_log(created_at);
+        CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_created ON webhook_deliveries(created_at);
+        CREATE INDEX IF NOT EXISTS idx_agent_messages_created ON agent_messages(created_at);
+    """),
 ]
 
 
@@ -1498,6 +1702,9 @@ class MigrationManager:
         """
         statements = _split_sql_statements(sql)
         async with self._db.transaction() as conn:
+            await conn.create_function(
+                "role_from_agent_id", 1, _sql_role_from_agent_id, deterministic=True,
+            )
             for stmt in statements:
                 m = _ADD_COLUMN_RE.match(stmt)
                 if m:
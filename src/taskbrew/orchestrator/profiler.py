@@ -0,0 +1,276 @@
+"""On-demand profiling of the running orchestrator process.
+
+Two tools, neither of which needs the process restarted under a profiler:
+
+* :func:`sample_profile` -- a wall-clock sampling profile for a fixed
+  window. A background thread samples every thread's Python stack
+  (``sys._current_frames``), which covers the event-loop thread while it
+  is blocked as well as the aiosqlite and executor worker threads. A
+  coroutine on the loop samples the await chain of every asyncio task,
+  which shows where work is *waiting*. Both are returned as collapsed
+  stacks (``root;outer;...;inner count``), the input format of
+  flamegraph.pl, speedscope and inferno.
+* :class:`LoopStallDetector` -- a watchdog thread that notices when the
+  event loop has not run a heartbeat callback for longer than a
+  threshold, and logs the loop thread's stack *while it is still
+  blocked*, pointing at the synchronous file I/O, ``ast.parse`` or
+  similar call responsible. Unlike ``loop.set_debug(True)`` it costs
+  one timer callback per quarter-threshold, so it can stay on in
+  production.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from functools import lru_cache
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 60.0
+_MAX_STACK_DEPTH = 128
+_THREAD_NUMBER_RE = re.compile(r"\d+")
+
+_profiling = False
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profile is already being captured in this process."""
+
+
+@lru_cache(maxsize=4096)
+def _short_path(path: str) -> str:
+    for marker in ("site-packages/", "/taskbrew/"):
+        idx = path.rfind(marker)
+        if idx != -1:
+            start = idx + len(marker) if marker == "site-packages/" else idx + 1
+            return path[start:]
+    return path.rsplit("/", 1)[-1]
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    # ';' separates frames and ' ' precedes the count in collapsed output.
+    label = f"{name} ({_short_path(code.co_filename)}:{frame.f_lineno})"
+    return label.replace(";", ":").replace(" ", "_")
+
+
+def _thread_stack(frame: FrameType | None) -> list[str]:
+    stack: list[str] = []
+    while frame is not None and len(stack) < _MAX_STACK_DEPTH:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _task_stack(task: asyncio.Task) -> list[str]:
+    """Outermost-first labels along *task*'s chain of awaited coroutines."""
+    stack: list[str] = []
+    coro = task.get_coro()
+    while coro is not None and len(stack) < _MAX_STACK_DEPTH:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+        if isinstance(coro, asyncio.Future):
+            break
+    return stack
+
+
+def _sample_threads(
+    stop: threading.Event, interval: float, counts: Counter, loop_ident: int,
+) -> None:
+    me = threading.get_ident()
+    while not stop.wait(interval):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            if ident == loop_ident:
+                root = "thread:event-loop"
+            else:
+                root = "thread:" + _THREAD_NUMBER_RE.sub("N", names.get(ident, "unknown"))
+            root = root.replace(" ", "_").replace(";", ":")
+            counts[";".join([root, *_thread_stack(frame)])] += 1
+
+
+async def sample_profile(seconds: float, interval: float = 0.005) -> dict:
+    """Sample all threads and asyncio tasks for *seconds*.
+
+    Returns ``{"stacks": {collapsed_stack: count}, ...}`` with the stacks
+    ordered by count. Raises :class:`ProfilerBusyError` if a profile is
+    already running and :class:`ValueError` for out-of-range arguments.
+    """
+    global _profiling
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise ValueError(f"seconds must be in (0, {MAX_PROFILE_SECONDS:g}]")
+    if not 0.001 <= interval <= 1.0:
+        raise ValueError("interval must be between 1 ms and 1 s")
+    if _profiling:
+        raise ProfilerBusyError("a profile is already being captured")
+    _profiling = True
+    try:
+        thread_counts: Counter = Counter()
+        task_counts: Counter = Counter()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=_sample_threads,
+            args=(stop, interval, thread_counts, threading.get_ident()),
+            name="taskbrew-profiler",
+            daemon=True,
+        )
+        loop = asyncio.get_running_loop()
+        me = asyncio.current_task()
+        started = time.monotonic()
+        sampler.start()
+        try:
+            deadline = loop.time() + seconds
+            while loop.time() < deadline:
+                for task in asyncio.all_tasks(loop):
+                    if task is me:
+                        continue
+                    stack = _task_stack(task)
+                    if stack:
+                        task_counts[";".join(["asyncio", *stack])] += 1
+                await asyncio.sleep(interval)
+        finally:
+            stop.set()
+            await asyncio.to_thread(sampler.join, 5.0)
+        elapsed = time.monotonic() - started
+    finally:
+        _profiling = False
+
+    stacks = thread_counts + task_counts
+    return {
+        "seconds": round(elapsed, 3),
+        "interval_ms": interval * 1000,
+        "thread_samples": sum(thread_counts.values()),
+        "task_samples": sum(task_counts.values()),
+        "stacks": dict(stacks.most_common()),
+    }
+
+
+def collapsed(profile: dict) -> str:
+    """Render *profile* as collapsed-stack text, one ``stack count`` per line."""
+    return "".join(f"{stack} {n}\n" for stack, n in profile["stacks"].items())
+
+
+class LoopStallDetector:
+    """Log the loop thread's stack whenever the event loop stalls.
+
+    Parameters
+    ----------
+    threshold:
+        Seconds the loop may go without running a callback before it is
+        reported.
+    max_records:
+        Recent stalls kept for :meth:`recent`.
+    """
+
+    def __init__(self, threshold: float = 0.25, max_records: int = 50) -> None:
+        self.threshold = threshold
+        self._interval = threshold / 4
+        self._records: deque[dict] = deque(maxlen=max_records)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_ident: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._last_beat = time.monotonic()
+        self.stalls = 0
+
+    def start(self) -> None:
+        """Begin watching the running loop; call from the loop thread."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_ident = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        self._thread = threading.Thread(
+            target=self._watch, name="taskbrew-stall-detector", daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _beat(self) -> None:
+        self._last_beat = time.monotonic()
+        if not self._stop.is_set():
+            self._handle = self._loop.call_later(self._interval, self._beat)
+
+    def _watch(self) -> None:
+        record: dict | None = None
+        while not self._stop.wait(self._interval):
+            loop = self._loop
+            if loop is None or loop.is_closed() or not loop.is_running():
+                return
+            # The next beat is due one interval after the last one.
+            blocked = time.monotonic() - self._last_beat - self._interval
+            if blocked > self.threshold:
+                if record is None:
+                    frame = sys._current_frames().get(self._loop_ident)
+                    stack = traceback.format_stack(frame) if frame else []
+                    record = {
+                        "detected_at": time.time(),
+                        "blocked_ms": round(blocked * 1000),
+                        "stack": [line.rstrip() for line in stack[-30:]],
+                    }
+                    self._records.append(record)
+                    self.stalls += 1
+                    logger.warning(
+                        "Event loop blocked for more than %.0f ms; loop thread stack:\n%s",
+                        self.threshold * 1000, "".join(stack[-30:]),
+                    )
+                else:
+                    record["blocked_ms"] = round(blocked * 1000)
+            elif record is not None:
+                logger.warning(
+                    "Event loop unblocked after about %d ms", record["blocked_ms"],
+                )
+                record = None
+
+    def recent(self) -> list[dict]:
+        """Recorded stalls, newest first."""
+        return list(reversed(self._records))
+
+
+_detector: LoopStallDetector | None = None
+
+
+def get_stall_detector() -> LoopStallDetector | None:
+    return _detector
+
+
+def start_stall_detector(threshold_ms: float) -> LoopStallDetector | None:
+    """(Re)start the process-wide detector; ``threshold_ms <= 0`` disables it."""
+    global _detector
+    stop_stall_detector()
+    if threshold_ms > 0:
+        _detector = LoopStallDetector(threshold=threshold_ms / 1000)
+        _detector.start()
+    return _detector
+
+
+def stop_stall_detector() -> None:
+    global _detector
+    if _detector is not None:
+        _detector.stop()
+        _detector = None
@@ -0,0 +1,398 @@
+"""Query-plan audit harness for the SQLite schema.
+
+Replays the queries issued by the dashboard routers, the agent loop and
+the intelligence managers against a synthetic, ``ANALYZE``-d database
+and captures ``EXPLAIN QUERY PLAN`` for each one.  Each shape uses the
+SQL constant its call site executes, so a changed query is audited as
+changed.  A plan is flagged when SQLite falls back to a full table scan
+(``SCAN <table>`` with no index) or builds a temporary B-tree to satisfy
+``GROUP BY`` / ``ORDER BY`` / ``DISTINCT``.
+
+Shapes whose sort is inherent -- grouping by an expression such as
+``DATE(recorded_at)`` or ordering by an aggregate -- list the accepted
+flags in :attr:`QueryShape.allow` so the audit stays strict everywhere
+else.  ``tests/test_query_plans.py`` runs the audit as a regression test
+and ``taskbrew doctor --query-plans`` prints the report.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from taskbrew.agents import agent_loop, instance_manager
+from taskbrew.dashboard import chat_manager
+from taskbrew.dashboard.routers import analytics as analytics_router
+from taskbrew.dashboard.routers import exports as exports_router
+from taskbrew.dashboard.routers import pipelines as pipelines_router
+from taskbrew.dashboard.routers import tasks as tasks_router
+from taskbrew.intelligence import escalation, execution, planning, verification
+from taskbrew.orchestrator import database, task_board
+from taskbrew.orchestrator.database import Database
+
+# Flag names reported by :func:`classify_plan`.
+FULL_SCAN = "full_scan"
+TEMP_BTREE = "temp_btree"
+
+# "SCAN task_usage" / "SCAN u" -- a table scan.  Scans that walk an index
+# ("SCAN t USING COVERING INDEX ...") are ordered and are not flagged.
+_TABLE_SCAN_RE = re.compile(r"^SCAN (\S+)(?: AS \S+)?$")
+_TEMP_BTREE_RE = re.compile(r"USE TEMP B-TREE FOR (\w+(?: \w+)?)")
+
+# Relative "now" used for every time-windowed shape.
+_NOW = datetime(2026, 1, 31, tzinfo=timezone.utc)
+_CUTOFF = (_NOW - timedelta(days=7)).isoformat()
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query issued somewhere in the code base, with representative params."""
+
+    name: str
+    source: str
+    sql: str
+    params: tuple = ()
+    # Flags (e.g. ``"temp_btree:GROUP BY"``) that are inherent to the shape.
+    allow: frozenset[str] = frozenset()
+
+
+@dataclass
+class PlanReport:
+    """``EXPLAIN QUERY PLAN`` output for one :class:`QueryShape`."""
+
+    shape: QueryShape
+    plan: list[str] = field(default_factory=list)
+    flags: list[str] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.unexpected
+
+    @property
+    def unexpected(self) -> list[str]:
+        return [f for f in self.flags if f not in self.shape.allow]
+
+
+# Grouping by an expression (a date bucket) or by a joined table's column.
+_GROUP_BY_EXPR = frozenset({f"{TEMP_BTREE}:GROUP BY"})
+# Ordering the already-grouped result by an aggregate or a bucket.
+_ORDER_BY_GROUPS = frozenset({f"{TEMP_BTREE}:ORDER BY"})
+# Sorting the handful of rows an index lookup returns for one task.
+_SMALL_SORT = frozenset({f"{TEMP_BTREE}:ORDER BY"})
+# Grouping the few rows of a short time window by role.
+_WINDOW_GROUPS = frozenset({f"{TEMP_BTREE}:GROUP BY"})
+# Ranking the (partial-index) set of flaky tests by failure rate.
+_RANK_PARTIAL = frozenset({f"{TEMP_BTREE}:ORDER BY"})
+
+QUERY_SHAPES: list[QueryShape] = [
+    # -- task_usage ---------------------------------------------------
+    QueryShape(
+        "group_trace_usage",
+        "dashboard/routers/tasks.py:get_group_trace",
+        tasks_router._TRACE_USAGE_SQL.format(placeholders="?, ?, ?"),
+        ("T-1", "T-2", "T-3"),
+    ),
+    QueryShape(
+        "pipeline_task_usage",
+        "dashboard/routers/pipelines.py:pipeline_detail",
+        pipelines_router._TASK_USAGE_TOTALS_SQL,
+        ("T-1",),
+    ),
+    QueryShape(
+        "latest_task_usage",
+        "agents/agent_loop.py:cost attribution",
+        agent_loop._LATEST_USAGE_SQL,
+        ("T-1",),
+    ),
+    QueryShape(
+        "instance_performance",
+        "agents/instance_manager.py:get_performance_stats",
+        instance_manager._INSTANCE_PERFORMANCE_SQL,
+        ("coder-1",),
+    ),
+    QueryShape(
+        "instance_performance_all",
+        "agents/instance_manager.py:get_performance_stats",
+        instance_manager._ALL_INSTANCES_PERFORMANCE_SQL,
+        allow=_ORDER_BY_GROUPS,
+    ),
+    QueryShape(
+        "usage_summary",
+        "orchestrator/database.py:get_usage_summary",
+        database._USAGE_SUMMARY_SQL,
+        (_CUTOFF,),
+    ),
+    QueryShape(
+        "usage_timeseries",
+        "dashboard/routers/tasks.py:get_metrics_timeseries",
+        tasks_router._USAGE_TIMESERIES_SQL,
+        ("%Y-%m-%dT%H:00:00", _CUTOFF),
+        allow=_GROUP_BY_EXPR | _ORDER_BY_GROUPS,
+    ),
+    QueryShape(
+        "analytics_agents",
+        "dashboard/routers/analytics.py:agent_performance_summary",
+        analytics_router._AGENT_SUMMARY_SQL,
+        (_CUTOFF, _CUTOFF),
+        # "usage"/"u" are the materialized one-row-per-agent CTE.
+        allow=_ORDER_BY_GROUPS | {f"{FULL_SCAN}:usage", f"{FULL_SCAN}:u"},
+    ),
+    QueryShape(
+        "analytics_agent_daily",
+        "dashboard/routers/analytics.py:agent_detail",
+        analytics_router._AGENT_DAILY_USAGE_SQL,
+        ("coder-1", _CUTOFF),
+        allow=_GROUP_BY_EXPR,
+    ),
+    QueryShape(
+        "analytics_efficiency",
+        "dashboard/routers/analytics.py:efficiency_metrics",
+        analytics_router._EFFICIENCY_SQL,
+        (_CUTOFF,),
+        allow=_GROUP_BY_EXPR,
+    ),
+    QueryShape(
+        "role_performance",
+        "agents/instance_manager.py:get_role_performance",
+        instance_manager._ROLE_PERFORMANCE_SQL,
+        allow=_ORDER_BY_GROUPS,
+    ),
+    QueryShape(
+        "usage_export_window",
+        "dashboard/routers/exports.py:export_usage",
+        exports_router._USAGE_EXPORT_SQL,
+        (_CUTOFF,),
+    ),
+    QueryShape(
+        "planning_history_by_type",
+        "intelligence/planning.py:estimate_effort",
+        planning._HISTORY_BY_TYPE_SQL,
+        ("implementation",),
+    ),
+    # -- tasks --------------------------------------------------------
+    QueryShape(
+        "analytics_agent_recent_tasks",
+        "dashboard/routers/analytics.py:agent_detail",
+        analytics_router._AGENT_RECENT_TASKS_SQL,
+        ("coder-1", _CUTOFF),
+    ),
+    QueryShape(
+        "throughput_daily",
+        "dashboard/routers/analytics.py:throughput_metrics",
+        analytics_router._DAILY_THROUGHPUT_SQL,
+        (_CUTOFF,),
+        allow=_GROUP_BY_EXPR,
+    ),
+    QueryShape(
+        "tasks_timeseries",
+        "dashboard/routers/tasks.py:get_metrics_timeseries",
+        tasks_router._TASK_TIMESERIES_SQL,
+        ("%Y-%m-%dT%H:00:00", _CUTOFF),
+        allow=_GROUP_BY_EXPR | _ORDER_BY_GROUPS,
+    ),
+    QueryShape(
+        "autoscale_queue_depths",
+        "orchestrator/task_board.py:get_queue_depths",
+        task_board._QUEUE_DEPTHS_SQL,
+    ),
+    QueryShape(
+        "autoscale_arrivals",
+        "orchestrator/task_board.py:get_flow_stats",
+        task_board._ARRIVALS_SQL,
+        (_CUTOFF, _NOW.isoformat()),
+        allow=_WINDOW_GROUPS,
+    ),
+    QueryShape(
+        "autoscale_completions",
+        "orchestrator/task_board.py:get_flow_stats",
+        task_board._COMPLETIONS_SQL,
+        (_CUTOFF, _NOW.isoformat()),
+        allow=_WINDOW_GROUPS,
+    ),
+    # -- events / intelligence ----------------------------------------
+    QueryShape(
+        "task_events",
+        "intelligence/execution.py:get_failure_context",
+        execution._TASK_EVENTS_SQL,
+        ("T-1",),
+    ),
+    QueryShape(
+        "task_escalations",
+        "intelligence/escalation.py:get_escalations_for_task",
+        escalation._TASK_ESCALATIONS_SQL,
+        ("T-1",),
+    ),
+    QueryShape(
+        "task_quality_scores",
+        "intelligence/execution.py:get_failure_context",
+        execution._TASK_QUALITY_SCORES_SQL,
+        ("T-1",),
+        allow=_SMALL_SORT,
+    ),
+    QueryShape(
+        "chat_history_page",
+        "dashboard/chat_manager.py:get_history_page",
+        chat_manager._HISTORY_PAGE_SQL,
+        ("coder-1", 1_000_000, 50),
+    ),
+    QueryShape(
+        "board_changes",
+        "orchestrator/task_board.py:get_board_changes",
+        task_board._BOARD_CHANGES_SQL.format(columns="*"),
+        (4990,),
+    ),
+    QueryShape(
+        "board_tombstones",
+        "orchestrator/task_board.py:get_board_changes",
+        task_board._TOMBSTONES_SQL,
+        (4990,),
+    ),
+    QueryShape(
+        "flaky_tests",
+        "intelligence/verification.py:get_flaky_tests",
+        verification._FLAKY_TESTS_SQL,
+        (20,),
+        allow=_RANK_PARTIAL,
+    ),
+]
+
+
+def classify_plan(detail_lines: list[str]) -> list[str]:
+    """Return the flags raised by a list of ``EXPLAIN QUERY PLAN`` details."""
+    flags: list[str] = []
+    for detail in detail_lines:
+        m = _TABLE_SCAN_RE.match(detail)
+        if m:
+            flags.append(f"{FULL_SCAN}:{m.group(1)}")
+        m = _TEMP_BTREE_RE.search(detail)
+        if m:
+            flags.append(f"{TEMP_BTREE}:{m.group(1)}")
+    return flags
+
+
+async def explain(db: Database, shape: QueryShape) -> PlanReport:
+    """Capture and classify the query plan for *shape*."""
+    report = PlanReport(shape=shape)
+    try:
+        rows = await db.execute_fetchall(
+            f"EXPLAIN QUERY PLAN {shape.sql}", shape.params,
+        )
+    except Exception as exc:  # noqa: BLE001 -- reported, not raised
+        report.error = f"{type(exc).__name__}: {exc}"
+        return report
+    report.plan = [r["detail"] for r in rows]
+    report.flags = classify_plan(report.plan)
+    return report
+
+
+async def populate_synthetic(db: Database, *, tasks: int = 5000, seed: int = 0) -> None:
+    """Fill *db* with a synthetic workload of roughly *tasks* tasks.
+
+    Each task gets a handful of usage rows, events and occasional
+    escalations / quality scores, spread over 90 days and a few dozen
+    agents, so that ``ANALYZE`` gives the planner realistic selectivity.
+    """
+    rng = random.Random(seed)
+    roles = ["pm", "architect", "coder", "verifier", "reviewer"]
+    agents = [f"{role}-{i}" for role in roles for i in range(1, 9)]
+    statuses = ["completed"] * 6 + ["failed", "pending", "in_progress", "blocked"]
+    types = ["implementation", "bug_fix", "review", "planning", "verification"]
+    groups = [f"G-{i}" for i in range(1, max(2, tasks // 20) + 1)]
+
+    task_rows, usage_rows, event_rows, esc_rows, score_rows = [], [], [], [], []
+    for n in range(1, tasks + 1):
+        task_id = f"T-{n}"
+        created = _NOW - timedelta(minutes=rng.randrange(90 * 24 * 60))
+        created_at = created.isoformat()
+        status = rng.choice(statuses)
+        agent = rng.choice(agents)
+        completed_at = (
+            (created + timedelta(minutes=rng.randrange(5, 600))).isoformat()
+            if status in ("completed", "failed") else None
+        )
+        task_rows.append((
+            task_id, rng.choice(groups), f"task {n}", rng.choice(types),
+            rng.choice(["low", "medium", "high", "critical"]),
+            agent.split("-")[0], agent, status, created_at, completed_at,
+        ))
+        for k in range(rng.randrange(1, 6)):
+            recorded = (created + timedelta(minutes=10 * k)).isoformat()
+            usage_rows.append((
+                task_id, agent, agent.split("-")[0], "claude-sonnet", rng.randrange(100, 50000),
+                rng.randrange(50, 8000), rng.random(), rng.randrange(1000, 90000),
+                rng.randrange(1, 30), recorded,
+            ))
+        for k in range(rng.randrange(2, 10)):
+            event_rows.append((
+                rng.choice(["task.claimed", "task.completed", "agent.status", "tool.used"]),
+                rng.choice(groups), task_id, agent, "{}",
+                (created + timedelta(seconds=30 * k)).isoformat(),
+            ))
+        if rng.random() < 0.05:
+            esc_rows.append((task_id, agent, "pm", "stuck", "high", "open", created_at))
+        if rng.random() < 0.3:
+            score_rows.append((task_id, agent, "self_review", rng.random(), "{}", created_at))
+
+    async with db.transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO groups (id, title, created_at) VALUES (?, ?, ?)",
+            [(g, g, (_NOW - timedelta(days=90)).isoformat()) for g in groups],
+        )
+        await conn.executemany(
+            "INSERT INTO tasks (id, group_id, title, task_type, priority, assigned_to, "
+            "claimed_by, status, created_at, completed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            task_rows,
+        )
+        await conn.executemany(
+            "INSERT INTO task_usage (task_id, agent_id, role, model, input_tokens, "
+            "output_tokens, cost_usd, duration_api_ms, num_turns, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            usage_rows,
+        )
+        await conn.executemany(
+            "INSERT INTO events (event_type, group_id, task_id, agent_id, data, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            event_rows,
+        )
+        await conn.executemany(
+            "INSERT INTO escalations (task_id, from_agent, to_agent, reason, severity, "
+            "status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            esc_rows,
+        )
+        await conn.executemany(
+            "INSERT INTO quality_scores (task_id, agent_id, score_type, score, details, "
+            "created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            score_rows,
+        )
+    await db.execute("ANALYZE")
+
+
+async def audit_query_plans(
+    db: Database | None = None,
+    *,
+    shapes: list[QueryShape] | None = None,
+    tasks: int = 5000,
+) -> list[PlanReport]:
+    """Explain every shape in *shapes* (default :data:`QUERY_SHAPES`).
+
+    When *db* is ``None`` a throw-away database is created in a temporary
+    directory, migrated, and populated via :func:`populate_synthetic`.
+    """
+    shapes = QUERY_SHAPES if shapes is None else shapes
+    if db is not None:
+        return [await explain(db, s) for s in shapes]
+
+    with tempfile.TemporaryDirectory(prefix="taskbrew-plans-") as tmp:
+        scratch = Database(os.path.join(tmp, "plans.db"), pool_size=1)
+        await scratch.initialize()
+        try:
+            await populate_synthetic(scratch, tasks=tasks)
+            return [await explain(scratch, s) for s in shapes]
+        finally:
+            await scratch.close()
@@ -0,0 +1,370 @@
+"""Retention policies and file compaction for the SQLite database.
+
+Several tables only ever grow: the event log, the context-snapshot cache,
+pipeline bottleneck samples, impact predictions, the decision audit log,
+webhook deliveries, usage rows, agent messages, dashboard chats and
+deleted-task tombstones.
+:class:`RetentionManager` trims them by age and/or row count according to
+:class:`RetentionPolicy` entries (defaults in :data:`DEFAULT_POLICIES`,
+overridable per table in ``team.yaml`` under ``maintenance.retention``),
+optionally archiving the rows it removes to gzip-compressed NDJSON.
+Each batch is deleted and archived in one transaction: the rows come
+back from ``DELETE ... RETURNING``, go to a ``.part`` file of their own,
+and the file is renamed into place once the delete has committed, so a
+failed batch never reaches the archive and a retried one never appears
+twice.
+
+Deleting rows does not shrink the file; :meth:`RetentionManager.compact`
+does, but only while no task is in progress: it truncates the WAL,
+runs ``PRAGMA optimize`` and returns free pages to the filesystem with
+``PRAGMA incremental_vacuum``. Databases created before incremental
+auto-vacuum was enabled get one full ``VACUUM`` (which also switches them
+over) once their free-page ratio passes ``vacuum_free_ratio``. That
+``VACUUM`` holds the write lock for as long as it takes to rewrite the
+file, so it is deferred while agent workers share the database.
+
+Both run as jobs of the :class:`~taskbrew.orchestrator.maintenance.MaintenanceRunner`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Rows deleted (and archived) per statement, so the write lock is held
+# briefly and agent claims can interleave with a large purge.
+_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long rows of one table are kept.
+
+    ``guard`` is an extra SQL condition a row must meet to be removed
+    (e.g. only delivered webhooks); ``expires_column`` additionally
+    removes rows whose own expiry time has passed.
+    """
+
+    table: str
+    time_column: str
+    max_age_days: int | None = None
+    max_rows: int | None = None
+    archive: bool = False
+    guard: str | None = None
+    expires_column: str | None = None
+
+
+DEFAULT_POLICIES: dict[str, RetentionPolicy] = {
+    p.table: p for p in (
+        RetentionPolicy("events", "created_at", max_age_days=30),
+        RetentionPolicy(
+            "context_snapshots", "created_at", max_age_days=7,
+            expires_column="expires_at",
+        ),
+        RetentionPolicy("pipeline_bottlenecks", "detected_at", max_age_days=30),
+        RetentionPolicy("impact_predictions", "created_at", max_age_days=30),
+        RetentionPolicy("decision_audit_log", "created_at", max_age_days=90, archive=True),
+        RetentionPolicy(
+            "webhook_deliveries", "created_at", max_age_days=14,
+            guard="status != 'pending'",
+        ),
+        # Cost history feeds budgets and analytics; keep a year.
+        RetentionPolicy("task_usage", "recorded_at", max_age_days=365, archive=True),
+        RetentionPolicy("agent_messages", "created_at", max_age_days=30, guard="read = 1"),
+        # Dashboard chats; a conversation's rolling summary outlives them.
+        RetentionPolicy("chat_messages", "timestamp", max_age_days=90),
+        # Board delta clients further behind than this get a full reset.
+        RetentionPolicy("task_tombstones", "deleted_at", max_age_days=30),
+    )
+}
+
+
+def build_policies(overrides: dict[str, dict | bool | None] | None = None) -> list[RetentionPolicy]:
+    """Apply ``maintenance.retention`` overrides to :data:`DEFAULT_POLICIES`.
+
+    Each override is a mapping of ``max_age_days`` / ``max_rows`` /
+    ``archive``, or ``false`` to disable the table. Only the tables in
+    :data:`DEFAULT_POLICIES` can be configured; anything else raises
+    ValueError.
+    """
+    policies = dict(DEFAULT_POLICIES)
+    for table, override in (overrides or {}).items():
+        if table not in DEFAULT_POLICIES:
+            raise ValueError(
+                f"maintenance.retention: unknown table {table!r} "
+                f"(expected one of {', '.join(sorted(DEFAULT_POLICIES))})"
+            )
+        if override is False or override is None:
+            policies.pop(table, None)
+            continue
+        if not isinstance(override, dict):
+            raise ValueError(  # noqa: TRY004 -- config errors are all ValueError
+                f"maintenance.retention.{table} must be a mapping or false"
+            )
+        unknown = set(override) - {"max_age_days", "max_rows", "archive"}
+        if unknown:
+            raise ValueError(
+                f"maintenance.retention.{table}: unknown keys {sorted(unknown)}"
+            )
+        for key in ("max_age_days", "max_rows"):
+            value = override.get(key)
+            if value is not None and (not isinstance(value, int) or value < 1):
+                raise ValueError(
+                    f"maintenance.retention.{table}.{key} must be a positive integer"
+                )
+        policies[table] = replace(DEFAULT_POLICIES[table], **override)
+    return list(policies.values())
+
+
+def _write_archive(path: Path, rows: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str, separators=(",", ":")) + "\n")
+
+
+class RetentionManager:
+    """Apply retention policies and compact the database file.
+
+    Parameters
+    ----------
+    db:
+        The :class:`~taskbrew.orchestrator.database.Database`.
+    policies:
+        Policies to enforce (see :func:`build_policies`).
+    archive_dir:
+        Where ``<table>-<timestamp>-<batch>.ndjson.gz`` archives are
+        written, one file per batch.
+    vacuum_free_ratio:
+        Free-page fraction above which a database without incremental
+        auto-vacuum gets a one-off full ``VACUUM``.
+    full_vacuum:
+        False defers that ``VACUUM``; other processes writing to the
+        database would time out waiting for its lock.
+    """
+
+    def __init__(
+        self,
+        db,
+        policies: list[RetentionPolicy] | None = None,
+        *,
+        archive_dir: str | Path | None = None,
+        vacuum_free_ratio: float = 0.2,
+        full_vacuum: bool = True,
+    ) -> None:
+        self._db = db
+        self.policies = policies if policies is not None else build_policies()
+        self.archive_dir = Path(archive_dir) if archive_dir else None
+        self.vacuum_free_ratio = vacuum_free_ratio
+        self.full_vacuum = full_vacuum
+        self._batches = 0  # numbers archive files, unique per process
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    async def apply_all(self) -> dict:
+        """Enforce every policy. Returns per-table deleted/archived counts."""
+        deleted: dict[str, int] = {}
+        archived: dict[str, int] = {}
+        for policy in self.policies:
+            try:
+                result = await self.apply(policy)
+            except Exception:
+                logger.exception("Retention for %s failed", policy.table)
+                continue
+            if result["deleted"]:
+                deleted[policy.table] = result["deleted"]
+            if result["archived"]:
+                archived[policy.table] = result["archived"]
+        return {
+            "deleted": deleted,
+            "archived": archived,
+            "total_deleted": sum(deleted.values()),
+        }
+
+    async def apply(self, policy: RetentionPolicy, *, now: datetime | None = None) -> dict:
+        """Enforce one policy; returns ``{"deleted": n, "archived": n}``."""
+        now = now or datetime.now(timezone.utc)
+        table, col = policy.table, policy.time_column
+        guard = f" AND ({policy.guard})" if policy.guard else ""
+        deleted = archived = 0
+
+        expired: list[str] = []
+        params: list = []
+        if policy.max_age_days:
+            expired.append(f"{col} < ?")
+            params.append((now - timedelta(days=policy.max_age_days)).isoformat())
+        if policy.expires_column:
+            expired.append(
+                f"({policy.expires_column} IS NOT NULL AND {policy.expires_column} < ?)"
+            )
+            params.append(now.isoformat())
+        if expired:
+            where = f"({' OR '.join(expired)}){guard}"
+            d, a = await self._purge(policy, where, tuple(params))
+            deleted += d
+            archived += a
+
+        if policy.max_rows:
+            row = await self._db.execute_fetchone(
+                f"SELECT COUNT(*) AS n FROM {table} WHERE 1 = 1{guard}"
+            )
+            excess = (row["n"] if row else 0) - policy.max_rows
+            if excess > 0:
+                # Oldest first: the newest max_rows rows survive.
+                d, a = await self._purge(
+                    policy, f"1 = 1{guard}", (), limit=excess, oldest_first=True,
+                )
+                deleted += d
+                archived += a
+
+        if deleted:
+            logger.info(
+                "Retention removed %d rows from %s (%d archived)", deleted, table, archived,
+            )
+        return {"deleted": deleted, "archived": archived}
+
+    async def _purge(
+        self,
+        policy: RetentionPolicy,
+        where: str,
+        params: tuple,
+        *,
+        limit: int | None = None,
+        oldest_first: bool = False,
+    ) -> tuple[int, int]:
+        table = policy.table
+        order = f" ORDER BY {policy.time_column}" if oldest_first else ""
+        archive = self.archive_dir is not None and policy.archive
+        remaining = limit
+        deleted = archived = 0
+        run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        while remaining is None or remaining > 0:
+            batch = _BATCH_SIZE if remaining is None else min(_BATCH_SIZE, remaining)
+            selected = f"SELECT rowid FROM {table} WHERE {where}{order} LIMIT ?"
+            if archive:
+                self._batches += 1
+                path = self.archive_dir / f"{table}-{run}-{self._batches:04d}.ndjson.gz"
+                part = path.with_name(path.name + ".part")
+                try:
+                    async with self._db.transaction() as conn:
+                        cursor = await conn.execute(
+                            f"DELETE FROM {table} WHERE rowid IN ({selected}) RETURNING *",
+                            (*params, batch),
+                        )
+                        rows = [dict(r) for r in await cursor.fetchall()]
+                        if rows:
+                            await asyncio.to_thread(_write_archive, part, rows)
+                except BaseException:
+                    part.unlink(missing_ok=True)
+                    raise
+                if rows:
+                    part.replace(path)
+                n = len(rows)
+                archived += n
+            else:
+                async with self._db.transaction() as conn:
+                    cursor = await conn.execute(
+                        f"DELETE FROM {table} WHERE rowid IN ({selected})",
+                        (*params, batch),
+                    )
+                n = cursor.rowcount
+            deleted += n
+            if remaining is not None:
+                remaining -= n
+            if n < batch:
+                break
+            await asyncio.sleep(0)  # let agent claims in between batches
+        return deleted, archived
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _file_bytes(self) -> int | None:
+        path = self._db.db_path
+        if path == ":memory:":
+            return None
+        return sum(
+            os.path.getsize(p) for p in (path, f"{path}-wal") if os.path.exists(p)
+        )
+
+    async def _pragma(self, name: str) -> int:
+        row = await self._db.execute_fetchone(f"PRAGMA {name}")
+        return next(iter(row.values())) if row else 0
+
+    async def is_idle(self) -> bool:
+        """True when no task is being worked on."""
+        row = await self._db.execute_fetchone(
+            "SELECT 1 AS busy FROM tasks WHERE status = 'in_progress' LIMIT 1"
+        )
+        return row is None
+
+    async def compact(self, *, force: bool = False) -> dict:
+        """Checkpoint, optimize and vacuum while idle; report reclaimed space.
+
+        Returns ``{"skipped": "busy"}`` while a task is in progress,
+        unless *force* is set.
+        """
+        if not force and not await self.is_idle():
+            return {"skipped": "busy"}
+
+        page_size = await self._pragma("page_size")
+        pages_before = await self._pragma("page_count")
+        free_before = await self._pragma("freelist_count")
+        bytes_before = self._file_bytes()
+
+        vacuum = None
+        auto_vacuum = await self._pragma("auto_vacuum")
+        if auto_vacuum == 2:
+            if free_before:
+                await self._db.execute_outside_transaction("PRAGMA incremental_vacuum;")
+                vacuum = "incremental"
+        elif pages_before and free_before / pages_before >= self.vacuum_free_ratio:
+            if self.full_vacuum:
+                # One full VACUUM rewrites the file and, with auto_vacuum
+                # set first, leaves it in incremental mode for later runs.
+                await self._db.execute_outside_transaction(
+                    "PRAGMA auto_vacuum = INCREMENTAL; VACUUM;"
+                )
+                vacuum = "full"
+            else:
+                logger.info(
+                    "Full VACUUM deferred while agent workers share the database; "
+                    "run once with execution.agent_workers: 0 to convert it"
+                )
+                vacuum = "deferred"
+
+        checkpoint = await self._db.execute_fetchone("PRAGMA wal_checkpoint(TRUNCATE)")
+        await self._db.execute_outside_transaction("PRAGMA optimize;")
+
+        pages_after = await self._pragma("page_count")
+        bytes_after = self._file_bytes()
+        report = {
+            "vacuum": vacuum,
+            "checkpoint_busy": bool(checkpoint and next(iter(checkpoint.values()))),
+            "free_pages_before": free_before,
+            "free_pages_after": await self._pragma("freelist_count"),
+            "pages_reclaimed": max(0, pages_before - pages_after),
+            "bytes_reclaimed": (
+                max(0, bytes_before - bytes_after)
+                if bytes_before is not None and bytes_after is not None
+                else max(0, pages_before - pages_after) * page_size
+            ),
+            "file_bytes": bytes_after,
+        }
+        if report["bytes_reclaimed"]:
+            logger.info(
+                "Compaction reclaimed %d bytes (%s vacuum)",
+                report["bytes_reclaimed"], vacuum or "no",
+            )
+        return report
@@ -11,6 +11,29 @@ from taskbrew.orchestrator.database import Database
 
 logger = logging.getLogger(__name__)
 
+# Board delta reads; ``{columns}`` is ``*`` or the summary columns.
+_BOARD_CHANGES_SQL = (
+    "SELECT {columns} FROM tasks WHERE row_version > ? ORDER BY row_version"
+)
+_TOMBSTONES_SQL = "SELECT task_id FROM task_tombstones WHERE version > ? ORDER BY version"
+
+_QUEUE_DEPTHS_SQL = (
+    "SELECT assigned_to, COUNT(*) AS depth FROM tasks "
+    "WHERE status = 'pending' AND claimed_by IS NULL "
+    "GROUP BY assigned_to"
+)
+# Per-role arrivals and completions in a ``(since, until]`` window.
+_ARRIVALS_SQL = (
+    "SELECT assigned_to, COUNT(*) AS n FROM tasks "
+    "WHERE created_at > ? AND created_at <= ? GROUP BY assigned_to"
+)
+_COMPLETIONS_SQL = (
+    "SELECT assigned_to, COUNT(*) AS n, "
+    "COALESCE(SUM((julianday(completed_at) - julianday(started_at)) * 86400.0), 0) AS busy "
+    "FROM tasks WHERE completed_at > ? AND completed_at <= ? "
+    "AND status = 'completed' AND started_at IS NOT NULL GROUP BY assigned_to"
+)
+
 
 def _utcnow() -> str:
     """Return the current UTC time as an ISO-8601 string."""
@@ -623,6 +646,22 @@ class TaskBoard:
     # Board view
     # ------------------------------------------------------------------
 
+    # Compact projection for board clients that only draw cards and
+    # counts (``GET /api/board?view=summary``); skips the large text
+    # columns (description, output_text, config_snapshot, ...).
+    BOARD_SUMMARY_COLUMNS = (
+        "id", "group_id", "parent_id", "title", "task_type", "priority",
+        "assigned_to", "claimed_by", "status", "created_at", "started_at",
+        "completed_at", "awaiting_input_since", "row_version",
+    )
+
+    @staticmethod
+    def _board_filters(**filters: str | None) -> dict[str, str]:
+        return {col: val for col, val in filters.items() if val is not None}
+
+    def _board_columns(self, summary: bool) -> str:
+        return ", ".join(self.BOARD_SUMMARY_COLUMNS) if summary else "*"
+
     async def get_board(
         self,
         group_id: str | None = None,
@@ -630,33 +669,26 @@ class TaskBoard:
         claimed_by: str | None = None,
         task_type: str | None = None,
         priority: str | None = None,
+        summary: bool = False,
     ) -> dict[str, list[dict]]:
         """Return tasks grouped by status, with optional filters.
 
         Returns a dict like ``{"pending": [...], "in_progress": [...], ...}``.
+        With *summary* only :attr:`BOARD_SUMMARY_COLUMNS` are returned.
         """
-        clauses: list[str] = []
-        params: list[str] = []
-
-        if group_id is not None:
-            clauses.append("group_id = ?")
-            params.append(group_id)
-        if assigned_to is not None:
-            clauses.append("assigned_to = ?")
-            params.append(assigned_to)
-        if claimed_by is not None:
-            clauses.append("claimed_by = ?")
-            params.append(claimed_by)
-        if task_type is not None:
-            clauses.append("task_type = ?")
-            params.append(task_type)
-        if priority is not None:
-            clauses.append("priority = ?")
-            params.append(priority)
-
-        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
-        sql = f"SELECT * FROM tasks{where} ORDER BY created_at"
-        rows = await self._db.execute_fetchall(sql, tuple(params))
+        filters = self._board_filters(
+            group_id=group_id, assigned_to=assigned_to, claimed_by=claimed_by,
+            task_type=task_type, priority=priority,
+        )
+        where = (
+            " WHERE " + " AND ".join(f"{col} = ?" for col in filters)
+            if filters else ""
+        )
+        sql = (
+            f"SELECT {self._board_columns(summary)} FROM tasks{where} "
+            f"ORDER BY created_at"
+        )
+        rows = await self._db.execute_fetchall(sql, tuple(filters.values()))
 
         board: dict[str, list[dict]] = {}
         for row in rows:
@@ -664,6 +696,110 @@ class TaskBoard:
             board.setdefault(status, []).append(row)
         return board
 
+    async def get_board_version(self) -> int:
+        """Return the board version, bumped by every task insert/update/delete."""
+        row = await self._db.execute_fetchone(
+            "SELECT version FROM board_version WHERE id = 1"
+        )
+        return row["version"] if row else 0
+
+    async def get_board_changes(
+        self,
+        since: int,
+        group_id: str | None = None,
+        assigned_to: str | None = None,
+        claimed_by: str | None = None,
+        task_type: str | None = None,
+        priority: str | None = None,
+        summary: bool = False,
+    ) -> dict:
+        """Return what changed on the board after version *since*.
+
+        Returns ``{"version", "since", "reset", "changed", "deleted"}``.
+        ``changed`` holds the current rows of tasks modified after *since*
+        that match the filters, oldest change first; ``deleted`` lists ids
+        that were deleted or changed so they no longer match. Applying
+        both to the board as of *since* yields the board as of
+        ``version``. A *since* ahead of the current version (the database
+        was replaced), or older than the newest tombstone retention has
+        pruned, sets ``reset`` and returns every matching task in
+        ``changed``; the client should drop its copy first.
+        """
+        # Read the version first: rows changed after this read are sent
+        # again next time, which is harmless.
+        row = await self._db.execute_fetchone(
+            "SELECT version, pruned_version FROM board_version WHERE id = 1"
+        )
+        version, pruned = (row["version"], row["pruned_version"]) if row else (0, 0)
+        result: dict = {
+            "version": version, "since": since, "reset": False,
+            "changed": [], "deleted": [],
+        }
+        filters = self._board_filters(
+            group_id=group_id, assigned_to=assigned_to, claimed_by=claimed_by,
+            task_type=task_type, priority=priority,
+        )
+        if since > version or since < pruned:
+            result["reset"] = True
+            board = await self.get_board(**filters, summary=summary)
+            result["changed"] = sorted(
+                (row for rows in board.values() for row in rows),
+                key=lambda row: row["created_at"] or "",
+            )
+            return result
+        if since == version:
+            return result
+
+        rows = await self._db.execute_fetchall(
+            _BOARD_CHANGES_SQL.format(columns=self._board_columns(summary)), (since,),
+        )
+        for row in rows:
+            if all(row[col] == val for col, val in filters.items()):
+                result["changed"].append(row)
+            else:
+                result["deleted"].append(row["id"])
+        tombstones = await self._db.execute_fetchall(_TOMBSTONES_SQL, (since,))
+        result["deleted"].extend(t["task_id"] for t in tombstones)
+        return result
+
+    async def get_queue_depths(self) -> dict[str, int]:
+        """Return the number of claimable (pending, unclaimed) tasks per role.
+
+        One grouped ``COUNT`` answered from the partial
+        ``idx_tasks_assignee_status`` index, for callers that only need
+        queue depth rather than the task rows :meth:`get_board` returns.
+        """
+        rows = await self._db.execute_fetchall(_QUEUE_DEPTHS_SQL)
+        return {r["assigned_to"]: r["depth"] for r in rows if r["assigned_to"]}
+
+    async def get_flow_stats(
+        self, since: str, until: str | None = None,
+    ) -> dict[str, dict]:
+        """Return per-role arrivals and completions in ``(since, until]``.
+
+        Each value is ``{"arrivals": int, "completions": int,
+        "service_seconds": float}`` where ``service_seconds`` is the summed
+        ``started_at`` -> ``completed_at`` time of the completed tasks.
+        Roles with no activity in the window are omitted.
+        """
+        until = until or _utcnow()
+        stats: dict[str, dict] = {}
+
+        def _entry(role: str) -> dict:
+            return stats.setdefault(
+                role, {"arrivals": 0, "completions": 0, "service_seconds": 0.0},
+            )
+
+        for row in await self._db.execute_fetchall(_ARRIVALS_SQL, (since, until)):
+            if row["assigned_to"]:
+                _entry(row["assigned_to"])["arrivals"] = row["n"]
+        for row in await self._db.execute_fetchall(_COMPLETIONS_SQL, (since, until)):
+            if row["assigned_to"]:
+                entry = _entry(row["assigned_to"])
+                entry["completions"] = row["n"]
+                entry["service_seconds"] = max(float(row["busy"]), 0.0)
+        return stats
+
     # ------------------------------------------------------------------
     # Cycle detection
     # ------------------------------------------------------------------
@@ -0,0 +1,382 @@
+"""Lightweight in-process tracing for the orchestrator hot paths.
+
+Two kinds of measurements are collected, both aggregated into fixed-bucket
+histograms in memory:
+
+* **stage spans** -- :meth:`Tracer.span` around each step of
+  ``AgentLoop.run_once`` (claim, worktree setup, ``build_context``, the
+  SDK run, ``complete_and_handoff``), labelled by stage and role;
+* **queries** -- :meth:`Tracer.record_query` from ``Database.execute*``,
+  labelled by a statement fingerprint (literals and ``IN`` lists
+  collapsed), with the number of rows returned or changed.
+
+:meth:`Tracer.render_prometheus` serves the histograms in the Prometheus
+text format (``GET /api/metrics/prometheus``). When an
+:class:`OTLPFileExporter` is attached, finished spans are also buffered
+and appended to a local file as OTLP/JSON lines, one ``resourceSpans``
+document per batch, which the OpenTelemetry collector's ``otlpjsonfile``
+receiver can ingest.
+
+Overhead is kept low enough to leave on: a span or query costs two
+``perf_counter`` calls, a cached fingerprint lookup and a bisect. Span
+ids are only minted while an exporter is attached. The tracer is
+process-wide (:func:`get_tracer`), like :mod:`logging`.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Seconds. Covers sub-millisecond SQLite reads up to half-hour agent runs.
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0,
+)
+
+# Distinct fingerprints kept before new ones are folded into one series;
+# bounds both memory and the size of the Prometheus payload.
+_MAX_FINGERPRINTS = 256
+_OTHER_FINGERPRINT = "<other>"
+_FINGERPRINT_CACHE_SIZE = 2048
+_FINGERPRINT_MAX_LEN = 240
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WS_RE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Normalise *sql* so statements differing only in literals match."""
+    fp = _STRING_RE.sub("?", sql)
+    fp = _NUMBER_RE.sub("?", fp)
+    fp = _WS_RE.sub(" ", fp).strip()
+    fp = _IN_LIST_RE.sub("(?)", fp)
+    if len(fp) > _FINGERPRINT_MAX_LEN:
+        fp = fp[:_FINGERPRINT_MAX_LEN] + "..."
+    return fp
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("buckets", "count", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        # One slot per bucket plus +Inf; stored non-cumulatively.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the *q* quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class _QueryStats:
+    __slots__ = ("duration", "rows")
+
+    def __init__(self) -> None:
+        self.duration = Histogram()
+        self.rows = 0
+
+
+class _Span:
+    __slots__ = ("attributes", "name", "parent_id", "span_id", "start_ns", "trace_id")
+
+    def __init__(
+        self, name: str, attributes: dict[str, Any],
+        trace_id: str, span_id: str, parent_id: str | None,
+    ) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+
+
+_current_span: ContextVar[_Span | None] = ContextVar("taskbrew_current_span", default=None)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPFileExporter:
+    """Append finished spans to *path* as OTLP/JSON lines.
+
+    Spans are buffered and written ``batch_size`` at a time (and on
+    :meth:`flush`), so the file is touched once per batch rather than
+    once per span.
+    """
+
+    def __init__(
+        self, path: str | Path, *, batch_size: int = 256,
+        service_name: str = "taskbrew",
+    ) -> None:
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.service_name = service_name
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, span: _Span, end_ns: int, ok: bool) -> None:
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [
+                {"key": k, "value": _otlp_value(v)}
+                for k, v in span.attributes.items() if v is not None
+            ],
+            "status": {"code": 1 if ok else 2},
+        }
+        if span.parent_id:
+            record["parentSpanId"] = span.parent_id
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if not spans:
+            return
+        document = {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": self.service_name}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "taskbrew.tracing"}, "spans": spans}],
+        }]}
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(document, separators=(",", ":")) + "\n")
+        except OSError:
+            logger.warning("Could not write spans to %s", self.path, exc_info=True)
+
+
+class Tracer:
+    """Collects stage and query timings; see the module docstring."""
+
+    def __init__(
+        self, *, enabled: bool = True, exporter: OTLPFileExporter | None = None,
+    ) -> None:
+        self.enabled = enabled
+        self.exporter = exporter
+        self._stages: dict[tuple[str, str], Histogram] = {}
+        self._queries: dict[str, _QueryStats] = {}
+        self._fingerprints: dict[str, str] = {}
+        self._started = time.time()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Time the enclosed block as stage *name*.
+
+        A ``role`` attribute becomes a histogram label; all attributes
+        are exported with the span.
+        """
+        if not self.enabled:
+            yield
+            return
+        span = None
+        token = None
+        if self.exporter is not None:
+            parent = _current_span.get()
+            span = _Span(
+                name, attributes,
+                trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+                span_id=os.urandom(8).hex(),
+                parent_id=parent.span_id if parent else None,
+            )
+            token = _current_span.set(span)
+        ok = False
+        started = time.perf_counter()
+        try:
+            yield
+            ok = True
+        finally:
+            elapsed = time.perf_counter() - started
+            key = (name, str(attributes.get("role") or ""))
+            hist = self._stages.get(key)
+            if hist is None:
+                hist = self._stages[key] = Histogram()
+            hist.observe(elapsed)
+            if span is not None:
+                _current_span.reset(token)
+                self.exporter.export(span, time.time_ns(), ok)
+
+    def record_query(self, sql: str, rows: int, seconds: float) -> None:
+        """Record one ``Database`` statement that took *seconds*."""
+        if not self.enabled:
+            return
+        fp = self._fingerprints.get(sql)
+        if fp is None:
+            if len(self._fingerprints) >= _FINGERPRINT_CACHE_SIZE:
+                self._fingerprints.clear()
+            fp = self._fingerprints[sql] = fingerprint(sql)
+        stats = self._queries.get(fp)
+        if stats is None:
+            if len(self._queries) >= _MAX_FINGERPRINTS:
+                fp = _OTHER_FINGERPRINT
+                stats = self._queries.get(fp)
+            if stats is None:
+                stats = self._queries[fp] = _QueryStats()
+        stats.duration.observe(seconds)
+        if rows > 0:
+            stats.rows += rows
+        if self.exporter is not None:
+            parent = _current_span.get()
+            if parent is not None:
+                # Only queries issued inside a stage span are exported;
+                # standalone dashboard reads would flood the file.
+                end_ns = time.time_ns()
+                span = _Span(
+                    "db.query", {"db.statement": fp, "db.rows": rows},
+                    trace_id=parent.trace_id, span_id=os.urandom(8).hex(),
+                    parent_id=parent.span_id,
+                )
+                span.start_ns = end_ns - int(seconds * 1e9)
+                self.exporter.export(span, end_ns, True)
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def snapshot(self, top: int = 20) -> dict:
+        """Summaries of stage timings and the *top* slowest query shapes."""
+        def _summary(h: Histogram) -> dict:
+            return {
+                "count": h.count,
+                "total_seconds": round(h.sum, 6),
+                "mean_ms": round(h.sum / h.count * 1000, 3) if h.count else None,
+                "p50_le_seconds": h.quantile(0.5),
+                "p95_le_seconds": h.quantile(0.95),
+            }
+
+        stages = [
+            {"stage": name, "role": role, **_summary(h)}
+            for (name, role), h in sorted(self._stages.items())
+        ]
+        queries = sorted(
+            self._queries.items(), key=lambda kv: kv[1].duration.sum, reverse=True,
+        )[:top]
+        return {
+            "enabled": self.enabled,
+            "since": self._started,
+            "stages": stages,
+            "queries": [
+                {"fingerprint": fp, "rows": s.rows, **_summary(s.duration)}
+                for fp, s in queries
+            ],
+        }
+
+    def render_prometheus(self) -> str:
+        """The histograms in the Prometheus text exposition format."""
+        lines: list[str] = []
+        lines.append("# HELP taskbrew_stage_duration_seconds Agent loop stage latency.")
+        lines.append("# TYPE taskbrew_stage_duration_seconds histogram")
+        for (name, role), h in sorted(self._stages.items()):
+            _render_histogram(
+                lines, "taskbrew_stage_duration_seconds", h,
+                f'stage="{_escape(name)}",role="{_escape(role)}"',
+            )
+        lines.append("# HELP taskbrew_db_query_duration_seconds SQL statement latency by fingerprint.")
+        lines.append("# TYPE taskbrew_db_query_duration_seconds histogram")
+        for fp, s in sorted(self._queries.items()):
+            _render_histogram(
+                lines, "taskbrew_db_query_duration_seconds", s.duration,
+                f'statement="{_escape(fp)}"',
+            )
+        lines.append("# HELP taskbrew_db_query_rows_total Rows returned or changed by fingerprint.")
+        lines.append("# TYPE taskbrew_db_query_rows_total counter")
+        for fp, s in sorted(self._queries.items()):
+            lines.append(f'taskbrew_db_query_rows_total{{statement="{_escape(fp)}"}} {s.rows}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        self._stages.clear()
+        self._queries.clear()
+        self._started = time.time()
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_histogram(lines: list[str], metric: str, h: Histogram, labels: str) -> None:
+    cumulative = 0
+    for bound, n in zip(h.buckets, h.counts):
+        cumulative += n
+        lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {h.count}')
+    lines.append(f"{metric}_sum{{{labels}}} {h.sum:.6f}")
+    lines.append(f"{metric}_count{{{labels}}} {h.count}")
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """The process-wide tracer."""
+    return _tracer
+
+
+def configure_tracing(
+    *, enabled: bool = True, export_path: str | Path | None = None,
+) -> Tracer:
+    """Enable or disable tracing and (re)attach the file exporter."""
+    _tracer.enabled = enabled
+    if _tracer.exporter is not None:
+        _tracer.exporter.flush()
+    _tracer.exporter = (
+        OTLPFileExporter(export_path) if enabled and export_path else None
+    )
+    return _tracer
@@ -0,0 +1,249 @@
+"""Agent runner processes for multi-process mode.
+
+With ``--workers N`` (or ``execution.agent_workers`` in team.yaml) the
+process that serves the dashboard API runs no agent loops. It spawns N
+worker processes (``python -m taskbrew.main --_agent_worker``), and each
+builds its own orchestrator on the same project and database and runs
+the agent instances :func:`partition_instances` assigns to it. Claims
+are atomic ``UPDATE ... RETURNING`` statements, so workers share the
+task board safely. Events and pause state travel over the
+:mod:`~taskbrew.orchestrator.event_bridge`, whose address and token
+reach workers through the environment, as does the agent API token.
+
+:class:`WorkerPool` restarts workers that exit unexpectedly, backing off
+exponentially while one keeps crashing and giving up on it after
+``max_restarts`` crashes in a row, and stops them all with the API
+process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from taskbrew.auth import AGENT_TOKEN_ENV, agent_api_token
+
+logger = logging.getLogger(__name__)
+
+# Overrides ``execution.agent_workers``; set by ``taskbrew start --workers``.
+WORKER_COUNT_ENV = "TASKBREW_AGENT_WORKERS"
+HUB_ADDRESS_ENV = "TASKBREW_EVENT_HUB"
+HUB_TOKEN_ENV = "TASKBREW_EVENT_HUB_TOKEN"
+
+
+def partition_instances(roles: dict, index: int, count: int) -> list[tuple[str, object]]:
+    """Return ``(instance_id, role_config)`` for the agents worker *index* runs.
+
+    Instances are dealt round-robin in role order, so each worker (1 to
+    *count*) gets a mix of roles rather than all instances of one.
+    """
+    if not 1 <= index <= count:
+        raise ValueError(f"worker index {index} out of range 1..{count}")
+    slots = [
+        (f"{name}-{i}", role_config)
+        for name, role_config in roles.items()
+        for i in range(1, role_config.max_instances + 1)
+    ]
+    return slots[index - 1::count]
+
+
+@dataclass
+class _Worker:
+    index: int
+    process: asyncio.subprocess.Process | None = None
+    started_at: float | None = None
+    restarts: int = 0
+    last_exit: int | None = None
+    # Crashes since the worker last stayed up for ``stable_after``.
+    failures: int = 0
+    gave_up: bool = False
+
+
+class WorkerPool:
+    """Spawn, supervise and stop the agent worker processes.
+
+    Parameters
+    ----------
+    project_dir:
+        Project every worker builds its orchestrator from.
+    count:
+        Number of worker processes.
+    hub:
+        The started :class:`~taskbrew.orchestrator.event_bridge.EventHub`.
+    log_dir:
+        When set, worker *i* logs to ``taskbrew-worker-<i>.log`` there;
+        otherwise workers inherit this process's stderr.
+    restart_delay:
+        Seconds to wait before the first restart of a worker that exited;
+        doubles with each further crash, up to *max_restart_delay*.
+    max_restarts:
+        Crashes in a row after which a worker is left down.
+    stable_after:
+        Seconds a worker must stay up for its crash count to reset.
+    """
+
+    def __init__(
+        self,
+        project_dir: str | Path,
+        count: int,
+        hub,
+        *,
+        log_dir: str | Path | None = None,
+        restart_delay: float = 5.0,
+        max_restart_delay: float = 300.0,
+        max_restarts: int = 5,
+        stable_after: float = 60.0,
+    ) -> None:
+        if count < 1:
+            raise ValueError("WorkerPool needs at least one worker")
+        self.project_dir = str(project_dir)
+        self.count = count
+        self._hub = hub
+        self.log_dir = Path(log_dir) if log_dir else None
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_restarts = max_restarts
+        self.stable_after = stable_after
+        self._workers = [_Worker(index=i) for i in range(1, count + 1)]
+        self._stopping = asyncio.Event()
+
+    def _command(self, index: int) -> list[str]:
+        cmd = [
+            sys.executable, "-m", "taskbrew.main", "--_agent_worker",
+            "--project-dir", self.project_dir,
+            "--worker-index", str(index),
+            "--worker-count", str(self.count),
+        ]
+        if self.log_dir is not None:
+            cmd += ["--log-file", str(self.log_dir / f"taskbrew-worker-{index}.log")]
+        return cmd
+
+    def _env(self) -> dict[str, str]:
+        env = dict(os.environ)
+        env.pop(WORKER_COUNT_ENV, None)
+        env[HUB_ADDRESS_ENV] = self._hub.address
+        env[HUB_TOKEN_ENV] = self._hub.token
+        # Agents' MCP tool servers call back into this process's API.
+        env[AGENT_TOKEN_ENV] = agent_api_token()
+        return env
+
+    async def _spawn(self, worker: _Worker) -> None:
+        worker.process = await asyncio.create_subprocess_exec(
+            *self._command(worker.index), env=self._env(),
+        )
+        worker.started_at = time.time()
+        logger.info("Started agent worker %d (PID %d)", worker.index, worker.process.pid)
+
+    async def start(self) -> None:
+        for worker in self._workers:
+            await self._spawn(worker)
+
+    async def run(self) -> None:
+        """Restart workers that exit until :meth:`stop` is called."""
+        await asyncio.gather(*(self._supervise(w) for w in self._workers))
+
+    async def _sleep_unless_stopping(self, seconds: float) -> bool:
+        """Wait *seconds*; returns True if :meth:`stop` was called meanwhile."""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _supervise(self, worker: _Worker) -> None:
+        while not self._stopping.is_set():
+            if worker.process is not None:
+                exited = asyncio.create_task(worker.process.wait())
+                stopping = asyncio.create_task(self._stopping.wait())
+                await asyncio.wait({exited, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                stopping.cancel()
+                if self._stopping.is_set():
+                    exited.cancel()
+                    return
+                worker.last_exit = exited.result()
+                worker.process = None
+                if worker.started_at and time.time() - worker.started_at >= self.stable_after:
+                    worker.failures = 0
+            worker.failures += 1
+            if worker.failures > self.max_restarts:
+                worker.gave_up = True
+                logger.error(
+                    "Agent worker %d failed %d times in a row (last status %s); "
+                    "not restarting it",
+                    worker.index, worker.failures - 1, worker.last_exit,
+                )
+                return
+            delay = min(
+                self.restart_delay * 2 ** (worker.failures - 1), self.max_restart_delay,
+            )
+            logger.error(
+                "Agent worker %d exited with status %s; restarting in %.0fs",
+                worker.index, worker.last_exit, delay,
+            )
+            if await self._sleep_unless_stopping(delay):
+                return
+            worker.restarts += 1
+            try:
+                await self._spawn(worker)
+            except OSError:
+                logger.exception("Could not restart agent worker %d", worker.index)
+
+    def _alive(self) -> list[_Worker]:
+        return [
+            w for w in self._workers
+            if w.process is not None and w.process.returncode is None
+        ]
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Ask every worker to shut down; kill those still running after *timeout*."""
+        self._stopping.set()
+        alive = self._alive()
+        for worker in alive:
+            try:
+                worker.process.send_signal(signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        try:
+            if alive:
+                await asyncio.wait(
+                    [asyncio.create_task(w.process.wait()) for w in alive],
+                    timeout=timeout,
+                )
+        finally:
+            # Also reached when the caller's own shutdown deadline cancels us.
+            for worker in self._alive():
+                logger.warning("Killing agent worker %d after %.0fs", worker.index, timeout)
+                try:
+                    worker.process.kill()
+                except ProcessLookupError:
+                    pass
+
+    def stats(self) -> dict:
+        connected = set(self._hub.workers) if self._hub is not None else set()
+        now = time.time()
+        return {
+            "count": self.count,
+            "workers": [
+                {
+                    "index": w.index,
+                    "pid": w.process.pid if w.process is not None else None,
+                    "alive": w.process is not None and w.process.returncode is None,
+                    "connected": f"worker-{w.index}" in connected,
+                    "uptime_seconds": (
+                        round(now - w.started_at, 1)
+                        if w.started_at and w.process is not None else None
+                    ),
+                    "restarts": w.restarts,
+                    "consecutive_failures": w.failures,
+                    "gave_up": w.gave_up,
+                    "last_exit": w.last_exit,
+                }
+                for w in self._workers
+            ],
+        }
@@ -182,7 +182,7 @@ _DEFAULT_ROLES: dict[str, dict] = {
             "- Use blocked_by for true data dependencies only — do NOT chain tasks just for ordering\n"
             "- Include: technical approach, specific files to modify, acceptance criteria\n"
         ),
-        "tools": ["Read", "Glob", "Grep", "Write", "WebSearch", "mcp__task-tools__create_task"],
+        "tools": ["Read", "Glob", "Grep", "Write", "WebSearch", "mcp__task-tools__create_task", "mcp__task-tools__create_tasks"],
         "model": "claude-opus-4-6",
         "produces": ["tech_design", "tech_debt", "architecture_review"],
         "accepts": ["tech_design", "architecture_review", "rejection"],
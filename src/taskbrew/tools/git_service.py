@@ -0,0 +1,512 @@
+"""Shared git access with cached repository state.
+
+Every component that talks to git in the orchestrator process (worktree
+management, agent diff checks, the git-history context provider, the
+dashboard's /api/git routes) goes through one :class:`GitService` per
+repository, obtained from :func:`get_git_service`. It provides:
+
+- **Bounded concurrency.** All git children run under one semaphore
+  per repository, so twenty agents finishing at once queue for a
+  handful of git processes instead of forking dozens.
+- **Cached ref and worktree state.** ``git for-each-ref`` and
+  ``git worktree list --porcelain`` run once and are reused until the
+  repository changes. Change detection stats the ref directories,
+  ``packed-refs``, ``HEAD`` and the worktree admin dirs under the
+  common git dir, so commits made by agents' own git children (which
+  never pass through this class) are still noticed. Commands this class
+  runs that may move refs drop the cache eagerly.
+- **Batched diff statistics.** :meth:`GitService.diff_stats` computes
+  ``base...branch`` numstats for many branches with one ``git diff-tree
+  --stdin`` run. Results are memoised by commit ids, which never change
+  meaning, so an unchanged branch costs no process at all.
+
+Child processes get the same hardening as the rest of the tree (audit 05
+F#5): a wall-clock timeout, ``GIT_TERMINAL_PROMPT=0`` and ``ASKPASS``
+pinned to ``/bin/true``, and the child is killed if the caller is
+cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+# Commands that never move refs or worktrees; anything else run through
+# GitService.run drops the cached snapshots when it finishes.
+_READ_ONLY_COMMANDS = frozenset({
+    "cat-file", "diff", "diff-tree", "for-each-ref", "log", "ls-files",
+    "merge-base", "rev-list", "rev-parse", "show", "status",
+})
+
+# Filesystem timestamps come from a coarse kernel clock, so a ref written
+# in the same tick as our stat would not change the stamp. Snapshots
+# taken while the newest timestamp is this fresh are not cached.
+_RACY_WINDOW_NS = 100_000_000
+
+_DIFF_CACHE_SIZE = 512
+_LOG_CACHE_SIZE = 32
+
+_SHA_RE = re.compile(r"^[0-9a-f]{40}$")
+
+
+class GitError(RuntimeError):
+    """A git command failed or timed out."""
+
+
+class GitTimeoutError(GitError):
+    """A git command was killed after its wall-clock timeout."""
+
+
+def _find_common_dir(repo_dir: str) -> Path | None:
+    """Return the common ``.git`` directory of *repo_dir*, or None.
+
+    Handles the ``.git`` file of a linked worktree without spawning git.
+    """
+    dot_git = Path(repo_dir) / ".git"
+    try:
+        if dot_git.is_dir():
+            return dot_git
+        if not dot_git.is_file():
+            return None
+        text = dot_git.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if not text.startswith("gitdir:"):
+        return None
+    git_dir = Path(text[len("gitdir:"):].strip())
+    if not git_dir.is_absolute():
+        git_dir = Path(repo_dir) / git_dir
+    try:
+        common = (git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return git_dir
+    common_dir = Path(common)
+    if not common_dir.is_absolute():
+        common_dir = git_dir / common_dir
+    return common_dir.resolve()
+
+
+def _parse_numstat(lines: list[str]) -> list[tuple[int | None, int | None, str]]:
+    """Parse ``--numstat`` lines; binary files get ``None`` counts."""
+    out: list[tuple[int | None, int | None, str]] = []
+    for line in lines:
+        parts = line.split("\t", 2)
+        if len(parts) < 3:
+            continue
+        added, removed, path = parts
+        try:
+            out.append((
+                None if added == "-" else int(added),
+                None if removed == "-" else int(removed),
+                path,
+            ))
+        except ValueError:
+            continue
+    return out
+
+
+class GitService:
+    """Semaphore-bounded git runner with cached ref and worktree state.
+
+    Parameters
+    ----------
+    repo_dir:
+        Repository (or linked worktree) the commands default to.
+    max_concurrency:
+        Upper bound on concurrently running git children.
+    """
+
+    DEFAULT_TIMEOUT_S = 30.0
+
+    def __init__(
+        self, repo_dir: str, *, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self.repo_dir = repo_dir
+        self._max_concurrency = max(int(max_concurrency), 1)
+        self._common_dir_cache: Path | None = None
+        # asyncio primitives bind to the loop that first waits on them, so
+        # they are rebuilt if the service outlives its loop (tests, CLI
+        # subcommands that call asyncio.run more than once).
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._snapshot_lock: asyncio.Lock | None = None
+        # kind -> (stamp, value) for "refs" and "worktrees"
+        self._snapshots: dict[str, tuple[tuple, object]] = {}
+        self._diff_cache: OrderedDict[tuple[str, str], list] = OrderedDict()
+        self._log_cache: OrderedDict[tuple, str] = OrderedDict()
+        self._processes = 0
+        self._cache_hits = 0
+
+    @property
+    def _common_dir(self) -> Path | None:
+        # Looked up lazily: the service may be created before the project
+        # directory has been initialised as a repository.
+        if self._common_dir_cache is None:
+            self._common_dir_cache = _find_common_dir(self.repo_dir)
+        return self._common_dir_cache
+
+    # ------------------------------------------------------------------
+    # Process execution
+    # ------------------------------------------------------------------
+
+    def _primitives(self) -> tuple[asyncio.Semaphore, asyncio.Lock]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None or self._snapshot_lock is None:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._snapshot_lock = asyncio.Lock()
+        return self._semaphore, self._snapshot_lock
+
+    async def exec(
+        self,
+        *args: str,
+        cwd: str | None = None,
+        timeout: float | None = None,
+        stdin: bytes | None = None,
+    ) -> tuple[int, str, str]:
+        """Run ``git <args>`` and return ``(returncode, stdout, stderr)``.
+
+        Raises asyncio.TimeoutError after killing the child when the
+        wall-clock *timeout* expires.
+        """
+        env = dict(os.environ)
+        env["GIT_TERMINAL_PROMPT"] = "0"
+        env.setdefault("GIT_ASKPASS", "/bin/true")
+        env.setdefault("SSH_ASKPASS", "/bin/true")
+        wait = timeout if timeout is not None else self.DEFAULT_TIMEOUT_S
+        semaphore, _ = self._primitives()
+        async with semaphore:
+            self._processes += 1
+            proc = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=cwd or self.repo_dir,
+                env=env,
+                stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    proc.communicate(stdin), timeout=wait,
+                )
+            except asyncio.TimeoutError:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                try:
+                    await proc.wait()
+                except Exception as exc:  # noqa: BLE001 -- the timeout is what we report
+                    logger.debug("Reaping timed-out git process failed: %s", exc)
+                raise
+            except asyncio.CancelledError:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+                raise
+        return (
+            proc.returncode or 0,
+            (stdout or b"").decode(errors="replace"),
+            (stderr or b"").decode(errors="replace"),
+        )
+
+    async def run(
+        self,
+        *args: str,
+        cwd: str | None = None,
+        timeout: float | None = None,
+        stdin: bytes | None = None,
+    ) -> str:
+        """Run ``git <args>`` and return stripped stdout.
+
+        Raises GitError on a non-zero exit or timeout. Commands that can
+        move refs or worktrees invalidate the cached snapshots.
+        """
+        wait = timeout if timeout is not None else self.DEFAULT_TIMEOUT_S
+        try:
+            rc, stdout, stderr = await self.exec(*args, cwd=cwd, timeout=wait, stdin=stdin)
+        except asyncio.TimeoutError:
+            raise GitTimeoutError(f"git {' '.join(args)} timed out after {wait}s") from None
+        finally:
+            if args and args[0] not in _READ_ONLY_COMMANDS and args[:2] != ("worktree", "list"):
+                self.invalidate()
+        if rc != 0:
+            raise GitError(f"git {' '.join(args)} failed: {stderr}")
+        return stdout.strip()
+
+    # ------------------------------------------------------------------
+    # Cached repository state
+    # ------------------------------------------------------------------
+
+    def invalidate(self) -> None:
+        """Drop the cached ref and worktree snapshots."""
+        self._snapshots.clear()
+
+    def _state_stamp(self) -> tuple | None:
+        """Return a cheap fingerprint of the ref and worktree state.
+
+        None means the state cannot be fingerprinted (no git dir found,
+        or it changed too recently to trust) and must not be cached.
+        """
+        common = self._common_dir
+        if common is None:
+            return None
+        stamp: list[int] = []
+        try:
+            for path in (common, common / "HEAD", common / "packed-refs"):
+                try:
+                    stamp.append(path.stat().st_mtime_ns)
+                except FileNotFoundError:
+                    stamp.append(0)
+            for root, _dirs, _files in os.walk(common / "refs"):
+                stamp.append(os.stat(root).st_mtime_ns)
+            admin = common / "worktrees"
+            if admin.is_dir():
+                stamp.append(admin.stat().st_mtime_ns)
+                for entry in os.scandir(admin):
+                    stamp.append(entry.stat().st_mtime_ns)
+        except OSError:
+            return None
+        if max(stamp) >= time.time_ns() - _RACY_WINDOW_NS:
+            return None
+        return tuple(stamp)
+
+    async def _snapshot(self, kind: str, loader) -> object:
+        _, lock = self._primitives()
+        async with lock:
+            stamp = self._state_stamp()
+            cached = self._snapshots.get(kind)
+            if stamp is not None and cached is not None and cached[0] == stamp:
+                self._cache_hits += 1
+                return cached[1]
+            value = await loader()
+            if stamp is not None:
+                self._snapshots[kind] = (stamp, value)
+            return value
+
+    async def _load_refs(self) -> dict:
+        out = await self.run(
+            "for-each-ref", "--format=%(objectname) %(HEAD) %(refname)",
+        )
+        refs: dict[str, str] = {}
+        current: str | None = None
+        for line in out.splitlines():
+            # "<sha> <*| > <refname>"; %(HEAD) is a single character.
+            sha, _, rest = line.partition(" ")
+            if len(rest) < 3:
+                continue
+            head, name = rest[0], rest[2:]
+            refs[name] = sha
+            if head == "*" and name.startswith("refs/heads/"):
+                current = name[len("refs/heads/"):]
+        return {"refs": refs, "current": current}
+
+    async def refs(self) -> dict[str, str]:
+        """Return ``{refname: commit id}`` for every ref in the repository."""
+        snap = await self._snapshot("refs", self._load_refs)
+        return dict(snap["refs"])
+
+    async def current_branch(self) -> str | None:
+        """Return the branch checked out in ``repo_dir`` (None if detached)."""
+        snap = await self._snapshot("refs", self._load_refs)
+        return snap["current"]
+
+    async def branch_exists(self, branch: str) -> bool:
+        """Return True when ``refs/heads/<branch>`` exists."""
+        try:
+            snap = await self._snapshot("refs", self._load_refs)
+        except GitError:
+            return False
+        return f"refs/heads/{branch}" in snap["refs"]
+
+    async def resolve(self, name: str) -> str | None:
+        """Resolve a branch, tag or commit id via the cached refs."""
+        if _SHA_RE.match(name):
+            return name
+        snap = await self._snapshot("refs", self._load_refs)
+        refs = snap["refs"]
+        if name == "HEAD":
+            current = snap["current"]
+            return refs.get(f"refs/heads/{current}") if current else None
+        for candidate in (name, f"refs/heads/{name}", f"refs/tags/{name}", f"refs/remotes/{name}"):
+            if candidate in refs:
+                return refs[candidate]
+        return None
+
+    async def _load_worktrees(self) -> list[dict]:
+        out = await self.run("worktree", "list", "--porcelain")
+        worktrees: list[dict] = []
+        entry: dict | None = None
+        for line in out.splitlines():
+            if line.startswith("worktree "):
+                entry = {"path": line[len("worktree "):], "head": None, "branch": None}
+                worktrees.append(entry)
+            elif entry is None:
+                continue
+            elif line.startswith("HEAD "):
+                entry["head"] = line[len("HEAD "):]
+            elif line.startswith("branch refs/heads/"):
+                entry["branch"] = line[len("branch refs/heads/"):]
+        return worktrees
+
+    async def worktrees(self) -> list[dict]:
+        """Return git's worktree list as ``{path, head, branch}`` dicts."""
+        snap = await self._snapshot("worktrees", self._load_worktrees)
+        return [dict(w) for w in snap]
+
+    async def worktree_branch(self, path: str) -> str | None:
+        """Return the branch checked out in the worktree at *path*."""
+        try:
+            target = str(Path(path).resolve())
+        except (OSError, ValueError):
+            target = path
+        for wt in await self.worktrees():
+            try:
+                if str(Path(wt["path"]).resolve()) == target:
+                    return wt["branch"]
+            except (OSError, ValueError):
+                continue
+        return None
+
+    # ------------------------------------------------------------------
+    # Logs and diffs
+    # ------------------------------------------------------------------
+
+    async def log(self, max_count: int, fmt: str) -> str:
+        """Return ``git log --max-count=N --format=fmt`` for HEAD.
+
+        Memoised by the HEAD commit id when it can be read from the ref
+        snapshot.
+        """
+        args = ("log", f"--max-count={max_count}", f"--format={fmt}")
+        head = None
+        if self._common_dir is not None:
+            try:
+                head = await self.resolve("HEAD")
+            except GitError:
+                head = None
+        if head is None:
+            return await self.run(*args)
+        key = (head, max_count, fmt)
+        cached = self._log_cache.get(key)
+        if cached is not None:
+            self._log_cache.move_to_end(key)
+            self._cache_hits += 1
+            return cached
+        out = await self.run(*args)
+        self._log_cache[key] = out
+        while len(self._log_cache) > _LOG_CACHE_SIZE:
+            self._log_cache.popitem(last=False)
+        return out
+
+    async def diff_stats(
+        self, branches: list[str], base: str = "main",
+    ) -> dict[str, list[tuple[int | None, int | None, str]]]:
+        """Return ``base...branch`` numstats for each branch.
+
+        Each value is a list of ``(added, removed, path)``; binary files
+        report ``None`` counts. Branches (or a base) that do not resolve,
+        and branches sharing no history with the base, are left out. Merge bases of uncached pairs are found
+        concurrently, then every uncached diff is produced by a single
+        ``git diff-tree --stdin``. Rename detection is off, so a rename
+        shows as a delete plus an add.
+        """
+        base_sha = await self.resolve(base)
+        if base_sha is None:
+            return {}
+        heads: dict[str, str] = {}
+        for branch in branches:
+            sha = await self.resolve(branch)
+            if sha is not None:
+                heads[branch] = sha
+
+        missing = sorted({
+            sha for sha in heads.values()
+            if (base_sha, sha) not in self._diff_cache
+        })
+        self._cache_hits += len(set(heads.values())) - len(missing)
+        if missing:
+            found = await asyncio.gather(*(
+                self._merge_base(base_sha, sha) for sha in missing
+            ))
+            # Unrelated histories have no merge base; leave them out.
+            pairs = [(sha, mb) for sha, mb in zip(missing, found) if mb]
+            missing = [sha for sha, _ in pairs]
+        if missing:
+            stdin = "".join(f"{sha} {mb}\n" for sha, mb in pairs).encode()
+            out = await self.run(
+                "diff-tree", "-r", "--numstat", "--always", "--stdin",
+                stdin=stdin,
+            )
+            blocks: list[list[str]] = []
+            for line in out.splitlines():
+                if "\t" not in line and _SHA_RE.match(line.strip()):
+                    blocks.append([])
+                elif blocks:
+                    blocks[-1].append(line)
+            if len(blocks) != len(missing):
+                raise GitError(
+                    f"git diff-tree returned {len(blocks)} results for {len(missing)} commits"
+                )
+            for sha, block in zip(missing, blocks):
+                self._diff_cache[(base_sha, sha)] = _parse_numstat(block)
+            while len(self._diff_cache) > _DIFF_CACHE_SIZE:
+                self._diff_cache.popitem(last=False)
+
+        result = {}
+        for branch, sha in heads.items():
+            key = (base_sha, sha)
+            if key not in self._diff_cache:
+                continue
+            self._diff_cache.move_to_end(key)
+            result[branch] = list(self._diff_cache[key])
+        return result
+
+    async def _merge_base(self, base_sha: str, sha: str) -> str | None:
+        try:
+            return await self.run("merge-base", base_sha, sha) or None
+        except GitError:
+            return None
+
+    async def diff_numstat(
+        self, base: str, branch: str | None = None, *, cwd: str | None = None,
+    ) -> list[tuple[int | None, int | None, str]]:
+        """Return the ``base...branch`` numstat for one branch.
+
+        Served from :meth:`diff_stats` when *branch* resolves through the
+        ref snapshot. Otherwise (detached HEAD, unknown branch) falls
+        back to ``git diff --numstat base...HEAD`` in *cwd*.
+        """
+        if branch:
+            stats = await self.diff_stats([branch], base=base)
+            if branch in stats:
+                return stats[branch]
+        out = await self.run("diff", "--numstat", f"{base}...HEAD", cwd=cwd, timeout=10)
+        return _parse_numstat(out.splitlines())
+
+    def stats(self) -> dict:
+        """Return process and cache-hit counters."""
+        return {"processes": self._processes, "cache_hits": self._cache_hits}
+
+
+_services: dict[str, GitService] = {}
+
+
+def get_git_service(repo_dir: str) -> GitService:
+    """Return the process-wide GitService for *repo_dir*."""
+    key = os.path.realpath(repo_dir)
+    service = _services.get(key)
+    if service is None:
+        service = GitService(key)
+        _services[key] = service
+    return service
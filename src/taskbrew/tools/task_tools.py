@@ -4,16 +4,25 @@ Usage (as subprocess):
     python -m taskbrew.tools.task_tools
 
 Environment:
-    TASKBREW_API_URL  Base URL of the dashboard API (default: http://127.0.0.1:8420)
+    TASKBREW_API_URL    Base URL of the dashboard API (default: http://127.0.0.1:8420)
+    TASKBREW_API_TOKEN  Bearer token sent with every request (the per-run agent
+                        token, set by the orchestrator for builtin servers;
+                        the /mcp/tools/* endpoints require one)
+
+Every tool is a coroutine sharing one keep-alive :class:`httpx.AsyncClient`
+(httpx ships with the ``mcp`` SDK), so an agent's dozens of calls per task
+reuse a single connection and a slow call never holds up the others.
+``ask_question`` long-polls the dashboard instead of holding one request
+open until a human answers.
 """
 
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-import urllib.request
-import urllib.error
+from contextlib import asynccontextmanager
 
+import httpx
 from mcp.server.fastmcp import FastMCP
 
 from taskbrew.tools._tool_gating import gate_or_error
@@ -58,11 +67,118 @@ def _check_assigned_by(llm_value: str) -> tuple[bool, str | None]:
     )
 
 
-def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
-    mcp = FastMCP("task-tools")
+# Per-request timeout for ordinary tool calls.
+_REQUEST_TIMEOUT = 10.0
+# Seconds the dashboard holds each ask_question long-poll before
+# answering "still pending"; the client re-polls until resolved.
+_LONG_POLL_SECONDS = 25.0
+
+
+def _auth_headers() -> dict[str, str]:
+    token = os.environ.get("TASKBREW_API_TOKEN")
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+class _ApiClient:
+    """Lazily created keep-alive HTTP client for the dashboard API.
+
+    The underlying :class:`httpx.AsyncClient` is built on first use so it
+    binds to the event loop FastMCP is actually running.  *transport* is
+    passed straight to httpx (tests hand in an ``ASGITransport``).
+    """
+
+    def __init__(
+        self, api_url: str, transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._api_url = api_url.rstrip("/")
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self._api_url,
+                transport=self._transport,
+                timeout=_REQUEST_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=8, keepalive_expiry=120),
+                headers=_auth_headers(),
+            )
+        return self._client
+
+    async def request(
+        self, method: str, path: str, *, json: dict | None = None,
+        params: dict | None = None, timeout: float | None = _REQUEST_TIMEOUT,
+    ) -> httpx.Response:
+        return await self._get_client().request(
+            method, path, json=json, params=params, timeout=timeout,
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_TASK_FIELDS = frozenset({
+    "group_id", "title", "assigned_to", "assigned_by", "task_type",
+    "description", "priority", "parent_id", "blocked_by", "requires_fanout",
+})
+
+
+def _task_payload(
+    group_id: str,
+    title: str,
+    assigned_to: str,
+    assigned_by: str,
+    task_type: str,
+    description: str = "",
+    priority: str = "medium",
+    parent_id: str = "",
+    blocked_by: str = "",
+    requires_fanout: str = "",
+) -> dict:
+    """Build the ``POST /api/tasks`` body from the tool's string arguments."""
+    payload: dict = {
+        "group_id": group_id,
+        "title": title,
+        "assigned_to": assigned_to,
+        "assigned_by": assigned_by,
+        "task_type": task_type,
+    }
+    if description:
+        payload["description"] = description
+    payload["priority"] = priority
+    if parent_id:
+        payload["parent_id"] = parent_id
+    if blocked_by:
+        payload["blocked_by"] = [t.strip() for t in blocked_by.split(",") if t.strip()]
+    rf = requires_fanout.strip().lower()
+    if rf in ("true", "1", "yes"):
+        payload["requires_fanout"] = True
+    elif rf in ("false", "0", "no"):
+        payload["requires_fanout"] = False
+    # empty string => omit, API will apply task_type default
+    return payload
+
+
+def build_task_tools_server(
+    api_url: str = "http://127.0.0.1:8420",
+    *,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> FastMCP:
+    api = _ApiClient(api_url, transport=transport)
+
+    @asynccontextmanager
+    async def _lifespan(_server: FastMCP):
+        try:
+            yield {}
+        finally:
+            await api.aclose()
+
+    mcp = FastMCP("task-tools", lifespan=_lifespan)
 
     @mcp.tool()
-    def create_task(
+    async def create_task(
         group_id: str,
         title: str,
         assigned_to: str,
@@ -102,57 +218,92 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
                 - "true" to opt in — rare; forces the gate on a task_type
                   that normally wouldn't require fan-out.
         """
-        payload: dict = {
-            "group_id": group_id,
-            "title": title,
-            "assigned_to": assigned_to,
-            "assigned_by": assigned_by,
-            "task_type": task_type,
-        }
-        if description:
-            payload["description"] = description
-        payload["priority"] = priority
-        if parent_id:
-            payload["parent_id"] = parent_id
-        if blocked_by:
-            payload["blocked_by"] = [t.strip() for t in blocked_by.split(",") if t.strip()]
+        payload = _task_payload(
+            group_id, title, assigned_to, assigned_by, task_type,
+            description, priority, parent_id, blocked_by, requires_fanout,
+        )
         denial = gate_or_error("create_task")
         if denial:
             return denial
         ok, err = _check_assigned_by(assigned_by)
         if not ok:
             return f"Error: {err}"
-        rf = requires_fanout.strip().lower()
-        if rf in ("true", "1", "yes"):
-            payload["requires_fanout"] = True
-        elif rf in ("false", "0", "no"):
-            payload["requires_fanout"] = False
-        # empty string => omit, API will apply task_type default
-
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{api_url}/api/tasks",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                result = json.loads(resp.read())
-                task_id = result.get("id", "<unknown>")
-                task_title = result.get("title", "<unknown>")
-                task_status = result.get("status", "<unknown>")
-                return f"Task created: {task_id} — {task_title} (status: {task_status})"
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            return f"Error creating task (HTTP {e.code}): {body}"
-        except urllib.error.URLError as e:
-            return f"Error creating task (connection failed — is the dashboard running?): {e.reason}"
+            resp = await api.request("POST", "/api/tasks", json=payload)
+        except httpx.TransportError as e:
+            return f"Error creating task (connection failed — is the dashboard running?): {e}"
         except Exception as e:
             return f"Error creating task (unexpected error): {e}"
+        if resp.is_error:
+            return f"Error creating task (HTTP {resp.status_code}): {resp.text}"
+        result = resp.json()
+        task_id = result.get("id", "<unknown>")
+        task_title = result.get("title", "<unknown>")
+        task_status = result.get("status", "<unknown>")
+        return f"Task created: {task_id} — {task_title} (status: {task_status})"
+
+    @mcp.tool()
+    async def create_tasks(tasks: list[dict]) -> str:
+        """Create several tasks in one call — prefer this over repeated create_task.
+
+        Each entry takes the same fields as ``create_task``: group_id,
+        title, assigned_to, assigned_by, task_type and optionally
+        description, priority, parent_id, blocked_by (comma-separated)
+        and requires_fanout. Entries are created in order; one rejected
+        entry does not stop the others.
+
+        Args:
+            tasks: List of task objects (max 200).
+        """
+        # Same capability as create_task, so it is gated under that name.
+        denial = gate_or_error("create_task")
+        if denial:
+            return denial
+        payloads = []
+        for i, item in enumerate(tasks, start=1):
+            if not isinstance(item, dict):
+                return f"Error: task #{i} must be an object"
+            missing = [
+                k for k in ("group_id", "title", "assigned_to", "assigned_by", "task_type")
+                if not item.get(k)
+            ]
+            if missing:
+                return f"Error: task #{i} is missing {', '.join(missing)}"
+            ok, err = _check_assigned_by(str(item["assigned_by"]))
+            if not ok:
+                return f"Error: task #{i}: {err}"
+            payloads.append(_task_payload(**{
+                k: ",".join(map(str, v)) if isinstance(v, list) else str(v)
+                for k, v in item.items() if k in _TASK_FIELDS
+            }))
+        if not payloads:
+            return "No tasks to create."
+
+        try:
+            resp = await api.request("POST", "/api/tasks/bulk", json={"tasks": payloads})
+        except httpx.TransportError as e:
+            return f"Error creating tasks (connection failed — is the dashboard running?): {e}"
+        except Exception as e:
+            return f"Error creating tasks (unexpected error): {e}"
+        if resp.is_error:
+            return f"Error creating tasks (HTTP {resp.status_code}): {resp.text}"
+        data = resp.json()
+        lines = []
+        for i, result in enumerate(data.get("results", []), start=1):
+            if "error" in result:
+                lines.append(
+                    f"  #{i} Error (HTTP {result.get('status_code')}): {result['error']}"
+                )
+            else:
+                lines.append(
+                    f"  #{i} {result.get('id', '<unknown>')} — "
+                    f"{result.get('title', '<unknown>')} (status: {result.get('status', '<unknown>')})"
+                )
+        return f"Created {data.get('created', 0)} of {len(payloads)} tasks:\n" + "\n".join(lines)
 
     @mcp.tool()
-    def list_tasks(
+    async def list_tasks(
         group_id: str = "",
         assigned_to: str = "",
         status: str = "pending",
@@ -169,41 +320,35 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
         denial = gate_or_error("list_tasks")
         if denial:
             return denial
-        params = []
+        params = {}
         if group_id:
-            params.append(f"group_id={group_id}")
+            params["group_id"] = group_id
         if assigned_to:
-            params.append(f"assigned_to={assigned_to}")
-        query = "&".join(params)
-        url = f"{api_url}/api/board"
-        if query:
-            url += f"?{query}"
-        req = urllib.request.Request(url, method="GET")
+            params["assigned_to"] = assigned_to
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read())
-                # data is dict like {"pending": [...], "in_progress": [...]}
-                lines = []
-                total = 0
-                for s, tasks in data.items():
-                    if status and s != status:
-                        continue
-                    for t in tasks:
-                        lines.append(f"  {t['id']}: {t['title']} [{s}] (assigned: {t.get('assigned_to', '?')})")
-                        total += 1
-                if not lines:
-                    return "No tasks found matching filters."
-                return f"Found {total} tasks:\n" + "\n".join(lines[:30])  # cap at 30 for token efficiency
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            return f"Error listing tasks (HTTP {e.code}): {body}"
-        except urllib.error.URLError as e:
-            return f"Error listing tasks (connection failed): {e.reason}"
+            resp = await api.request("GET", "/api/board", params=params)
+        except httpx.TransportError as e:
+            return f"Error listing tasks (connection failed): {e}"
         except Exception as e:
             return f"Error listing tasks: {e}"
+        if resp.is_error:
+            return f"Error listing tasks (HTTP {resp.status_code}): {resp.text}"
+        # data is dict like {"pending": [...], "in_progress": [...]}
+        data = resp.json()
+        lines = []
+        total = 0
+        for s, tasks in data.items():
+            if status and s != status:
+                continue
+            for t in tasks:
+                lines.append(f"  {t['id']}: {t['title']} [{s}] (assigned: {t.get('assigned_to', '?')})")
+                total += 1
+        if not lines:
+            return "No tasks found matching filters."
+        return f"Found {total} tasks:\n" + "\n".join(lines[:30])  # cap at 30 for token efficiency
 
     @mcp.tool()
-    def complete_task(
+    async def complete_task(
         task_id: str,
         status: str = "completed",
     ) -> str:
@@ -219,28 +364,21 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
         denial = gate_or_error("complete_task")
         if denial:
             return denial
-        payload: dict = {"status": status}
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{api_url}/api/tasks/{task_id}/complete",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                result = json.loads(resp.read())
-                return f"Task {task_id} marked as {result.get('status', status)}."
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            return f"Error completing task (HTTP {e.code}): {body}"
-        except urllib.error.URLError as e:
-            return f"Error completing task (connection failed — is the dashboard running?): {e.reason}"
+            resp = await api.request(
+                "POST", f"/api/tasks/{task_id}/complete", json={"status": status},
+            )
+        except httpx.TransportError as e:
+            return f"Error completing task (connection failed — is the dashboard running?): {e}"
         except Exception as e:
             return f"Error completing task (unexpected error): {e}"
+        if resp.is_error:
+            return f"Error completing task (HTTP {resp.status_code}): {resp.text}"
+        result = resp.json()
+        return f"Task {task_id} marked as {result.get('status', status)}."
 
     @mcp.tool()
-    def update_task(
+    async def update_task(
         task_id: str,
         priority: str = "",
         assigned_to: str = "",
@@ -264,32 +402,24 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
             payload["assigned_to"] = assigned_to
         if not payload:
             return "No fields to update — specify at least priority or assigned_to."
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{api_url}/api/tasks/{task_id}",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="PATCH",
-        )
         try:
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                result = json.loads(resp.read())
-                parts = []
-                if priority:
-                    parts.append(f"priority={result.get('priority', priority)}")
-                if assigned_to:
-                    parts.append(f"assigned_to={result.get('assigned_to', assigned_to)}")
-                return f"Task {task_id} updated: {', '.join(parts)}."
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            return f"Error updating task (HTTP {e.code}): {body}"
-        except urllib.error.URLError as e:
-            return f"Error updating task (connection failed — is the dashboard running?): {e.reason}"
+            resp = await api.request("PATCH", f"/api/tasks/{task_id}", json=payload)
+        except httpx.TransportError as e:
+            return f"Error updating task (connection failed — is the dashboard running?): {e}"
         except Exception as e:
             return f"Error updating task (unexpected error): {e}"
+        if resp.is_error:
+            return f"Error updating task (HTTP {resp.status_code}): {resp.text}"
+        result = resp.json()
+        parts = []
+        if priority:
+            parts.append(f"priority={result.get('priority', priority)}")
+        if assigned_to:
+            parts.append(f"assigned_to={result.get('assigned_to', assigned_to)}")
+        return f"Task {task_id} updated: {', '.join(parts)}."
 
     @mcp.tool()
-    def send_message(
+    async def send_message(
         from_agent: str,
         to_agent: str,
         content: str,
@@ -310,23 +440,16 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
         if not ok:
             return f"Error: {err}"
         payload = {"from_agent": from_agent, "to_agent": to_agent, "content": content, "priority": priority}
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{api_url}/api/messages",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
         try:
-            with urllib.request.urlopen(req, timeout=10) as _resp:
-                return f"Message sent to {to_agent}."
-        except urllib.error.HTTPError as e:
-            return f"Error sending message (HTTP {e.code}): {e.read().decode()}"
+            resp = await api.request("POST", "/api/messages", json=payload)
         except Exception as e:
             return f"Error sending message: {e}"
+        if resp.is_error:
+            return f"Error sending message (HTTP {resp.status_code}): {resp.text}"
+        return f"Message sent to {to_agent}."
 
     @mcp.tool()
-    def ask_question(
+    async def ask_question(
         task_id: str,
         group_id: str,
         question: str,
@@ -364,37 +487,44 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
             "options": options,
             "preferred_answer": preferred_answer,
             "reasoning": reasoning,
+            "wait_seconds": _LONG_POLL_SECONDS,
         }
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{api_url}/mcp/tools/ask_question",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
+        # Manual mode can wait indefinitely for a human; each round trip
+        # is bounded by the long-poll window and re-issued until resolved.
+        poll_timeout = _LONG_POLL_SECONDS + _REQUEST_TIMEOUT
         try:
-            # No timeout: manual mode blocks indefinitely until the user answers.
-            with urllib.request.urlopen(req, timeout=None) as resp:
-                result = json.loads(resp.read())
-            if result.get("status") == "cancelled":
-                return (
-                    "Question was cancelled before resolution; "
-                    "the task may have been cancelled by the user."
-                )
-            return (
-                f"Selected answer: {result.get('selected_answer')!r} "
-                f"(by {result.get('selected_by')}, request_id={result.get('request_id')})"
+            resp = await api.request(
+                "POST", "/mcp/tools/ask_question", json=payload, timeout=poll_timeout,
             )
-        except urllib.error.HTTPError as e:
-            body = e.read().decode()
-            return f"Error asking question (HTTP {e.code}): {body}"
-        except urllib.error.URLError as e:
-            return f"Error asking question (connection failed): {e.reason}"
+            while not resp.is_error and resp.json().get("status") == "pending":
+                request_id = resp.json().get("request_id")
+                try:
+                    resp = await api.request(
+                        "GET", f"/mcp/tools/ask_question/{request_id}",
+                        params={"wait": _LONG_POLL_SECONDS}, timeout=poll_timeout,
+                    )
+                except httpx.TimeoutException:
+                    await asyncio.sleep(1)
+                    continue
+        except httpx.TransportError as e:
+            return f"Error asking question (connection failed): {e}"
         except Exception as e:
             return f"Error asking question (unexpected error): {e}"
+        if resp.is_error:
+            return f"Error asking question (HTTP {resp.status_code}): {resp.text}"
+        result = resp.json()
+        if result.get("status") == "cancelled":
+            return (
+                "Question was cancelled before resolution; "
+                "the task may have been cancelled by the user."
+            )
+        return (
+            f"Selected answer: {result.get('selected_answer')!r} "
+            f"(by {result.get('selected_by')}, request_id={result.get('request_id')})"
+        )
 
     @mcp.tool()
-    def escalate_task(
+    async def escalate_task(
         task_id: str,
         from_agent: str,
         reason: str,
@@ -415,20 +545,13 @@ def build_task_tools_server(api_url: str = "http://127.0.0.1:8420") -> FastMCP:
         if not ok:
             return f"Error: {err}"
         payload = {"task_id": task_id, "from_agent": from_agent, "reason": reason, "severity": severity}
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{api_url}/api/escalations",
-            data=data,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
         try:
-            with urllib.request.urlopen(req, timeout=10) as _resp:
-                return f"Task {task_id} escalated ({severity})."
-        except urllib.error.HTTPError as e:
-            return f"Error escalating (HTTP {e.code}): {e.read().decode()}"
+            resp = await api.request("POST", "/api/escalations", json=payload)
         except Exception as e:
             return f"Error escalating: {e}"
+        if resp.is_error:
+            return f"Error escalating (HTTP {resp.status_code}): {resp.text}"
+        return f"Task {task_id} escalated ({severity})."
 
     return mcp
 
@@ -7,8 +7,11 @@ import logging
 import os
 import re
 import shutil
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+from taskbrew.tools.git_service import get_git_service
+
 logger = logging.getLogger(__name__)
 
 # agent_name flows into worktree directory paths and is an LLM-
@@ -31,28 +34,77 @@ def _validate_agent_name(agent_name: str) -> None:
         raise ValueError(f"Invalid agent name {agent_name!r}")
 
 
+# Idle pool slots live beside agent worktrees under worktree_base. The
+# leading dot puts them outside the agent-name namespace
+# (_AGENT_NAME_PATTERN rejects it), so a slot can never collide with an
+# agent's directory.
+_POOL_SLOT_PREFIX = ".warm-"
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """copytree copy_function: hardlink, falling back to a real copy
+    across filesystems or where links are not permitted."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
 class WorktreeManager:
     """Creates and manages git worktrees for agent isolation.
 
     Each agent gets its own worktree directory under ``worktree_base``.
     When an agent picks up a task, a worktree is created on a fresh branch
     derived from the task ID so the agent never touches the main checkout.
+
+    With ``pool_size`` > 0 the manager keeps that many idle, detached
+    worktrees ready. An agent without a worktree takes a slot instead of
+    running ``git worktree add`` on its claim path: the slot is moved to
+    the agent's directory and switched to the task branch, which only
+    rewrites files that differ. Released worktrees go back to the pool
+    and keep their ignored files. The pool is refilled in the
+    background. ``warm_paths`` names ignored dependency directories
+    (``node_modules``, ``.venv``) in the main checkout. They are
+    hardlinked into each new slot so agents start with dependencies
+    installed. The links share inodes with the main checkout, so tools
+    that rewrite files in place, rather than replacing them, write
+    through to it.
     """
 
-    def __init__(self, repo_dir: str, worktree_base: str):
+    def __init__(
+        self,
+        repo_dir: str,
+        worktree_base: str,
+        *,
+        pool_size: int = 0,
+        warm_paths: list[str] | tuple[str, ...] = (),
+    ):
         self.repo_dir = repo_dir
         self.worktree_base = worktree_base
+        self.git = get_git_service(repo_dir)
         # Resolve once; every path we hand back to shutil.rmtree must be a
         # descendant of this resolved path.
         self._worktree_base_resolved: Path | None = None
         self._worktrees: dict[str, str] = {}  # agent_name -> worktree path
-        # audit 05 F#6: serialise mutations to the worktree base so two
-        # coroutines racing to create or cleanup for different agents
-        # cannot corrupt each other's state (or the shared
-        # ``git worktree list`` metadata) mid-operation. A single
-        # module-scope lock is enough -- worktree ops are not hot enough
-        # to warrant per-agent locks.
-        self._create_lock = asyncio.Lock()
+        # audit 05 F#6: create/cleanup steps for one agent, and for one
+        # branch, must not interleave. Locks are per agent and per
+        # branch (see _locked) so claims for different agents no longer
+        # queue behind each other's git commands.
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._lock_users: dict[str, int] = {}
+        for rel in warm_paths:
+            if os.path.isabs(rel) or ".." in Path(rel).parts:
+                raise ValueError(f"warm path {rel!r} must be relative to the repo")
+        self._pool_size = max(int(pool_size), 0)
+        self._warm_paths = tuple(warm_paths)
+        self._pool: list[str] = []  # idle slot paths
+        # Agent worker processes sharing a checkout each extend this so
+        # they never adopt or name-clash with another worker's slots.
+        self.slot_prefix = _POOL_SLOT_PREFIX
+        self._pool_adopted = False
+        self._slot_seq = 0
+        self._pool_fill_lock = asyncio.Lock()
+        self._replenish_task: asyncio.Task | None = None
 
     # ------------------------------------------------------------------
     # Path-safety helpers
@@ -128,6 +180,24 @@ class WorktreeManager:
 
         shutil.rmtree(p, ignore_errors=False, onerror=_on_error)
 
+    @asynccontextmanager
+    async def _locked(self, key: str):
+        """Hold the lock for *key* (``agent:<name>`` / ``branch:<name>``).
+
+        Locks are created on demand and dropped once nobody holds or
+        waits for them, so per-branch keys do not accumulate.
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._lock_users[key] = self._lock_users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._lock_users[key] -= 1
+            if not self._lock_users[key]:
+                del self._lock_users[key]
+                self._locks.pop(key, None)
+
     # ------------------------------------------------------------------
     # Git helpers
     # ------------------------------------------------------------------
@@ -143,81 +213,44 @@ class WorktreeManager:
         cwd: str | None = None,
         timeout_seconds: float | None = None,
     ) -> str:
-        """Run a git command and return stdout.
+        """Run a git command through the shared GitService and return stdout.
 
         GIT_TERMINAL_PROMPT / GIT_ASKPASS are forced so the child never
         blocks waiting for interactive credentials. A wall-clock timeout
-        kills the child cleanly and surfaces RuntimeError to the caller.
+        kills the child cleanly and surfaces RuntimeError to the caller,
+        as does a non-zero exit.
         """
-        env = dict(os.environ)
-        env["GIT_TERMINAL_PROMPT"] = "0"
-        env.setdefault("GIT_ASKPASS", "/bin/true")
-        env.setdefault("SSH_ASKPASS", "/bin/true")
-        proc = await asyncio.create_subprocess_exec(
-            "git", *args,
-            cwd=cwd or self.repo_dir,
-            env=env,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
         wait = timeout_seconds if timeout_seconds is not None else self._DEFAULT_GIT_TIMEOUT_S
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=wait,
-            )
-        except asyncio.TimeoutError:
-            try:
-                proc.kill()
-            except ProcessLookupError:
-                pass
-            try:
-                await proc.wait()
-            except Exception:
-                pass
-            raise RuntimeError(f"git {' '.join(args)} timed out after {wait}s")
-        if proc.returncode != 0:
-            raise RuntimeError(f"git {' '.join(args)} failed: {stderr.decode()}")
-        return stdout.decode().strip()
+        return await self.git.run(*args, cwd=cwd or self.repo_dir, timeout=wait)
 
     async def _branch_exists(self, branch_name: str) -> bool:
-        """Check whether a local branch already exists."""
-        try:
-            await self._run_git("rev-parse", "--verify", f"refs/heads/{branch_name}")
-            return True
-        except RuntimeError:
-            return False
+        """Check whether a local branch already exists (cached refs)."""
+        return await self.git.branch_exists(branch_name)
 
     async def _find_worktree_for_branch(self, branch_name: str) -> str | None:
         """Return the worktree path that has *branch_name* checked out, or None."""
         try:
-            output = await self._run_git("worktree", "list", "--porcelain")
+            worktrees = await self.git.worktrees()
         except RuntimeError:
             return None
-
-        current_path: str | None = None
-        for line in output.splitlines():
-            if line.startswith("worktree "):
-                current_path = line[len("worktree "):]
-            elif line.startswith("branch refs/heads/"):
-                checked_out_branch = line[len("branch refs/heads/"):]
-                if checked_out_branch == branch_name and current_path:
-                    return current_path
+        for wt in worktrees:
+            if wt["branch"] == branch_name:
+                return wt["path"]
         return None
 
     async def _list_git_worktree_paths(self) -> set[str]:
         """Return the set of worktree paths known to git (resolved)."""
         paths: set[str] = set()
         try:
-            output = await self._run_git("worktree", "list", "--porcelain")
+            worktrees = await self.git.worktrees()
         except RuntimeError:
             return paths
-        for line in output.splitlines():
-            if line.startswith("worktree "):
-                p = line[len("worktree "):]
-                try:
-                    paths.add(str(Path(p).resolve()))
-                except (OSError, ValueError):
-                    paths.add(p)
+        for wt in worktrees:
+            p = wt["path"]
+            try:
+                paths.add(str(Path(p).resolve()))
+            except (OSError, ValueError):
+                paths.add(p)
         return paths
 
     # ------------------------------------------------------------------
@@ -232,10 +265,14 @@ class WorktreeManager:
     ) -> str:
         """Create a git worktree for an agent. Returns the worktree path.
 
-        audit 05 F#6: serialised behind ``self._create_lock`` so two
-        concurrent claimers for the same agent_name (or two agents
-        racing on the same branch) cannot interleave the
-        check-stale / run-git / record-in-dict steps.
+        audit 05 F#6: serialised per agent_name and per branch so two
+        concurrent claimers for the same agent (or two agents racing on
+        the same branch) cannot interleave the check-stale / run-git /
+        record-in-dict steps. Claims for unrelated agents and branches
+        run concurrently.
+
+        When the warm pool has an idle slot it is checked out instead of
+        creating a worktree from scratch.
 
         Handles edge-cases from previous crashes:
         * If the worktree directory already exists it is force-removed first.
@@ -250,10 +287,14 @@ class WorktreeManager:
         on top of a prior task's branch pass that task's
         ``branch_name`` so the worktree starts from there.
         """
-        async with self._create_lock:
-            return await self._create_worktree_locked(
-                agent_name, branch_name, base_branch,
-            )
+        _validate_agent_name(agent_name)
+        # Always agent before branch: a holder of a branch lock never
+        # waits on an agent lock, so the two cannot deadlock.
+        async with self._locked(f"agent:{agent_name}"):
+            async with self._locked(f"branch:{branch_name}"):
+                return await self._create_worktree_locked(
+                    agent_name, branch_name, base_branch,
+                )
 
     async def _create_worktree_locked(
         self,
@@ -291,29 +332,28 @@ class WorktreeManager:
                     agent_name, exc,
                 )
 
-        # Clean up stale worktree from a previous crash (or from the
-        # reuse fallback above).
-        if worktree_path_obj.exists() or worktree_path_obj.is_symlink():
-            logger.info("Removing stale worktree at %s", worktree_path)
+        slot = self._pool.pop() if self._pool else None
+        if slot is not None:
             try:
-                await self._run_git("worktree", "remove", worktree_path, "--force")
-            except RuntimeError:
-                self._safe_rmtree(worktree_path)
-                await self._run_git("worktree", "prune")
+                await self._checkout_pool_slot(
+                    slot, worktree_path, branch_name, base_branch,
+                )
+                self._worktrees[agent_name] = worktree_path
+                # Refill after the claim so it doesn't compete with it.
+                self._schedule_replenish()
+                return worktree_path
+            except RuntimeError as exc:
+                logger.warning(
+                    "Warm worktree checkout failed for %s (%s); creating a fresh one",
+                    agent_name, exc,
+                )
+                if os.path.exists(slot):
+                    await self._remove_worktree_dir(slot)
 
-        # Check if the branch is already checked out in another worktree.
-        existing_wt = await self._find_worktree_for_branch(branch_name)
-        if existing_wt and os.path.normpath(existing_wt) != os.path.normpath(worktree_path):
-            logger.info(
-                "Branch %s already checked out in stale worktree %s, removing it",
-                branch_name, existing_wt,
-            )
-            try:
-                await self._run_git("worktree", "remove", existing_wt, "--force")
-            except RuntimeError:
-                # Only rmtree if the stale worktree is inside our sandbox.
-                self._safe_rmtree(existing_wt)
-                await self._run_git("worktree", "prune")
+        # Clean up stale worktree from a previous crash (or from the
+        # reuse / pool fallbacks above).
+        await self._remove_stale(worktree_path)
+        await self._evict_branch(branch_name, keep_path=worktree_path)
 
         if await self._branch_exists(branch_name):
             # Branch survives from a previous run -- reuse it.
@@ -332,8 +372,149 @@ class WorktreeManager:
             await self._run_git(*args)
 
         self._worktrees[agent_name] = worktree_path
+        self._schedule_replenish()
         return worktree_path
 
+    async def _remove_worktree_dir(self, path: str) -> None:
+        """Force-remove a worktree, falling back to rmtree + prune."""
+        try:
+            await self._run_git("worktree", "remove", path, "--force")
+        except RuntimeError:
+            # Only rmtree if the stale worktree is inside our sandbox.
+            self._safe_rmtree(path)
+            await self._run_git("worktree", "prune")
+
+    async def _remove_stale(self, worktree_path: str) -> None:
+        """Remove whatever occupies *worktree_path* (crash leftovers)."""
+        p = Path(worktree_path)
+        if p.exists() or p.is_symlink():
+            logger.info("Removing stale worktree at %s", worktree_path)
+            await self._remove_worktree_dir(worktree_path)
+
+    async def _evict_branch(self, branch_name: str, keep_path: str) -> None:
+        """Remove another worktree that still has *branch_name* checked out."""
+        existing_wt = await self._find_worktree_for_branch(branch_name)
+        if existing_wt and os.path.normpath(existing_wt) != os.path.normpath(keep_path):
+            logger.info(
+                "Branch %s already checked out in stale worktree %s, removing it",
+                branch_name, existing_wt,
+            )
+            await self._remove_worktree_dir(existing_wt)
+
+    # ------------------------------------------------------------------
+    # Warm pool
+    # ------------------------------------------------------------------
+
+    async def _checkout_pool_slot(
+        self,
+        slot: str,
+        worktree_path: str,
+        branch_name: str,
+        base_branch: str | None,
+    ) -> None:
+        """Move idle *slot* to *worktree_path* and switch it to *branch_name*."""
+        await self._remove_stale(worktree_path)
+        await self._run_git("worktree", "move", slot, worktree_path)
+        await self._evict_branch(branch_name, keep_path=worktree_path)
+        if await self._branch_exists(branch_name):
+            await self._run_git("checkout", branch_name, cwd=worktree_path)
+        else:
+            # Same start point as ``worktree add -b``: base_branch, else
+            # the main checkout's HEAD (the slot's own HEAD may be stale).
+            start = base_branch or await self._run_git("rev-parse", "HEAD")
+            await self._run_git(
+                "checkout", "-b", branch_name, start, cwd=worktree_path,
+            )
+
+    def _next_slot_path(self) -> str:
+        # Names are never reused within a process, so a refill and a
+        # park racing on the same number is impossible.
+        base = self._resolved_base()
+        while True:
+            self._slot_seq += 1
+            candidate = base / f"{self.slot_prefix}{self._slot_seq}"
+            if not candidate.exists():
+                return str(candidate)
+
+    def _seed_warm_paths(self, slot: str) -> None:
+        """Hardlink-copy the configured dependency dirs into *slot*."""
+        for rel in self._warm_paths:
+            src = Path(self.repo_dir) / rel
+            dst = Path(slot) / rel
+            if not src.is_dir() or src.is_symlink() or dst.exists():
+                continue
+            try:
+                shutil.copytree(src, dst, symlinks=True, copy_function=_link_or_copy)
+            except (OSError, shutil.Error) as exc:
+                logger.warning("Could not seed %s into %s: %s", rel, slot, exc)
+
+    async def _adopt_pool_slots(self) -> None:
+        """Take over idle slots a previous run left registered with git."""
+        self._pool_adopted = True
+        known = await self._list_git_worktree_paths()
+        base = self._resolved_base()
+        for entry in sorted(base.glob(f"{self.slot_prefix}*")):
+            if entry.is_symlink() or str(entry.resolve()) not in known:
+                continue
+            if len(self._pool) < self._pool_size:
+                self._pool.append(str(entry.resolve()))
+            else:
+                await self._remove_worktree_dir(str(entry))
+
+    async def fill_pool(self) -> int:
+        """Create idle worktrees until the pool is full. Returns how many
+        were added."""
+        if not self._pool_size:
+            return 0
+        async with self._pool_fill_lock:
+            if not self._pool_adopted:
+                await self._adopt_pool_slots()
+            added = 0
+            while len(self._pool) < self._pool_size:
+                slot = self._next_slot_path()
+                try:
+                    await self._run_git("worktree", "add", "--detach", slot, "HEAD")
+                except RuntimeError as exc:
+                    logger.warning("Could not pre-create warm worktree %s: %s", slot, exc)
+                    break
+                await asyncio.to_thread(self._seed_warm_paths, slot)
+                self._pool.append(slot)
+                added += 1
+            return added
+
+    def _schedule_replenish(self) -> None:
+        """Refill the pool in the background (at most one refill at a time)."""
+        if not self._pool_size or (
+            self._replenish_task is not None and not self._replenish_task.done()
+        ):
+            return
+        self._replenish_task = asyncio.create_task(self._replenish())
+
+    async def _replenish(self) -> None:
+        try:
+            await self.fill_pool()
+        except Exception:
+            logger.exception("Warm worktree pool refill failed")
+
+    def start_pool(self) -> None:
+        """Begin filling the warm pool in the background."""
+        self._schedule_replenish()
+
+    async def _park(self, path: str) -> None:
+        """Return an agent's worktree to the pool: scrub tracked and
+        unignored changes, detach from the task branch, move it to a
+        slot. Ignored files (dependency caches) are kept."""
+        await self._run_git("reset", "--hard", "HEAD", cwd=path)
+        await self._run_git("clean", "-fd", cwd=path)
+        await self._run_git("checkout", "--detach", cwd=path)
+        slot = self._next_slot_path()
+        await self._run_git("worktree", "move", path, slot)
+        self._pool.append(slot)
+
+    def pool_status(self) -> dict:
+        """Return the warm pool's configured size and idle slots."""
+        return {"size": self._pool_size, "idle": list(self._pool)}
+
     async def _reuse_worktree(
         self,
         *,
@@ -410,27 +591,29 @@ class WorktreeManager:
         Returns None on detached HEAD or any git failure.
         """
         try:
-            out = await self._run_git(
-                "rev-parse", "--abbrev-ref", "HEAD",
-                cwd=worktree_path,
-            )
+            return await self.git.worktree_branch(worktree_path)
         except RuntimeError:
             return None
-        branch = (out or "").strip()
-        if not branch or branch == "HEAD":
-            return None
-        return branch
 
     async def cleanup_worktree(self, agent_name: str) -> None:
         """Remove an agent's worktree (keeps the branch and its commits).
 
-        Shares ``_create_lock`` with create_worktree so cleanup cannot
+        With a warm pool that has room, the worktree is scrubbed and
+        parked as an idle slot instead of being deleted.
+
+        Shares the per-agent lock with create_worktree so cleanup cannot
         race against an in-flight create for the same agent.
         """
-        async with self._create_lock:
+        async with self._locked(f"agent:{agent_name}"):
             path = self._worktrees.pop(agent_name, None)
             if not path:
                 return
+            if len(self._pool) < self._pool_size and os.path.isdir(path):
+                try:
+                    await self._park(path)
+                    return
+                except RuntimeError as exc:
+                    logger.debug("Could not park worktree %s: %s", path, exc)
             try:
                 await self._run_git("worktree", "remove", path, "--force")
             except RuntimeError:
@@ -452,7 +635,17 @@ class WorktreeManager:
         return self._worktrees.get(agent_name)
 
     async def cleanup_all(self) -> None:
-        """Remove all managed worktrees."""
+        """Remove all managed worktrees.
+
+        Idle pool slots are left registered so the next run adopts them
+        warm; a refill still in flight is cancelled.
+        """
+        if self._replenish_task is not None and not self._replenish_task.done():
+            self._replenish_task.cancel()
+            try:
+                await self._replenish_task
+            except (asyncio.CancelledError, Exception):
+                pass
         for agent_name in list(self._worktrees):
             await self.cleanup_worktree(agent_name)
 
@@ -500,6 +693,8 @@ class WorktreeManager:
             # Skip entries currently owned by this process.
             if entry.name in self._worktrees or resolved_entry in in_memory_resolved:
                 continue
+            if resolved_entry in self._pool:
+                continue
             logger.info("Pruning stale worktree directory %s", entry)
             self._safe_rmtree(entry)
 
@@ -1094,3 +1094,46 @@ async def test_verification_requeue_respects_status_predicate(
     row = await board.get_task(task_row["id"])
     # Must still be cancelled -- not resurrected to pending.
     assert row["status"] == "cancelled"
+
+
+async def test_execute_task_charges_spend_to_budget_ledger(
+    board: TaskBoard, event_bus: EventBus, instance_mgr: InstanceManager,
+    db: Database, monkeypatch,
+):
+    """Usage recorded by execute_task reaches the CostManager ledger."""
+    from taskbrew.agents import base
+    from taskbrew.orchestrator.cost_manager import CostManager
+
+    class _Runner:
+        def __init__(self, **kwargs):
+            self.last_usage = None
+
+        async def run(self, **kwargs):
+            self.last_usage = {"usage": {"input_tokens": 10}, "cost_usd": 0.75}
+            return "done"
+
+    monkeypatch.setattr(base, "AgentRunner", _Runner)
+    cost_manager = CostManager(db)
+    await cost_manager.create_budget("role", 1.0, scope_id="coder")
+
+    group = await board.create_group(title="Feature", created_by="pm")
+    await board.create_task(
+        group_id=group["id"], title="Implement", task_type="implementation",
+        assigned_to="coder",
+    )
+    loop = _make_loop(board, event_bus, instance_mgr)
+    loop.cost_manager = cost_manager
+    for _ in range(2):
+        task = await loop.poll_for_task()
+        await loop.execute_task(task)
+        await board.complete_task(task["id"])
+        await board.create_task(
+            group_id=group["id"], title="More", task_type="implementation",
+            assigned_to="coder",
+        )
+
+    budget = await cost_manager.check_budget(role="coder")
+    assert budget["allowed"] is False
+    assert budget["spent"] == pytest.approx(1.5)
+    row = await db.execute_fetchone("SELECT SUM(cost_usd) AS c FROM task_usage")
+    assert row["c"] == pytest.approx(1.5)
@@ -434,3 +434,56 @@ async def test_answer_endpoint_400_on_invalid_option(dash_client):
     # Cleanup
     await qmgr.cancel_for_task(env["task_id"])
     await asyncio.wait_for(pending_task, timeout=2.0)
+
+
+async def test_ask_question_long_poll(mcp_client):
+    """With wait_seconds a manual question returns 'pending' and the
+    caller long-polls until the human answer arrives."""
+    c, env = mcp_client
+    headers = {"Authorization": "Bearer test-token"}
+    resp = await c.post(
+        "/mcp/tools/ask_question",
+        json={
+            "task_id": env["task_id"],
+            "group_id": env["group_id"],
+            "agent_role": "architect",
+            "question": "x?",
+            "options": ["A", "B"],
+            "preferred_answer": "A",
+            "reasoning": "because",
+            "wait_seconds": 0.05,
+        },
+        headers=headers,
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["status"] == "pending"
+    qid = body["request_id"]
+
+    row = await env["db"].execute_fetchone(
+        "SELECT awaiting_input_since FROM tasks WHERE id = ?",
+        (env["task_id"],),
+    )
+    assert row["awaiting_input_since"] is not None
+
+    poll = asyncio.create_task(
+        c.get(f"/mcp/tools/ask_question/{qid}?wait=5", headers=headers)
+    )
+    await asyncio.sleep(0.05)
+    assert not poll.done()
+    await env["qmgr"].answer(qid, "B")
+    resp = await asyncio.wait_for(poll, 2)
+    assert resp.json()["status"] == "answered"
+    assert resp.json()["selected_answer"] == "B"
+
+    # An answer that lands between polls is read back from the row.
+    again = await c.get(f"/mcp/tools/ask_question/{qid}?wait=5", headers=headers)
+    assert again.json()["selected_answer"] == "B"
+    row = await env["db"].execute_fetchone(
+        "SELECT awaiting_input_since FROM tasks WHERE id = ?",
+        (env["task_id"],),
+    )
+    assert row["awaiting_input_since"] is None
+
+    missing = await c.get("/mcp/tools/ask_question/qst-nope?wait=0", headers=headers)
+    assert missing.status_code == 404
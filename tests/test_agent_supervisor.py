@@ -0,0 +1,156 @@
+"""Tests for the fleet-wide AgentSupervisor."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from taskbrew.agents.instance_manager import InstanceManager
+from taskbrew.agents.supervisor import AgentSupervisor
+from taskbrew.config_loader import RoleConfig
+from taskbrew.orchestrator.agent_questions import AgentQuestionManager
+from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.event_bus import EventBus
+from taskbrew.orchestrator.task_board import TaskBoard
+
+
+def _role() -> RoleConfig:
+    return RoleConfig(
+        role="coder", display_name="Coder", prefix="CD", color="#000",
+        emoji="", system_prompt="You are a coder.",
+    )
+
+
+@pytest.fixture
+async def env():
+    db = Database(":memory:")
+    await db.initialize()
+    bus = EventBus()
+    board = TaskBoard(db, event_bus=bus)
+    instances = InstanceManager(db)
+    supervisor = AgentSupervisor(instances, board, bus, recovery_interval=0)
+    supervisor.attach()
+    yield {
+        "db": db, "bus": bus, "board": board,
+        "instances": instances, "supervisor": supervisor,
+    }
+    supervisor.detach()
+    await db.close()
+
+
+def _count_statements(monkeypatch, db) -> list[str]:
+    seen: list[str] = []
+    for name in ("execute", "execute_fetchall", "execute_fetchone", "execute_returning"):
+        original = getattr(db, name)
+
+        def _spy(sql, *args, _original=original, **kwargs):
+            seen.append(sql)
+            return _original(sql, *args, **kwargs)
+
+        monkeypatch.setattr(db, name, _spy)
+    return seen
+
+
+async def test_tick_cost_is_constant_in_fleet_size(env, monkeypatch):
+    instances, supervisor = env["instances"], env["supervisor"]
+    supervisor.recovery_interval = 3600
+    for i in range(25):
+        await instances.register_instance(f"coder-{i}", _role())
+        supervisor.register(f"coder-{i}", asyncio.current_task())
+
+    seen = _count_statements(monkeypatch, env["db"])
+    await supervisor.tick()
+    assert len(seen) == 1
+    rows = await instances.get_all_instances()
+    assert all(r["last_heartbeat"] is not None for r in rows)
+
+
+async def test_idle_watchdog_pauses_while_awaiting_input(env):
+    db, bus, board, supervisor = env["db"], env["bus"], env["board"], env["supervisor"]
+    supervisor.recovery_interval = 3600
+    group = await board.create_group(title="G", origin="pm", created_by="human")
+    task = await board.create_task(
+        group_id=group["id"], title="Impl", task_type="implementation",
+        assigned_to="coder", created_by="human",
+    )
+    qmgr = AgentQuestionManager(db, event_bus=bus)
+    target = asyncio.create_task(asyncio.sleep(60))
+    supervisor.register("coder-1")
+    supervisor.watch("coder-1", task_id=task["id"], target=target, idle_timeout=0.05)
+
+    ask = asyncio.create_task(qmgr.ask(
+        task_id=task["id"], group_id=group["id"], agent_role="coder",
+        instance_id="coder-1", question="Which?", options=["a", "b"],
+        preferred_answer="a", reasoning="Both work.", mode="manual",
+    ))
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if supervisor.is_awaiting_input(task["id"]):
+            break
+    assert supervisor.is_awaiting_input(task["id"])
+
+    await asyncio.sleep(0.1)
+    await supervisor.tick()
+    assert not target.done()
+
+    pending = await qmgr.get_pending()
+    await qmgr.answer(pending[0]["id"], "b")
+    await ask
+    await bus.drain()
+    assert not supervisor.is_awaiting_input(task["id"])
+
+    await asyncio.sleep(0.1)
+    await supervisor.tick()
+    await asyncio.sleep(0)
+    assert target.cancelled()
+    assert supervisor.stats()["idle_kills"] == 1
+
+
+async def test_recovery_uses_in_memory_liveness(env):
+    db, board, instances, supervisor = (
+        env["db"], env["board"], env["instances"], env["supervisor"],
+    )
+    group = await board.create_group(title="G", origin="pm", created_by="human")
+    for _ in range(3):
+        await board.create_task(
+            group_id=group["id"], title="Impl", task_type="implementation",
+            assigned_to="coder", created_by="human",
+        )
+    dead_loop = asyncio.create_task(asyncio.sleep(0))
+    await dead_loop
+    claimed = {}
+    for iid in ("coder-live", "coder-gone", "coder-crashed"):
+        await instances.register_instance(iid, _role())
+        claimed[iid] = await board.claim_task("coder", iid)
+        await instances.update_status(iid, "working", current_task=claimed[iid]["id"])
+    old = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    await db.execute("UPDATE agent_instances SET last_heartbeat = ?", (old,))
+
+    # coder-live still runs here despite its stale row; coder-crashed is
+    # registered but its loop has exited; coder-gone is from elsewhere.
+    supervisor.register("coder-live", asyncio.current_task())
+    supervisor.register("coder-crashed", dead_loop)
+    await supervisor.recover()
+
+    status = {
+        iid: (await board.get_task(t["id"]))["status"] for iid, t in claimed.items()
+    }
+    assert status == {
+        "coder-live": "in_progress",
+        "coder-gone": "pending",
+        "coder-crashed": "pending",
+    }
+    assert (await instances.get_instance("coder-gone"))["status"] == "idle"
+    assert supervisor.stats()["agents"] == 1
+
+
+async def test_stop_returns_without_waiting_out_interval(env):
+    supervisor = env["supervisor"]
+    supervisor.interval = 3600
+    runner = asyncio.create_task(supervisor.run())
+    await asyncio.sleep(0)
+    supervisor.stop()
+    await asyncio.wait_for(runner, timeout=1)
+    assert supervisor.stats()["ticks"] == 0
@@ -84,6 +84,23 @@ class TestAgentPerformanceSummary:
         resp = await app_client["client"].get("/api/analytics/agents?days=1")
         assert resp.status_code == 200
 
+    async def test_task_outcomes_joined_per_agent(self, app_client):
+        group, t1, t2 = await _seed(app_client)
+        board = app_client["board"]
+        db = app_client["db"]
+        await board.claim_task("coder", "coder-2")
+        await board.fail_task(t2["id"])
+        await db.record_task_usage(task_id=t2["id"], agent_id="coder-2", cost_usd=0.01)
+
+        resp = await app_client["client"].get("/api/analytics/agents")
+        agents = {a["agent_id"]: a for a in resp.json()["agents"]}
+        assert agents["coder-1"]["tasks_completed"] == 1
+        assert agents["coder-1"]["tasks_failed"] == 0
+        assert agents["coder-1"]["success_rate"] == 100.0
+        assert agents["coder-2"]["tasks_completed"] == 0
+        assert agents["coder-2"]["tasks_failed"] == 1
+        assert agents["coder-2"]["total_runs"] == 1
+
 
 class TestAgentDetail:
     async def test_with_data(self, app_client):
@@ -132,3 +149,22 @@ class TestEfficiency:
         data = resp.json()
         assert data["overall"]["total_runs"] == 2
         assert data["overall"]["avg_cost"] > 0
+
+    async def test_breakdowns_rolled_up_from_one_query(self, app_client):
+        await _seed(app_client)
+        # Usage for a task that no longer exists counts towards the
+        # overall figures only.
+        await app_client["db"].record_task_usage(
+            task_id="GONE-1", agent_id="coder-1", cost_usd=0.05,
+        )
+        resp = await app_client["client"].get("/api/analytics/efficiency")
+        data = resp.json()
+        assert data["overall"]["total_runs"] == 3
+        assert data["overall"]["avg_cost"] == pytest.approx(0.1 / 3)
+        assert data["by_priority"] == [
+            {"priority": "high", "runs": 1, "avg_cost": pytest.approx(0.03),
+             "avg_duration_ms": 5000},
+            {"priority": "medium", "runs": 1, "avg_cost": pytest.approx(0.02),
+             "avg_duration_ms": 3000},
+        ]
+        assert [r["task_type"] for r in data["by_task_type"]] == ["code", "test"]
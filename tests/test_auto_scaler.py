@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from taskbrew.agents.auto_scaler import AutoScaler
+from taskbrew.agents.auto_scaler import AutoScaler, DemandEstimate, replay_history
 from taskbrew.agents.instance_manager import InstanceManager
 from taskbrew.config_loader import AutoScaleConfig, RoleConfig
 from taskbrew.orchestrator.database import Database
@@ -371,3 +372,139 @@ async def test_get_scaling_status(
     status = scaler.get_scaling_status()
     assert status["extra_instances"] == {"coder": 3}
     assert status["running"] is False
+
+
+async def test_demand_estimate_sizes_for_load_and_backlog():
+    est = DemandEstimate(alpha=0.5)
+    assert est.desired_instances(10, 600) is None  # no service time yet
+
+    est.observe(60, arrivals=6, completions=2, service_seconds=1200)
+    assert est.arrival_rate == pytest.approx(0.1)
+    assert est.service_time == pytest.approx(600)
+    # An empty window halves the arrival rate.
+    est.observe(60, arrivals=0, completions=0, service_seconds=0)
+    assert est.arrival_rate == pytest.approx(0.05)
+    assert est.service_time == pytest.approx(600)  # unchanged without completions
+    # 0.05/s * 600s = 30 for arrivals + 4 * 600 / 1200 = 2 for the backlog
+    assert est.desired_instances(4, 1200) == 32
+
+
+async def _backdate(db: Database, task_id: str, minutes_ago: float, duration_min: float):
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        "UPDATE tasks SET status = 'completed', started_at = ?, completed_at = ? WHERE id = ?",
+        (
+            (now - timedelta(minutes=minutes_ago + duration_min)).isoformat(),
+            (now - timedelta(minutes=minutes_ago)).isoformat(),
+            task_id,
+        ),
+    )
+
+
+async def test_forecast_scales_up_before_threshold(
+    task_board: TaskBoard, instance_mgr: InstanceManager, db: Database
+):
+    """With target_latency set, demand below scale_up_threshold still scales."""
+    auto_cfg = AutoScaleConfig(enabled=True, scale_up_threshold=10, target_latency=5)
+    role = _make_role(max_instances=5, auto_scale=auto_cfg)
+    await instance_mgr.register_instance("coder-1", role)
+
+    factory_calls = []
+
+    async def factory(iid, rcfg):
+        factory_calls.append(iid)
+        return asyncio.current_task()
+
+    scaler = AutoScaler(task_board, instance_mgr, {"coder": role}, agent_factory=factory)
+    await scaler._check_and_scale()  # opens the flow window
+    assert factory_calls == []
+
+    group = await task_board.create_group(title="Feature", created_by="pm")
+    tasks = [
+        await task_board.create_task(
+            group_id=group["id"], title=f"Task {i}",
+            task_type="implementation", assigned_to="coder",
+        )
+        for i in range(4)
+    ]
+    # One finished in the window after 5 minutes of work; three queued.
+    await _backdate(db, tasks[0]["id"], minutes_ago=0, duration_min=5)
+    assert await task_board.get_queue_depths() == {"coder": 3}
+    scaler._flow_at = time.monotonic() - 60
+
+    await scaler._check_and_scale()
+    # 3 pending * 300s / 300s target = 3 for the backlog, plus arrivals
+    # 4/60s * 300s = 20 -> capped at max_instances (5) - active (1).
+    assert len(factory_calls) == 4
+    status = scaler.get_scaling_status()
+    assert status["estimates"]["coder"]["service_time"] == pytest.approx(300, rel=0.01)
+    assert status["recent_decisions"][-1]["direction"] == "up"
+
+
+async def test_dry_run_records_without_spawning(
+    task_board: TaskBoard, instance_mgr: InstanceManager
+):
+    auto_cfg = AutoScaleConfig(enabled=True, scale_up_threshold=1)
+    role = _make_role(max_instances=5, auto_scale=auto_cfg)
+    await instance_mgr.register_instance("coder-1", role)
+    group = await task_board.create_group(title="Feature", created_by="pm")
+    for i in range(3):
+        await task_board.create_task(
+            group_id=group["id"], title=f"Task {i}",
+            task_type="implementation", assigned_to="coder",
+        )
+
+    factory_calls = []
+
+    async def factory(iid, rcfg):
+        factory_calls.append(iid)
+
+    scaler = AutoScaler(
+        task_board, instance_mgr, {"coder": role}, agent_factory=factory, dry_run=True,
+    )
+    await scaler._check_and_scale()
+
+    assert factory_calls == []
+    [decision] = scaler.get_scaling_status()["recent_decisions"]
+    assert decision["direction"] == "up"
+    assert decision["count"] == 2
+    assert decision["dry_run"] is True
+
+
+async def test_replay_history_scales_with_recorded_flow(
+    task_board: TaskBoard, db: Database
+):
+    group = await task_board.create_group(title="Feature", created_by="pm")
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Ten tasks arrive in the first minute, each takes 10 minutes once
+    # claimed; they are worked two at a time.
+    for i in range(10):
+        task = await task_board.create_task(
+            group_id=group["id"], title=f"Task {i}",
+            task_type="implementation", assigned_to="coder",
+        )
+        start = base + timedelta(minutes=10 * (i // 2))
+        await db.execute(
+            "UPDATE tasks SET status = 'completed', created_at = ?, "
+            "started_at = ?, completed_at = ? WHERE id = ?",
+            (
+                (base + timedelta(seconds=5 * i)).isoformat(),
+                start.isoformat(),
+                (start + timedelta(minutes=10)).isoformat(),
+                task["id"],
+            ),
+        )
+
+    reactive = await replay_history(db, {"coder": _make_role(
+        max_instances=4, auto_scale=AutoScaleConfig(enabled=True, scale_up_threshold=3),
+    )})
+    coder = reactive["coder"]
+    assert coder["peak_pending"] == 8
+    assert coder["peak_instances"] == 4
+    assert coder["decisions"][0]["direction"] == "up"
+    assert coder["decisions"][0]["from"] == 1
+    # The queue drains, so the extras are released by the end.
+    assert coder["decisions"][-1]["direction"] == "down"
+
+    disabled = await replay_history(db, {"coder": _make_role(auto_scale=None)})
+    assert disabled == {}
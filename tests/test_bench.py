@@ -0,0 +1,110 @@
+"""Tests for the fake provider and the end-to-end orchestrator benchmark."""
+
+from __future__ import annotations
+
+import pytest
+
+from taskbrew.agents import fake_cli
+from taskbrew.agents.provider import detect_provider, get_message_types, sdk_query
+from taskbrew.orchestrator.bench import (
+    BenchConfig,
+    DbProfileBenchConfig,
+    compare_results,
+    percentiles,
+    run_benchmark,
+    run_db_profile_benchmark,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake_provider():
+    previous = fake_cli.configure()
+    yield
+    fake_cli.configure(previous)
+
+
+async def _run(prompt: str) -> list:
+    options = fake_cli.FakeOptions()
+    return [m async for m in sdk_query(prompt=prompt, options=options, provider="fake")]
+
+
+async def test_fake_provider_is_deterministic_and_calls_hook():
+    assert detect_provider(model="fake-coder") == "fake"
+    seen = []
+
+    async def _hook(task_id, prompt):
+        seen.append(task_id)
+
+    fake_cli.configure(fake_cli.FakeBehavior(on_run=_hook))
+    messages = await _run("## Your Task\n**CD-001**: Build it")
+    types = get_message_types("fake")
+    assert isinstance(messages[-1], types["ResultMessage"])
+    assert messages[-1].usage["output_tokens"] == 200
+    assert seen == ["CD-001"]
+
+    fake_cli.configure(fake_cli.FakeBehavior(failure_rate=0.5, seed=7))
+    outcomes = []
+    for _ in range(2):
+        row = []
+        for i in range(20):
+            try:
+                await _run(f"**T-{i}**: x")
+                row.append(True)
+            except fake_cli.FakeCLIError:
+                row.append(False)
+        outcomes.append(row)
+    assert outcomes[0] == outcomes[1]
+    assert True in outcomes[0] and False in outcomes[0]
+
+
+async def test_benchmark_runs_full_pipeline(tmp_path):
+    report = await run_benchmark(
+        BenchConfig(agents_per_role=1, tasks=2, fanout=2, latency_ms=0, jitter_ms=0),
+        workdir=tmp_path,
+    )
+    assert not report["timed_out"]
+    # 2 goals fan out to 4 designs, 8 implementations and 16 verifications,
+    # plus the pm's goal_verification follow-up per goal.
+    assert report["tasks"]["by_status"] == {"completed": 32}
+    assert report["claim_latency_ms"]["count"] == 32
+    assert report["queue_wait_ms"]["count"] == 32
+    assert report["db_statements"]["per_task"] > 0
+    assert report["event_bus_lag_ms"]["count"] > 0
+    assert report["throughput_tasks_per_second"] > 0
+
+
+async def test_benchmark_failures_stop_fanout(tmp_path):
+    report = await run_benchmark(
+        BenchConfig(agents_per_role=1, tasks=3, failure_rate=1.0, latency_ms=0, jitter_ms=0),
+        workdir=tmp_path,
+    )
+    assert report["tasks"]["by_status"] == {"failed": 3}
+
+
+def test_compare_results_flags_regressions():
+    base = {
+        "throughput_tasks_per_second": 100.0,
+        "db_statements": {"per_task": 40.0},
+        "claim_latency_ms": percentiles([1.0, 2.0, 3.0]),
+    }
+    same = {**base, "db_statements": {"per_task": 42.0}}
+    assert compare_results(base, same, max_regression_pct=10) == []
+    worse = {**base, "throughput_tasks_per_second": 70.0, "db_statements": {"per_task": 60.0}}
+    regressions = compare_results(base, worse, max_regression_pct=10)
+    assert [r.split(":")[0] for r in regressions] == [
+        "throughput_tasks_per_second", "db_statements.per_task",
+    ]
+
+
+async def test_db_profile_benchmark_reports_each_profile(tmp_path):
+    config = DbProfileBenchConfig(
+        profiles=("safe", "balanced"), tasks=200, read_rounds=1, write_transactions=10,
+    )
+    report = await run_db_profile_benchmark(config, workdir=tmp_path)
+    assert set(report["profiles"]) == {"safe", "balanced"}
+    for result in report["profiles"].values():
+        assert result["read"]["queries"] > 0 and result["read"]["per_second"] > 0
+        assert result["write"]["transactions"] == 10
+    assert report["profiles"]["balanced"]["settings"]["synchronous"] == "NORMAL"
+    with pytest.raises(ValueError, match="turbo"):
+        await run_db_profile_benchmark(DbProfileBenchConfig(profiles=("turbo",)))
@@ -130,3 +130,157 @@ async def test_stop_all_cleans_up(mock_client_cls, chat_manager):
     assert len(chat_manager.sessions) == 2
     await chat_manager.stop_all()
     assert len(chat_manager.sessions) == 0
+
+
+def _scripted_client(session_id="sdk-1"):
+    """SDK client stub that records prompts and answers each with a result."""
+    from claude_agent_sdk import ResultMessage
+
+    client = AsyncMock()
+    client.prompts = []
+
+    async def query(prompt):
+        client.prompts.append(prompt)
+
+    async def receive_response():
+        result = MagicMock(spec=ResultMessage)
+        result.result = f"reply {len(client.prompts)}"
+        result.session_id = session_id
+        yield result
+
+    client.query = query
+    client.receive_response = receive_response
+    return client
+
+
+@patch("taskbrew.dashboard.chat_manager.ClaudeSDKClient")
+async def test_turns_send_only_the_new_message(mock_client_cls, agent_config):
+    client = _scripted_client()
+    mock_client_cls.return_value = client
+    manager = ChatManager(history_window=8)
+    await manager.start_session("coder", agent_config)
+    for i in range(10):
+        await manager.send_message("coder", f"question {i}")
+
+    assert client.prompts == [f"question {i}" for i in range(10)]
+    session = manager.get_session("coder")
+    assert session.sdk_session_id == "sdk-1"
+    assert len(session.history) == 8
+    assert session.summary.splitlines()[0] == "User: question 0"
+    assert session.message_count == 20
+
+
+@patch("taskbrew.dashboard.chat_manager.ClaudeSDKClient")
+async def test_summary_covers_every_turn_the_context_block_omits(mock_client_cls, agent_config):
+    mock_client_cls.return_value = _scripted_client()
+    manager = ChatManager(history_window=50)
+    await manager.start_session("coder", agent_config)
+    for i in range(12):
+        await manager.send_message("coder", f"question {i}")
+
+    session = manager.get_session("coder")
+    assert len(session.history) == 24
+    lines = session.summary.splitlines()
+    assert len(lines) == 16
+    assert (lines[0], lines[-1]) == ("User: question 0", "Assistant: reply 8")
+
+    # A client rebuilt without resume sees every earlier turn somewhere.
+    session.needs_context = True
+    session.history.append(session.history[-1])
+    prompt = ChatManager._build_contextual_prompt(session)
+    for i in range(12):
+        assert f"question {i}" in prompt
+
+
+@patch("taskbrew.dashboard.chat_manager.ClaudeSDKClient")
+async def test_clear_history_forgets_the_conversation(mock_client_cls, agent_config, tmp_path):
+    from taskbrew.orchestrator.database import Database
+
+    db = Database(str(tmp_path / "chat.db"))
+    await db.initialize()
+    try:
+        mock_client_cls.return_value = _scripted_client("sdk-9")
+        manager = ChatManager(db=db)
+        await manager.start_session("coder", agent_config)
+        await manager.send_message("coder", "remember this")
+
+        assert await manager.clear_history("coder") == 2
+        assert manager.get_session("coder") is None
+        assert await manager.get_history_page("coder") is None
+        session = await manager.start_session("coder", agent_config)
+        assert mock_client_cls.call_args.kwargs["options"].resume is None
+        assert session.summary == "" and session.history == []
+    finally:
+        await db.close()
+
+
+@patch("taskbrew.dashboard.chat_manager.ClaudeSDKClient")
+async def test_persisted_chat_resumes_and_pages(mock_client_cls, agent_config, tmp_path):
+    from taskbrew.orchestrator.database import Database
+
+    db = Database(str(tmp_path / "chat.db"))
+    await db.initialize()
+    try:
+        mock_client_cls.return_value = _scripted_client("sdk-42")
+        first = ChatManager(db=db, history_window=8)
+        await first.start_session("coder", agent_config)
+        for i in range(6):
+            await first.send_message("coder", f"q{i}")
+        await first.stop_all()
+
+        # A restarted dashboard resumes the SDK conversation instead of
+        # replaying history into the prompt.
+        client = _scripted_client("sdk-42")
+        mock_client_cls.return_value = client
+        second = ChatManager(db=db, history_window=8)
+        session = await second.start_session("coder", agent_config)
+        assert mock_client_cls.call_args.kwargs["options"].resume == "sdk-42"
+        assert [m.content for m in session.history][:2] == ["q2", "reply 3"]
+        await second.send_message("coder", "next")
+        assert client.prompts == ["next"]
+
+        latest = await second.get_history_page("coder", limit=4)
+        assert [m.content for m in latest] == ["q5", "reply 6", "next", "reply 1"]
+        older = await second.get_history_page("coder", before=latest[0].seq, limit=4)
+        assert [m.content for m in older] == ["q3", "reply 4", "q4", "reply 5"]
+        assert await second.get_history_page("nobody") is None
+    finally:
+        await db.close()
+
+
+@patch("taskbrew.dashboard.chat_manager.ClaudeSDKClient")
+async def test_idle_session_is_suspended_and_resumed(mock_client_cls, agent_config):
+    first_client = _scripted_client("sdk-7")
+    mock_client_cls.return_value = first_client
+    manager = ChatManager(idle_timeout=60)
+    session = await manager.start_session("coder", agent_config)
+    await manager.send_message("coder", "hello")
+
+    session.last_active -= 120
+    assert await manager.evict_idle() == ["coder"]
+    first_client.disconnect.assert_awaited_once()
+    assert session.suspended and session.client is None
+
+    second_client = _scripted_client("sdk-7")
+    mock_client_cls.return_value = second_client
+    await manager.send_message("coder", "again")
+    assert manager.get_session("coder") is session
+    assert mock_client_cls.call_args.kwargs["options"].resume == "sdk-7"
+    assert second_client.prompts == ["again"]
+
+
+def test_context_block_is_bounded():
+    from taskbrew.dashboard.chat_manager import ChatMessage, ChatSession
+
+    session = ChatSession(
+        session_id="s", agent_name="coder", agent_config=None,
+        needs_context=True, summary="User: long ago",
+    )
+    session.history = [
+        ChatMessage(id=str(i), role="user", content="x" * 1000, timestamp="t")
+        for i in range(40)
+    ]
+    prompt = ChatManager._build_contextual_prompt(session)
+    assert prompt.startswith("[Conversation context]\n[Earlier conversation, summarized]\nUser: long ago")
+    assert prompt.count("User: xxx") == 8
+    assert len(prompt) < 4000
@@ -420,6 +420,20 @@ def test_load_team_config_expands_tilde(tmp_path):
     assert cfg.db_path.startswith("/")
 
 
+def test_load_team_config_database_profile(tmp_path):
+    """Keys beside path/profile in the database section become overrides."""
+    team_yaml = tmp_path / "team.yaml"
+    team_yaml.write_text(
+        'team_name: test\n'
+        'database:\n  path: "data/t.db"\n  profile: read_heavy\n  mmap_size_mb: 512\n'
+        'dashboard:\n  host: "0.0.0.0"\n  port: 8420\n'
+        'artifacts:\n  base_dir: "artifacts"\n'
+    )
+    cfg = load_team_config(team_yaml)
+    assert cfg.database.profile == "read_heavy"
+    assert cfg.database.overrides == {"mmap_size_mb": 512}
+
+
 # ---------------------------------------------------------------------------
 # routing_mode field on RoleConfig
 # ---------------------------------------------------------------------------
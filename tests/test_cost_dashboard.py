@@ -325,6 +325,29 @@ async def test_costs_by_group_from_attributions(cost_client):
     assert feat1["records"] == 2
 
 
+# ------------------------------------------------------------------
+# Forecast endpoint
+# ------------------------------------------------------------------
+
+
+async def test_cost_forecast_flags_at_risk_budget(cost_client):
+    """Forecast marks budgets whose projected spend exceeds the limit."""
+    db = cost_client["db"]
+    now = datetime.now(timezone.utc)
+    reset_at = (now + timedelta(hours=12)).isoformat()
+    await db.execute(
+        "INSERT INTO cost_budgets (id, scope, scope_id, budget_usd, spent_usd, period, reset_at, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ("hot", "global", None, 10.0, 9.0, "daily", reset_at, now.isoformat()),
+    )
+
+    resp = await cost_client["client"].get("/api/costs/forecast")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["at_risk"] == ["hot"]
+    assert data["forecasts"][0]["projected"] > 10.0
+
+
 # ------------------------------------------------------------------
 # Costs page route
 # ------------------------------------------------------------------
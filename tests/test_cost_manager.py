@@ -253,3 +253,131 @@ async def test_delete_nonexistent_budget(cost_mgr: CostManager):
     await cost_mgr.delete_budget("nonexistent-id")
     budgets = await cost_mgr.get_budgets()
     assert len(budgets) == 0
+
+
+# ------------------------------------------------------------------
+# In-memory Ledger Tests
+# ------------------------------------------------------------------
+
+
+async def test_check_budget_answers_from_ledger(cost_mgr: CostManager, db: Database):
+    """Once loaded, check_budget issues no database queries."""
+    await cost_mgr.create_budget(scope="global", budget_usd=10.0, period="daily")
+    await cost_mgr.load()
+
+    async def _fail(*args, **kwargs):
+        raise AssertionError("check_budget touched the database")
+
+    db.execute_fetchone = _fail
+    db.execute_fetchall = _fail
+    result = await cost_mgr.check_budget(role="coder", group_id="FEAT-001")
+    assert result["allowed"] is True
+
+
+async def test_small_spend_is_buffered_until_flush(db: Database):
+    """Spend below the flush threshold stays in memory until flushed."""
+    mgr = CostManager(db, flush_interval=3600, flush_threshold_usd=5.0)
+    budget = await mgr.create_budget(scope="global", budget_usd=100.0, period="daily")
+    await mgr.load()
+
+    await mgr.record_spend(1.0)
+    row = await db.execute_fetchone(
+        "SELECT spent_usd FROM cost_budgets WHERE id = ?", (budget["id"],)
+    )
+    assert row["spent_usd"] == 0
+
+    await mgr.flush()
+    row = await db.execute_fetchone(
+        "SELECT spent_usd FROM cost_budgets WHERE id = ?", (budget["id"],)
+    )
+    assert row["spent_usd"] == 1.0
+
+
+async def test_spend_over_threshold_flushes(db: Database):
+    """Crossing flush_threshold_usd writes the ledger back immediately."""
+    mgr = CostManager(db, flush_interval=3600, flush_threshold_usd=2.0)
+    budget = await mgr.create_budget(scope="global", budget_usd=100.0, period="daily")
+
+    await mgr.record_spend(1.5)
+    await mgr.record_spend(1.0)
+    row = await db.execute_fetchone(
+        "SELECT spent_usd FROM cost_budgets WHERE id = ?", (budget["id"],)
+    )
+    assert row["spent_usd"] == 2.5
+
+
+async def test_expired_period_rolls_over(cost_mgr: CostManager, db: Database):
+    """A budget whose reset_at has passed starts a fresh period."""
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        "INSERT INTO cost_budgets (id, scope, scope_id, budget_usd, spent_usd, "
+        "period, reset_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ("old", "global", None, 10.0, 10.0, "daily",
+         (now - timedelta(days=3)).isoformat(), now.isoformat()),
+    )
+
+    result = await cost_mgr.check_budget()
+    assert result["allowed"] is True
+
+    await cost_mgr.record_spend(2.0)
+    budgets = await cost_mgr.get_budgets()
+    assert budgets[0]["spent_usd"] == 2.0
+    reset_at = datetime.fromisoformat(budgets[0]["reset_at"])
+    assert now < reset_at <= now + timedelta(days=1)
+    assert (reset_at.hour, reset_at.minute) == (0, 0)
+
+
+async def test_weekly_reset_aligns_to_monday(cost_mgr: CostManager):
+    """Weekly budgets reset on the next Monday 00:00 UTC."""
+    budget = await cost_mgr.create_budget(scope="global", budget_usd=10.0, period="weekly")
+    reset_at = datetime.fromisoformat(budget["reset_at"])
+    assert reset_at.weekday() == 0
+    assert reset_at > datetime.now(timezone.utc)
+
+
+async def test_deleted_budget_leaves_ledger(cost_mgr: CostManager):
+    """Deleting a budget stops it from blocking check_budget."""
+    budget = await cost_mgr.create_budget(scope="global", budget_usd=1.0, period="daily")
+    await cost_mgr.record_spend(1.0)
+    assert (await cost_mgr.check_budget())["allowed"] is False
+
+    await cost_mgr.delete_budget(budget["id"])
+    assert (await cost_mgr.check_budget())["allowed"] is True
+
+
+async def test_forecast_projects_burn_rate(cost_mgr: CostManager):
+    """forecast extrapolates current spend to the end of the period."""
+    await cost_mgr.create_budget(scope="global", budget_usd=1.0, period="monthly")
+    await cost_mgr.create_budget(scope="role", budget_usd=1.0, scope_id="coder", period="daily")
+    await cost_mgr.record_spend(0.5, role="coder")
+
+    forecasts = await cost_mgr.forecast(role="coder")
+    assert len(forecasts) == 2
+    for f in forecasts:
+        assert f["projected"] >= f["spent"] == 0.5
+        assert f["burn_rate_per_hour"] > 0
+
+    # Only the global budget applies to other roles.
+    assert len(await cost_mgr.forecast(role="reviewer")) == 1
+
+
+async def test_concurrent_rollovers_keep_each_others_spend(db: Database):
+    """Two processes rolling the same budget over both keep their new-period spend."""
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        "INSERT INTO cost_budgets (id, scope, scope_id, budget_usd, spent_usd, "
+        "period, reset_at, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        ("b", "global", None, 10.0, 9.0, "daily",
+         (now - timedelta(hours=1)).isoformat(), now.isoformat()),
+    )
+    first, second = CostManager(db), CostManager(db)
+    await first.load()
+    await second.load()
+
+    await first.record_spend(1.0)
+    await first.flush()
+    await second.record_spend(2.0)
+    await second.flush()
+
+    row = await db.execute_fetchone("SELECT spent_usd FROM cost_budgets WHERE id = 'b'")
+    assert row["spent_usd"] == 3.0
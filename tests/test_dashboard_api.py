@@ -110,6 +110,38 @@ async def test_get_board_filtered(app_client):
     assert all_tasks[0]["title"] == "Task in group 1"
 
 
+async def test_get_board_delta_and_etag(app_client):
+    board = app_client["board"]
+    client = app_client["client"]
+    group = await board.create_group(title="Feature A", origin="pm", created_by="pm")
+    await board.create_task(
+        group_id=group["id"], title="First", task_type="implement",
+        assigned_to="coder", created_by="pm",
+    )
+    resp = await client.get("/api/board")
+    version = int(resp.headers["X-Board-Version"])
+    etag = resp.headers["ETag"]
+
+    resp = await client.get("/api/board", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    second = await board.create_task(
+        group_id=group["id"], title="Second", task_type="implement",
+        assigned_to="coder", created_by="pm",
+    )
+    resp = await client.get(
+        f"/api/board?since={version}&view=summary",
+        headers={"If-None-Match": etag},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["version"] == version + 1
+    assert [t["id"] for t in data["changed"]] == [second["id"]]
+    assert "description" not in data["changed"][0]
+    assert resp.headers["ETag"] != etag
+
+
 async def test_get_groups(app_client):
     board = app_client["board"]
     await board.create_group(title="My Group", origin="pm", created_by="pm")
@@ -511,6 +543,28 @@ async def test_route_validation_unknown_role(routed_client):
     assert "Unknown target role" in resp.json()["detail"]
 
 
+async def test_bulk_create_reports_each_entry(routed_client):
+    """/api/tasks/bulk validates each entry like /api/tasks and keeps going."""
+    c = routed_client["client"]
+    goal = await c.post("/api/goals", json={"title": "Test"})
+    gid = goal.json()["group_id"]
+
+    resp = await c.post("/api/tasks/bulk", json={"tasks": [
+        {"group_id": gid, "title": "Bad role", "assigned_to": "nonexistent",
+         "assigned_by": "pm-1", "task_type": "tech_design"},
+        {"group_id": gid, "title": "Design", "assigned_to": "architect",
+         "assigned_by": "pm-1", "task_type": "tech_design"},
+    ]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["created"] == 1
+    bad, good = data["results"]
+    assert bad["status_code"] == 400
+    assert "Unknown target role" in bad["error"]
+    assert good["title"] == "Design"
+    assert good["assigned_to"] == "architect"
+
+
 async def test_route_validation_bad_task_type(routed_client):
     """C3: task_type not accepted by target role returns 400."""
     c = routed_client["client"]
@@ -4,7 +4,11 @@ from __future__ import annotations
 
 import pytest
 
-from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.database import (
+    CONNECTION_PROFILES,
+    Database,
+    connection_profile,
+)
 
 
 @pytest.fixture
@@ -58,3 +62,72 @@ async def test_generate_task_id_unregistered(db: Database):
     """Requesting an ID for an unknown prefix must raise ValueError."""
     with pytest.raises(ValueError, match="Unregistered prefix"):
         await db.generate_task_id("XX")
+
+
+# ------------------------------------------------------------------
+# Connection profiles
+# ------------------------------------------------------------------
+
+
+async def _pragma(conn, name: str):
+    async with conn.execute(f"PRAGMA {name}") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+async def test_connection_profile_applied_to_every_connection(tmp_path):
+    profile = connection_profile("read_heavy", cache_size_mb=16)
+    database = Database(str(tmp_path / "p.db"), pool_size=2, profile=profile)
+    await database.initialize()
+    try:
+        async with database.acquire() as pooled:
+            for conn in (database._conn, pooled):
+                assert await _pragma(conn, "synchronous") == 1  # NORMAL
+                assert await _pragma(conn, "cache_size") == -16 * 1024
+                assert await _pragma(conn, "temp_store") == 2  # MEMORY
+                assert await _pragma(conn, "mmap_size") == 256 * 1024 * 1024
+    finally:
+        await database.close()
+
+
+async def test_safe_profile_keeps_sqlite_defaults(tmp_path):
+    database = Database(str(tmp_path / "s.db"), profile=CONNECTION_PROFILES["safe"])
+    await database.initialize()
+    try:
+        assert await _pragma(database._conn, "synchronous") == 2  # FULL
+        assert await _pragma(database._conn, "mmap_size") == 0
+    finally:
+        await database.close()
+
+
+def test_connection_profile_rejects_bad_settings():
+    with pytest.raises(ValueError, match="Unknown database profile"):
+        connection_profile("turbo")
+    with pytest.raises(ValueError, match="Unknown database settings"):
+        connection_profile("balanced", page_size=4096)
+    with pytest.raises(ValueError, match="synchronous"):
+        connection_profile("balanced", synchronous="sometimes")
+    with pytest.raises(ValueError, match="mmap_size_mb"):
+        connection_profile("balanced", mmap_size_mb=-1)
+    with pytest.raises(ValueError, match="temp_store"):
+        connection_profile("balanced", temp_store=2)
+    with pytest.raises(ValueError, match="optimize_on_close"):
+        connection_profile("balanced", optimize_on_close="no")
+
+
+def test_connection_profile_accepts_yaml_scalars():
+    import yaml
+
+    overrides = yaml.safe_load("synchronous: off\ntemp_store: memory\n")
+    profile = connection_profile("safe", **overrides)
+    assert profile.synchronous == "OFF" and profile.temp_store == "MEMORY"
+    assert "PRAGMA synchronous = OFF" in profile.pragmas()
+
+
+async def test_close_runs_optimize(tmp_path):
+    database = Database(str(tmp_path / "o.db"))
+    await database.initialize()
+    conn = database._conn
+    statements = []
+    await conn.set_trace_callback(statements.append)
+    await database.close()
+    assert "PRAGMA optimize" in statements
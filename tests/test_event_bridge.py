@@ -0,0 +1,170 @@
+"""Tests for the event hub that links the API process with agent workers."""
+
+from __future__ import annotations
+
+import asyncio
+
+from taskbrew.agents.instance_manager import InstanceManager
+from taskbrew.orchestrator.event_bridge import EventBridgeClient, EventHub
+from taskbrew.orchestrator.event_bus import EventBus
+
+
+class _Recorder:
+    def __init__(self, bus: EventBus) -> None:
+        self.events: list[dict] = []
+        bus.subscribe("*", self._record)
+
+    async def _record(self, event: dict) -> None:
+        self.events.append(event)
+
+    def types(self) -> list[str]:
+        return [e["type"] for e in self.events]
+
+
+async def _until(predicate, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met"
+        await asyncio.sleep(0.01)
+
+
+async def _worker(
+    hub: EventHub, name: str, token: str | None = None, agents: list[str] | None = None,
+):
+    bus = EventBus()
+    instances = InstanceManager(db=None)
+    client = EventBridgeClient(
+        bus, instances, address=hub.address, token=token or hub.token, worker_id=name,
+        instances=agents,
+    )
+    await client.connect()
+    task = asyncio.create_task(client.run())
+    return bus, instances, client, task
+
+
+def test_deliver_does_not_forward():
+    bus = EventBus()
+    forwarded = []
+    bus.set_forwarder(forwarded.append)
+
+    async def _go():
+        await bus.emit("task.available", {"task_id": "T-1"})
+        bus.deliver({"type": "task.completed", "task_id": "T-2"})
+
+    asyncio.run(_go())
+    assert [e["type"] for e in forwarded] == ["task.available"]
+    assert [e["type"] for e in bus.get_history()] == ["task.available", "task.completed"]
+
+
+async def test_events_reach_every_other_process_once():
+    api_bus = EventBus()
+    api_instances = InstanceManager(db=None)
+    api_seen = _Recorder(api_bus)
+    hub = EventHub(api_bus, api_instances)
+    await hub.start()
+    bus1, _, client1, task1 = await _worker(hub, "worker-1")
+    bus2, _, client2, task2 = await _worker(hub, "worker-2")
+    seen1, seen2 = _Recorder(bus1), _Recorder(bus2)
+    try:
+        await _until(lambda: hub.workers == ["worker-1", "worker-2"])
+
+        await api_bus.emit("task.available", {"task_id": "T-1"})
+        await bus1.emit("task.completed", {"task_id": "T-2"})
+        await _until(lambda: "task.completed" in seen2.types() and len(seen1.events) == 2)
+        await asyncio.sleep(0.05)
+
+        assert api_seen.types() == ["task.available", "task.completed"]
+        # worker-1 sees its own event before the relayed one; no echoes.
+        assert sorted(seen1.types()) == ["task.available", "task.completed"]
+        assert seen2.types() == ["task.available", "task.completed"]
+        assert seen2.events[1] == {"type": "task.completed", "task_id": "T-2"}
+        stats = hub.stats()["workers"]
+        assert stats["worker-1"]["events_received"] == 1
+        assert client2.events_sent == 0
+    finally:
+        await hub.close()
+        await asyncio.wait_for(asyncio.gather(task1, task2), 2)
+        await client1.close()
+        await client2.close()
+
+
+async def test_pause_state_is_pushed_to_workers():
+    api_instances = InstanceManager(db=None)
+    api_instances.pause_all(["pm", "coder"])
+    hub = EventHub(EventBus(), api_instances)
+    await hub.start()
+    _, instances, client, task = await _worker(hub, "worker-1")
+    try:
+        await _until(lambda: instances.get_paused_roles() == ["coder", "pm"])
+        api_instances.resume_role("pm")
+        await _until(lambda: instances.get_paused_roles() == ["coder"])
+        api_instances.resume_all()
+        await _until(lambda: instances.get_paused_roles() == [])
+    finally:
+        await hub.close()
+        await asyncio.wait_for(task, 2)
+        await client.close()
+
+
+async def test_wrong_token_is_disconnected():
+    hub = EventHub(EventBus(), InstanceManager(db=None))
+    await hub.start()
+    try:
+        _, _, client, task = await _worker(hub, "intruder", token="not-the-token")
+        await asyncio.wait_for(task, 2)  # the hub hangs up
+        assert hub.workers == []
+        await client.close()
+    finally:
+        await hub.close()
+
+
+async def test_frames_that_are_not_objects_are_skipped():
+    api_bus = EventBus()
+    api_seen = _Recorder(api_bus)
+    hub = EventHub(api_bus, InstanceManager(db=None))
+    await hub.start()
+    bus, _, client, task = await _worker(hub, "worker-1")
+    seen = _Recorder(bus)
+    try:
+        await _until(lambda: hub.workers == ["worker-1"])
+        client._writer.write(b'[]\n1\n"x"\n')
+        hub._peers["worker-1"].writer.write(b'[]\nnull\n')
+        await bus.emit("task.completed", {"task_id": "T-1"})
+        await api_bus.emit("task.available", {"task_id": "T-2"})
+        await _until(lambda: sorted(api_seen.types()) == ["task.available", "task.completed"])
+        await _until(lambda: "task.available" in seen.types())
+        assert hub.workers == ["worker-1"] and not task.done()
+    finally:
+        await hub.close()
+        await asyncio.wait_for(task, 2)
+        await client.close()
+
+
+async def test_scaled_agents_go_to_the_least_loaded_worker():
+    hub = EventHub(EventBus(), InstanceManager(db=None))
+    await hub.start()
+    _, _, client1, task1 = await _worker(hub, "worker-1", agents=["pm-1", "coder-1"])
+    _, _, client2, task2 = await _worker(hub, "worker-2", agents=["coder-2"])
+    requests: dict[str, list[dict]] = {"worker-1": [], "worker-2": []}
+    for client in (client1, client2):
+        async def _record(message, name=client.worker_id):
+            requests[name].append(message)
+        client.on_command = _record
+    try:
+        await _until(lambda: hub.workers == ["worker-1", "worker-2"])
+        assert hub.spawn_agent("coder-auto-1", "coder") == "worker-2"
+        assert hub.spawn_agent("coder-auto-2", "coder") == "worker-1"
+        assert hub.stop_agent("coder-auto-1") is True
+        assert hub.stop_agent("coder-auto-9") is False
+        await _until(lambda: len(requests["worker-2"]) == 2)
+        assert requests["worker-2"] == [
+            {"kind": "spawn", "instance_id": "coder-auto-1", "role": "coder"},
+            {"kind": "stop", "instance_id": "coder-auto-1"},
+        ]
+        await _until(lambda: len(requests["worker-1"]) == 1)
+        assert hub.stats()["workers"]["worker-1"]["agents"] == 3
+    finally:
+        await hub.close()
+        await asyncio.wait_for(asyncio.gather(task1, task2), 2)
+        await client1.close()
+        await client2.close()
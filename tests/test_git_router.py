@@ -103,16 +103,17 @@ class TestGitBranches:
     @patch("taskbrew.dashboard.routers.git.asyncio.create_subprocess_exec")
     async def test_branches(self, mock_exec, app_client):
         mock_exec.return_value = _mock_process(
-            "* main    abc1234 Latest commit\n"
-            "  develop def5678 Dev commit\n"
-            "  feature 789abcd Feature work\n"
+            f"{'d' * 40}   refs/heads/develop\n"
+            f"{'f' * 40}   refs/heads/feature\n"
+            f"{'a' * 40} * refs/heads/main\n"
+            f"{'a' * 40}   refs/remotes/origin/main\n"
         )
         resp = await app_client["client"].get("/api/git/branches")
         assert resp.status_code == 200
         data = resp.json()
         assert data["current"] == "main"
         assert data["count"] == 3
-        assert data["branches"][0]["current"] is True
+        assert data["branches"][2] == {"name": "main", "current": True}
 
 
 class TestGitDiff:
@@ -0,0 +1,121 @@
+"""Tests for the shared GitService: cached refs, batched diffs, bounded concurrency."""
+
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import time
+
+import pytest
+
+from taskbrew.tools.git_service import GitService, get_git_service
+
+
+def _git(repo, *args):
+    return subprocess.run(
+        ["git", *args], cwd=str(repo), capture_output=True, text=True, check=True,
+    ).stdout.strip()
+
+
+def _commit(repo, name, text):
+    (repo / name).write_text(text)
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", f"add {name}")
+
+
+def _settle():
+    # Let ref timestamps age past the racy window so snapshots are cached.
+    time.sleep(0.15)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "config", "user.email", "test@test.com")
+    _git(repo, "config", "user.name", "Test")
+    _commit(repo, "README.md", "# Test\n")
+    for branch, lines in (("feature/a", "1\n2\n3\n"), ("feature/b", "x\n")):
+        _git(repo, "checkout", "-q", "-b", branch, "main")
+        _commit(repo, f"{branch.replace('/', '-')}.txt", lines)
+    _git(repo, "checkout", "-q", "main")
+    _settle()
+    return repo
+
+
+async def test_refs_cached_until_a_ref_moves(repo):
+    git = GitService(str(repo))
+    assert await git.branch_exists("feature/a")
+    assert not await git.branch_exists("nope")
+    assert await git.current_branch() == "main"
+    assert git.stats()["processes"] == 1
+
+    # A commit made outside the service (as an agent's CLI would) on a
+    # nested branch name is still picked up.
+    _git(repo, "checkout", "-q", "feature/a")
+    _commit(repo, "more.txt", "m\n")
+    _git(repo, "branch", "feature/new")
+    _settle()
+    assert await git.branch_exists("feature/new")
+    refs = await git.refs()
+    assert refs["refs/heads/feature/a"] == _git(repo, "rev-parse", "feature/a")
+    assert await git.current_branch() == "feature/a"
+    assert git.stats()["processes"] == 2
+
+
+async def test_diff_stats_batches_branches_and_memoises(repo):
+    git = GitService(str(repo))
+    stats = await git.diff_stats(["feature/a", "feature/b", "missing"], base="main")
+    assert stats == {
+        "feature/a": [(3, 0, "feature-a.txt")],
+        "feature/b": [(1, 0, "feature-b.txt")],
+    }
+    # for-each-ref + two merge-bases + one diff-tree for both branches
+    assert git.stats()["processes"] == 4
+
+    again = await git.diff_stats(["feature/a", "feature/b"], base="main")
+    assert again == stats
+    assert git.stats()["processes"] == 4
+    assert await git.diff_numstat("main", "feature/b") == [(1, 0, "feature-b.txt")]
+    assert git.stats()["processes"] == 4
+
+
+async def test_worktree_snapshot_and_mutations_invalidate(repo, tmp_path):
+    git = get_git_service(str(repo))
+    assert get_git_service(str(repo / ".")) is git
+    wt = tmp_path / "wt"
+    await git.run("worktree", "add", str(wt), "feature/b")
+    _settle()
+    assert await git.worktree_branch(str(wt)) == "feature/b"
+    before = git.stats()["processes"]
+    assert await git.worktree_branch(str(wt)) == "feature/b"
+    assert git.stats()["processes"] == before
+
+    await git.run("checkout", "-q", "--detach", cwd=str(wt))
+    assert await git.worktree_branch(str(wt)) is None
+
+
+async def test_concurrent_git_processes_are_bounded(monkeypatch, tmp_path):
+    running = 0
+    peak = 0
+
+    class _Proc:
+        returncode = 0
+
+        async def communicate(self, _input=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return b"", b""
+
+    async def fake_exec(*args, **kwargs):
+        return _Proc()
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    git = GitService(str(tmp_path), max_concurrency=2)
+    await asyncio.gather(*(git.exec("status") for _ in range(8)))
+    assert peak == 2
+    assert git.stats()["processes"] == 8
@@ -123,3 +123,17 @@ async def test_remove_instance(mgr: InstanceManager):
 
     result = await mgr.get_instance("coder-1")
     assert result is None
+
+
+async def test_role_performance_uses_stored_role(mgr: InstanceManager, db: Database):
+    """Usage rows are grouped on their stored role, including hyphenated roles."""
+    await db.record_task_usage("T-1", "security-reviewer-1", cost_usd=0.5)
+    await db.record_task_usage("T-2", "coder-auto-2", cost_usd=0.25)
+    await db.record_task_usage("T-3", "coder-1", cost_usd=0.25)
+    await db.record_task_usage("T-4", "pm", cost_usd=0.1)
+
+    rows = await mgr.get_role_performance()
+    by_role = {r["role"]: r for r in rows}
+    assert set(by_role) == {"security-reviewer", "coder", "pm"}
+    assert by_role["coder"]["tasks"] == 2
+    assert by_role["coder"]["total_cost"] == pytest.approx(0.5)
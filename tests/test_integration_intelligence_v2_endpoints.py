@@ -677,6 +677,40 @@ class TestAdvancedPlanningEndpoints:
         )
         assert resp.status_code == 200
 
+    async def test_critical_path_returns_schedule(self, client):
+        """GET /api/groups/{id}/critical-path schedules via task_dependencies."""
+        goal = await _create_task(client, "Critical path endpoint test")
+        group_id = goal["group_id"]
+
+        first = await client.post(
+            "/api/tasks",
+            json={
+                "group_id": group_id,
+                "title": "Design",
+                "assigned_to": "coder",
+                "assigned_by": "human",
+                "task_type": "implementation",
+            },
+        )
+        second = await client.post(
+            "/api/tasks",
+            json={
+                "group_id": group_id,
+                "title": "Build",
+                "assigned_to": "coder",
+                "assigned_by": "human",
+                "task_type": "implementation",
+                "blocked_by": [first.json()["id"]],
+            },
+        )
+
+        resp = await client.get(f"/api/groups/{group_id}/critical-path")
+        assert resp.status_code == 200
+        data = resp.json()
+        path = data["critical_path"]
+        assert path.index(first.json()["id"]) < path.index(second.json()["id"])
+        assert data["estimated_completion_at"] is not None
+
     async def test_plan_increments_returns_200(self, client):
         """POST /api/v2/planning/increments plans delivery increments."""
         resp = await client.post(
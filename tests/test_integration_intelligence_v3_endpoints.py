@@ -639,6 +639,29 @@ class TestVerificationEndpoints:
         )
         assert resp.status_code == 200
 
+    async def test_ingest_test_report(self, client):
+        """POST /api/v3/verification/test-reports parses and records a report."""
+        resp = await client.post(
+            "/api/v3/verification/test-reports",
+            json={"report": {"tests": [
+                {"nodeid": "t.py::test_a", "outcome": "passed"},
+                {"nodeid": "t.py::test_b", "outcome": "failed"},
+            ]}},
+        )
+        assert resp.status_code == 200
+        assert resp.json()["recorded"] == 2
+        resp = await client.post(
+            "/api/v3/verification/test-reports",
+            json={"report": "<not-xml", "format": "junit"},
+        )
+        assert resp.status_code == 400
+        for junk in ("[1]", {"tests": [1]}, {"tests": [{"nodeid": "t", "outcome": "passed", "call": 5}]}):
+            resp = await client.post(
+                "/api/v3/verification/test-reports",
+                json={"report": junk, "format": "pytest-json"},
+            )
+            assert resp.status_code == 400
+
     async def test_detect_flaky_returns_200(self, client):
         """GET /api/v3/verification/flaky-tests returns 200."""
         resp = await client.get("/api/v3/verification/flaky-tests")
@@ -142,6 +142,98 @@ async def test_build_schedule_empty_group(planner: AdvancedPlanningManager):
     assert result == []
 
 
+async def test_build_schedule_reads_task_dependencies(planner: AdvancedPlanningManager, db: Database):
+    """Edges in task_dependencies are honoured alongside depends_on."""
+    group = "GRP-deps"
+    t_a = await _create_task(db, group_id=group)
+    t_b = await _create_task(db, group_id=group)
+    await db.execute(
+        "INSERT INTO task_dependencies (task_id, blocked_by) VALUES (?, ?)",
+        (t_b, t_a),
+    )
+
+    result = await planner.build_schedule(group)
+    order_map = {s["task_id"]: s["scheduled_order"] for s in result}
+    assert order_map[t_a] == 0
+    assert order_map[t_b] == 1
+
+
+async def test_build_schedule_cycle_raises(planner: AdvancedPlanningManager, db: Database):
+    """A dependency cycle raises instead of emitting a broken schedule."""
+    group = "GRP-cycle"
+    t_a = await _create_task(db, group_id=group)
+    t_b = await _create_task(db, group_id=group, depends_on=t_a)
+    await db.execute("UPDATE tasks SET depends_on = ? WHERE id = ?", (t_b, t_a))
+
+    with pytest.raises(ValueError, match="Dependency cycle"):
+        await planner.build_schedule(group)
+
+
+async def test_critical_path_and_slack(planner: AdvancedPlanningManager, db: Database):
+    """The longest weighted chain is critical; the short branch has slack."""
+    group = "GRP-cpm"
+    t_a = await _create_task(db, group_id=group)
+    t_long = await _create_task(db, group_id=group, depends_on=t_a)
+    t_short = await _create_task(db, group_id=group, depends_on=t_a)
+    t_end = await _create_task(db, group_id=group, depends_on=f"{t_long},{t_short}")
+    now = _now_iso()
+    for tid, hours in ((t_a, 1.0), (t_long, 4.0), (t_short, 1.0), (t_end, 2.0)):
+        await db.execute(
+            "INSERT INTO deadline_estimates (id, task_id, estimated_hours, "
+            "based_on_samples, estimated_at) VALUES (?, ?, ?, 0, ?)",
+            (uuid.uuid4().hex[:12], tid, hours, now),
+        )
+
+    await planner.build_schedule(group)
+    result = await planner.get_critical_path(group)
+
+    assert result["critical_path"] == [t_a, t_long, t_end]
+    assert result["remaining_hours"] == pytest.approx(7.0)
+    slack = {t["task_id"]: t["slack_hours"] for t in result["tasks"]}
+    assert slack[t_short] == pytest.approx(3.0)
+    assert slack[t_long] == pytest.approx(0.0)
+
+    stored = await planner.get_schedule(group)
+    assert {r["task_id"] for r in stored if r["is_critical"]} == {t_a, t_long, t_end}
+
+
+async def test_mark_task_completed_updates_schedule(planner: AdvancedPlanningManager, db: Database):
+    """Completing a task re-times the cached graph and persists it."""
+    group = "GRP-inc"
+    t_a = await _create_task(db, group_id=group)
+    t_b = await _create_task(db, group_id=group, depends_on=t_a)
+    await planner.build_schedule(group)
+    before = await planner.get_critical_path(group)
+
+    update = await planner.mark_task_completed(t_a)
+    assert update["remaining_hours"] == pytest.approx(before["remaining_hours"] - 1.0)
+
+    stored = {r["task_id"]: r for r in await planner.get_schedule(group)}
+    assert stored[t_a]["estimated_hours"] == 0
+    assert stored[t_b]["earliest_start_hours"] == 0
+
+    assert await planner.mark_task_completed("TSK-unknown") is None
+
+
+async def test_build_schedule_large_chain(planner: AdvancedPlanningManager, db: Database):
+    """Long chains are levelled in a single pass (one level per link)."""
+    group = "GRP-long"
+    await _ensure_group(db, group)
+    now = _now_iso()
+    ids = [f"LONG-{i:04d}" for i in range(500)]
+    async with db.transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO tasks (id, title, status, created_at, group_id, depends_on) "
+            "VALUES (?, 'T', 'pending', ?, ?, ?)",
+            [(tid, now, group, ids[i - 1] if i else None) for i, tid in enumerate(ids)],
+        )
+
+    result = await planner.build_schedule(group)
+    order_map = {s["task_id"]: s["scheduled_order"] for s in result}
+    assert order_map[ids[-1]] == 499
+    assert all(s["is_critical"] for s in result)
+
+
 # ------------------------------------------------------------------
 # Feature 46: Resource-Aware Planning
 # ------------------------------------------------------------------
@@ -0,0 +1,158 @@
+"""Tests for offline embeddings, the vector index and hybrid search."""
+
+from __future__ import annotations
+
+import textwrap
+
+import pytest
+
+from taskbrew.intelligence import embeddings
+from taskbrew.intelligence.code_intel import CodeIntelligenceManager
+from taskbrew.intelligence.embeddings import (
+    EMBEDDING_DIM,
+    VectorIndex,
+    decode_embedding,
+    embed_text,
+    encode_embedding,
+    tokenize,
+)
+from taskbrew.orchestrator.database import Database
+
+DOCS = {
+    "avg": "calculate_average Calculate the average of a list of numbers",
+    "max": "find_maximum Find the maximum value in a list",
+    "login": "authenticateUser Check the password and start a login session",
+    "yaml": "parse_config Parse YAML configuration file",
+    "http": "fetch_url Download a page over HTTP with retries",
+}
+
+
+@pytest.fixture
+async def db():
+    database = Database(":memory:")
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+def _index(**kwargs) -> VectorIndex:
+    index = VectorIndex(**kwargs)
+    for key, text in DOCS.items():
+        index.add(key, embed_text(text))
+    return index
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("authenticateUser parse_config HTTPServer of") == [
+        "authenticate", "user", "parse", "config", "http", "server",
+    ]
+
+
+def test_embedding_blob_round_trip():
+    vector = embed_text("calculate_average values")
+    blob = encode_embedding(vector)
+    assert len(blob) == EMBEDDING_DIM * 4
+    assert list(decode_embedding(blob)) == pytest.approx(vector)
+    assert decode_embedding(blob[:-4]) is None
+    assert decode_embedding(None) is None
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_vector_index_ranks_by_meaning(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(embeddings, "_HAS_NUMPY", False)
+    index = _index()
+
+    hits = index.search(embed_text("compute the mean average"), k=3)
+    assert hits[0][0] == "avg"
+    assert hits[0][1] > hits[-1][1] > 0
+
+    # Partial words still match through character trigrams.
+    assert index.search(embed_text("auth"), k=1)[0][0] == "login"
+
+    index.remove("avg")
+    assert all(key != "avg" for key, _ in index.search(embed_text("average"), k=5))
+
+
+def test_python_scores_match_numpy_after_incremental_adds(monkeypatch):
+    pytest.importorskip("numpy")
+    index = _index()
+    index.search(embed_text("average"), k=5)
+    index.add("mean", embed_text("compute_mean Return the arithmetic mean"))
+    index.add("avg", embed_text("running_average Update a running average"))
+    query = embed_text("compute the mean average")
+    expected = index.search(query, k=5)
+
+    monkeypatch.setattr(embeddings, "_HAS_NUMPY", False)
+    hits = index.search(query, k=5)
+    assert [key for key, _ in hits] == [key for key, _ in expected]
+    assert [score for _, score in hits] == pytest.approx(
+        [score for _, score in expected], rel=1e-4,
+    )
+
+
+def test_ivf_partitions_large_indexes():
+    pytest.importorskip("numpy")
+    index = VectorIndex(ivf_threshold=50, nprobe=4)
+    for i in range(200):
+        index.add(f"gen{i}", embed_text(f"handler_{i} process item {i} queue worker"))
+    for key, text in DOCS.items():
+        index.add(key, embed_text(text))
+
+    hits = index.search(embed_text("parse yaml configuration"), k=3)
+    assert index._centroids is not None
+    assert hits[0][0] == "yaml"
+
+
+async def test_search_by_intent_is_semantic(db: Database, tmp_path):
+    src = tmp_path / "math_ops.py"
+    src.write_text(textwrap.dedent('''\
+        def calculate_average(values):
+            """Calculate the average of a list of numbers."""
+            return sum(values) / len(values)
+
+        def find_maximum(values):
+            """Find the maximum value in a list."""
+            return max(values)
+    '''))
+    intel = CodeIntelligenceManager(db)
+    await intel.index_file(str(src))
+
+    rows = await db.execute_fetchall("SELECT embedding FROM code_embeddings")
+    assert rows and all(len(r["embedding"]) == EMBEDDING_DIM * 4 for r in rows)
+
+    # "compute" appears nowhere, so an AND-ed keyword scan finds nothing.
+    results = await intel.search_by_intent("compute average")
+    assert results[0]["symbol_name"] == "calculate_average"
+    assert "embedding" not in results[0]
+    assert results == sorted(results, key=lambda r: r["score"], reverse=True)
+
+
+async def test_rows_without_embeddings_are_backfilled(db: Database):
+    await db.execute(
+        "INSERT INTO code_embeddings "
+        "(id, file_path, symbol_name, symbol_type, embedding, description, last_updated) "
+        "VALUES ('CE-legacy', 'a.py', 'send_email', 'function', NULL, "
+        "'Send an email notification', '2026-01-01')",
+    )
+    intel = CodeIntelligenceManager(db)
+
+    results = await intel.search_by_intent("email notification")
+    assert [r["id"] for r in results] == ["CE-legacy"]
+    row = await db.execute_fetchone(
+        "SELECT embedding FROM code_embeddings WHERE id = 'CE-legacy'"
+    )
+    assert row["embedding"] is not None
+
+
+async def test_search_sees_rows_written_by_another_process(db: Database, tmp_path):
+    src = tmp_path / "mail.py"
+    src.write_text('def send_email(to):\n    """Send an email notification."""\n')
+    reader, writer = CodeIntelligenceManager(db), CodeIntelligenceManager(db)
+    assert await reader.search_by_intent("email notification") == []
+
+    await writer.index_file(str(src))
+    results = await reader.search_by_intent("email notification")
+    assert [r["symbol_name"] for r in results] == ["send_email"]
@@ -260,3 +260,45 @@ async def test_recall_empty_does_not_error(memory: MemoryManager):
     """Regression: recall() with no results should not error on batch update."""
     results = await memory.recall("coder", "nonexistent xyz abc")
     assert results == []
+
+
+async def test_recall_cache_serves_repeats_and_invalidates_on_write(db: Database):
+    mm = MemoryManager(db, recall_cache_ttl=60.0)
+    await mm.store_lesson("coder", "Use fixtures", "pytest fixtures")
+    first = await mm.recall("coder", "fixtures")
+    second = await mm.recall("coder", "fixtures")
+    assert second == first
+
+    row = await db.execute_fetchone("SELECT access_count FROM agent_memories")
+    assert row["access_count"] == 1  # the cached repeat did not touch the DB
+
+    await mm.store_lesson("coder", "More fixtures", "conftest fixtures")
+    assert len(await mm.recall("coder", "fixtures")) == 2
+
+    await mm.delete_memory(first[0]["id"])
+    assert len(await mm.recall("coder", "fixtures")) == 1
+
+
+async def test_recall_cache_disabled_by_default(memory: MemoryManager, db: Database):
+    await memory.store_lesson("coder", "Use fixtures", "pytest fixtures")
+    await memory.recall("coder", "fixtures")
+    await memory.recall("coder", "fixtures")
+    row = await db.execute_fetchone("SELECT access_count FROM agent_memories")
+    assert row["access_count"] == 2
+
+
+async def test_decay_scores_updates_stale_memories_in_one_pass(memory: MemoryManager, db: Database):
+    """decay_scores decays only stale memories, with a 0.1 floor."""
+    for title in ("stale", "floor", "fresh"):
+        await memory.store_memory("coder", "lesson", title, "content")
+    await db.execute(
+        "UPDATE agent_memories SET last_accessed = '2000-01-01T00:00:00+00:00', "
+        "relevance_score = CASE title WHEN 'floor' THEN 0.105 ELSE 1.0 END "
+        "WHERE title != 'fresh'"
+    )
+
+    assert await memory.decay_scores(age_days=30) == 2
+    rows = await db.execute_fetchall("SELECT title, relevance_score FROM agent_memories")
+    assert {r["title"]: r["relevance_score"] for r in rows} == {
+        "stale": 0.9, "floor": 0.1, "fresh": 1.0,
+    }
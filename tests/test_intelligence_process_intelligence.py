@@ -108,6 +108,25 @@ async def test_refresh_scores(manager):
     assert result["updated"] == 2
 
 
+async def test_refresh_scores_is_one_statement(manager):
+    """refresh_scores rewrites every row with a single UPDATE."""
+    db = manager._db
+    await manager.score_file("a.py", 10, 5.0, 50)
+    await manager.score_file("over.py", 4, 2.0, 150)
+    await manager.score_file("under.py", 3, 1.5, -20)
+    await db.execute("UPDATE risk_scores SET risk_score = 0")
+
+    seen: list[str] = []
+    await db._conn.set_trace_callback(seen.append)
+    result = await manager.refresh_scores()
+    await db._conn.set_trace_callback(None)
+
+    assert result["updated"] == 3
+    assert [s for s in seen if s.lstrip().upper().startswith("UPDATE")] == [seen[1]]
+    scores = {r["file_path"]: r["risk_score"] for r in await manager.get_heat_map()}
+    assert scores == {"a.py": 25.0, "over.py": 0.0, "under.py": 4.5}
+
+
 # ------------------------------------------------------------------
 # Feature 41: Process Bottleneck Miner
 # ------------------------------------------------------------------
@@ -190,6 +190,27 @@ async def test_predict_regression_risk_init_and_test(tqm: TestingQualityManager,
     assert result["risk_score"] >= 0.3  # 0.2 for init + 0.1 for test
 
 
+async def test_predict_regression_risk_long_file(tqm: TestingQualityManager, project_dir):
+    """Files over the line threshold add risk; invalid paths are skipped."""
+    (project_dir / "src" / "big.py").write_text("x = 1\n" * 600)
+    (project_dir / "src" / "small.py").write_text("x = 1\n")
+
+    result = await tqm.predict_regression_risk(
+        ["src/big.py", "src/small.py", "../outside.py"]
+    )
+    assert result["risk_factors"] == ["src/big.py has 601 lines (>500)"]
+    assert result["risk_score"] == 0.2
+
+
+async def test_file_analyses_report_syntax_errors(tqm: TestingQualityManager, project_dir):
+    """Unparseable files yield no skeletons/suggestions and a mutation error."""
+    (project_dir / "src" / "broken.py").write_text("def broken(:\n")
+    assert await tqm.generate_test_skeletons("src/broken.py") == []
+    assert await tqm.suggest_property_tests("src/broken.py") == []
+    result = await tqm.run_mutation_analysis("src/broken.py")
+    assert "SyntaxError" in result["error"]
+
+
 # ------------------------------------------------------------------
 # Feature 31: Review Checklist Generation
 # ------------------------------------------------------------------
@@ -276,6 +297,27 @@ async def test_record_test_timing_running_avg(tqm: TestingQualityManager):
     assert result["avg_duration_ms"] == 150.0  # (100 + 200) / 2
 
 
+async def test_record_test_timings_matches_sequential(tqm: TestingQualityManager):
+    """A batch folds samples exactly as one call per sample would."""
+    samples = [("test_a", 100.0), ("test_b", 10.0), ("test_a", 250.0),
+               ("test_a", 130.0), ("test_b", 12.5)]
+    for name, ms in samples:
+        await tqm.record_test_timing(f"seq_{name}", ms)
+    batch = await tqm.record_test_timings(
+        [{"test_name": f"bulk_{name}", "duration_ms": ms} for name, ms in samples]
+    )
+    assert [b["test_name"] for b in batch] == ["bulk_test_a", "bulk_test_b"]
+    for b in batch:
+        row = await tqm._db.execute_fetchone(
+            "SELECT avg_duration_ms, std_deviation_ms, sample_count "
+            "FROM perf_baselines WHERE test_name = ?",
+            (b["test_name"].replace("bulk_", "seq_"),),
+        )
+        assert (b["avg_duration_ms"], b["std_deviation_ms"], b["sample_count"]) == (
+            row["avg_duration_ms"], row["std_deviation_ms"], row["sample_count"],
+        )
+
+
 async def test_detect_perf_regressions(tqm: TestingQualityManager):
     """High variance relative to mean triggers a regression flag."""
     # Record a stable test
@@ -5,10 +5,23 @@ from __future__ import annotations
 import json
 import uuid
 from datetime import datetime, timezone
+from types import SimpleNamespace
 
 import pytest
-
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+from taskbrew.agents.instance_manager import InstanceManager
+from taskbrew.agents.provider import _build_mcp_dict
+from taskbrew.config_loader import MCPServerConfig
+from taskbrew.dashboard.app import create_app
+from taskbrew.dashboard.routers import _deps
+from taskbrew.dashboard.routers.intelligence import router as intelligence_router
+from taskbrew.intelligence.impact import ImpactAnalyzer
 from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.event_bus import EventBus
+from taskbrew.orchestrator.task_board import TaskBoard
+from taskbrew.tools.intelligence_tools import build_intelligence_tools_server
 from taskbrew.intelligence.memory import MemoryManager
 from taskbrew.intelligence.quality import QualityManager
 from taskbrew.intelligence.tool_router import ToolRouter, TOOL_PROFILES, ROLE_TOOLS
@@ -231,3 +244,109 @@ async def test_tool_profiles_constants():
         assert isinstance(role, str)
         assert isinstance(tools, list)
         assert len(tools) > 0
+
+
+# ------------------------------------------------------------------
+# MCP proxy tests
+# ------------------------------------------------------------------
+
+
+@pytest.fixture
+async def proxy(db: Database, tmp_path, monkeypatch):
+    """intelligence-tools server wired to the real dashboard routes."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("import os\n")
+    orch = SimpleNamespace(
+        project_dir=tmp_path,
+        memory_manager=MemoryManager(db, recall_cache_ttl=60.0),
+        impact_analyzer=ImpactAnalyzer(db, project_dir=str(tmp_path)),
+        quality_manager=QualityManager(db),
+    )
+    monkeypatch.setattr(_deps, "_orchestrator", orch)
+    monkeypatch.delenv("TASKBREW_ALLOWED_TOOLS", raising=False)
+    app = FastAPI()
+    app.include_router(intelligence_router)
+    server = build_intelligence_tools_server(
+        api_url="http://dashboard", transport=ASGITransport(app=app),
+    )
+    return server, orch
+
+
+async def _call(server, name, args):
+    result = await server.call_tool(name, args)
+    content = result[0] if isinstance(result, tuple) else result
+    return content[0].text
+
+
+async def test_proxy_memory_tools_use_shared_manager(proxy):
+    server, orch = proxy
+    stored = json.loads(await _call(server, "store_lesson", {
+        "agent_role": "coder", "title": "Use fixtures", "content": "pytest fixtures",
+    }))
+    assert stored["stored"] is True
+
+    recalled = json.loads(await _call(server, "recall_memory", {
+        "agent_role": "coder", "query": "fixtures",
+    }))
+    assert [m["title"] for m in recalled] == ["Use fixtures"]
+    assert orch.memory_manager._recall_cache
+
+    ctx = json.loads(await _call(server, "get_project_context", {"agent_role": "coder"}))
+    assert ctx == {"context": ""}
+
+
+async def test_proxy_impact_and_confidence(proxy, db: Database):
+    server, _ = proxy
+    impact = json.loads(await _call(server, "check_impact", {
+        "file_paths": "src/a.py, ../../etc/passwd",
+    }))
+    assert impact["src/a.py"]["imports"] == ["os"]
+    assert "error" in impact["../../etc/passwd"]
+
+    task_id = await _create_task(db)
+    conf = json.loads(await _call(server, "report_confidence", {
+        "task_id": task_id, "agent_role": "coder", "output_text": "All tests pass.",
+    }))
+    assert conf["task_id"] == task_id
+    assert conf["confidence"] >= 0.7
+
+
+async def test_proxy_reports_connection_failure(monkeypatch):
+    monkeypatch.delenv("TASKBREW_ALLOWED_TOOLS", raising=False)
+    server = build_intelligence_tools_server(api_url="http://127.0.0.1:9")
+    text = await _call(server, "recall_memory", {"agent_role": "coder", "query": "x"})
+    assert text.startswith("Error recalling memories (connection failed")
+
+
+async def test_proxy_authenticates_with_agent_token(db: Database, tmp_path, monkeypatch):
+    """With auth on, builtin servers get a token the dashboard accepts."""
+    monkeypatch.setenv("AUTH_ENABLED", "true")
+    monkeypatch.delenv("TASKBREW_ALLOWED_TOOLS", raising=False)
+    app = create_app(
+        event_bus=EventBus(),
+        task_board=TaskBoard(db),
+        instance_manager=InstanceManager(db),
+    )
+    orch = SimpleNamespace(
+        project_dir=tmp_path,
+        memory_manager=MemoryManager(db),
+        impact_analyzer=ImpactAnalyzer(db, project_dir=str(tmp_path)),
+        quality_manager=QualityManager(db),
+    )
+    monkeypatch.setattr(_deps, "_orchestrator", orch)
+    args = {"agent_role": "coder", "query": "x"}
+
+    monkeypatch.delenv("TASKBREW_API_TOKEN", raising=False)
+    server = build_intelligence_tools_server(
+        api_url="http://dashboard", transport=ASGITransport(app=app),
+    )
+    assert "HTTP 401" in await _call(server, "recall_memory", args)
+
+    env = _build_mcp_dict({"intelligence-tools": MCPServerConfig(builtin=True)})[
+        "intelligence-tools"
+    ]["env"]
+    monkeypatch.setenv("TASKBREW_API_TOKEN", env["TASKBREW_API_TOKEN"])
+    server = build_intelligence_tools_server(
+        api_url="http://dashboard", transport=ASGITransport(app=app),
+    )
+    assert json.loads(await _call(server, "recall_memory", args)) == []
@@ -6,7 +6,7 @@ from __future__ import annotations
 import pytest
 
 from taskbrew.orchestrator.database import Database
-from taskbrew.intelligence.verification import VerificationManager
+from taskbrew.intelligence.verification import VerificationManager, parse_test_report
 
 
 # ------------------------------------------------------------------
@@ -177,6 +177,88 @@ async def test_quarantine_test(manager):
     assert not any(f["test_name"] == "test_broken" for f in flaky)
 
 
+_JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="4">
+  <testcase classname="tests.test_a" name="test_ok" time="0.012"/>
+  <testcase classname="tests.test_a" name="test_bad" time="0.5">
+    <failure message="assert 1 == 2">trace</failure>
+  </testcase>
+  <testcase classname="tests.test_b" name="test_err" time="0.001"><error/></testcase>
+  <testcase classname="tests.test_b" name="test_skip" time="0"><skipped/></testcase>
+</testsuite></testsuites>"""
+
+
+async def test_ingest_junit_report_in_one_transaction(manager, monkeypatch):
+    """A JUnit report lands as one transaction and updates test_stats."""
+    calls = []
+    original = manager._db.transaction
+
+    def _spy():
+        calls.append(1)
+        return original()
+
+    monkeypatch.setattr(manager._db, "transaction", _spy)
+    summary = await manager.ingest_report(_JUNIT, run_id="R1")
+    assert summary == {"run_id": "R1", "recorded": 3, "passed": 1, "failed": 2}
+    assert len(calls) == 1
+
+    runs = await manager._db.execute_fetchall(
+        "SELECT test_name, passed, duration_ms FROM test_runs WHERE run_id = 'R1' "
+        "ORDER BY test_name"
+    )
+    assert [(r["test_name"], r["passed"], r["duration_ms"]) for r in runs] == [
+        ("tests.test_a::test_bad", 0, 500),
+        ("tests.test_a::test_ok", 1, 12),
+        ("tests.test_b::test_err", 0, 1),
+    ]
+    stats = await manager.get_test_stats("tests.test_a::test_bad")
+    assert stats["total_runs"] == 1 and stats["failures"] == 1
+    assert stats["recent_outcomes"] == 1
+
+
+def test_parse_rejects_dtds_and_malformed_reports():
+    """Entity declarations and junk pytest JSON raise ValueError."""
+    bomb = '<?xml version="1.0"?><!DOCTYPE t [<!ENTITY a "aaaa">]><testsuite>&a;</testsuite>'
+    with pytest.raises(ValueError, match="DOCTYPE"):
+        parse_test_report(bomb, "junit")
+    for junk in ([], {"tests": ["x"]}, {"tests": [{"nodeid": "t", "outcome": "passed", "call": 1}]}):
+        with pytest.raises(ValueError):
+            parse_test_report(junk, "pytest-json")
+
+
+async def test_ingest_pytest_json_and_streaming_stats(manager):
+    """Repeated pytest JSON reports fold into the running aggregates."""
+    for i in range(5):
+        report = {"tests": [
+            {"nodeid": "t.py::test_flaky", "outcome": "failed" if i == 3 else "passed",
+             "setup": {"duration": 0.001}, "call": {"duration": 0.1},
+             "teardown": {"duration": 0.001}},
+            {"nodeid": "t.py::test_xfail", "outcome": "xfailed"},
+        ]}
+        await manager.ingest_report(report)
+
+    stats = await manager.get_test_stats("t.py::test_flaky")
+    assert stats["total_runs"] == 5
+    assert stats["failures"] == 1
+    # Newest run is bit 0: the failure was the second most recent run.
+    assert stats["recent_outcomes"] == 0b10
+    assert stats["recent_count"] == 5
+    assert stats["ewma_duration_ms"] == pytest.approx(102.0)
+    assert await manager.get_test_stats("t.py::test_xfail") is None
+
+    flaky = await manager.detect_flaky(min_runs=5, flaky_threshold=0.1)
+    assert flaky[0]["test_name"] == "t.py::test_flaky"
+    assert flaky[0]["failure_rate"] == 0.2
+    assert flaky[0]["recent_failures"] == 1
+
+
+async def test_ingest_report_rejects_garbage(manager):
+    with pytest.raises(ValueError):
+        await manager.ingest_report("<testsuite>", fmt="junit")
+    with pytest.raises(ValueError):
+        await manager.ingest_report({"summary": {}})
+
+
 # ------------------------------------------------------------------
 # Feature 36: Behavioral Spec Miner
 # ------------------------------------------------------------------
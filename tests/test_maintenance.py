@@ -0,0 +1,71 @@
+"""Tests for the background MaintenanceRunner."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from taskbrew.orchestrator.maintenance import MaintenanceRunner
+from taskbrew.orchestrator.tracing import get_tracer
+
+
+async def test_tick_runs_only_due_jobs_and_records_metrics():
+    runner = MaintenanceRunner(tick=3600)
+    calls: list[str] = []
+
+    async def _refresh():
+        calls.append("refresh")
+        return {"updated": 3}
+
+    async def _cluster():
+        calls.append("cluster")
+        return [{"cluster_name": "a"}, {"cluster_name": "b"}]
+
+    async def _manual():
+        calls.append("manual")
+
+    runner.register("refresh", _refresh, 60, initial_delay=0)
+    runner.register("cluster", _cluster, 60, initial_delay=0)
+    runner.register("later", _refresh, 60)
+    runner.register("manual", _manual, 0)
+
+    await runner.tick()
+    await runner.tick()  # nothing is due again for another minute
+    assert calls == ["refresh", "cluster"]
+
+    jobs = {j["name"]: j for j in runner.stats()["jobs"]}
+    assert jobs["refresh"]["runs"] == 1
+    assert jobs["refresh"]["last_result"] == {"updated": 3}
+    assert jobs["cluster"]["last_result"] == {"items": 2}
+    assert jobs["later"]["runs"] == 0
+    assert jobs["refresh"]["next_due_in_seconds"] > 50
+
+    result = await runner.run_job("manual")
+    assert result["runs"] == 1 and calls[-1] == "manual"
+    stages = {s["stage"] for s in get_tracer().snapshot()["stages"]}
+    assert {"maintenance.refresh", "maintenance.cluster"} <= stages
+    with pytest.raises(KeyError):
+        await runner.run_job("missing")
+
+
+async def test_failed_job_is_recorded_and_rescheduled():
+    runner = MaintenanceRunner(tick=3600)
+
+    async def _boom():
+        raise RuntimeError("disk full")
+
+    runner.register("boom", _boom, 60, initial_delay=0)
+    await runner.tick()
+    job = runner.stats()["jobs"][0]
+    assert job["failures"] == 1 and job["runs"] == 1
+    assert job["last_error"] == "RuntimeError: disk full"
+    assert job["next_due_in_seconds"] > 50
+
+
+async def test_stop_returns_without_waiting_out_tick():
+    runner = MaintenanceRunner(tick=3600)
+    task = asyncio.create_task(runner.run())
+    await asyncio.sleep(0)
+    runner.stop()
+    await asyncio.wait_for(task, timeout=1)
@@ -7,7 +7,7 @@ from unittest.mock import patch
 import pytest
 
 from taskbrew.orchestrator.database import Database
-from taskbrew.orchestrator.migration import MigrationManager, MIGRATIONS
+from taskbrew.orchestrator.migration import MigrationManager, MIGRATIONS, _split_sql_statements
 
 
 # ------------------------------------------------------------------
@@ -71,3 +71,38 @@ async def test_apply_pending(migration_mgr: MigrationManager, db: Database):
     # Verify the test table actually exists
     rows = await db.execute_fetchall("SELECT * FROM test_migration")
     assert rows == []  # Empty table but it exists (no error)
+
+
+async def test_usage_role_backfill_matches_record_task_usage(db: Database):
+    """Migration 36 derives orphaned rows' roles by the runtime rule."""
+    agents = ["code-reviewer-auto-2", "coder-1", "pm"]
+    for agent_id in agents:
+        await db.execute(
+            "INSERT INTO task_usage (task_id, agent_id, role, recorded_at) "
+            "VALUES ('T-gone', ?, NULL, '2026-01-01')",
+            (agent_id,),
+        )
+    (backfill,) = [m for m in MIGRATIONS if m[0] == 36]
+    with patch("taskbrew.orchestrator.migration.MIGRATIONS", [(999, *backfill[1:])]):
+        await MigrationManager(db).apply_pending()
+
+    roles = await db.execute_fetchall("SELECT role FROM task_usage ORDER BY id")
+    assert [r["role"] for r in roles] == ["code-reviewer", "coder", "pm"]
+
+
+def test_split_keeps_trigger_bodies_whole():
+    """CREATE TRIGGER ... BEGIN ...; ...; END is one statement."""
+    sql = """
+        CREATE TABLE t (id INTEGER); -- a comment; with a semicolon
+        CREATE TRIGGER IF NOT EXISTS trg AFTER INSERT ON t
+        BEGIN
+            UPDATE t SET id = id + 1;
+            DELETE FROM t WHERE id > 10;
+        END;
+        CREATE INDEX i ON t(id);
+    """
+    statements = _split_sql_statements(sql)
+    assert len(statements) == 3
+    assert statements[1].startswith("CREATE TRIGGER")
+    assert statements[1].endswith("END")
+    assert statements[1].count(";") == 2
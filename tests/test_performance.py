@@ -347,6 +347,75 @@ class TestMemoryUsage:
         assert last_event["index"] == EventBus.MAX_HISTORY + 499
 
 
+# ------------------------------------------------------------------
+# Code intelligence indexing
+# ------------------------------------------------------------------
+
+
+_SRC_ROOT = Path(__file__).resolve().parent.parent / "src" / "taskbrew"
+
+
+class TestCodeIntelPerformance:
+    """Benchmarks for AST indexing over the project's own source tree."""
+
+    async def test_index_src_tree_within_time_limit(self, db: Database):
+        """Indexing every module under src/taskbrew completes within 30 seconds."""
+        from taskbrew.intelligence.analysis_engine import AnalysisEngine
+        from taskbrew.intelligence.code_intel import CodeIntelligenceManager
+
+        py_files = sorted(_SRC_ROOT.rglob("*.py"))
+        assert len(py_files) > 50
+
+        engine = AnalysisEngine()  # cold cache: every file is parsed
+        intel = CodeIntelligenceManager(db, engine=engine)
+        start = time.monotonic()
+        total = 0
+        for py_file in py_files:
+            total += await intel.index_file(str(py_file))
+        elapsed = time.monotonic() - start
+        engine.close()
+
+        rows = await db.execute_fetchone("SELECT COUNT(*) AS n FROM code_embeddings")
+        assert total > 1000
+        assert rows["n"] > 0
+        assert elapsed < 30.0, (
+            f"Indexing {len(py_files)} files ({total} symbols) took {elapsed:.2f}s "
+            "(limit: 30s)"
+        )
+
+    async def test_index_large_generated_file_is_linear(self, db: Database, tmp_path: Path):
+        """A 4000-function generated module indexes within 5 seconds.
+
+        With a per-node parent re-walk this was quadratic in the node
+        count and took tens of seconds.
+        """
+        from taskbrew.intelligence.analysis_engine import AnalysisEngine
+        from taskbrew.intelligence.code_intel import CodeIntelligenceManager
+
+        generated = tmp_path / "generated.py"
+        generated.write_text("".join(
+            f"def handler_{i}(value):\n    return value + {i}\n\n"
+            for i in range(4000)
+        ))
+
+        engine = AnalysisEngine()
+        intel = CodeIntelligenceManager(db, engine=engine)
+        start = time.monotonic()
+        count = await intel.index_file(str(generated))
+        # Re-indexing updates every row in one batch.
+        count_again = await intel.index_file(str(generated))
+        elapsed = time.monotonic() - start
+        engine.close()
+
+        assert count == count_again == 4000
+        rows = await db.execute_fetchone(
+            "SELECT COUNT(*) AS n FROM code_embeddings WHERE file_path = ?",
+            (str(generated),),
+        )
+        assert rows["n"] == 4000
+        assert elapsed < 5.0, f"Indexing 4000 functions took {elapsed:.2f}s (limit: 5s)"
+
+
 # ------------------------------------------------------------------
 # WebSocket / EventBus performance
 # ------------------------------------------------------------------
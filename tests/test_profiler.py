@@ -0,0 +1,103 @@
+"""Tests for the sampling profiler and the event-loop stall detector."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from taskbrew.orchestrator import profiler
+from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.event_bus import EventBus
+from taskbrew.orchestrator.task_board import TaskBoard
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def _waiting_on_something():
+    await asyncio.sleep(10)
+
+
+async def test_profile_sees_blocked_loop_and_waiting_tasks():
+    waiter = asyncio.create_task(_waiting_on_something())
+
+    async def _blocker():
+        await asyncio.sleep(0.05)
+        _block_the_loop(0.15)
+
+    blocker = asyncio.create_task(_blocker())
+    profile = await profiler.sample_profile(0.3, interval=0.005)
+    await blocker
+    waiter.cancel()
+
+    assert profile["thread_samples"] > 0 and profile["task_samples"] > 0
+    stacks = profile["stacks"]
+    blocked = sum(
+        n for s, n in stacks.items()
+        if s.startswith("thread:event-loop;") and "_block_the_loop" in s
+    )
+    assert blocked >= 5
+    assert any(
+        s.startswith("asyncio;") and "_waiting_on_something" in s for s in stacks
+    )
+    text = profiler.collapsed(profile)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in text.splitlines())
+
+
+async def test_profile_rejects_concurrent_and_out_of_range_requests():
+    first = asyncio.create_task(profiler.sample_profile(0.1))
+    await asyncio.sleep(0.01)
+    with pytest.raises(profiler.ProfilerBusyError):
+        await profiler.sample_profile(0.1)
+    await first
+    with pytest.raises(ValueError):
+        await profiler.sample_profile(profiler.MAX_PROFILE_SECONDS + 1)
+
+
+async def test_stall_detector_logs_blocking_stack(caplog):
+    detector = profiler.LoopStallDetector(threshold=0.05)
+    detector.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="taskbrew.orchestrator.profiler"):
+            _block_the_loop(0.25)
+            await asyncio.sleep(0.1)
+    finally:
+        detector.stop()
+
+    assert detector.stalls == 1
+    record = detector.recent()[0]
+    assert record["blocked_ms"] >= 100
+    assert any("_block_the_loop" in line for line in record["stack"])
+    messages = [r.getMessage() for r in caplog.records]
+    assert any("_block_the_loop" in m for m in messages)
+    assert any("unblocked" in m for m in messages)
+
+
+async def test_debug_endpoints(tmp_path):
+    db = Database(str(tmp_path / "t.db"))
+    await db.initialize()
+    from taskbrew.dashboard.app import create_app
+
+    app = create_app(event_bus=EventBus(), task_board=TaskBoard(db))
+    profiler.start_stall_detector(500)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            resp = await client.get("/api/debug/profile?seconds=0.2&format=collapsed")
+            assert resp.status_code == 200
+            assert "thread:event-loop;" in resp.text
+
+            resp = await client.get("/api/debug/profile?seconds=600")
+            assert resp.status_code == 422
+
+            resp = await client.get("/api/debug/stalls")
+            assert resp.json()["enabled"] is True
+            assert resp.json()["threshold_ms"] == 500
+    finally:
+        profiler.stop_stall_detector()
+        await db.close()
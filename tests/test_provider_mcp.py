@@ -17,6 +17,22 @@ def test_build_mcp_dict_builtin():
     assert "taskbrew.tools.task_tools" in result["task-tools"]["args"]
 
 
+def test_build_mcp_dict_builtin_gets_agent_token():
+    """Built-in servers call the API, so they get its URL and the agent token."""
+    from taskbrew.agents.provider import _build_mcp_dict
+    from taskbrew.auth import agent_api_token
+    servers = {
+        "task-tools": MCPServerConfig(builtin=True),
+        "intelligence-tools": MCPServerConfig(builtin=True),
+    }
+    result = _build_mcp_dict(servers, api_url="http://localhost:8420")
+    for name in servers:
+        assert result[name]["env"] == {
+            "TASKBREW_API_URL": "http://localhost:8420",
+            "TASKBREW_API_TOKEN": agent_api_token(),
+        }
+
+
 def test_build_mcp_dict_custom():
     """Custom MCP servers should use command/args/env from config."""
     from taskbrew.agents.provider import _build_mcp_dict
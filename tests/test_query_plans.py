@@ -0,0 +1,46 @@
+"""Regression tests for the EXPLAIN QUERY PLAN audit harness."""
+
+from __future__ import annotations
+
+from taskbrew.orchestrator.query_plans import (
+    QUERY_SHAPES,
+    QueryShape,
+    audit_query_plans,
+    classify_plan,
+)
+
+
+def test_classify_plan_flags_table_scans_and_temp_btrees():
+    assert classify_plan([
+        "SCAN task_usage",
+        "SCAN u",
+        "SCAN tasks USING COVERING INDEX idx_tasks_completed",
+        "SEARCH events USING INDEX idx_events_task (task_id=?)",
+        "USE TEMP B-TREE FOR GROUP BY",
+        "USE TEMP B-TREE FOR ORDER BY",
+    ]) == [
+        "full_scan:task_usage",
+        "full_scan:u",
+        "temp_btree:GROUP BY",
+        "temp_btree:ORDER BY",
+    ]
+
+
+async def test_hot_queries_use_indexes():
+    reports = await audit_query_plans(tasks=2000)
+    assert len(reports) == len(QUERY_SHAPES)
+    bad = {
+        r.shape.name: (r.error or r.unexpected, r.plan)
+        for r in reports if not r.ok
+    }
+    assert bad == {}
+
+
+async def test_invalid_shape_is_reported_not_raised():
+    shape = QueryShape(
+        "broken", "test",
+        "SELECT * FROM task_usage ORDER BY created_at",
+    )
+    [report] = await audit_query_plans(shapes=[shape], tasks=10)
+    assert not report.ok
+    assert "created_at" in report.error
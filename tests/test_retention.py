@@ -0,0 +1,181 @@
+"""Tests for retention policies, archival and database compaction."""
+
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from taskbrew.orchestrator import retention as retention_mod
+from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.retention import (
+    RetentionManager,
+    RetentionPolicy,
+    build_policies,
+)
+
+
+@pytest.fixture
+async def db(tmp_path):
+    database = Database(str(tmp_path / "r.db"))
+    await database.initialize()
+    yield database
+    await database.close()
+
+
+def _ago(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+async def _add_events(db: Database, ages_days: list[float]) -> None:
+    async with db.transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO events (event_type, data, created_at) VALUES (?, ?, ?)",
+            [("task.claimed", json.dumps({"n": i}), _ago(d)) for i, d in enumerate(ages_days)],
+        )
+
+
+async def _count(db: Database, table: str) -> int:
+    return (await db.execute_fetchone(f"SELECT COUNT(*) AS n FROM {table}"))["n"]
+
+
+def test_build_policies_overrides_and_validation():
+    policies = {p.table: p for p in build_policies({
+        "events": {"max_age_days": 7, "archive": True},
+        "task_usage": False,
+    })}
+    assert policies["events"].max_age_days == 7 and policies["events"].archive
+    assert policies["events"].time_column == "created_at"
+    assert "task_usage" not in policies
+    with pytest.raises(ValueError, match="unknown table"):
+        build_policies({"tasks": {"max_age_days": 1}})
+    with pytest.raises(ValueError, match="unknown keys"):
+        build_policies({"events": {"guard": "1=1"}})
+    with pytest.raises(ValueError, match="positive integer"):
+        build_policies({"events": {"max_rows": 0}})
+
+
+async def test_age_policy_deletes_in_batches_and_archives(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(retention_mod, "_BATCH_SIZE", 4)
+    await _add_events(db, [40] * 10 + [1] * 3)
+    mgr = RetentionManager(
+        db, [RetentionPolicy("events", "created_at", max_age_days=30, archive=True)],
+        archive_dir=tmp_path / "archive",
+    )
+
+    result = await mgr.apply_all()
+    assert result == {
+        "deleted": {"events": 10}, "archived": {"events": 10}, "total_deleted": 10,
+    }
+    assert await _count(db, "events") == 3
+
+    archives = sorted((tmp_path / "archive").glob("events-*"))
+    assert len(archives) == 3 and all(p.suffix == ".gz" for p in archives)
+    rows = []
+    for archive in archives:
+        with gzip.open(archive, "rt") as f:
+            rows += [json.loads(line) for line in f]
+    assert len(rows) == 10
+    assert {json.loads(r["data"])["n"] for r in rows} == set(range(10))
+    assert "_rowid" not in rows[0]
+
+
+async def test_failed_archive_batch_keeps_rows_and_writes_nothing(
+    db, tmp_path, monkeypatch,
+):
+    await _add_events(db, [40] * 3)
+    mgr = RetentionManager(
+        db, [RetentionPolicy("events", "created_at", max_age_days=30, archive=True)],
+        archive_dir=tmp_path / "archive",
+    )
+
+    def _disk_full(path, rows):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("partial")
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(retention_mod, "_write_archive", _disk_full)
+    assert (await mgr.apply_all())["total_deleted"] == 0
+    assert await _count(db, "events") == 3
+    assert list((tmp_path / "archive").iterdir()) == []
+
+    monkeypatch.undo()
+    assert (await mgr.apply_all())["archived"] == {"events": 3}
+    (archive,) = (tmp_path / "archive").iterdir()
+    with gzip.open(archive, "rt") as f:
+        assert len(f.readlines()) == 3
+
+
+async def test_row_cap_keeps_newest_and_guard_protects_rows(db):
+    await _add_events(db, [5, 4, 3, 2, 1])
+    now = _ago(0)
+    async with db.transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO agent_messages (from_agent, to_agent, content, read, created_at) "
+            "VALUES ('a', 'b', 'hi', ?, ?)",
+            [(0, _ago(60)), (1, _ago(60)), (1, now)],
+        )
+    mgr = RetentionManager(db, build_policies({"events": {"max_rows": 2}}))
+
+    result = await mgr.apply_all()
+    assert result["deleted"] == {"events": 3, "agent_messages": 1}
+    remaining = await db.execute_fetchall("SELECT data FROM events ORDER BY created_at")
+    assert [json.loads(r["data"])["n"] for r in remaining] == [3, 4]
+    # The unread old message and the fresh read one both survive.
+    assert await _count(db, "agent_messages") == 2
+
+
+async def test_compact_reclaims_space_only_when_idle(db):
+    await _add_events(db, [40] * 3000)
+    await db.execute("UPDATE events SET data = ?", ("x" * 500,))
+    mgr = RetentionManager(db, build_policies())
+    await mgr.apply_all()
+
+    group = await db.execute_returning(
+        "INSERT INTO groups (id, title, status, created_at) "
+        "VALUES ('G-1', 'g', 'active', ?) RETURNING id", (_ago(0),),
+    )
+    await db.execute(
+        "INSERT INTO tasks (id, group_id, title, status, created_at) "
+        "VALUES ('T-1', ?, 't', 'in_progress', ?)", (group[0]["id"], _ago(0)),
+    )
+    assert await mgr.compact() == {"skipped": "busy"}
+
+    await db.execute("UPDATE tasks SET status = 'completed'")
+    report = await mgr.compact()
+    assert report["vacuum"] == "incremental"
+    assert report["free_pages_before"] > 0 and report["free_pages_after"] == 0
+    assert report["pages_reclaimed"] > 0 and report["bytes_reclaimed"] > 0
+
+
+async def test_compact_converts_legacy_database_with_full_vacuum(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE filler (x TEXT)")
+    legacy.commit()
+    legacy.close()
+
+    db = Database(str(path))
+    await db.initialize()
+    try:
+        assert (await db.execute_fetchone("PRAGMA auto_vacuum"))["auto_vacuum"] == 0
+        async with db.transaction() as conn:
+            await conn.executemany(
+                "INSERT INTO filler (x) VALUES (?)", [("y" * 1000,)] * 2000,
+            )
+        await db.execute("DELETE FROM filler")
+
+        report = await RetentionManager(db, [], full_vacuum=False).compact()
+        assert report["vacuum"] == "deferred"
+        assert (await db.execute_fetchone("PRAGMA auto_vacuum"))["auto_vacuum"] == 0
+
+        report = await RetentionManager(db, []).compact()
+        assert report["vacuum"] == "full"
+        assert report["bytes_reclaimed"] > 1_000_000
+        assert (await db.execute_fetchone("PRAGMA auto_vacuum"))["auto_vacuum"] == 2
+    finally:
+        await db.close()
@@ -207,6 +207,68 @@ async def test_get_board_filtered_by_group(board: TaskBoard):
     assert all_tasks[0]["group_id"] == g1["id"]
 
 
+async def test_board_changes_since_version(board: TaskBoard, db: Database):
+    """Every task mutation bumps the board version; deltas return only
+    what changed, and rows leaving a filter or deleted are reported."""
+    g1 = await board.create_group(title="Group 1", created_by="pm")
+    t1 = await board.create_task(
+        group_id=g1["id"], title="T1", task_type="implementation", assigned_to="coder",
+    )
+    t2 = await board.create_task(
+        group_id=g1["id"], title="T2", task_type="implementation", assigned_to="coder",
+    )
+    v0 = await board.get_board_version()
+    assert v0 >= 2
+
+    unchanged = await board.get_board_changes(v0)
+    assert unchanged["changed"] == [] and unchanged["deleted"] == []
+
+    # A raw UPDATE outside TaskBoard is versioned too.
+    await db.execute("UPDATE tasks SET priority = 'high' WHERE id = ?", (t1["id"],))
+    delta = await board.get_board_changes(v0, summary=True)
+    assert delta["version"] == v0 + 1
+    assert [t["id"] for t in delta["changed"]] == [t1["id"]]
+    assert "description" not in delta["changed"][0]
+
+    filtered = await board.get_board_changes(v0, priority="medium")
+    assert filtered["changed"] == [] and filtered["deleted"] == [t1["id"]]
+
+    await db.execute("DELETE FROM tasks WHERE id = ?", (t2["id"],))
+    delta = await board.get_board_changes(v0 + 1)
+    assert delta["deleted"] == [t2["id"]]
+
+    reset = await board.get_board_changes(delta["version"] + 100)
+    assert reset["reset"] is True
+    assert [t["id"] for t in reset["changed"]] == [t1["id"]]
+
+
+async def test_pruned_tombstones_reset_clients_behind_them(board: TaskBoard, db: Database):
+    from taskbrew.orchestrator.retention import DEFAULT_POLICIES, RetentionManager
+
+    g1 = await board.create_group(title="Group 1", created_by="pm")
+    t1 = await board.create_task(
+        group_id=g1["id"], title="T1", task_type="implementation", assigned_to="coder",
+    )
+    t2 = await board.create_task(
+        group_id=g1["id"], title="T2", task_type="implementation", assigned_to="coder",
+    )
+    before = await board.get_board_version()
+    await db.execute("DELETE FROM tasks WHERE id = ?", (t2["id"],))
+    after = await board.get_board_version()
+    row = await db.execute_fetchone("SELECT deleted_at FROM task_tombstones")
+    assert row["deleted_at"]
+
+    await db.execute("UPDATE task_tombstones SET deleted_at = '2000-01-01T00:00:00+00:00'")
+    mgr = RetentionManager(db, [DEFAULT_POLICIES["task_tombstones"]])
+    assert (await mgr.apply_all())["deleted"] == {"task_tombstones": 1}
+
+    stale = await board.get_board_changes(before)
+    assert stale["reset"] is True
+    assert [t["id"] for t in stale["changed"]] == [t1["id"]]
+    current = await board.get_board_changes(after)
+    assert current["reset"] is False and current["deleted"] == []
+
+
 # ------------------------------------------------------------------
 # Task 6: Dependency resolution
 # ------------------------------------------------------------------
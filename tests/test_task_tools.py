@@ -0,0 +1,115 @@
+"""Tests for the async task_tools MCP server against a stub dashboard."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport
+
+from taskbrew.tools import task_tools
+from taskbrew.tools.task_tools import build_task_tools_server
+
+
+@pytest.fixture
+def dashboard():
+    """Minimal stand-in for the dashboard endpoints task_tools calls."""
+    app = FastAPI()
+    state = {"answer": asyncio.Event(), "polls": 0, "bulk": None}
+
+    @app.get("/api/board")
+    async def board(group_id: str = ""):
+        return {"pending": [{"id": "CD-001", "title": "Impl", "assigned_to": "coder"}]}
+
+    @app.post("/api/tasks/bulk")
+    async def bulk(body: dict):
+        state["bulk"] = body
+        results = [
+            {"id": f"CD-{i:03d}", "title": t["title"], "status": "pending"}
+            for i, t in enumerate(body["tasks"], start=1)
+        ]
+        results[-1] = {"error": "Unknown target role", "status_code": 400}
+        return {"created": len(results) - 1, "results": results}
+
+    @app.post("/mcp/tools/ask_question")
+    async def ask(body: dict):
+        assert body["wait_seconds"] == task_tools._LONG_POLL_SECONDS
+        return {"request_id": "qst-1", "status": "pending"}
+
+    @app.get("/mcp/tools/ask_question/{qid}")
+    async def poll(qid: str, wait: float):
+        state["polls"] += 1
+        try:
+            await asyncio.wait_for(state["answer"].wait(), wait)
+        except asyncio.TimeoutError:
+            return {"request_id": qid, "status": "pending"}
+        return {
+            "request_id": qid, "status": "answered",
+            "selected_answer": "B", "selected_by": "user",
+        }
+
+    return app, state
+
+
+@pytest.fixture
+def server(dashboard, monkeypatch):
+    monkeypatch.setattr(task_tools, "_LONG_POLL_SECONDS", 0.05)
+    for var in ("TASKBREW_AGENT_ROLE", "TASKBREW_AGENT_INSTANCE", "TASKBREW_ALLOWED_TOOLS"):
+        monkeypatch.delenv(var, raising=False)
+    app, _ = dashboard
+    return build_task_tools_server(
+        api_url="http://dashboard", transport=ASGITransport(app=app),
+    )
+
+
+async def _call(server, name, args):
+    result = await server.call_tool(name, args)
+    content = result[0] if isinstance(result, tuple) else result
+    return content[0].text
+
+
+async def test_waiting_question_does_not_block_other_tools(server, dashboard):
+    _, state = dashboard
+    question = asyncio.create_task(_call(server, "ask_question", {
+        "task_id": "CD-001", "group_id": "GRP-1", "question": "Which?",
+        "options": ["A", "B"], "preferred_answer": "A", "reasoning": "r",
+    }))
+
+    listing = await asyncio.wait_for(_call(server, "list_tasks", {}), 2)
+    assert "CD-001: Impl [pending]" in listing
+
+    await asyncio.sleep(0.2)
+    assert not question.done()
+    assert state["polls"] >= 2
+
+    state["answer"].set()
+    answer = await asyncio.wait_for(question, 2)
+    assert answer.startswith("Selected answer: 'B' (by user")
+
+
+async def test_create_tasks_sends_one_batch(server, dashboard):
+    _, state = dashboard
+    text = await _call(server, "create_tasks", {"tasks": [
+        {"group_id": "GRP-1", "title": "One", "assigned_to": "coder",
+         "assigned_by": "architect-1", "task_type": "implementation",
+         "blocked_by": ["AR-1", "AR-2"], "requires_fanout": False},
+        {"group_id": "GRP-1", "title": "Two", "assigned_to": "nobody",
+         "assigned_by": "architect-1", "task_type": "implementation"},
+    ]})
+    first, second = state["bulk"]["tasks"]
+    assert first["blocked_by"] == ["AR-1", "AR-2"]
+    assert first["requires_fanout"] is False
+    assert second["priority"] == "medium"
+    assert text.splitlines() == [
+        "Created 1 of 2 tasks:",
+        "  #1 CD-001 — One (status: pending)",
+        "  #2 Error (HTTP 400): Unknown target role",
+    ]
+
+
+async def test_create_tasks_rejects_incomplete_entry(server, dashboard):
+    _, state = dashboard
+    text = await _call(server, "create_tasks", {"tasks": [{"title": "x"}]})
+    assert text.startswith("Error: task #1 is missing group_id")
+    assert state["bulk"] is None
@@ -0,0 +1,135 @@
+"""Tests for hot-path tracing: histograms, query fingerprints, exporters."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from taskbrew.orchestrator.database import Database
+from taskbrew.orchestrator.event_bus import EventBus
+from taskbrew.orchestrator.task_board import TaskBoard
+from taskbrew.orchestrator.tracing import (
+    OTLPFileExporter,
+    Tracer,
+    fingerprint,
+    get_tracer,
+)
+
+
+@pytest.fixture
+async def traced_db():
+    tracer = Tracer()
+    db = Database(":memory:", tracer=tracer)
+    await db.initialize()
+    tracer.reset()
+    yield db, tracer
+    await db.close()
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM tasks\n  WHERE id IN (?, ?, ?) AND priority = 'high' LIMIT 5")
+    b = fingerprint("SELECT * FROM tasks WHERE id IN (?,?) AND priority = 'low' LIMIT 50")
+    assert a == b == "SELECT * FROM tasks WHERE id IN (?) AND priority = ? LIMIT ?"
+
+
+async def test_database_records_queries_by_fingerprint(traced_db):
+    db, tracer = traced_db
+    board = TaskBoard(db)
+    await board.register_prefixes({"coder": "CD"})
+    group = await board.create_group(title="G", origin="pm", created_by="human")
+    for _ in range(3):
+        await board.create_task(
+            group_id=group["id"], title="T", task_type="implementation",
+            assigned_to="coder", created_by="human",
+        )
+    for status in ("pending", "completed"):
+        await db.execute_fetchall("SELECT id FROM tasks WHERE status = ?", (status,))
+    await db.execute_fetchall("SELECT id FROM tasks WHERE status = 'blocked'")
+
+    queries = {q["fingerprint"]: q for q in tracer.snapshot(top=256)["queries"]}
+    q = queries["SELECT id FROM tasks WHERE status = ?"]
+    assert q["count"] == 3
+    assert q["rows"] == 3
+
+    text = tracer.render_prometheus()
+    assert (
+        'taskbrew_db_query_duration_seconds_count'
+        '{statement="SELECT id FROM tasks WHERE status = ?"} 3'
+    ) in text
+    assert 'taskbrew_db_query_rows_total{statement="SELECT id FROM tasks WHERE status = ?"} 3' in text
+
+
+async def test_transaction_statements_are_recorded(traced_db):
+    db, tracer = traced_db
+    await db.execute("CREATE TABLE t (v INTEGER)")
+    async with db.transaction() as conn:
+        await conn.executemany("INSERT INTO t (v) VALUES (?)", [(1,), (2,), (3,)])
+        await conn.execute("DELETE FROM t WHERE v > ?", (1,))
+
+    queries = {q["fingerprint"]: q for q in tracer.snapshot(top=256)["queries"]}
+    assert queries["INSERT INTO t (v) VALUES (?)"]["rows"] == 3
+    assert queries["DELETE FROM t WHERE v > ?"]["rows"] == 2
+
+
+async def test_spans_feed_stage_histograms_and_export_nested(tmp_path, traced_db):
+    db, tracer = traced_db
+    path = tmp_path / "spans.jsonl"
+    tracer.exporter = OTLPFileExporter(path)
+
+    with tracer.span("agent.claim", role="coder"):
+        await db.execute_fetchone("SELECT 1 AS n")
+    with (
+        pytest.raises(RuntimeError),
+        tracer.span("agent.sdk_run", role="coder", task_id="CD-001"),
+    ):
+        raise RuntimeError("boom")
+    await db.execute_fetchone("SELECT 2 AS n")  # outside any span: not exported
+    tracer.close()
+
+    stages = {(s["stage"], s["role"]): s for s in tracer.snapshot()["stages"]}
+    assert stages[("agent.claim", "coder")]["count"] == 1
+    assert stages[("agent.sdk_run", "coder")]["count"] == 1
+    assert 'taskbrew_stage_duration_seconds_count{stage="agent.claim",role="coder"} 1' in (
+        tracer.render_prometheus()
+    )
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {s["name"]: s for s in spans}
+    assert set(by_name) == {"db.query", "agent.claim", "agent.sdk_run"}
+    assert by_name["db.query"]["parentSpanId"] == by_name["agent.claim"]["spanId"]
+    assert by_name["db.query"]["traceId"] == by_name["agent.claim"]["traceId"]
+    assert by_name["agent.sdk_run"]["status"]["code"] == 2
+
+
+async def test_disabled_tracer_records_nothing(traced_db):
+    db, tracer = traced_db
+    tracer.enabled = False
+    with tracer.span("agent.claim", role="coder"):
+        await db.execute_fetchone("SELECT 1")
+    snap = tracer.snapshot()
+    assert snap["stages"] == [] and snap["queries"] == []
+
+
+async def test_prometheus_endpoint(tmp_path):
+    db = Database(str(tmp_path / "t.db"))
+    await db.initialize()
+    from taskbrew.dashboard.app import create_app
+
+    app = create_app(event_bus=EventBus(), task_board=TaskBoard(db))
+    with get_tracer().span("agent.claim", role="coder"):
+        pass
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        resp = await client.get("/api/metrics/prometheus")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain")
+        assert "# TYPE taskbrew_stage_duration_seconds histogram" in resp.text
+        assert 'stage="agent.claim",role="coder"' in resp.text
+
+        resp = await client.get("/api/metrics/hotpaths?top=5")
+        assert resp.status_code == 200
+        assert len(resp.json()["queries"]) <= 5
+    await db.close()
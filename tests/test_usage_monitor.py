@@ -265,3 +265,195 @@ def test_parse_usage_text():
     assert result["limits"][3]["pct_used"] == 100
     assert result["extra_usage_spent"] == 68.38
     assert result["extra_usage_limit"] == 50.00
+
+
+def _assistant_line(model: str, out: int, ts: str = "2026-02-26T10:00:00.000Z") -> str:
+    return json.dumps({
+        "type": "assistant",
+        "timestamp": ts,
+        "message": {"model": model, "usage": {"input_tokens": 1, "output_tokens": out}},
+    })
+
+
+def test_session_aggregator_reads_only_appended_bytes(tmp_path):
+    from taskbrew.dashboard.session_usage import SessionUsageAggregator
+
+    proj = tmp_path / "projects" / "p"
+    proj.mkdir(parents=True)
+    log = proj / "s.jsonl"
+    log.write_text(_assistant_line("claude-opus-4-6", 10) + "\n")
+
+    agg = SessionUsageAggregator()
+    agg.refresh(tmp_path / "projects")
+    first_read = agg.bytes_read
+    assert agg.latest()["models"]["claude-opus-4-6"]["output_tokens"] == 10
+
+    # An append plus a half-written line: only the new bytes are read and
+    # the partial line is left for the next refresh.
+    partial = _assistant_line("claude-sonnet-4-6", 7)
+    appended = _assistant_line("claude-opus-4-6", 5) + "\n" + partial[:20]
+    with open(log, "a") as fh:
+        fh.write(appended)
+    agg.refresh(tmp_path / "projects")
+    assert agg.bytes_read - first_read == len(appended)
+    session = agg.latest()
+    assert session["messages"] == 2
+    assert session["models"]["claude-opus-4-6"]["output_tokens"] == 15
+
+    with open(log, "a") as fh:
+        fh.write(partial[20:] + "\n")
+    agg.refresh(tmp_path / "projects")
+    assert agg.latest()["models"]["claude-sonnet-4-6"]["output_tokens"] == 7
+
+    # A rewritten (shorter) file is re-read from the start.
+    log.write_text(_assistant_line("claude-haiku-4-5-20251001", 3) + "\n")
+    agg.refresh(tmp_path / "projects")
+    assert agg.latest()["models"] == {
+        "claude-haiku-4-5-20251001": {
+            "input_tokens": 1, "output_tokens": 3, "cache_read": 0,
+            "cache_create": 0, "messages": 1,
+        },
+    }
+
+
+def test_session_aggregator_reads_large_logs_in_chunks(tmp_path, monkeypatch):
+    from taskbrew.dashboard import session_usage
+    from taskbrew.dashboard.session_usage import SessionUsageAggregator
+
+    monkeypatch.setattr(session_usage, "_READ_CHUNK", 64)  # splits every line
+    proj = tmp_path / "projects" / "p"
+    proj.mkdir(parents=True)
+    lines = [_assistant_line("claude-opus-4-6", n) for n in range(1, 21)]
+    (proj / "s.jsonl").write_text("\n".join(lines))  # last line unterminated
+
+    reads = []
+    real_open = open
+
+    def _open(*args, **kwargs):
+        fh = real_open(*args, **kwargs)
+        real_read = fh.read
+        fh.read = lambda size=-1: reads.append(size) or real_read(size)
+        return fh
+
+    monkeypatch.setattr(session_usage, "open", _open, raising=False)
+    agg = SessionUsageAggregator()
+    agg.refresh(tmp_path / "projects")
+    session = agg.latest()
+    assert session["messages"] == 20
+    assert session["models"]["claude-opus-4-6"]["output_tokens"] == sum(range(1, 21))
+    assert reads and max(reads) == 64
+    assert agg.bytes_read == sum(len(line) for line in lines) + 19
+
+
+def test_session_aggregator_tracks_newest_files(tmp_path):
+    import os
+
+    from taskbrew.dashboard.session_usage import SessionUsageAggregator
+
+    root = tmp_path / "projects"
+    for i in range(4):
+        d = root / f"p{i}"
+        d.mkdir(parents=True)
+        f = d / "s.jsonl"
+        f.write_text(_assistant_line("claude-opus-4-6", i) + "\n")
+        os.utime(f, (1000 + i, 1000 + i))
+
+    agg = SessionUsageAggregator(max_files=2)
+    agg.refresh(root)
+    assert [s["models"]["claude-opus-4-6"]["output_tokens"] for s in agg.sessions()] == [3, 2]
+
+    new = root / "p0" / "new.jsonl"
+    new.write_text(_assistant_line("claude-opus-4-6", 99) + "\n")
+    agg.refresh(root)
+    assert agg.latest()["models"]["claude-opus-4-6"]["output_tokens"] == 99
+    assert len(agg.sessions()) == 2
+
+
+async def test_quota_probe_serves_cache_and_coalesces():
+    import asyncio
+    import threading
+    import time
+
+    from taskbrew.dashboard.quota_probe import QuotaProbe
+
+    lock = asyncio.Lock()
+    running = {"now": 0, "peak": 0, "calls": 0}
+    guard = threading.Lock()
+
+    def slow_probe():
+        with guard:
+            running["calls"] += 1
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.05)
+        with guard:
+            running["now"] -= 1
+        return {"limits": [{"label": "Current session", "pct_used": 3}]}
+
+    claude = QuotaProbe("claude", slow_probe, lock)
+    gemini = QuotaProbe("gemini", slow_probe, lock)
+
+    # Reads never wait for the CLI; a burst of them starts one probe.
+    assert [claude.get() for _ in range(5)] == [None] * 5
+    assert gemini.get() is None
+    assert claude.status()["refreshing"] is True
+    await asyncio.gather(claude.refresh(), gemini.refresh())
+
+    assert running["calls"] == 2
+    assert running["peak"] == 1  # shared spawn lock: one CLI at a time
+    assert claude.get()["limits"][0]["pct_used"] == 3
+    status = claude.status()
+    assert status["stale"] is False and status["age_seconds"] is not None
+    assert claude.metrics()["probes"] == 1 and claude.metrics()["failures"] == 0
+
+
+async def test_quota_probe_timeout_is_a_failure_and_keeps_lock():
+    import asyncio
+    import time
+
+    from taskbrew.dashboard.quota_probe import QuotaProbe
+
+    lock = asyncio.Lock()
+
+    def hung_probe():
+        time.sleep(0.2)
+        return None
+
+    probe = QuotaProbe("claude", hung_probe, lock, timeout=0.05)
+    task = probe.refresh()
+    await asyncio.sleep(0.1)
+    assert probe.metrics()["failures"] == 1
+    assert "timed out" in probe.status()["last_error"]
+    assert lock.locked()  # the thread is still running its CLI
+    await task
+    assert not lock.locked()
+    # Spaced retries: a read right after the failure does not respawn.
+    assert probe.get() is None
+    assert probe.status()["refreshing"] is False
+
+
+def test_session_aggregator_readers_see_published_summary(tmp_path):
+    from taskbrew.dashboard.session_usage import SessionUsageAggregator
+
+    proj = tmp_path / "projects" / "p"
+    proj.mkdir(parents=True)
+    log = proj / "s.jsonl"
+    log.write_text(_assistant_line("claude-opus-4-6", 10) + "\n")
+    agg = SessionUsageAggregator()
+    agg.refresh(tmp_path / "projects")
+
+    # Readers running while a refresh tails (and grows state.models)
+    # get the previous summary, not the dicts being mutated.
+    with open(log, "a") as fh:
+        fh.write(_assistant_line("claude-sonnet-4-6", 7) + "\n")
+    seen = []
+    real_tail = agg._tail
+
+    def _tail(path):
+        real_tail(path)
+        seen.append(agg.latest()["models"])
+
+    agg._tail = _tail
+    agg.refresh(tmp_path / "projects")
+    assert list(seen[0]) == ["claude-opus-4-6"]
+    assert set(agg.latest()["models"]) == {"claude-opus-4-6", "claude-sonnet-4-6"}
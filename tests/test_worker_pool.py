@@ -0,0 +1,129 @@
+"""Tests for multi-process mode: instance partitioning and agent workers."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from taskbrew.orchestrator.bench import BenchConfig, _write_project
+from taskbrew.orchestrator.worker_pool import (
+    WORKER_COUNT_ENV,
+    WorkerPool,
+    partition_instances,
+)
+
+
+def _roles(**counts: int) -> dict:
+    return {name: SimpleNamespace(max_instances=n) for name, n in counts.items()}
+
+
+async def test_crashing_worker_backs_off_then_gives_up(monkeypatch):
+    hub = SimpleNamespace(address="unix:/nonexistent", token="t", workers=[])
+    pool = WorkerPool(".", 1, hub, restart_delay=0.01, max_restarts=3)
+    monkeypatch.setattr(
+        pool, "_command", lambda index: [sys.executable, "-c", "raise SystemExit(3)"],
+    )
+    delays = []
+    original = pool._sleep_unless_stopping
+
+    async def _sleep(seconds):
+        delays.append(seconds)
+        return await original(seconds)
+
+    monkeypatch.setattr(pool, "_sleep_unless_stopping", _sleep)
+    await pool.start()
+    await asyncio.wait_for(pool.run(), 10)
+
+    (worker,) = pool.stats()["workers"]
+    assert delays == [0.01, 0.02, 0.04]
+    assert worker["restarts"] == 3 and worker["gave_up"] is True
+    assert worker["last_exit"] == 3 and worker["alive"] is False
+
+
+def test_partition_covers_every_instance_once():
+    roles = _roles(pm=1, coder=3, verifier=2)
+    shares = [[i for i, _ in partition_instances(roles, w, 2)] for w in (1, 2)]
+    assert shares == [["pm-1", "coder-2", "verifier-1"], ["coder-1", "coder-3", "verifier-2"]]
+    assert partition_instances(roles, 1, 1)[0] == ("pm-1", roles["pm"])
+    # More workers than instances leaves the extra workers idle.
+    assert partition_instances(_roles(pm=1), 2, 3) == []
+    with pytest.raises(ValueError, match="out of range"):
+        partition_instances(roles, 3, 2)
+
+
+async def test_agent_workers_complete_tasks_and_relay_events(tmp_path, monkeypatch):
+    from taskbrew.main import build_orchestrator, start_agents
+
+    _write_project(tmp_path, BenchConfig(agents_per_role=1, fanout=0, latency_ms=1, jitter_ms=0))
+    monkeypatch.setenv(WORKER_COUNT_ENV, "2")
+    orch = await build_orchestrator(project_dir=tmp_path)
+    try:
+        await start_agents(orch)
+        assert orch._agent_loops == []
+        orch.instance_manager.resume_all()
+
+        for n in range(3):
+            group = await orch.task_board.create_group(
+                title=f"Goal {n}", origin="pm", created_by="test",
+            )
+            await orch.task_board.create_task(
+                group_id=group["id"], title=f"Goal {n}", task_type="goal",
+                assigned_to="pm", created_by="test",
+            )
+
+        deadline = time.monotonic() + 60
+        while True:
+            row = await orch.db.execute_fetchone(
+                "SELECT COUNT(*) AS n FROM tasks "
+                "WHERE status IN ('pending', 'in_progress', 'blocked')"
+            )
+            if not row["n"]:
+                break
+            assert time.monotonic() < deadline, "workers did not finish the tasks"
+            await asyncio.sleep(0.1)
+
+        done = await orch.db.execute_fetchall("SELECT status, claimed_by FROM tasks")
+        assert {r["status"] for r in done} == {"completed"}
+        assert {r["claimed_by"] for r in done} <= {"pm-1"}  # pm-1 lives in worker 1
+        assert orch.event_hub.workers == ["worker-1", "worker-2"]
+        assert any(
+            e["type"] == "task.completed" for e in orch.event_bus.get_history()
+        )
+        stats = orch.worker_pool.stats()
+        assert [w["alive"] for w in stats["workers"]] == [True, True]
+    finally:
+        await orch.shutdown(timeout=10.0)
+    assert orch.worker_pool.stats()["workers"][0]["alive"] is False
+
+
+async def test_worker_applies_dashboard_role_edits(tmp_path):
+    import yaml
+
+    from taskbrew.main import _reload_roles, build_orchestrator, start_agents
+
+    _write_project(tmp_path, BenchConfig(agents_per_role=1, fanout=0))
+    orch = await build_orchestrator(project_dir=tmp_path)
+    try:
+        await start_agents(orch)
+        coder = orch.roles["coder"]
+        roles_dir = tmp_path / "config" / "roles"
+        data = yaml.safe_load((roles_dir / "coder.yaml").read_text())
+        data["system_prompt"] = "Edited on the dashboard."
+        (roles_dir / "coder.yaml").write_text(yaml.safe_dump(data))
+        (roles_dir / "verifier.yaml").unlink()
+
+        await _reload_roles(orch, {"type": "role.updated", "role": "coder"})
+
+        assert orch.roles["coder"] is coder  # running loops hold this object
+        assert coder.system_prompt == "Edited on the dashboard."
+        assert "verifier" not in orch.roles
+        assert "verifier-1" not in orch._agent_tasks_by_id
+        assert {loop.instance_id for loop in orch._agent_loops} == {
+            "pm-1", "architect-1", "coder-1",
+        }
+    finally:
+        await orch.shutdown(timeout=5.0)
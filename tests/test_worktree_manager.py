@@ -204,3 +204,86 @@ async def test_cleanup_removes_reused_worktree(worktree_manager):
     assert os.path.exists(path)
     await worktree_manager.cleanup_worktree("coder-1")
     assert not os.path.exists(path)
+
+
+@pytest.fixture
+async def pooled_manager(git_repo):
+    nm = git_repo / "node_modules" / "pkg"
+    nm.mkdir(parents=True)
+    (nm / "index.js").write_text("module.exports = 1;\n")
+    manager = WorktreeManager(
+        repo_dir=str(git_repo), worktree_base=str(git_repo / ".worktrees"),
+        pool_size=1, warm_paths=["node_modules"],
+    )
+    yield manager
+    await manager.cleanup_all()
+
+
+async def test_pool_slot_is_checked_out_with_warm_deps(pooled_manager, git_repo):
+    assert await pooled_manager.fill_pool() == 1
+    [slot] = pooled_manager.pool_status()["idle"]
+    seeded = os.path.join(slot, "node_modules", "pkg", "index.js")
+    source = git_repo / "node_modules" / "pkg" / "index.js"
+    assert os.stat(seeded).st_ino == source.stat().st_ino  # hardlinked
+
+    path = await pooled_manager.create_worktree("coder-1", "feat/pooled")
+    assert path == str((git_repo / ".worktrees" / "coder-1").resolve())
+    assert not os.path.exists(slot)
+    assert os.path.exists(os.path.join(path, "node_modules", "pkg", "index.js"))
+    branch = subprocess.run(
+        ["git", "rev-parse", "--abbrev-ref", "HEAD"],
+        cwd=path, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    assert branch == "feat/pooled"
+
+    # The claim kicked off a background refill.
+    await pooled_manager._replenish_task
+    assert len(pooled_manager.pool_status()["idle"]) == 1
+
+
+async def test_released_worktree_returns_to_pool(pooled_manager):
+    path = await pooled_manager.create_worktree("coder-1", "feat/release")
+    # Keep the pool empty so the release has room to park.
+    pooled_manager._replenish_task.cancel()
+    with open(os.path.join(path, "stray.txt"), "w") as f:
+        f.write("uncommitted")
+    os.makedirs(os.path.join(path, ".venv"))
+    await pooled_manager.cleanup_worktree("coder-1")
+
+    assert not os.path.exists(path)
+    [slot] = pooled_manager.pool_status()["idle"]
+    assert not os.path.exists(os.path.join(slot, "stray.txt"))
+    assert os.path.isdir(os.path.join(slot, ".venv"))  # ignored cache kept
+
+    # The branch is free again for the next claim.
+    path2 = await pooled_manager.create_worktree("coder-2", "feat/release")
+    assert os.path.isdir(path2)
+
+
+async def test_pool_slots_survive_restart(pooled_manager, git_repo):
+    await pooled_manager.fill_pool()
+    [slot] = pooled_manager.pool_status()["idle"]
+
+    restarted = WorktreeManager(
+        repo_dir=str(git_repo), worktree_base=str(git_repo / ".worktrees"), pool_size=1,
+    )
+    await restarted.prune_stale()
+    assert await restarted.fill_pool() == 0
+    assert restarted.pool_status()["idle"] == [slot]
+
+
+async def test_concurrent_claims_for_different_agents(worktree_manager):
+    import asyncio
+
+    paths = await asyncio.gather(*(
+        worktree_manager.create_worktree(f"coder-{i}", f"feat/par-{i}")
+        for i in range(4)
+    ))
+    assert len(set(paths)) == 4
+    assert all(os.path.isdir(p) for p in paths)
+    assert worktree_manager._locks == {}
+
+
+def test_warm_paths_must_stay_in_repo(git_repo):
+    with pytest.raises(ValueError):
+        WorktreeManager(str(git_repo), str(git_repo / ".worktrees"), warm_paths=["../x"])